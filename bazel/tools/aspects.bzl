@@ -51,6 +51,7 @@ mypy_aspect = mypy(
         # `types-pika-ts` wrongfully resolves `pika-ts` instead of `pika`.
         requirement("pika"): types[requirement("pika-ts")],
         # Add stubs for 3rd party packages we use
+        requirement("lz4"): Label("@//tests/typeshed:lz4-stubs"),
         requirement("marshmallow-oneofschema"): Label("@//tests/typeshed:marshmallow-oneofschema-stubs"),
         requirement("pyprof2calltree"): Label("@//tests/typeshed:pyprof2calltree-stubs"),
     },
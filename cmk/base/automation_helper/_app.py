@@ -4,13 +4,25 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import asyncio
+import functools
 import io
 import logging
+import multiprocessing
+import signal
 import sys
 import time
 from collections.abc import AsyncGenerator, Awaitable, Callable, Iterator
-from contextlib import asynccontextmanager, contextmanager, redirect_stderr, redirect_stdout
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import (
+    asynccontextmanager,
+    contextmanager,
+    redirect_stderr,
+    redirect_stdout,
+    suppress,
+)
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
 from typing import assert_never, Protocol
 
 from fastapi import FastAPI, Request, status
@@ -32,7 +44,7 @@ from cmk.ccc.hostaddress import Hosts
 from cmk.checkengine.plugins import AgentBasedPlugins
 
 from ._cache import Cache, CacheError
-from ._config import Config, ReloaderConfig
+from ._config import Config, ReloaderConfig, WorkerPoolConfig
 from ._tracer import TRACER
 
 
@@ -66,13 +78,20 @@ class _State:
 
         Raises on failure; callers decide whether to continue or report the error.
         """
+        # Do not yet set `self.last_reload_at`. We don't know if we succeed.
+        time_right_before_reload, self.loading_result = self.load_generation()
+        self.last_reload_at = time_right_before_reload
+
+    def load_generation(self) -> tuple[float, config.LoadingResult]:
+        """Load the plugins (once) and the configuration without making it the current one.
+
+        Returns the configuration together with the time right before it was loaded.
+        """
         if self.plugins is None:
             self.plugins = config.load_all_plugins()
 
-        # Do not yet set `self.last_reload_at`. We don't know if we succeed.
         time_right_before_reload = time.time()
-        self.loading_result = self.reload_config()
-        self.last_reload_at = time_right_before_reload
+        return time_right_before_reload, self.reload_config()
 
     def reload_if_required(self) -> bool:
         """Reload the configuration if the cache reports a newer change than our last reload.
@@ -92,6 +111,7 @@ class _ApplicationDependencies:
     clear_caches_before_each_call: Callable[[ConfigCache, Hosts], None]
     state: _State
     log_manager: LoggingManager
+    worker_pool: "_WorkerPool | None"
 
 
 class HealthCheckResponse(BaseModel, frozen=True):
@@ -127,25 +147,46 @@ def make_application(
             },
         )
 
+    state = _State(
+        automation_or_reload_lock=asyncio.Lock(),
+        reload_config=reload_config,
+        last_reload_at=0,
+        plugins=None,
+        loading_result=None,
+        changes_cache=cache,
+    )
+    log_manager = LoggingManager(log_level=logging.NOTSET)
     app.state.dependencies = _ApplicationDependencies(
         automation_engine=engine,
         config=config,
         clear_caches_before_each_call=clear_caches_before_each_call,
-        state=_State(
-            automation_or_reload_lock=asyncio.Lock(),
-            reload_config=reload_config,
-            last_reload_at=0,
-            plugins=None,
-            loading_result=None,
-            changes_cache=cache,
+        state=state,
+        log_manager=log_manager,
+        worker_pool=(
+            _WorkerPool(
+                config.worker_pool_config,
+                state,
+                functools.partial(
+                    _execute_automation,
+                    edition,
+                    engine=engine,
+                    clear_caches_before_each_call=clear_caches_before_each_call,
+                    log_manager=log_manager,
+                ),
+            )
+            if config.worker_pool_config
+            else None
         ),
-        log_manager=LoggingManager(log_level=logging.NOTSET),
     )
 
     async def _automation_endpoint(
         request: Request, payload: AutomationPayload
     ) -> AutomationResponse:
         dependencies: _ApplicationDependencies = request.app.state.dependencies
+        if dependencies.worker_pool:
+            return await dependencies.worker_pool.execute(
+                payload, dependencies.log_manager.get_logger("automation")
+            )
         async with dependencies.state.automation_or_reload_lock:
             return _execute_automation_endpoint(
                 edition,
@@ -175,7 +216,10 @@ async def _lifespan(app: FastAPI) -> AsyncGenerator[None]:
         logger = dependencies.log_manager.get_logger("automation.reloader")
         # Continue on error. Either the reloader can fix it, or we will raise in the automation endpoint.
         try:
-            dependencies.state.load()
+            if dependencies.worker_pool:
+                await dependencies.worker_pool.reload_if_required()
+            else:
+                dependencies.state.load()
         except SystemExit:
             logger.warning("Failed to reload configuration. Shutting down")
         except Exception:
@@ -186,6 +230,11 @@ async def _lifespan(app: FastAPI) -> AsyncGenerator[None]:
                 config=dependencies.config.reloader_config,
                 state=dependencies.state,
                 logger=logger,
+                reload_if_required=(
+                    dependencies.worker_pool.reload_if_required
+                    if dependencies.worker_pool
+                    else None
+                ),
             )
             if dependencies.config.reloader_config.active
             else asyncio.sleep(0),
@@ -194,6 +243,8 @@ async def _lifespan(app: FastAPI) -> AsyncGenerator[None]:
         yield
 
     reloader_task.cancel()
+    if dependencies.worker_pool:
+        await dependencies.worker_pool.close()
 
 
 async def _reloader_task(
@@ -201,9 +252,16 @@ async def _reloader_task(
     state: _State,
     logger: logging.Logger,
     delayer_factory: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    reload_if_required: Callable[[], Awaitable[bool]] | None = None,
 ) -> None:
     logger.info("Operational")
 
+    async def _reload_state_if_required() -> bool:
+        async with state.automation_or_reload_lock:
+            return state.reload_if_required()
+
+    reload_if_required = reload_if_required or _reload_state_if_required
+
     def _get_last_change() -> float:
         try:
             return state.changes_cache.get_last_detected_change()
@@ -234,34 +292,32 @@ async def _reloader_task(
             cached_last_change = _get_last_change()
 
             if cached_last_change == last_change:
-                async with state.automation_or_reload_lock:
-                    # Do not let the reloader fail (and stop).
-                    # We will try again on the next change, and report failure in the automation endpoint.
-                    try:
-                        if state.reload_if_required():
-                            logger.info("Triggering reload")
-                    except SystemExit:
-                        logger.error("Failed to reload configuration. Shutting down")  # noqa: TRY400
-                    except Exception:
-                        logger.exception("Error reloading configuration")
-                    break
-
-            else:
-                # More changes arrived mid-cooldown (e.g. a bulk activation still in
-                # progress). Wait only for the gap between the two observed changes
-                # instead of resetting the full cooldown, so we still reload promptly
-                # once the burst settles rather than deferring indefinitely in busy
-                # environments (CMK-21331). abs() guards against the timestamp jumping
-                # backwards on a cache reset.
-                current_cooldown = min(
-                    abs(cached_last_change - last_change),
-                    config.cooldown_interval,
-                )
-                last_change = cached_last_change
-                logger.info(
-                    "Change detected %(seconds_ago).2f seconds ago",
-                    {"seconds_ago": time.time() - last_change},
-                )
+                # Do not let the reloader fail (and stop).
+                # We will try again on the next change, and report failure in the automation endpoint.
+                try:
+                    if await reload_if_required():
+                        logger.info("Triggering reload")
+                except SystemExit:
+                    logger.error("Failed to reload configuration. Shutting down")  # noqa: TRY400
+                except Exception:
+                    logger.exception("Error reloading configuration")
+                break
+
+            # More changes arrived mid-cooldown (e.g. a bulk activation still in
+            # progress). Wait only for the gap between the two observed changes
+            # instead of resetting the full cooldown, so we still reload promptly
+            # once the burst settles rather than deferring indefinitely in busy
+            # environments (CMK-21331). abs() guards against the timestamp jumping
+            # backwards on a cache reset.
+            current_cooldown = min(
+                abs(cached_last_change - last_change),
+                config.cooldown_interval,
+            )
+            last_change = cached_last_change
+            logger.info(
+                "Change detected %(seconds_ago).2f seconds ago",
+                {"seconds_ago": time.time() - last_change},
+            )
 
 
 def _execute_automation_endpoint(
@@ -287,6 +343,28 @@ def _execute_automation_endpoint(
             stderr=f"Error reloading configuration: {e}",
         )
 
+    return _execute_automation(
+        edition,
+        payload,
+        state.plugins,
+        state.loading_result,
+        engine=engine,
+        clear_caches_before_each_call=clear_caches_before_each_call,
+        log_manager=log_manager,
+    )
+
+
+def _execute_automation(
+    edition: cmk_version.Edition,
+    payload: AutomationPayload,
+    plugins: AgentBasedPlugins | None,
+    loading_result: config.LoadingResult | None,
+    *,
+    engine: AutomationEngine,
+    clear_caches_before_each_call: Callable[[ConfigCache, Hosts], None],
+    log_manager: LoggingManager,
+) -> AutomationResponse:
+    logger = log_manager.get_logger("automation")
     buffer_stdout = io.StringIO()
     buffer_stderr = io.StringIO()
     with (
@@ -306,18 +384,16 @@ def _execute_automation_endpoint(
         log_manager.temporary_log_level(payload.log_level),
         log_manager.stream_logging(stream=buffer_stderr, log_level=logging.ERROR),
     ):
-        if state.loading_result:
-            clear_caches_before_each_call(
-                state.loading_result.config_cache, state.loading_result.hosts_config
-            )
+        if loading_result:
+            clear_caches_before_each_call(loading_result.config_cache, loading_result.hosts_config)
         try:
             automation_start_time = time.time()
             result_or_error_code: ABCAutomationResult | int = engine.execute(
                 make_app(edition),
                 payload.name,
                 list(payload.args),
-                state.plugins,
-                state.loading_result,
+                plugins,
+                loading_result,
             )
             automation_end_time = time.time()
         except SystemExit as system_exit:
@@ -361,6 +437,272 @@ def _execute_automation_endpoint(
                 assert_never(result_or_error_code)
 
 
+type _ExecuteAutomation = Callable[
+    [AutomationPayload, AgentBasedPlugins | None, config.LoadingResult | None],
+    AutomationResponse,
+]
+
+
+_WORKER_EXIT_TIMEOUT = 5
+
+
+class _Worker:
+    """A forked process executing automations with the configuration it has been forked with"""
+
+    def __init__(self, process: BaseProcess, connection: Connection) -> None:
+        self.process = process
+        self._connection = connection
+
+    def execute(self, payload: AutomationPayload) -> AutomationResponse:
+        self._connection.send(payload)
+        response = self._connection.recv()
+        assert isinstance(response, AutomationResponse)
+        return response
+
+    def stop(self) -> None:
+        """Let the worker exit and reap it, it is idle or dead by now"""
+        with suppress(OSError):
+            self._connection.send(None)
+        self._connection.close()
+        self.process.join(timeout=_WORKER_EXIT_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+def _serve_automations(
+    connection: Connection, execute: Callable[[AutomationPayload], AutomationResponse]
+) -> None:
+    # The signal handling of uvicorn is meant for the process we have been forked from
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    with suppress(EOFError):
+        while (payload := connection.recv()) is not None:
+            connection.send(execute(payload))
+
+
+@dataclass
+class _Generation:
+    """The workers forked with the same configuration"""
+
+    last_reload_at: float
+    fork_worker: Callable[[], _Worker]
+    num_workers: int
+    # Held while a configuration is loaded, see `_WorkerPool`
+    fork_lock: asyncio.Lock
+    workers: list[_Worker] = field(default_factory=list)
+    idle: asyncio.Queue[_Worker] = field(default_factory=asyncio.Queue)
+    retired: asyncio.Event = field(default_factory=asyncio.Event)
+    _replacements: set[asyncio.Task[None]] = field(default_factory=set, init=False)
+
+    def __post_init__(self) -> None:
+        for _ in range(self.num_workers):
+            self._add(self.fork_worker())
+
+    def release(self, worker: _Worker) -> None:
+        if self.retired.is_set():
+            self._discard(worker)
+        else:
+            self.idle.put_nowait(worker)
+
+    def replace(self, worker: _Worker) -> None:
+        """Fork a new worker with the same configuration for one which failed or died"""
+        self._discard(worker)
+        if self.retired.is_set():
+            return
+        self._replacements.add(task := asyncio.create_task(self._fork_replacement()))
+        task.add_done_callback(self._replacements.discard)
+
+    async def _fork_replacement(self) -> None:
+        async with self.fork_lock:
+            if self.retired.is_set():
+                return
+            with suppress(OSError):  # E.g. out of memory, the remaining workers keep serving
+                self._add(self.fork_worker())
+        if not self.workers:
+            self.retire()
+
+    def retire(self) -> None:
+        """Stop the idle workers now and the busy ones once they are done"""
+        self.retired.set()
+        while not self.idle.empty():
+            self._discard(self.idle.get_nowait())
+
+    def _add(self, worker: _Worker) -> None:
+        self.workers.append(worker)
+        self.idle.put_nowait(worker)
+
+    def _discard(self, worker: _Worker) -> None:
+        worker.stop()
+        self.workers.remove(worker)
+
+
+class _WorkerPool:
+    """Executes the automations concurrently in forked worker processes
+
+    A new generation of the configuration is loaded in a background thread of this process, which
+    does not execute any automations itself. The workers are forked afterwards, so they share the
+    loaded configuration with this process. Once they are ready, the generation replaces the
+    current one. Automations which are running in the workers of the previous generation are not
+    interrupted.
+
+    Automations only wait for a reload if a change has been detected after the current generation
+    has been loaded. This guarantees that they never work on an outdated configuration.
+
+    Workers which fail or die are replaced by new ones forked with the configuration of their
+    generation, so the pool does not shrink over time.
+
+    Combining forking and multithreading is a no-go, so workers are only forked while the loader
+    thread is idle: the initial workers of a generation right after it has been loaded, their
+    replacements under the same lock as the loading. The other threads only wait for the
+    responses of the workers and hold no locks of cmk.base. The workers themselves are single
+    threaded and no daemons, so the automations may start process pools of their own, e.g. for
+    the creation of the core configuration. They are reaped explicitly once they are stopped.
+    """
+
+    def __init__(
+        self, config: WorkerPoolConfig, state: _State, execute: _ExecuteAutomation
+    ) -> None:
+        self._num_workers = config.num_workers
+        self._state = state
+        self._execute = execute
+        self._current: _Generation | None = None
+        self._generations: list[_Generation] = []
+        # Held while a configuration is loaded and while workers are forked
+        self._reload_lock = asyncio.Lock()
+        # cmk.base is not thread-safe, so the configuration is only ever loaded in this thread
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-loader")
+
+    async def reload_if_required(self) -> bool:
+        if not self._reload_required():
+            return False
+        async with self._reload_lock:
+            if not self._reload_required():
+                return False  # Reloaded while we were waiting for the lock
+            await self._load_generation()
+            return True
+
+    def _reload_required(self) -> bool:
+        return self._current is None or self._state.changes_cache.reload_required(
+            self._state.last_reload_at
+        )
+
+    async def _load_generation(self) -> None:
+        last_reload_at, loading_result = await asyncio.get_running_loop().run_in_executor(
+            self._loader, self._state.load_generation
+        )
+        generation = _Generation(
+            last_reload_at=last_reload_at,
+            fork_worker=functools.partial(
+                self._fork_worker,
+                functools.partial(
+                    self._execute,
+                    plugins=self._state.plugins,
+                    loading_result=loading_result,
+                ),
+            ),
+            num_workers=self._num_workers,
+            fork_lock=self._reload_lock,
+        )
+        self._generations = [g for g in self._generations if g.workers] + [generation]
+        previous, self._current = self._current, generation
+        self._state.loading_result = loading_result
+        self._state.last_reload_at = last_reload_at
+        if previous:
+            previous.retire()
+
+    @staticmethod
+    def _fork_worker(execute: Callable[[AutomationPayload], AutomationResponse]) -> _Worker:
+        context = multiprocessing.get_context("fork")
+        connection, worker_connection = context.Pipe()
+        process = context.Process(
+            target=_serve_automations,
+            args=(worker_connection, execute),
+            name="automation-worker",
+            # Daemons may not start processes. Without us, the worker exits on the closed pipe.
+            daemon=False,
+        )
+        process.start()
+        worker_connection.close()
+        return _Worker(process, connection)
+
+    async def execute(
+        self, payload: AutomationPayload, logger: logging.Logger
+    ) -> AutomationResponse:
+        try:
+            if await self.reload_if_required():
+                logger.warning("configurations were reloaded due to a stale state.")
+        except (Exception, SystemExit) as e:
+            return AutomationResponse(
+                serialized_result_or_error_code=AutomationError.UNKNOWN_ERROR,
+                stdout="",
+                stderr=f"Error reloading configuration: {e}",
+            )
+
+        if (acquired := await self._acquire()) is None:
+            return AutomationResponse(
+                serialized_result_or_error_code=AutomationError.UNKNOWN_ERROR,
+                stdout="",
+                stderr="No configuration loaded",
+            )
+        generation, worker = acquired
+
+        def _done(future: asyncio.Future[AutomationResponse]) -> None:
+            if future.cancelled() or future.exception() is not None:
+                generation.replace(worker)
+            else:
+                generation.release(worker)
+
+        execution = asyncio.get_running_loop().run_in_executor(None, worker.execute, payload)
+        execution.add_done_callback(_done)
+        try:
+            # A cancelled request must not hand out the worker before the automation is done
+            return await asyncio.shield(execution)
+        except (EOFError, OSError) as e:
+            logger.exception("Automation worker %(pid)s failed", {"pid": worker.process.pid})
+            return AutomationResponse(
+                serialized_result_or_error_code=AutomationError.UNKNOWN_ERROR,
+                stdout="",
+                stderr=f"Automation worker failed: {e!r}",
+            )
+
+    async def _acquire(self) -> tuple[_Generation, _Worker] | None:
+        """Wait for an idle worker of the current generation"""
+        while (generation := self._current) is not None:
+            get_worker = asyncio.ensure_future(generation.idle.get())
+            retired = asyncio.ensure_future(generation.retired.wait())
+            await asyncio.wait((get_worker, retired), return_when=asyncio.FIRST_COMPLETED)
+            retired.cancel()
+            if get_worker.done():
+                if (worker := get_worker.result()).process.is_alive():
+                    return generation, worker
+                # E.g. killed by the OOM killer while it was idle
+                generation.replace(worker)
+                continue
+            get_worker.cancel()
+            if self._current is generation:
+                # All workers of the generation have failed
+                self._current = None
+        return None
+
+    async def close(self) -> None:
+        self._current = None
+        for generation in self._generations:
+            generation.retire()
+        # The busy workers are stopped once their automations are done
+        processes = [worker.process for g in self._generations for worker in g.workers]
+        self._generations = []
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [process.join(timeout=30) for process in processes]
+        )
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._loader.shutdown()
+
+
 @contextmanager
 def _redirect_stdin(stream: io.StringIO) -> Iterator[None]:
     orig_stdin = sys.stdin
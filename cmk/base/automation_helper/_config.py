@@ -38,10 +38,16 @@ class ReloaderConfig(BaseModel, frozen=True):
     cooldown_interval: float
 
 
+class WorkerPoolConfig(BaseModel, frozen=True):
+    num_workers: int
+
+
 class Config(BaseModel, frozen=True):
     server_config: ServerConfig
     watcher_config: WatcherConfig
     reloader_config: ReloaderConfig
+    # Execute the automations in forked worker processes, see `_WorkerPool`
+    worker_pool_config: WorkerPoolConfig | None = None
 
 
 def default_config(
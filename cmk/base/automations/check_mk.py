@@ -189,7 +189,7 @@ from cmk.checkengine.specs.checkresults import ServiceState
 from cmk.checkengine.specs.parameters import TimespecificParameters
 from cmk.checkengine.submitters import ServiceDetails
 from cmk.checkengine.summarize import summarize
-from cmk.checkengine.value_store import AllValueStoresStore, ValueStoreManager
+from cmk.checkengine.value_store import JournaledValueStoresStore, ValueStoreManager
 from cmk.core_client import CoreAction
 from cmk.discover_plugins import (
     addons_plugins_local_path,
@@ -896,7 +896,7 @@ def _execute_discovery(
 
     with (
         set_value_store_manager(
-            ValueStoreManager(host_name, AllValueStoresStore(counters_dir / host_name)),
+            ValueStoreManager(host_name, JournaledValueStoresStore(counters_dir / host_name)),
             store_changes=False,
         ) as value_store_manager,
     ):
@@ -1643,6 +1643,10 @@ class AutomationRenameHosts:
         for d in ["cache", "counters"]:
             if self._rename_host_file(str(tmp_dir / d), oldname, newname):
                 actions.append(d)
+        # The journal of the counters is only valid together with their snapshot
+        if "counters" in actions:
+            (counters_dir / f"{newname}.journal").unlink(missing_ok=True)
+            self._rename_host_file(str(counters_dir), f"{oldname}.journal", f"{newname}.journal")
 
         actions.extend(move_piggyback_for_host_rename(cmk.utils.paths.omd_root, oldname, newname))
 
@@ -2417,6 +2421,7 @@ class AutomationDeleteHosts(ABCDeleteHosts):
             f"{precompiled_hostchecks_dir / hostname}.py",
             f"{autochecks_dir}/{hostname}.mk",
             f"{counters_dir / hostname}",
+            f"{counters_dir / hostname}.journal",
             f"{discovered_host_labels_dir}/{hostname}.mk",
             f"{tcp_cache_dir / hostname}",
             f"{var_dir}/persisted/{hostname}",
@@ -2428,6 +2433,7 @@ class AutomationDeleteHosts(ABCDeleteHosts):
             str(tree_path_gz.legacy),
             str(status_data_tree.path),
             str(status_data_tree.legacy),
+            str(inv_paths.inventory_tree_indexed(hostname)),
         ]
 
     @override
@@ -2470,6 +2476,7 @@ class AutomationDeleteHostsKnownRemote(ABCDeleteHosts):
             f"{precompiled_hostchecks_dir / hostname}.py",
             f"{autochecks_dir}/{hostname}.mk",
             f"{counters_dir / hostname}",
+            f"{counters_dir / hostname}.journal",
             f"{tcp_cache_dir / hostname}",
             f"{var_dir}/persisted/{hostname}",
         ]
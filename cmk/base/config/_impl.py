@@ -18,6 +18,7 @@ import enum
 import itertools
 import numbers
 import os
+import pickle
 import socket
 import sys
 import time
@@ -49,7 +50,7 @@ from cmk.base.configlib.scheduling import make_check_interval_config
 from cmk.base.configlib.servicelevel import make_service_level_config
 from cmk.base.configlib.servicename import PassiveServiceNameConfig
 from cmk.base.parent_scan import ScanConfig as ParentScanConfig
-from cmk.ccc import tty
+from cmk.ccc import store, tty
 from cmk.ccc.exceptions import MKBailOut, MKGeneralException
 from cmk.ccc.hostaddress import HostAddress, HostName, Hosts
 from cmk.ccc.regex import regex
@@ -578,7 +579,7 @@ def load(
     with_conf_d: bool = True,
     validate_hosts: bool = True,
 ) -> LoadingResult:
-    raw_config = _load_config(get_default_config(), StorageFormat.PICKLE, with_conf_d=with_conf_d)
+    raw_config = _load_config_with_snapshot(with_conf_d=with_conf_d)
 
     loading_result = perform_post_config_loading_actions(
         raw_config,
@@ -793,6 +794,82 @@ def _load_config(
     return target_context
 
 
+# Files modified this recently may be modified again without a change of their mtime
+_CONFIG_SNAPSHOT_MIN_FILE_AGE = 2.0
+
+type _ConfigSnapshotKey = tuple[str, bool, tuple[tuple[str, int, int], ...]]
+
+
+def _config_snapshot_path() -> Path:
+    return cmk.utils.paths.tmp_dir / "config_snapshot.pkl"
+
+
+def _load_config_with_snapshot(*, with_conf_d: bool) -> dict[str, object]:
+    """Evaluate the configuration files or restore their result from the config snapshot
+
+    Executing all the .mk files is a major part of the startup time of every cmk call. The first
+    load after a change of the configuration (usually the one of the activation) stores the
+    evaluated BaseConfig fields, including host_paths, in a snapshot on the tmpfs. All following
+    loads restore them from there as long as none of the configuration files has changed.
+    """
+    key = _config_snapshot_key(with_conf_d)
+    if (snapshot := _load_config_snapshot(key)) is not None:
+        return snapshot
+
+    raw_config = _load_config(get_default_config(), StorageFormat.PICKLE, with_conf_d=with_conf_d)
+    _save_config_snapshot(key, raw_config)
+    return raw_config
+
+
+def _config_snapshot_key(with_conf_d: bool) -> _ConfigSnapshotKey:
+    files: list[tuple[str, int, int]] = []
+    for path in get_config_file_paths(with_conf_d):
+        # See apply_hosts_file_to_object: The pickled hosts file is used if it is up to date
+        for file_path in (
+            [path, path.with_suffix(StorageFormat.PICKLE.extension())]
+            if path.name == "hosts.mk"
+            else [path]
+        ):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                files.append((str(file_path), -1, -1))
+            else:
+                files.append((str(file_path), stat.st_mtime_ns, stat.st_size))
+    return cmk_version.__version__, with_conf_d, tuple(files)
+
+
+def _load_config_snapshot(key: _ConfigSnapshotKey) -> dict[str, object] | None:
+    try:
+        with _config_snapshot_path().open("rb") as f:
+            # The key is stored separately to not unpickle an outdated config
+            if pickle.load(f) != key:  # nosec B301 # BNS:c3c5e9
+                return None
+            return pickle.load(f)  # nosec B301 # BNS:c3c5e9
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def _save_config_snapshot(key: _ConfigSnapshotKey, raw_config: Mapping[str, object]) -> None:
+    min_mtime_ns = int((time.time() - _CONFIG_SNAPSHOT_MIN_FILE_AGE) * 1_000_000_000)
+    if any(mtime_ns > min_mtime_ns for _path, mtime_ns, _size in key[2]):
+        return
+    if _config_snapshot_key(key[1]) != key:
+        return  # Changed while being loaded
+
+    try:
+        data = pickle.dumps(key) + pickle.dumps(
+            {f.name: raw_config[f.name] for f in dataclasses.fields(BaseConfig)}
+        )
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # E.g. functions or modules defined in a local configuration file
+        return
+
+    path = _config_snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    store.save_bytes_to_file(path, data)
+
+
 # Create list of all files to be included during configuration loading
 def get_config_file_paths(with_conf_d: bool) -> list[Path]:
     list_of_files = [cmk.utils.paths.main_config_file]
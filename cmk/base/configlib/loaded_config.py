@@ -236,6 +236,7 @@ class BaseConfig:  # type: ignore[explicit-any]
     notification_fallback_email: str
     notification_fallback_format: tuple[NotificationPluginNameStr, NotifyPluginParamsDict]
     notification_plugin_timeout: int
+    notification_plugin_limits: Mapping[NotificationPluginNameStr, tuple[int, int | None]]
     notification_logging: int
     notification_spooling: bool | Literal["local", "remote", "both", "off"] | None
     notification_spool_to: object
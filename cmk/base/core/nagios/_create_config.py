@@ -9,6 +9,7 @@
 """Code for support of Nagios (and compatible) cores"""
 
 import base64
+import functools
 import itertools
 import socket
 import sys
@@ -80,6 +81,7 @@ from cmk.utils.macros import replace_macros_in_str
 from cmk.utils.servicename import ServiceName
 from cmk.utils.timeperiod import TimeperiodSpecs
 
+from ._parallel import map_host_partitions
 from ._precompile_host_checks import precompile_hostchecks, PrecompileMode
 
 _ContactgroupName = str
@@ -177,6 +179,7 @@ class NagiosCore(MonitoringCore):
         )
         self._precompile_hostchecks(
             config_creation_context.path_created,
+            config_creation_context.path_active,
             hosts_config,
             passive_service_name_config,
             enforced_services_table,
@@ -259,6 +262,7 @@ class NagiosCore(MonitoringCore):
     def _precompile_hostchecks(
         self,
         config_path: Path,
+        previous_config_path: Path,
         hosts_config: Hosts,
         passive_service_name_config: Callable[[HostName, ServiceID, str | None], ServiceName],
         enforced_services_table: Callable[
@@ -273,7 +277,7 @@ class NagiosCore(MonitoringCore):
         with suppress(IOError):
             sys.stdout.write("Precompiling host checks...")
             sys.stdout.flush()
-        precompile_hostchecks(
+        stats = precompile_hostchecks(
             config_path,
             hosts_config,
             self._config_cache,
@@ -283,9 +287,10 @@ class NagiosCore(MonitoringCore):
             get_ip_stack_config,
             ip_address_of,
             precompile_mode=precompile_mode,
+            previous_config_path=previous_config_path,
         )
         with suppress(IOError):
-            sys.stdout.write(tty.ok + "\n")
+            sys.stdout.write(f"{tty.ok} ({stats.written} written, {stats.reused} unchanged)\n")
             sys.stdout.flush()
 
 
@@ -324,6 +329,27 @@ class NagiosConfig:
     def write_object(self, name: str, spec: Mapping[str, object]) -> None:
         self._outfile.write(_format_nagios_object(name, spec))
 
+    def merge(self, other: "NagiosConfig") -> None:
+        """Add the objects and the needed definitions of a config written to a StringIO"""
+        assert isinstance(other._outfile, StringIO)
+        self._outfile.write(other._outfile.getvalue())
+        self.hostgroups_to_define.update(other.hostgroups_to_define)
+        self.servicegroups_to_define.update(other.servicegroups_to_define)
+        self.contactgroups_to_define.update(other.contactgroups_to_define)
+        self.checknames_to_define.update(other.checknames_to_define)
+        self.active_checks_to_define.update(other.active_checks_to_define)
+        self.custom_commands_to_define.update(other.custom_commands_to_define)
+        self.hostcheck_commands_to_define.extend(other.hostcheck_commands_to_define)
+
+
+@dataclass(frozen=True)
+class _HostsObjects:
+    """The objects of some of the hosts, possibly created in a worker process"""
+
+    cfg: NagiosConfig
+    licensing_counter: Counter
+    notify_host_files: NotifyHostFiles
+
 
 def _validate_licensing(
     hosts: Hosts, licensing_handler: LicensingHandler, licensing_counter: Counter
@@ -367,13 +393,11 @@ def create_config(
     _output_conf_header(cfg)
 
     licensing_counter = Counter("services")
-    descendants_per_host = build_descendants_map(
-        {hostname: config_cache.parents(hostname) for hostname in hostnames}
-    )
-    all_notify_host_configs: dict[HostName, NotificationHostConfig] = {}
-    for hostname in hostnames:
-        all_notify_host_configs[hostname] = _create_nagios_config_host(
-            cfg=cfg,
+    notify_host_files: dict[HostName, bytes] = {}
+    for hosts_objects in map_host_partitions(
+        functools.partial(
+            _create_nagios_config_hosts,
+            timeperiods=timeperiods,
             hosts_config=hosts_config,
             host_tags=host_tags,
             config_cache=config_cache,
@@ -383,21 +407,25 @@ def create_config(
             passive_service_name_config=passive_service_name_config,
             enforced_services_table=enforced_services_table,
             plugins=plugins,
-            hostname=hostname,
-            ip_stack_config=get_ip_stack_config(hostname),
-            host_ip_family=default_address_family(hostname),
+            get_ip_stack_config=get_ip_stack_config,
+            default_address_family=default_address_family,
             stored_passwords=passwords,
-            license_counter=licensing_counter,
             ip_address_of=ip_address_of,
             service_depends_on=service_depends_on,
-            for_relay=get_relay_id(hostname) is not None,
-            descendants=descendants_per_host.get(hostname, ()),
-        )
+            get_relay_id=get_relay_id,
+            descendants_per_host=build_descendants_map(
+                {hostname: config_cache.parents(hostname) for hostname in hostnames}
+            ),
+        ),
+        hostnames,
+        ip_address_of=ip_address_of,
+    ):
+        cfg.merge(hosts_objects.cfg)
+        licensing_counter["services"] += hosts_objects.licensing_counter["services"]
+        notify_host_files.update(hosts_objects.notify_host_files)
 
     _validate_licensing(hosts_config, licensing_handler, licensing_counter)
 
-    notify_host_files = create_notify_host_files(all_notify_host_configs)
-
     _create_nagios_config_contacts(cfg, nagios_core_config.contacts)
     if hostnames:
         _create_nagios_check_mk_notify_contact(cfg)
@@ -420,6 +448,65 @@ def create_config(
     return notify_host_files
 
 
+def _create_nagios_config_hosts(
+    hostnames: Sequence[HostName],
+    *,
+    timeperiods: TimeperiodSpecs,
+    hosts_config: Hosts,
+    host_tags: HostTags,
+    config_cache: ConfigCache,
+    core_objects_config: CoreObjectsConfig,
+    nagios_core_config: NagiosCoreConfig,
+    final_service_name_config: Callable[
+        [HostName, ServiceName, Callable[[HostName], Labels]], ServiceName
+    ],
+    passive_service_name_config: Callable[[HostName, ServiceID, str | None], ServiceName],
+    enforced_services_table: Callable[
+        [HostName], Mapping[ServiceID, tuple[object, ConfiguredService]]
+    ],
+    plugins: Mapping[CheckPluginName, CheckPlugin],
+    get_ip_stack_config: Callable[[HostName], IPStackConfig],
+    default_address_family: Callable[
+        [HostName], Literal[socket.AddressFamily.AF_INET, socket.AddressFamily.AF_INET6]
+    ],
+    stored_passwords: Mapping[str, Secret[str]],
+    ip_address_of: ip_lookup.IPLookup,
+    service_depends_on: Callable[[HostAddress, ServiceName], Sequence[ServiceName]],
+    get_relay_id: Callable[[HostName], str | None],
+    descendants_per_host: Mapping[HostName, Sequence[HostName]],
+) -> _HostsObjects:
+    cfg = NagiosConfig(StringIO(), hostnames, timeperiods)
+    licensing_counter = Counter("services")
+    notify_host_configs: dict[HostName, NotificationHostConfig] = {}
+    for hostname in hostnames:
+        notify_host_configs[hostname] = _create_nagios_config_host(
+            cfg=cfg,
+            hosts_config=hosts_config,
+            host_tags=host_tags,
+            config_cache=config_cache,
+            core_objects_config=core_objects_config,
+            nagios_core_config=nagios_core_config,
+            final_service_name_config=final_service_name_config,
+            passive_service_name_config=passive_service_name_config,
+            enforced_services_table=enforced_services_table,
+            plugins=plugins,
+            hostname=hostname,
+            ip_stack_config=get_ip_stack_config(hostname),
+            host_ip_family=default_address_family(hostname),
+            stored_passwords=stored_passwords,
+            license_counter=licensing_counter,
+            ip_address_of=ip_address_of,
+            service_depends_on=service_depends_on,
+            for_relay=get_relay_id(hostname) is not None,
+            descendants=descendants_per_host.get(hostname, ()),
+        )
+    return _HostsObjects(
+        cfg=cfg,
+        licensing_counter=licensing_counter,
+        notify_host_files=create_notify_host_files(notify_host_configs),
+    )
+
+
 def _output_conf_header(cfg: NagiosConfig) -> None:
     cfg.write_str(
         """#
@@ -555,7 +642,8 @@ def create_nagios_host_spec(
             host_spec[key] = value
 
     def host_check_via_service_status(service: ServiceName) -> CoreCommand:
-        command = "check-mk-host-custom-%d" % (len(cfg.hostcheck_commands_to_define) + 1)
+        # Named after the host, not numbered: The hosts may be processed in separate workers
+        command = f"check-mk-host-custom-{hostname}"
         service_with_hostname = replace_macros_in_str(
             service,
             {"$HOSTNAME$": hostname},
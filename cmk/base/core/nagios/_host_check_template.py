@@ -47,6 +47,9 @@ def _self_compile(src: str, dst: str) -> None:
     """replace symlink with precompiled python-code, if we are run for the first time"""
     import os
 
+    host_checks_dir = os.path.dirname(os.path.abspath(__file__))
+    src = os.path.join(host_checks_dir, src)
+    dst = os.path.join(host_checks_dir, dst)
     if not os.path.islink(dst):
         return
 
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Distribution of the per host work of the config creation to forked worker processes"""
+
+import gc
+import multiprocessing
+import os
+from collections.abc import Callable, Mapping, Sequence
+
+from cmk.ccc.hostaddress import HostName
+from cmk.utils import config_warnings, ip_lookup
+
+# Below this number of hosts per process forking the workers does not pay off
+_MIN_HOSTS_PER_PROCESS = 500
+_MAX_PROCESSES = 8
+# More partitions than processes even out the different costs of the hosts
+_PARTITIONS_PER_PROCESS = 4
+
+
+def number_of_processes(num_hosts: int) -> int:
+    return max(
+        1,
+        min(len(os.sched_getaffinity(0)), _MAX_PROCESSES, num_hosts // _MIN_HOSTS_PER_PROCESS),
+    )
+
+
+def map_host_partitions[T](
+    function: Callable[[Sequence[HostName]], T],
+    hostnames: Sequence[HostName],
+    *,
+    ip_address_of: ip_lookup.IPLookup,
+) -> list[T]:
+    """Apply the function to consecutive partitions of the hosts
+
+    With enough hosts and cores the partitions are processed by forked worker processes. The
+    results are returned in the order of the partitions, so that combining them gives the same
+    result as processing all hosts at once. The configuration warnings issued by the workers are
+    added to the ones of this process, as are the failed lookups of ip_address_of, which has to be
+    the IP lookup used by the function.
+    """
+    processes = number_of_processes(len(hostnames))
+    if processes == 1:
+        return [function(hostnames)]
+
+    failed_ip_lookups = _failed_ip_lookups(ip_address_of)
+    num_partitions = min(len(hostnames), processes * _PARTITIONS_PER_PROCESS)
+    partitions = [
+        hostnames[n * len(hostnames) // num_partitions : (n + 1) * len(hostnames) // num_partitions]
+        for n in range(num_partitions)
+    ]
+    # Objects which exist before forking are ignored by the garbage collector of the workers.
+    # This keeps the pages of the config cache shared instead of copying them.
+    gc.freeze()
+    try:
+        # Only forked workers inherit the function, which usually can not be pickled
+        with multiprocessing.get_context("fork").Pool(
+            processes=processes,
+            initializer=_initialize_worker,
+            initargs=(function, failed_ip_lookups),
+        ) as pool:
+            results = pool.map(_process_partition, partitions, chunksize=1)
+    finally:
+        gc.unfreeze()
+
+    for _result, warnings, failed in results:
+        config_warnings.g_configuration_warnings.extend(warnings)
+        if failed_ip_lookups is not None:
+            for host_name, exc in failed.items():
+                failed_ip_lookups(host_name, exc)
+    return [result for result, _warnings, _failed in results]
+
+
+def _failed_ip_lookups(ip_address_of: ip_lookup.IPLookup) -> ip_lookup.CollectFailedHosts | None:
+    if isinstance(ip_address_of, ip_lookup.ConfiguredIPLookup) and isinstance(
+        ip_address_of.error_handler, ip_lookup.CollectFailedHosts
+    ):
+        return ip_address_of.error_handler
+    return None
+
+
+def _initialize_worker(
+    function: Callable[[Sequence[HostName]], object],
+    failed_ip_lookups: ip_lookup.CollectFailedHosts | None,
+) -> None:
+    _process_partition.function = function  # type: ignore[attr-defined]
+    _process_partition.failed_ip_lookups = failed_ip_lookups  # type: ignore[attr-defined]
+
+
+def _process_partition(
+    hostnames: Sequence[HostName],
+) -> tuple[object, Sequence[str], Mapping[HostName, Exception]]:
+    num_warnings = len(config_warnings.g_configuration_warnings)
+    failed_ip_lookups = _process_partition.failed_ip_lookups  # type: ignore[attr-defined]
+    # The failures collected in this process so far, including the ones of the parent process
+    failed: Mapping[HostName, Exception] = (
+        {} if failed_ip_lookups is None else failed_ip_lookups.failed_ip_lookups
+    )
+    known_failures = set(failed)
+    result = _process_partition.function(hostnames)  # type: ignore[attr-defined]
+    return (
+        result,
+        config_warnings.g_configuration_warnings[num_warnings:],
+        {host_name: exc for host_name, exc in failed.items() if host_name not in known_failures},
+    )
@@ -14,20 +14,23 @@ in adhoc mode (about 75%).
 # mypy: disable-error-code="type-arg"
 
 import enum
+import functools
+import importlib.util
 import itertools
 import os
 import py_compile
 import re
 import socket
 import sys
-from collections.abc import Callable, Iterable, Mapping
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from pathlib import Path
-from typing import assert_never
+from typing import assert_never, NamedTuple
 
 import cmk.ccc.debug
 import cmk.checkengine.plugin_backend as agent_based_register
 from cmk.base.config import ConfigCache, FilterMode
 from cmk.ccc import store, tty
+from cmk.ccc import version as cmk_version
 from cmk.ccc.exceptions import MKIPAddressLookupError
 from cmk.ccc.hostaddress import HostAddress, HostName, Hosts
 from cmk.checkengine.checkerplugin import ConfiguredService
@@ -45,6 +48,7 @@ from cmk.utils.log import console
 from cmk.utils.servicename import ServiceName
 
 from ._host_check_config import HostCheckConfig
+from ._parallel import map_host_partitions
 
 _TEMPLATE_FILE = Path(__file__).parent / "_host_check_template.py"
 
@@ -59,6 +63,11 @@ class PrecompileMode(enum.Enum):
     INSTANT = enum.auto()
 
 
+class PrecompileStats(NamedTuple):
+    written: int
+    reused: int
+
+
 class HostCheckStore:
     """Caring about persistence of the precompiled host check files"""
 
@@ -72,6 +81,25 @@ class HostCheckStore:
         path = HostCheckStore.host_check_file_path(config_path, hostname)
         return path.with_suffix(path.suffix + ".py")
 
+    @staticmethod
+    def fingerprint_file_path(config_path: Path) -> Path:
+        return config_path / "host_checks.fingerprint"
+
+    @staticmethod
+    def _fingerprint() -> str:
+        """Identifies what else the host checks depend on besides their source"""
+        return f"{cmk_version.__version__} {importlib.util.MAGIC_NUMBER.hex()}\n"
+
+    def save_fingerprint(self, config_path: Path) -> None:
+        store.save_text_to_file(self.fingerprint_file_path(config_path), self._fingerprint())
+
+    def has_current_fingerprint(self, config_path: Path) -> bool:
+        """Whether the host checks have been written by this Checkmk and Python version"""
+        try:
+            return self.fingerprint_file_path(config_path).read_text() == self._fingerprint()
+        except FileNotFoundError:
+            return False
+
     def write(
         self,
         config_path: Path,
@@ -79,11 +107,19 @@ class HostCheckStore:
         host_check: str,
         *,
         precompile_mode: PrecompileMode,
-    ) -> None:
+        previous_config_path: Path | None = None,
+    ) -> bool:
+        """Write and compile the host check, returns whether the previous files were reused"""
         compiled_filename = self.host_check_file_path(config_path, hostname)
         source_filename = self.host_check_source_file_path(config_path, hostname)
 
         compiled_filename.parent.mkdir(mode=0o770, exist_ok=True, parents=True)
+        if previous_config_path is not None and self._link_unchanged(
+            previous_config_path, config_path, hostname, host_check
+        ):
+            console.verbose(f" ==> {compiled_filename} (unchanged).", file=sys.stderr)
+            return True
+
         store.save_text_to_file(source_filename, host_check)
 
         # compile python (either now or delayed - see host_check code for delay_precompile handling)
@@ -102,6 +138,30 @@ class HostCheckStore:
                 assert_never(other)
 
         console.verbose(f" ==> {compiled_filename}.", file=sys.stderr)
+        return False
+
+    def _link_unchanged(
+        self, previous_config_path: Path, config_path: Path, hostname: HostName, host_check: str
+    ) -> bool:
+        """Hard link the files of the previous config if the host check did not change
+
+        The source contains everything the host check depends on, except for the plugins, which
+        are loaded when the host check is executed. A symlink (delayed precompilation) is only
+        reused once the host check compiled itself.
+        """
+        previous_source = self.host_check_source_file_path(previous_config_path, hostname)
+        previous_compiled = self.host_check_file_path(previous_config_path, hostname)
+        source_filename = self.host_check_source_file_path(config_path, hostname)
+        try:
+            if previous_compiled.is_symlink() or previous_source.read_text() != host_check:
+                return False
+            os.link(previous_source, source_filename)
+            os.link(previous_compiled, self.host_check_file_path(config_path, hostname))
+        except OSError:
+            # E.g. the host check of the previous config is just compiling itself
+            source_filename.unlink(missing_ok=True)
+            return False
+        return True
 
 
 def precompile_hostchecks(
@@ -117,16 +177,70 @@ def precompile_hostchecks(
     ip_address_of: IPLookup,
     *,
     precompile_mode: PrecompileMode,
-) -> None:
+    previous_config_path: Path | None = None,
+) -> PrecompileStats:
     console.verbose("Precompiling host checks...")
 
     host_check_store = HostCheckStore()
-    for hostname in {
-        # Inconsistent with `create_config` above.
-        hn
-        for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
-        if config_cache.is_active(hn) and config_cache.is_online(hn)
-    }:
+    if previous_config_path is not None and not host_check_store.has_current_fingerprint(
+        previous_config_path
+    ):
+        # E.g. after an update, the previous byte code may not even be loadable anymore
+        previous_config_path = None
+
+    written = reused = 0
+    for exit_code, stats in map_host_partitions(
+        functools.partial(
+            _precompile_hostchecks_of,
+            config_path=config_path,
+            hosts_config=hosts_config,
+            config_cache=config_cache,
+            passive_service_name_config=passive_service_name_config,
+            enforced_services_table=enforced_services_table,
+            plugins=plugins,
+            get_ip_stack_config=get_ip_stack_config,
+            ip_address_of=ip_address_of,
+            precompile_mode=precompile_mode,
+            previous_config_path=previous_config_path,
+        ),
+        sorted(
+            {
+                # Inconsistent with `create_config` above.
+                hn
+                for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
+                if config_cache.is_active(hn) and config_cache.is_online(hn)
+            }
+        ),
+        ip_address_of=ip_address_of,
+    ):
+        if exit_code is not None:
+            sys.exit(exit_code)
+        written += stats.written
+        reused += stats.reused
+    host_check_store.save_fingerprint(config_path)
+    return PrecompileStats(written=written, reused=reused)
+
+
+def _precompile_hostchecks_of(
+    hostnames: Sequence[HostName],
+    *,
+    config_path: Path,
+    hosts_config: Hosts,
+    config_cache: ConfigCache,
+    passive_service_name_config: Callable[[HostName, ServiceID, str | None], ServiceName],
+    enforced_services_table: Callable[
+        [HostName], Mapping[ServiceID, tuple[object, ConfiguredService]]
+    ],
+    plugins: AgentBasedPlugins,
+    get_ip_stack_config: Callable[[HostName], IPStackConfig],
+    ip_address_of: IPLookup,
+    precompile_mode: PrecompileMode,
+    previous_config_path: Path | None,
+) -> tuple[int | None, PrecompileStats]:
+    """Returns the exit code instead of exiting, which would break a worker process"""
+    host_check_store = HostCheckStore()
+    written = reused = 0
+    for hostname in hostnames:
         try:
             console.verbose_no_lf(
                 f"{tty.bold}{tty.blue}{hostname:<16}{tty.normal}:", file=sys.stderr
@@ -144,16 +258,24 @@ def precompile_hostchecks(
                 precompile_mode=precompile_mode,
             )
 
-            host_check_store.write(
-                config_path, hostname, host_check, precompile_mode=precompile_mode
-            )
+            if host_check_store.write(
+                config_path,
+                hostname,
+                host_check,
+                precompile_mode=precompile_mode,
+                previous_config_path=previous_config_path,
+            ):
+                reused += 1
+            else:
+                written += 1
         except MKIPAddressLookupError as e:
             console.error(f"Error precompiling checks for host {hostname}: {e}", file=sys.stderr)
         except Exception as e:
             if cmk.ccc.debug.enabled():
                 raise
             console.error(f"Error precompiling checks for host {hostname}: {e}", file=sys.stderr)
-            sys.exit(5)
+            return 5, PrecompileStats(written=written, reused=reused)
+    return None, PrecompileStats(written=written, reused=reused)
 
 
 def dump_precompiled_hostcheck(
@@ -218,8 +340,9 @@ def dump_precompiled_hostcheck(
     host_check_config = HostCheckConfig(
         delay_precompile=precompile_mode
         is PrecompileMode.DELAYED,  # propagation of enum would break b/c of the repr() below :-(
-        src=str(HostCheckStore.host_check_source_file_path(config_path, hostname)),
-        dst=str(HostCheckStore.host_check_file_path(config_path, hostname)),
+        # Relative to the host check, so that it does not differ between the configs
+        src=HostCheckStore.host_check_source_file_path(config_path, hostname).name,
+        dst=HostCheckStore.host_check_file_path(config_path, hostname).name,
         verify_site_python=verify_site_python,
         locations=locations,
         checks_to_load=legacy_checks_to_load,
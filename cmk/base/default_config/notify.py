@@ -34,6 +34,10 @@ notification_parameter: NotificationParameterSpecs = {}
 # Check every 10 seconds for ripe bulks
 notification_bulk_interval = 10
 notification_plugin_timeout = 60
+# Limits of the concurrent delivery in keepalive mode per plug-in: the number of plug-in
+# scripts running at the same time and the number of script starts per minute (None: unlimited).
+# Plug-ins without an entry may run 4 scripts at the same time.
+notification_plugin_limits: dict[NotificationPluginNameStr, tuple[int, int | None]] = {}
 
 # Notification Spooling.
 
@@ -125,7 +125,7 @@ from cmk.checkengine.source_builder import SourceBuilder
 from cmk.checkengine.specs.checkresults import ActiveCheckResult, ServiceState
 from cmk.checkengine.submitters import get_submitter
 from cmk.checkengine.summarize import summarize, SummarizerFunction
-from cmk.checkengine.value_store import AllValueStoresStore, ValueStoreManager
+from cmk.checkengine.value_store import JournaledValueStoresStore, ValueStoreManager
 from cmk.discover_plugins import discover_families, PluginGroup
 from cmk.inventory.paths import Paths as InventoryPaths
 from cmk.inventory.structured_data import (
@@ -1407,6 +1407,7 @@ def _mode_flush(app: CheckmkBaseApp, hosts: list[HostName]) -> None:
 
         # counters
         try:
+            (cmk.utils.paths.counters_dir / f"{host}.journal").unlink(missing_ok=True)
             (cmk.utils.paths.counters_dir / host).unlink()
             print_(tty.bold + tty.blue + " counters")
             flushed = True
@@ -3004,7 +3005,7 @@ def run_checking(
         error_handler,
         set_value_store_manager(
             ValueStoreManager(
-                hostname, AllValueStoresStore(cmk.utils.paths.counters_dir / hostname)
+                hostname, JournaledValueStoresStore(cmk.utils.paths.counters_dir / hostname)
             ),
             store_changes=not dry_run,
         ) as value_store_manager,
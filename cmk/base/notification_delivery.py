@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Concurrent delivery of notifications in keepalive mode
+
+Each notification plug-in gets its own pool of worker threads. The plug-in scripts run as
+subprocesses, so the threads mostly wait and a slow plug-in only delays the notifications of this
+plug-in. The number of running scripts and the number of script starts per minute can be limited
+per plug-in. The results are reported in the order the notifications were submitted per contact,
+no matter which delivery finishes first.
+
+The notifications about the same object, e.g. a PROBLEM and its RECOVERY, are delivered by a
+plug-in one after another in the order they were submitted. Otherwise, the RECOVERY could reach
+an incident management system before its PROBLEM and leave the incident open.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from cmk.utils.log import VERBOSE
+
+logger = logging.getLogger("cmk.base.notify")
+
+
+class PluginLimits(NamedTuple):
+    max_concurrent: int
+    max_per_minute: int | None
+
+
+DEFAULT_PLUGIN_LIMITS = PluginLimits(max_concurrent=4, max_per_minute=None)
+# Notifications which may wait for a free worker per plug-in. When these are exhausted, submitting
+# blocks, which makes the core queue the following notifications.
+_MAX_QUEUED = 1000
+
+
+@dataclass
+class PluginStatistics:
+    queued: int = 0
+    running: int = 0
+    delivered: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.delivered if self.delivered else 0.0
+
+
+@dataclass
+class _Plugin:
+    limits: PluginLimits
+    executor: ThreadPoolExecutor
+    slots: threading.Semaphore
+    statistics: PluginStatistics = field(default_factory=PluginStatistics)
+    next_start: float = 0.0
+
+
+@dataclass
+class _Delivery[T]:
+    future: Future[T]
+    report: Callable[[T], object]
+
+
+class NotificationDelivery:
+    def __init__(self, limits: Mapping[str, PluginLimits]) -> None:
+        self._limits = limits
+        self._plugins: dict[str, _Plugin] = {}
+        self._pending: dict[str, deque[_Delivery]] = {}
+        # The deliveries waiting for the running one of the same plug-in and object
+        self._waiting: dict[tuple[str, Hashable], deque[Callable[[], object]]] = {}
+        self._lock = threading.Lock()
+        # Reporting holds its own lock, so that the reports of one contact can not overtake
+        # each other, while the deliveries can go on.
+        self._report_lock = threading.Lock()
+
+    def submit[T](
+        self,
+        plugin_name: str,
+        contact: str,
+        subject: Hashable,
+        deliver: Callable[[], T],
+        report: Callable[[T], object],
+    ) -> None:
+        """Deliver a notification in a worker and report its result once delivered
+
+        deliver must not raise. The notifications of one plug-in about the same subject, e.g. host
+        and service, are delivered in the order of the submissions. The report functions of the
+        notifications of one contact are called in the order of the submissions.
+        """
+        plugin = self._plugin(plugin_name)
+        plugin.slots.acquire()
+        submitted = time.monotonic()
+        future: Future[T] = Future()
+        key = (plugin_name, subject)
+
+        def start() -> object:
+            return plugin.executor.submit(self._deliver, plugin, key, deliver, submitted, future)
+
+        with self._lock:
+            plugin.statistics.queued += 1
+            self._pending.setdefault(contact, deque()).append(_Delivery(future, report))
+            if (waiting := self._waiting.get(key)) is None:
+                self._waiting[key] = deque()
+                start()
+            else:
+                waiting.append(start)
+        future.add_done_callback(lambda _future: self._report(contact))
+
+    def statistics(self) -> Mapping[str, PluginStatistics]:
+        with self._lock:
+            return {
+                plugin_name: PluginStatistics(**vars(plugin.statistics))
+                for plugin_name, plugin in self._plugins.items()
+            }
+
+    def log_statistics(self) -> None:
+        for plugin_name, statistics in self.statistics().items():
+            logger.log(
+                VERBOSE,
+                "Delivery via %(plugin)s: %(queued)d queued, %(running)d running, "
+                "%(delivered)d delivered (latency: %(average).2f s average, %(max).2f s max)",
+                {
+                    "plugin": plugin_name,
+                    "queued": statistics.queued,
+                    "running": statistics.running,
+                    "delivered": statistics.delivered,
+                    "average": statistics.average_latency,
+                    "max": statistics.max_latency,
+                },
+            )
+
+    def shutdown(self) -> None:
+        """Wait for all submitted notifications to be delivered and reported"""
+        with self._lock:
+            futures = [
+                delivery.future for pending in self._pending.values() for delivery in pending
+            ]
+        # The waiting deliveries are only started by the running ones
+        wait(futures)
+        with self._lock:
+            plugins = list(self._plugins.values())
+            self._plugins.clear()
+        for plugin in plugins:
+            plugin.executor.shutdown(wait=True)
+
+    def _plugin(self, plugin_name: str) -> _Plugin:
+        with self._lock:
+            if (plugin := self._plugins.get(plugin_name)) is None:
+                limits = self._limits.get(plugin_name, DEFAULT_PLUGIN_LIMITS)
+                plugin = self._plugins[plugin_name] = _Plugin(
+                    limits=limits,
+                    executor=ThreadPoolExecutor(
+                        max_workers=limits.max_concurrent,
+                        thread_name_prefix=f"notify-{plugin_name}",
+                    ),
+                    slots=threading.Semaphore(limits.max_concurrent + _MAX_QUEUED),
+                )
+            return plugin
+
+    def _deliver[T](
+        self,
+        plugin: _Plugin,
+        key: tuple[str, Hashable],
+        deliver: Callable[[], T],
+        submitted: float,
+        future: Future[T],
+    ) -> None:
+        try:
+            self._wait_for_rate_limit(plugin)
+            with self._lock:
+                plugin.statistics.queued -= 1
+                plugin.statistics.running += 1
+            try:
+                result = deliver()
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                latency = time.monotonic() - submitted
+                with self._lock:
+                    plugin.statistics.running -= 1
+                    plugin.statistics.delivered += 1
+                    plugin.statistics.total_latency += latency
+                    plugin.statistics.max_latency = max(plugin.statistics.max_latency, latency)
+        finally:
+            plugin.slots.release()
+            with self._lock:
+                if waiting := self._waiting[key]:
+                    waiting.popleft()()
+                else:
+                    del self._waiting[key]
+
+    def _wait_for_rate_limit(self, plugin: _Plugin) -> None:
+        if not plugin.limits.max_per_minute:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, plugin.next_start)
+            plugin.next_start = start + 60.0 / plugin.limits.max_per_minute
+        time.sleep(start - now)
+
+    def _report(self, contact: str) -> None:
+        with self._report_lock:
+            while True:
+                with self._lock:
+                    pending = self._pending.get(contact)
+                    if not pending or not pending[0].future.done():
+                        return
+                    delivery = pending.popleft()
+                    if not pending:
+                        del self._pending[contact]
+                try:
+                    delivery.report(delivery.future.result())
+                except Exception:
+                    logger.exception("ERROR:")
@@ -59,6 +59,7 @@ from cmk.base.automations.automations import Automation, load_config, load_plugi
 from cmk.base.base_app import CheckmkBaseApp
 from cmk.base.configlib.loaded_config import BaseConfig
 from cmk.base.modes.modes import Mode, Option
+from cmk.base.notification_delivery import NotificationDelivery, PluginLimits
 from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException, MKTimeout, raise_mkterminate_on_sigint
 from cmk.ccc.hostaddress import HostName
@@ -72,6 +73,7 @@ from cmk.events.log_to_history import (
     notification_message,
     notification_result_message,
 )
+from cmk.events.notification_backlog import NotificationBacklog
 from cmk.events.notification_result import (
     NotificationContext,
     NotificationPluginName,
@@ -140,6 +142,9 @@ ContactNames = frozenset[ContactName]  # Must be hasable
 # for deduplication.
 _PER_RULE_PARAM_KEYS = frozenset({"matching_rule_nr", "matching_rule_text"})
 
+# Seconds to collect the remaining output of a notification plug-in after killing it
+_KILLED_PLUGIN_TIMEOUT = 1
+
 
 def _strip_per_rule_metadata(parameters: NotifyPluginParamsDict) -> NotifyPluginParamsDict:
     return {k: v for k, v in parameters.items() if k not in _PER_RULE_PARAM_KEYS}
@@ -177,6 +182,7 @@ class NotificationConfig:
     fallback_email: str
     fallback_format: _FallbackFormat
     plugin_timeout: int
+    plugin_limits: Mapping[NotificationPluginNameStr, PluginLimits]
     spooling: Literal["local", "remote", "both", "off"]
     logging_level: int
     host_parameters_cb: Callable[[HostName, NotificationPluginNameStr], Mapping[str, object]]
@@ -256,6 +262,10 @@ def make_notification_config(
         fallback_email=base_config.notification_fallback_email,
         fallback_format=base_config.notification_fallback_format,
         plugin_timeout=base_config.notification_plugin_timeout,
+        plugin_limits={
+            plugin_name: PluginLimits(*limits)
+            for plugin_name, limits in base_config.notification_plugin_limits.items()
+        },
         spooling=resolve_spooling(
             edition, base_config.notification_spooling, base_config.notification_spool_to
         ),
@@ -603,6 +613,7 @@ def _notify_notify(
     all_timeperiods: TimeperiodSpecs,
     analyse: bool = False,
     dispatch: str = "",
+    delivery: NotificationDelivery | None = None,
 ) -> NotifyAnalysisInfo | None:
     """
     This function processes one raw notification and decides wether it should be spooled or not.
@@ -613,6 +624,7 @@ def _notify_notify(
         multiple specific notification contexts out of the raw notification context and the matching
         notification rule.
     :param analyse:
+    :param delivery: Delivers the notifications concurrently instead of one after another.
     """
     enriched_context = events.complete_raw_context(
         raw_context,
@@ -668,6 +680,7 @@ def _notify_notify(
             analyse=analyse,
             dispatch=dispatch,
             timeperiods_active=timeperiods_active,
+            delivery=delivery,
         )
     return None
 
@@ -683,6 +696,7 @@ def _locally_deliver_raw_context(
     analyse: bool = False,
     dispatch: str = "",
     timeperiods_active: _CoreTimeperiodsActive,
+    delivery: NotificationDelivery | None = None,
 ) -> NotifyAnalysisInfo | None:
     try:
         logger.debug("Preparing rule based notifications")
@@ -696,6 +710,7 @@ def _locally_deliver_raw_context(
             analyse=analyse,
             dispatch=dispatch,
             timeperiods_active=timeperiods_active,
+            delivery=delivery,
         )
 
     except Exception:
@@ -822,6 +837,18 @@ def _notify_keepalive(
     config_contacts: ConfigContacts,
     all_timeperiods: TimeperiodSpecs,
 ) -> None:
+    # A slow plug-in must not hold back the notifications of the other plug-ins
+    delivery = NotificationDelivery(notification_config.plugin_limits)
+
+    def call_every_loop(timeperiods_active: _CoreTimeperiodsActive) -> None:
+        delivery.log_statistics()
+        _send_ripe_bulks(
+            get_http_proxy,
+            timeperiods_active,
+            bulk_interval=notification_config.bulk_interval,
+            plugin_timeout=notification_config.plugin_timeout,
+        )
+
     events.event_keepalive(
         event_function=partial(
             _notify_notify,
@@ -831,14 +858,11 @@ def _notify_keepalive(
             define_servicegroups=define_servicegroups,
             config_contacts=config_contacts,
             all_timeperiods=all_timeperiods,
+            delivery=delivery,
         ),
-        call_every_loop=partial(
-            _send_ripe_bulks,
-            get_http_proxy,
-            bulk_interval=notification_config.bulk_interval,
-            plugin_timeout=notification_config.plugin_timeout,
-        ),
+        call_every_loop=call_every_loop,
         loop_interval=notification_config.bulk_interval,
+        shutdown_function=delivery.shutdown,
     )
 
 
@@ -1036,6 +1060,7 @@ def _notify_rulebased(
     analyse: bool = False,
     dispatch: str = "",
     timeperiods_active: _CoreTimeperiodsActive,
+    delivery: NotificationDelivery | None = None,
 ) -> NotifyAnalysisInfo:
     # First step: go through all rules and construct our list of
     # notification entries. Each entry identifies a unique notification
@@ -1098,6 +1123,7 @@ def _notify_rulebased(
         spooling=notification_config.spooling,
         analyse=analyse,
         dispatch=dispatch,
+        delivery=delivery,
     )
 
     return rule_info, plugin_info
@@ -1267,6 +1293,7 @@ def _process_notifications(
     spooling: Literal["local", "remote", "both", "off"],
     analyse: bool,
     dispatch: str = "",
+    delivery: NotificationDelivery | None = None,
 ) -> list[NotifyPluginInfo]:
     plugin_info: list[NotifyPluginInfo] = []
 
@@ -1304,7 +1331,9 @@ def _process_notifications(
                     else rbn_split_plugin_context(plugin_context)
                 )
                 for context in plugin_contexts:
-                    call_notification_script(plugin_name, context, plugin_timeout=plugin_timeout)
+                    _deliver_notification(
+                        plugin_name, context, plugin_timeout=plugin_timeout, delivery=delivery
+                    )
             else:
                 logger.info("No rule matched, would notify fallback contacts, but none configured")
     else:
@@ -1371,8 +1400,11 @@ def _process_notifications(
                     else:
                         if dispatch and entry.plugin_name != dispatch:
                             continue
-                        call_notification_script(
-                            entry.plugin_name, context, plugin_timeout=plugin_timeout
+                        _deliver_notification(
+                            entry.plugin_name,
+                            context,
+                            plugin_timeout=plugin_timeout,
+                            delivery=delivery,
                         )
 
             except Exception as e:
@@ -2217,6 +2249,104 @@ def call_notification_script(
     return exitcode
 
 
+def _deliver_notification(
+    plugin_name: NotificationPluginNameStr,
+    plugin_context: NotificationContext,
+    *,
+    plugin_timeout: int,
+    delivery: NotificationDelivery | None,
+) -> None:
+    if delivery is None:
+        call_notification_script(plugin_name, plugin_context, plugin_timeout=plugin_timeout)
+        return
+
+    log_to_history(notification_message(NotificationPluginName(plugin_name), plugin_context))
+    if not (path := path_to_notification_script(plugin_name)):
+        return
+    delivery.submit(
+        plugin_name,
+        plugin_context.get("CONTACTNAME", ""),
+        (plugin_context.get("HOSTNAME", ""), plugin_context.get("SERVICEDESC", "")),
+        partial(
+            _run_notification_script,
+            plugin_name,
+            path,
+            plugin_context,
+            plugin_timeout=plugin_timeout,
+        ),
+        partial(_log_notification_result, plugin_name, plugin_context),
+    )
+
+
+def _run_notification_script(
+    plugin_name: NotificationPluginNameStr,
+    path: str,
+    plugin_context: NotificationContext,
+    *,
+    plugin_timeout: int,
+) -> tuple[NotificationResultCode, list[str]]:
+    """Execute a notification plug-in in a worker thread of the concurrent delivery
+
+    The signal based Timeout of call_notification_script() only works in the main thread.
+    """
+    logger.info("     %(plugin)s: executing %(path)s", {"plugin": plugin_name, "path": path})
+    timed_out = False
+    try:
+        with subprocess.Popen(
+            [path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=notification_script_env(plugin_context),
+            encoding="utf-8",
+            close_fds=True,
+        ) as p:
+            try:
+                stdout, _stderr = p.communicate(timeout=plugin_timeout)
+            except subprocess.TimeoutExpired:
+                logger.info(
+                    "     %(plugin)s: Notification plug-in did not finish within %(timeout)d "
+                    "seconds. Terminating.",
+                    {"plugin": plugin_name, "timeout": plugin_timeout},
+                )
+                p.kill()
+                try:
+                    stdout, _stderr = p.communicate(timeout=_KILLED_PLUGIN_TIMEOUT)
+                except subprocess.TimeoutExpired as e:
+                    # Processes started by the plug-in still hold the output pipe. It is closed
+                    # when leaving the context, which then only waits for the killed plug-in.
+                    stdout = (e.output or b"").decode("utf-8", errors="replace")
+                timed_out = True
+    except Exception as e:
+        logger.exception("     %(plugin)s: ERROR:", {"plugin": plugin_name})
+        return NotificationResultCode(2), [str(e)]
+
+    output_lines = [line.rstrip() for line in stdout.splitlines()]
+    for line in output_lines:
+        logger.info("     %(plugin)s: Output: %(line)s", {"plugin": plugin_name, "line": line})
+    if exitcode := 1 if timed_out else p.returncode:
+        logger.info(
+            "     %(plugin)s: Plug-in exited with code %(exitcode)d",
+            {"plugin": plugin_name, "exitcode": exitcode},
+        )
+    return NotificationResultCode(exitcode), output_lines
+
+
+def _log_notification_result(
+    plugin_name: NotificationPluginNameStr,
+    plugin_context: NotificationContext,
+    result: tuple[NotificationResultCode, list[str]],
+) -> None:
+    exit_code, output_lines = result
+    log_to_history(
+        notification_result_message(
+            plugin=NotificationPluginName(plugin_name),
+            context=plugin_context,
+            exit_code=exit_code,
+            output=output_lines,
+        )
+    )
+
+
 # Construct the environment for the notification script
 def notification_script_env(plugin_context: NotificationContext) -> PluginNotificationContext:
     # Use half of the maximum allowed string length MAX_ARG_STRLEN
@@ -2848,29 +2978,16 @@ def call_bulk_notification_script(
 
 
 def store_notification_backlog(raw_context: EventContext, *, backlog_size: int) -> None:
-    path = notification_logdir / "backlog.mk"
-    if not backlog_size:
-        if path.exists():
-            path.unlink()
-        return
-
-    backlog = store.load_object_from_file(
-        path,
-        default=[],
-        lock=True,
-    )[: backlog_size - 1]
-    store.save_object_to_file(path, [raw_context] + backlog, pprint_value=False)
+    NotificationBacklog(notification_logdir / "backlog").append(raw_context, size=backlog_size)
 
 
 def raw_context_from_backlog(nr: int) -> EventContext:
-    backlog = store.load_object_from_file(notification_logdir / "backlog.mk", default=[])
-
-    if nr < 0 or nr >= len(backlog):
+    if (raw_context := NotificationBacklog(notification_logdir / "backlog").get(nr)) is None:
         console.error(f"No notification number {nr} in backlog.", file=sys.stderr)
         sys.exit(2)
 
     logger.info("Replaying notification %(nr)d from backlog...\n", {"nr": nr})
-    return backlog[nr]
+    return raw_context
 
 
 def raw_context_from_env(environ: Mapping[str, str]) -> EventContext:
@@ -5,8 +5,12 @@
 
 from __future__ import annotations
 
+import gc
+import multiprocessing
 import os
 import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
 from multiprocessing.pool import Pool
 from pathlib import Path
 from typing import TypedDict
@@ -17,6 +21,12 @@ from redis import Redis
 from cmk.bi import storage
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.data_fetcher import BIStructureFetcher, SiteProgramStart
+from cmk.bi.dependencies import (
+    AggregationDependencies,
+    CompilationDependencies,
+    fingerprint,
+    SearchRecorder,
+)
 from cmk.bi.filesystem import BIFileSystem, get_default_site_filesystem
 from cmk.bi.frozen_manager import BIFrozenManager
 from cmk.bi.lib import SitesCallback
@@ -26,14 +36,17 @@ from cmk.bi.searcher import BISearcher
 from cmk.bi.trees import BICompiledAggregation
 from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
+from cmk.ccc.hostaddress import HostName
 from cmk.ccc.i18n import _
 from cmk.livestatus_client import Query, QuerySpecification
 from cmk.utils.redis import get_redis_client
 
-# NOTE: Multiprocessing support was reverted due to unexpected high resource usage. However, the
-# utility code was kept to further test on sandbox environments.
+# NOTE: The size of the pool is limited by the number of cores and the available memory. Each
+# worker is forked from the compiling process and may end up with a copy of its memory.
 _MAX_MULTIPROCESSING_POOL_SIZE = 8
 _AVAILABLE_MEMORY_RATIO = 0.75
+# Below this number of aggregations forking the workers does not pay off
+_MIN_AGGREGATIONS_FOR_MULTIPROCESSING = 16
 
 
 class ConfigStatus(TypedDict):
@@ -42,6 +55,18 @@ class ConfigStatus(TypedDict):
     online_sites: set[SiteProgramStart]
 
 
+@dataclass(frozen=True)
+class CompilationStats:
+    durations: Mapping[str, float]
+    duration: float
+    processes: int
+
+    @property
+    def speedup(self) -> float:
+        """CPU time spent on compiling the aggregations compared to the elapsed time"""
+        return sum(self.durations.values()) / self.duration if self.duration else 1.0
+
+
 class BICompiler:
     def __init__(
         self,
@@ -54,9 +79,11 @@ class BICompiler:
         self._fs = fs or get_default_site_filesystem()
 
         self._compiled_aggregations: dict[str, BICompiledAggregation] = {}
+        self.compilation_stats: CompilationStats | None = None
 
         self._aggregation_store = storage.AggregationStore(self._fs.cache)
         self._metadata_store = storage.MetadataStore(self._fs)
+        self._dependency_store = storage.DependencyStore(self._fs.cache)
         self._lookup_store = storage.LookupStore(redis_client or get_redis_client())
 
         self._bi_packs = BIAggregationPacks(bi_configuration_file)
@@ -99,20 +126,65 @@ class BICompiler:
 
             self.prepare_for_compilation(current_configstatus["online_sites"])
 
-            for aggregation in self._bi_packs.get_all_aggregations():
-                start = time.perf_counter()
-                LOGGER.debug(f"Starting compilation for {aggregation.id} ...")
-                self._compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
-                end = time.perf_counter()
-                LOGGER.debug(f"Compilation of {aggregation.id} took {end - start:f}")
+            aggregations = self._bi_packs.get_all_aggregations()
+            previous_dependencies = self._dependency_store.load()
+            pack_fingerprints = {
+                pack_id: fingerprint(bi_pack.serialize())
+                for pack_id, bi_pack in self._bi_packs.get_packs().items()
+            }
+            host_fingerprints = {
+                host_name: fingerprint(host_data)
+                for host_name, host_data in self.bi_searcher.hosts.items()
+            }
+
+            recompiled_aggregations, recorders = self._compile_aggregations(
+                self._get_aggregations_to_compile(
+                    aggregations, previous_dependencies, pack_fingerprints, host_fingerprints
+                )
+            )
+            LOGGER.info(
+                "Recompiled %(recompiled)d of %(count)d aggregations",
+                {"recompiled": len(recompiled_aggregations), "count": len(aggregations)},
+            )
+            self._compiled_aggregations = {
+                aggregation.id: recompiled_aggregations.get(aggregation.id)
+                or self._aggregation_store.get(aggregation.id)
+                for aggregation in aggregations
+            }
 
             self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
 
-            for compiled_aggregation in self._compiled_aggregations.values():
+            for compiled_aggregation in recompiled_aggregations.values():
                 self._store_compiled_aggregation(compiled_aggregation)
 
             self._compiled_aggregations = self._frozen_manager.update(self._compiled_aggregations)
-            self._lookup_store.generate_aggregation_lookups(self._compiled_aggregations)
+            if previous_dependencies is None or not self._lookup_store.base_lookup_key_exists():
+                self._lookup_store.generate_aggregation_lookups(self._compiled_aggregations)
+            else:
+                self._lookup_store.update_aggregation_lookups(
+                    self._compiled_aggregations,
+                    recompiled_aggregations.keys()
+                    | (previous_dependencies.aggregations.keys() - {a.id for a in aggregations}),
+                )
+
+            aggregation_dependencies = (
+                dict(previous_dependencies.aggregations) if previous_dependencies else {}
+            )
+            for aggregation in aggregations:
+                if recorder := recorders.get(aggregation.id):
+                    aggregation_dependencies[aggregation.id] = self._get_aggregation_dependencies(
+                        aggregation, recorder
+                    )
+            self._dependency_store.save(
+                CompilationDependencies(
+                    pack_fingerprints=pack_fingerprints,
+                    host_fingerprints=host_fingerprints,
+                    aggregations={
+                        aggregation.id: aggregation_dependencies[aggregation.id]
+                        for aggregation in aggregations
+                    },
+                )
+            )
 
             known_sites = {kv[0]: kv[1] for kv in current_configstatus.get("known_sites", set())}
             self._cleanup_vanished_aggregations()
@@ -129,7 +201,95 @@ class BICompiler:
         loaded_identifiers = self._get_currently_loaded_aggregation_identifiers()
         return stored_identifiers - loaded_identifiers
 
-    def _get_multiprocessing_pool(self, aggregation_count: int) -> Pool:
+    def _get_aggregations_to_compile(
+        self,
+        aggregations: Sequence[BIAggregation],
+        previous_dependencies: CompilationDependencies | None,
+        pack_fingerprints: Mapping[str, str],
+        host_fingerprints: Mapping[HostName, str],
+    ) -> list[BIAggregation]:
+        """The aggregations which may compile differently since the last compilation"""
+        if previous_dependencies is None:
+            return list(aggregations)
+
+        changed_packs = previous_dependencies.changed_packs(pack_fingerprints)
+        changed_hosts = previous_dependencies.changed_hosts(host_fingerprints)
+        changed_hosts_searcher = BISearcher()
+        changed_hosts_searcher.set_hosts(
+            {
+                host_name: self.bi_searcher.hosts[host_name]
+                for host_name in changed_hosts
+                if host_name in self.bi_searcher.hosts
+            }
+        )
+        stored_identifiers = set(self._aggregation_store.yield_stored_identifiers())
+        return [
+            aggregation
+            for aggregation in aggregations
+            if (dependencies := previous_dependencies.aggregations.get(aggregation.id)) is None
+            or storage.generate_identifier(aggregation.id) not in stored_identifiers
+            or dependencies.is_affected(changed_packs, changed_hosts, changed_hosts_searcher)
+        ]
+
+    def _get_aggregation_dependencies(
+        self, aggregation: BIAggregation, recorder: SearchRecorder
+    ) -> AggregationDependencies:
+        return AggregationDependencies(
+            packs=frozenset(
+                {aggregation.pack_id}
+                | {
+                    self._bi_packs.get_rule_mandatory(rule_id).pack_id
+                    for rule_id in self._bi_packs.get_rule_ids_of_aggregation(aggregation.id)
+                }
+            ),
+            hosts=frozenset(recorder.hosts),
+            searches=tuple(recorder.searches.values()),
+        )
+
+    def _compile_aggregations(
+        self, aggregations: Sequence[BIAggregation]
+    ) -> tuple[dict[str, BICompiledAggregation], dict[str, SearchRecorder]]:
+        start = time.perf_counter()
+        processes = (
+            _get_multiprocessing_pool_size(len(aggregations))
+            if len(aggregations) >= _MIN_AGGREGATIONS_FOR_MULTIPROCESSING
+            else 1
+        )
+        if processes > 1:
+            # Otherwise each worker would build the indexes of the searcher on its own
+            self.bi_searcher.build_index()
+            # Objects which exist before forking are ignored by the garbage collector of the
+            # workers. This keeps the pages of the searcher shared instead of copying them.
+            gc.freeze()
+            try:
+                with self._get_multiprocessing_pool(processes) as pool:
+                    results = pool.map(_process_compilation, aggregations, chunksize=1)
+            finally:
+                gc.unfreeze()
+        else:
+            results = [_compile_aggregation(a, self.bi_searcher) for a in aggregations]
+
+        self.compilation_stats = CompilationStats(
+            durations={compiled.id: duration for compiled, duration, _recorder in results},
+            duration=time.perf_counter() - start,
+            processes=processes,
+        )
+        LOGGER.info(
+            "Compiled %(count)d aggregations with %(processes)d processes in %(duration).2fs"
+            " (speedup: %(speedup).1f)",
+            {
+                "count": len(results),
+                "processes": processes,
+                "duration": self.compilation_stats.duration,
+                "speedup": self.compilation_stats.speedup,
+            },
+        )
+        return (
+            {compiled.id: compiled for compiled, _duration, _recorder in results},
+            {compiled.id: recorder for compiled, _duration, recorder in results},
+        )
+
+    def _get_multiprocessing_pool(self, processes: int) -> Pool:
         # HACK: due to known constraints with multiprocessing in Python, this is a simple way to
         # "inject" the BI searcher dependency to our separate processes. An alternative approach
         # would be to move this object to a global variable. However, we prefer the attribute based
@@ -139,8 +299,10 @@ class BICompiler:
         def initializer(function) -> None:  # type: ignore[no-untyped-def]
             function.searcher = self.bi_searcher
 
-        return Pool(
-            processes=_get_multiprocessing_pool_size(aggregation_count),
+        # Only forked workers share the memory of the searcher, they also don't need to pickle
+        # the initializer
+        return multiprocessing.get_context("fork").Pool(
+            processes=processes,
             initializer=initializer,
             initargs=(_process_compilation,),
         )
@@ -258,15 +420,35 @@ def _get_multiprocessing_pool_size(aggregation_count: int) -> int:
     current_process_memory = current_process.memory_info().rss
     potential_pool_size = int(available_memory // current_process_memory)
 
-    return min(potential_pool_size, _MAX_MULTIPROCESSING_POOL_SIZE, aggregation_count)
+    return min(
+        potential_pool_size,
+        len(os.sched_getaffinity(0)),
+        _MAX_MULTIPROCESSING_POOL_SIZE,
+        aggregation_count,
+    )
 
 
-def _process_compilation(aggregation: BIAggregation) -> BICompiledAggregation:
-    start = time.perf_counter()
-    compiled_aggregation = aggregation.compile(_process_compilation.searcher)  # type: ignore[attr-defined]
-    end = time.perf_counter()
+def _process_compilation(
+    aggregation: BIAggregation,
+) -> tuple[BICompiledAggregation, float, SearchRecorder]:
+    return _compile_aggregation(aggregation, _process_compilation.searcher)  # type: ignore[attr-defined]
+
+
+def _compile_aggregation(
+    aggregation: BIAggregation, searcher: BISearcher
+) -> tuple[BICompiledAggregation, float, SearchRecorder]:
+    # CPU time: Wall clock time would also count the time other workers use the same core
+    start = time.process_time()
+    with searcher.record() as recorder:
+        compiled_aggregation = aggregation.compile(searcher)
+    duration = time.process_time() - start
+    recorder.hosts.update(
+        host_spec.host_name
+        for branch in compiled_aggregation.branches
+        for host_spec in branch.get_required_hosts()
+    )
     LOGGER.debug(
         "Compilation of %(aggregation_id)s took: %(duration)fs",
-        {"aggregation_id": aggregation.id, "duration": end - start},
+        {"aggregation_id": aggregation.id, "duration": duration},
     )
-    return compiled_aggregation
+    return compiled_aggregation, duration, recorder
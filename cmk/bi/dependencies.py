@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Tracking of what a compiled aggregation depends on
+
+The result of compiling an aggregation is determined by the configuration of the rule packs its
+aggregation and rules are defined in and by the results of the searches it executes. A search
+result can only change if a changed host either was part of the previous result or matches the
+search now. So after a change only the aggregations are recompiled which
+
+* use a changed rule pack,
+* have touched a changed host during their last compilation or
+* have executed a search which matches one of the changed hosts now.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable, Mapping, Set
+from dataclasses import dataclass, field
+from typing import Literal
+
+from cmk.bi.lib import ABCBISearcher, BIHostData
+from cmk.bi.type_defs import HostConditions, HostServiceConditions
+from cmk.ccc.hostaddress import HostName
+
+type SearchCall = (
+    tuple[Literal["hosts"], HostConditions]
+    | tuple[Literal["services"], HostServiceConditions]
+    | tuple[Literal["host_name"], str]
+)
+
+
+@dataclass
+class SearchRecorder:
+    """Collects the searches and hosts used during the compilation of one aggregation"""
+
+    hosts: set[HostName] = field(default_factory=set)
+    searches: dict[str, SearchCall] = field(default_factory=dict)
+
+    def add_search(self, search: SearchCall) -> None:
+        self.searches.setdefault(repr(search), search)
+
+    def add_hosts(self, hosts: Iterable[BIHostData]) -> None:
+        # The children and parents of a host are looked up by name, e.g. with refer_to "child"
+        for host in hosts:
+            self.hosts.add(host.name)
+            self.hosts.update(host.children)
+            self.hosts.update(host.parents)
+
+
+@dataclass(frozen=True)
+class AggregationDependencies:
+    packs: frozenset[str]
+    hosts: frozenset[HostName]
+    searches: tuple[SearchCall, ...]
+
+    def is_affected(
+        self,
+        changed_packs: Set[str],
+        changed_hosts: Set[HostName],
+        changed_hosts_searcher: ABCBISearcher,
+    ) -> bool:
+        """changed_hosts_searcher only knows the current data of the changed hosts"""
+        if not self.packs.isdisjoint(changed_packs) or not self.hosts.isdisjoint(changed_hosts):
+            return True
+        if not changed_hosts_searcher.hosts:
+            return False
+        return any(_replay(search, changed_hosts_searcher) for search in self.searches)
+
+
+def _replay(search: SearchCall, searcher: ABCBISearcher) -> bool:
+    match search:
+        case ("hosts", conditions):
+            return bool(searcher.search_hosts(conditions))
+        case ("services", conditions):
+            return bool(searcher.search_services(conditions))
+        case ("host_name", pattern):
+            return bool(searcher.get_host_name_matches(list(searcher.hosts.values()), pattern)[0])
+    raise NotImplementedError(f"Invalid search {search!r}")
+
+
+@dataclass(frozen=True)
+class CompilationDependencies:
+    pack_fingerprints: Mapping[str, str]
+    host_fingerprints: Mapping[HostName, str]
+    aggregations: Mapping[str, AggregationDependencies]
+
+    def changed_packs(self, pack_fingerprints: Mapping[str, str]) -> set[str]:
+        return _changed_keys(self.pack_fingerprints, pack_fingerprints)
+
+    def changed_hosts(self, host_fingerprints: Mapping[HostName, str]) -> set[HostName]:
+        return _changed_keys(self.host_fingerprints, host_fingerprints)
+
+
+def _changed_keys[T](old: Mapping[T, str], new: Mapping[T, str]) -> set[T]:
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def fingerprint(value: object) -> str:
+    """A digest of the value which does not depend on the order of sets and dicts"""
+    return hashlib.sha256(repr(_canonical(value)).encode()).hexdigest()
+
+
+def _canonical(value: object) -> object:
+    if isinstance(value, Mapping):
+        return tuple(sorted((repr(k), _canonical(v)) for k, v in value.items()))
+    if isinstance(value, set | frozenset):
+        return tuple(sorted(repr(_canonical(v)) for v in value))
+    if isinstance(value, list | tuple):
+        return tuple(_canonical(v) for v in value)
+    return value
@@ -4,14 +4,23 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 
-from collections.abc import Iterable, Mapping
-from typing import override
+import bisect
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from typing import Final, override
 
+from cmk.bi.dependencies import SearchRecorder
 from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSearchMatch
 from cmk.bi.type_defs import HostChoice, HostConditions, HostRegexMatches, HostServiceConditions
+from cmk.ccc.hostaddress import HostName
 from cmk.ccc.regex import regex
 from cmk.ruleset_matcher.labels import LabelGroups
-from cmk.ruleset_matcher.matcher import matches_labels, matches_tag_condition, TagCondition
+from cmk.ruleset_matcher.matcher import (
+    CompiledLabelGroups,
+    HostConditionIndex,
+    matches_tag_condition,
+    TagCondition,
+)
 from cmk.ruleset_matcher.tags import TagGroupID
 
 #   .--Defines-------------------------------------------------------------.
@@ -25,6 +34,105 @@ from cmk.ruleset_matcher.tags import TagGroupID
 
 # Search data used by bi_searcher
 
+_REGEX_SPECIAL_CHARS: Final = frozenset(".^$*+?{}[]\\|()")
+
+
+def _literal_prefix(pattern: str) -> str:
+    """A prefix every string matched by the pattern (from its start) begins with"""
+    if "|" in pattern:
+        return ""
+    prefix_length = 0
+    while prefix_length < len(pattern) and pattern[prefix_length] not in _REGEX_SPECIAL_CHARS:
+        prefix_length += 1
+    if prefix_length < len(pattern) and pattern[prefix_length] in "*?{":
+        prefix_length -= 1  # The last character is optional
+    return pattern[: max(prefix_length, 0)]
+
+
+class _HostIndex:
+    """Indexes over the hosts of one compilation
+
+    The searches only verify the candidates these indexes provide instead of checking every
+    host and service. The results of the searches are cached, as the same conditions are used
+    over and over again for different rule nodes.
+    """
+
+    def __init__(self, hosts: Iterable[BIHostData]) -> None:
+        self.hosts: Final = {host.name: host for host in hosts}
+        self._conditions: Final = HostConditionIndex(
+            self.hosts, {host_name: host.tags for host_name, host in self.hosts.items()}
+        )
+
+        hosts_by_folder: dict[str, list[HostName]] = {}
+        for host_name, host in self.hosts.items():
+            # Every folder the host is located in, directly or in a subfolder
+            end = host.folder.find("/")
+            while end != -1:
+                hosts_by_folder.setdefault(host.folder[:end], []).append(host_name)
+                end = host.folder.find("/", end + 1)
+        self._folders: Final = {
+            folder_path: self._conditions.bits(host_names)
+            for folder_path, host_names in hosts_by_folder.items()
+        }
+
+        self._service_descriptions: Final = sorted(
+            {
+                service_description
+                for host in self.hosts.values()
+                for service_description in host.services
+            }
+        )
+
+        self._host_matches: dict[str, set[HostName] | None] = {}
+        self._service_description_matches: dict[str, dict[str, tuple[str, ...]]] = {}
+
+    def hosts_matching(
+        self,
+        folder_path: str,
+        tag_conditions: Mapping[TagGroupID, TagCondition],
+        required_label_groups: LabelGroups,
+    ) -> set[HostName] | None:
+        """The names of the hosts matching all conditions
+
+        None if the conditions can not be evaluated on the index.
+        """
+        key = repr((folder_path, tag_conditions, required_label_groups))
+        if key not in self._host_matches:
+            try:
+                self._host_matches[key] = self._conditions.matching_hosts(
+                    self._folders.get(folder_path, 0) if folder_path else self._conditions.all,
+                    None,
+                    tag_conditions,
+                    CompiledLabelGroups.compile(required_label_groups),
+                    self._labels,
+                )
+            except NotImplementedError:
+                self._host_matches[key] = None
+        return self._host_matches[key]
+
+    def _labels(self, host_name: HostName) -> Mapping[str, str]:
+        return self.hosts[host_name].labels
+
+    def service_description_matches(self, pattern: str) -> Mapping[str, tuple[str, ...]]:
+        """The match groups of all known service descriptions matching the pattern"""
+        if (matches := self._service_description_matches.get(pattern)) is not None:
+            return matches
+
+        regex_pattern = regex(pattern)
+        prefix = _literal_prefix(pattern)
+        matches = {}
+        for position in range(
+            bisect.bisect_left(self._service_descriptions, prefix), len(self._service_descriptions)
+        ):
+            service_description = self._service_descriptions[position]
+            if not service_description.startswith(prefix):
+                break
+            if match := regex_pattern.match(service_description):
+                matches[service_description] = tuple(match.groups())
+        self._service_description_matches[pattern] = matches
+        return matches
+
+
 #   .--BISearcher----------------------------------------------------------.
 #   |         ____ ___ ____                      _                         |
 #   |        | __ )_ _/ ___|  ___  __ _ _ __ ___| |__   ___ _ __           |
@@ -36,6 +144,20 @@ from cmk.ruleset_matcher.tags import TagGroupID
 
 
 class BISearcher(ABCBISearcher):
+    def __init__(self) -> None:
+        super().__init__()
+        self._recorder: SearchRecorder | None = None
+        self._index: _HostIndex | None = None
+
+    @contextmanager
+    def record(self) -> Iterator[SearchRecorder]:
+        """Records the searches and touched hosts, see cmk.bi.dependencies"""
+        self._recorder = SearchRecorder()
+        try:
+            yield self._recorder
+        finally:
+            self._recorder = None
+
     def set_hosts(self, hosts: dict[str, BIHostData]) -> None:
         self.cleanup()
         # The key may be a pattern / regex, so `str` is the correct type for the key.
@@ -47,17 +169,54 @@ class BISearcher(ABCBISearcher):
         self.hosts = {}
         self._host_regex_match_cache.clear()
         self._host_regex_miss_cache.clear()
+        self._index = None
+
+    def build_index(self) -> None:
+        """Build the indexes of the hosts now instead of with the first search"""
+        self._get_index()
+
+    def _get_index(self) -> _HostIndex:
+        if self._index is None:
+            self._index = _HostIndex(self.hosts.values())
+        return self._index
 
     @override
     def search_hosts(self, conditions: HostConditions) -> list[BIHostSearchMatch]:
-        hosts, matched_re_groups = self.filter_host_choice(
-            list(self.hosts.values()), conditions["host_choice"]
+        host_matches = self._search_hosts(conditions)
+        if self._recorder is not None:
+            self._recorder.add_search(("hosts", conditions))
+            self._recorder.add_hosts(host_match.host for host_match in host_matches)
+        return host_matches
+
+    def _search_hosts(self, conditions: HostConditions) -> list[BIHostSearchMatch]:
+        matched_re_groups: HostRegexMatches | None = None
+        if conditions["host_choice"]["type"] == "all_hosts":
+            hosts = list(self.hosts.values())
+        else:
+            hosts, matched_re_groups = self.filter_host_choice(
+                list(self.hosts.values()), conditions["host_choice"]
+            )
+
+        # All candidates are known to the index, it can apply the other conditions at once
+        matched_host_names = self._get_index().hosts_matching(
+            conditions["host_folder"], conditions["host_tags"], conditions["host_label_groups"]
         )
-        matched_hosts = self.filter_host_folder(hosts, conditions["host_folder"])
-        matched_hosts = self.filter_host_tags(matched_hosts, conditions["host_tags"])
-        matched_hosts = self.filter_host_labels(matched_hosts, conditions["host_label_groups"])
+        if matched_host_names is None:
+            matched_hosts = self.filter_host_folder(hosts, conditions["host_folder"])
+            matched_hosts = self.filter_host_tags(matched_hosts, conditions["host_tags"])
+            matched_hosts = self.filter_host_labels(matched_hosts, conditions["host_label_groups"])
+        else:
+            matched_hosts = (host for host in hosts if host.name in matched_host_names)
+
         return [
-            BIHostSearchMatch(host=matched_host, match_groups=matched_re_groups[matched_host.name])
+            BIHostSearchMatch(
+                host=matched_host,
+                match_groups=(
+                    (matched_host.name,)
+                    if matched_re_groups is None
+                    else matched_re_groups[matched_host.name]
+                ),
+            )
             for matched_host in matched_hosts
         ]
 
@@ -71,7 +230,7 @@ class BISearcher(ABCBISearcher):
             return hosts, self._get_host_match_groups_by_name(hosts)
 
         if condition["type"] == "host_name_regex":
-            return self.get_host_name_matches(hosts, condition["pattern"])
+            return self._get_host_name_matches(hosts, condition["pattern"])
 
         if condition["type"] == "host_alias_regex":
             return self.get_host_alias_matches(hosts, condition["pattern"])
@@ -89,6 +248,17 @@ class BISearcher(ABCBISearcher):
         self,
         hosts: list[BIHostData],
         pattern: str,
+    ) -> tuple[list[BIHostData], HostRegexMatches]:
+        matched_hosts, matched_re_groups = self._get_host_name_matches(hosts, pattern)
+        if self._recorder is not None:
+            self._recorder.add_search(("host_name", pattern))
+            self._recorder.add_hosts(matched_hosts)
+        return matched_hosts, matched_re_groups
+
+    def _get_host_name_matches(
+        self,
+        hosts: list[BIHostData],
+        pattern: str,
     ) -> tuple[list[BIHostData], HostRegexMatches]:
         if pattern == "(.*)":
             return hosts, self._get_host_match_groups_by_name(hosts)
@@ -157,9 +327,25 @@ class BISearcher(ABCBISearcher):
         host_matches: list[BIHostSearchMatch],
         pattern: str,
     ) -> list[BIServiceSearchMatch]:
-        matched_services = []
+        index = self._get_index()
+        indexed_matches = index.service_description_matches(pattern)
         regex_pattern = regex(pattern)
+        matched_services = []
         for host_match in host_matches:
+            if index.hosts.get(host_match.host.name) is host_match.host:
+                if not indexed_matches:
+                    continue
+                for service_description in host_match.host.services:
+                    if (match_groups := indexed_matches.get(service_description)) is not None:
+                        matched_services.append(
+                            BIServiceSearchMatch(
+                                host_match=host_match,
+                                service_description=service_description,
+                                match_groups=match_groups,
+                            )
+                        )
+                continue
+
             for service_description in host_match.host.services:
                 if match := regex_pattern.match(service_description):
                     matched_services.append(
@@ -173,11 +359,19 @@ class BISearcher(ABCBISearcher):
 
     @override
     def search_services(self, conditions: HostServiceConditions) -> list[BIServiceSearchMatch]:
-        host_matches: list[BIHostSearchMatch] = self.search_hosts(conditions)
+        host_matches: list[BIHostSearchMatch] = self._search_hosts(conditions)
         service_matches = self.get_service_description_matches(
             host_matches, conditions["service_regex"]
         )
-        return self.filter_service_labels(service_matches, conditions["service_label_groups"])
+        service_matches = self.filter_service_labels(
+            service_matches, conditions["service_label_groups"]
+        )
+        if self._recorder is not None:
+            self._recorder.add_search(("services", conditions))
+            self._recorder.add_hosts(
+                service_match.host_match.host for service_match in service_matches
+            )
+        return service_matches
 
     @override
     def filter_host_folder(
@@ -188,8 +382,11 @@ class BISearcher(ABCBISearcher):
         if not folder_path:
             return hosts
 
-        folder_path = f"{folder_path}/"
-        return (host for host in hosts if host.folder.startswith(folder_path))
+        return self._filter_indexed_hosts(
+            hosts,
+            self._get_index().hosts_matching(folder_path, {}, []),
+            lambda host: host.folder.startswith(f"{folder_path}/"),
+        )
 
     @override
     def filter_host_tags(
@@ -197,17 +394,20 @@ class BISearcher(ABCBISearcher):
         hosts: Iterable[BIHostData],
         tag_conditions: Mapping[TagGroupID, TagCondition],
     ) -> Iterable[BIHostData]:
-        return (
-            host
-            for host in hosts  #
-            if all(
+        if not tag_conditions:
+            return hosts
+
+        return self._filter_indexed_hosts(
+            hosts,
+            self._get_index().hosts_matching("", tag_conditions, []),
+            lambda host: all(
                 matches_tag_condition(
                     taggroup_id,
                     tag_condition,
                     host.tags,
                 )
                 for taggroup_id, tag_condition in tag_conditions.items()
-            )
+            ),
         )
 
     @override
@@ -216,10 +416,30 @@ class BISearcher(ABCBISearcher):
     ) -> Iterable[BIHostData]:
         if not required_label_groups:
             return hosts
+
+        compiled_label_groups = CompiledLabelGroups.compile(required_label_groups)
+        return self._filter_indexed_hosts(
+            hosts,
+            self._get_index().hosts_matching("", {}, required_label_groups),
+            lambda host: compiled_label_groups.matches(host.labels),
+        )
+
+    def _filter_indexed_hosts(
+        self,
+        hosts: Iterable[BIHostData],
+        matched_host_names: set[HostName] | None,
+        matches: Callable[[BIHostData], bool],
+    ) -> Iterable[BIHostData]:
+        """Look up the hosts known to the index, check the others"""
+        indexed_hosts = self._get_index().hosts
         return (
-            matched_label
-            for matched_label in hosts
-            if matches_labels(matched_label.labels, required_label_groups)
+            host
+            for host in hosts
+            if (
+                host.name in matched_host_names
+                if matched_host_names is not None and indexed_hosts.get(host.name) is host
+                else matches(host)
+            )
         )
 
     def filter_service_labels(
@@ -228,9 +448,10 @@ class BISearcher(ABCBISearcher):
         if not required_label_groups:
             return services
 
+        compiled_label_groups = CompiledLabelGroups.compile(required_label_groups)
         matched_services: list[BIServiceSearchMatch] = []
         for service in services:
             service_data = service.host_match.host.services[service.service_description]
-            if matches_labels(service_data.labels, required_label_groups):
+            if compiled_label_groups.matches(service_data.labels):
                 matched_services.append(service)
         return matched_services
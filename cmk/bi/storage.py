@@ -7,11 +7,12 @@
 from __future__ import annotations
 
 import ast
+import json
 import pickle
 import re
 import shutil
 import uuid
-from collections.abc import Generator
+from collections.abc import Generator, Iterator, Set
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Final, NewType
@@ -19,6 +20,7 @@ from typing import Final, NewType
 from redis import Redis
 
 from cmk.bi.aggregation import BIAggregation
+from cmk.bi.dependencies import CompilationDependencies
 from cmk.bi.filesystem import BIFileSystem, BIFileSystemCache, BIFileSystemVar
 from cmk.bi.trees import BICompiledAggregation
 from cmk.ccc import store
@@ -128,10 +130,26 @@ class MetadataStore:
         return last_change
 
 
+class DependencyStore:
+    def __init__(self, fs_cache: BIFileSystemCache) -> None:
+        self.fs_cache = fs_cache
+
+    def load(self) -> CompilationDependencies | None:
+        dependencies = store.load_object_from_pickle_file(
+            self.fs_cache.compilation_dependencies, default=None
+        )
+        return dependencies if isinstance(dependencies, CompilationDependencies) else None
+
+    def save(self, dependencies: CompilationDependencies) -> None:
+        store.save_bytes_to_file(self.fs_cache.compilation_dependencies, pickle.dumps(dependencies))
+
+
 class LookupStore:
     def __init__(self, redis_client: Redis) -> None:
         self._redis_client = redis_client
         self._lookup_key = "bi:aggregation_lookup"
+        # Per aggregation: the lookup entries it has written, see update_aggregation_lookups()
+        self._lookup_index_key = "bi:aggregation_lookup_index"
         self._lookup_key_lock = "bi:aggregation_lookup_lock"
 
     def base_lookup_key_exists(self) -> bool:
@@ -158,21 +176,66 @@ class LookupStore:
         # to wait for the updated data. There is no tempfile -> live mechanism.
         # Updates are done on the live data via pipeline, using transactions.
         part_of_aggregation_map = self._get_aggregation_lookup_map(compiled_aggregations)
+        lookup_index_map = self._get_aggregation_lookup_index_map(compiled_aggregations)
 
         # Fetch existing keys
         existing_keys = set(self._redis_client.scan_iter(f"{self._lookup_key}:*"))
+        existing_keys.update(self._redis_client.scan_iter(f"{self._lookup_index_key}:*"))
 
         # Update keys
         pipeline = self._redis_client.pipeline()
-        for key, values in part_of_aggregation_map.items():
+        for key, values in (part_of_aggregation_map | lookup_index_map).items():
+            pipeline.delete(key)
             pipeline.sadd(key, *values)
         pipeline.set(self._lookup_key, "1")
 
-        if obsolete_keys := existing_keys - set(part_of_aggregation_map.keys()):
+        if (
+            obsolete_keys := existing_keys
+            - part_of_aggregation_map.keys()
+            - lookup_index_map.keys()
+        ):
             pipeline.delete(*obsolete_keys)
 
         pipeline.execute()
 
+    def update_aggregation_lookups(
+        self, compiled_aggregations: dict[str, BICompiledAggregation], aggregation_ids: Set[str]
+    ) -> None:
+        """Only rewrite the lookups of the given (recompiled or removed) aggregations
+
+        The lookups of frozen aggregations belong to the aggregation they are based on. The keys
+        of all other aggregations are left untouched.
+        """
+        affected_aggregations = {
+            aggr_id: compiled_aggregation
+            for aggr_id, compiled_aggregation in compiled_aggregations.items()
+            if _get_based_on_aggregation_id(compiled_aggregation) in aggregation_ids
+        }
+        lookup_index_map = self._get_aggregation_lookup_index_map(affected_aggregations)
+        index_keys = [
+            self._get_aggregation_lookup_index_key(aggr_id) for aggr_id in aggregation_ids
+        ]
+
+        pipeline = self._redis_client.pipeline(transaction=False)
+        for index_key in index_keys:
+            pipeline.smembers(index_key)
+        previous_entries: list[set[str]] = pipeline.execute()
+
+        pipeline = self._redis_client.pipeline()
+        for index_key, previous in zip(index_keys, previous_entries):
+            current = set(lookup_index_map.get(index_key, []))
+            if current == previous:
+                continue
+            for entry in previous - current:
+                pipeline.srem(*json.loads(entry))
+            for entry in current - previous:
+                pipeline.sadd(*json.loads(entry))
+            pipeline.delete(index_key)
+            if current:
+                pipeline.sadd(index_key, *current)
+        pipeline.set(self._lookup_key, "1")
+        pipeline.execute()
+
     def _get_aggregation_lookup_key(self, host_name: str, service_description: str | None) -> str:
         return f"{self._lookup_key}:{host_name}:{service_description}"
 
@@ -180,6 +243,24 @@ class LookupStore:
         self, compiled_aggregations: dict[str, BICompiledAggregation]
     ) -> dict[str, list[str]]:
         aggregation_lookup_map: dict[str, list[str]] = {}
+        for _aggr_id, key, value in self._iter_aggregation_lookups(compiled_aggregations):
+            aggregation_lookup_map.setdefault(key, []).append(value)
+        return aggregation_lookup_map
+
+    def _get_aggregation_lookup_index_map(
+        self, compiled_aggregations: dict[str, BICompiledAggregation]
+    ) -> dict[str, list[str]]:
+        lookup_index_map: dict[str, list[str]] = {}
+        for aggr_id, key, value in self._iter_aggregation_lookups(compiled_aggregations):
+            index_key = self._get_aggregation_lookup_index_key(
+                _get_based_on_aggregation_id(compiled_aggregations[aggr_id])
+            )
+            lookup_index_map.setdefault(index_key, []).append(json.dumps([key, value]))
+        return lookup_index_map
+
+    def _iter_aggregation_lookups(
+        self, compiled_aggregations: dict[str, BICompiledAggregation]
+    ) -> Iterator[tuple[str, str, str]]:
         for aggr_id, compiled_aggregation in compiled_aggregations.items():
             for branch in compiled_aggregation.branches:
                 for _, host_name, service_description in branch.required_elements:
@@ -187,7 +268,13 @@ class LookupStore:
                     # aggregation for any host/service. Right now it is only an indicator if this
                     # host/service is part of an aggregation
                     key = self._get_aggregation_lookup_key(host_name, service_description)
-                    value = f"{aggr_id}\t{branch.properties.title}"
-                    aggregation_lookup_map.setdefault(key, []).append(value)
+                    yield aggr_id, key, f"{aggr_id}\t{branch.properties.title}"
 
-        return aggregation_lookup_map
+    def _get_aggregation_lookup_index_key(self, aggr_id: str) -> str:
+        return f"{self._lookup_index_key}:{aggr_id}"
+
+
+def _get_based_on_aggregation_id(compiled_aggregation: BICompiledAggregation) -> str:
+    if frozen_info := compiled_aggregation.frozen_info:
+        return frozen_info.based_on_aggregation_id
+    return compiled_aggregation.id
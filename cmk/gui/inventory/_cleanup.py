@@ -407,6 +407,7 @@ def _compute_classified_file_paths(
             inventory_tree_gz.legacy,
             status_data_tree.path,
             status_data_tree.legacy,
+            inventory_paths.inventory_tree_indexed(host_name),
         ]:
             if (timestamp := _compute_timestamp_from_file_path(file_path)) is not None:
                 abandoned_tree_files_by_host.setdefault(raw_host_name, []).append(
@@ -430,6 +431,8 @@ def _compute_classified_file_paths(
             for file_path in (
                 set(inventory_paths.inventory_dir.glob("[!.]*"))
                 .union(inventory_paths.status_data_dir.glob("*"))
+                .union(inventory_paths.indexed_tree_dir.glob("*"))
+                .difference(inventory_paths.inventory_tree_indexed(h) for h in file_paths_by_host)
                 .difference(
                     fp
                     for fps in file_paths_by_host.values()
@@ -24,11 +24,11 @@ from typing import Any, cast, Literal, NamedTuple, NotRequired, overload, overri
 
 import cmk.gui.view_utils
 import cmk.gui.watolib.audit_log as _audit_log
-from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException, MKTimeout
 from cmk.ccc.site import omd_site, SiteId
 from cmk.ccc.user import UserId
 from cmk.ccc.version import Edition
+from cmk.events.notification_backlog import NotificationBacklog
 from cmk.events.notification_result import NotificationContext
 from cmk.events.notify_types import (
     EventRule,
@@ -1701,10 +1701,7 @@ class ModeAnalyzeNotifications(ModeNotifications):
         self, escape_plugin_output: bool, *, table_row_limit: int
     ) -> None:
         """Show recent notifications. We can use them for rule analysis"""
-        backlog = store.load_object_from_file(
-            cmk.utils.paths.var_dir / "notify/backlog.mk",
-            default=[],
-        )
+        backlog = list(NotificationBacklog(cmk.utils.paths.var_dir / "notify/backlog"))
         if not backlog:
             return
 
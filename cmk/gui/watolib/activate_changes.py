@@ -17,12 +17,13 @@ from __future__ import annotations
 import ast
 import functools
 import hashlib
-import io
 import logging
 import os
 import re
 import shutil
+import stat
 import subprocess
+import tempfile
 import time
 import traceback
 from collections import Counter
@@ -42,7 +43,7 @@ from html import unescape
 from itertools import filterfalse
 from multiprocessing.pool import AsyncResult, ThreadPool
 from pathlib import Path
-from typing import Any, assert_never, Final, Literal, NamedTuple, override, TypedDict
+from typing import Any, assert_never, Final, IO, Literal, NamedTuple, override, TypedDict
 from urllib.parse import urlparse
 
 from pydantic import BaseModel
@@ -765,11 +766,12 @@ def _get_config_sync_state(
     replication_paths: Sequence[ReplicationPath],
     *,
     debug: bool,
-) -> tuple[ConfigSyncFileInfos, int]:
+) -> tuple[ConfigSyncFileInfos, int, bool]:
     """Get the config file states from the remote sites
 
     Calls the automation call "get-config-sync-state" on the remote site,
-    which is handled by AutomationGetConfigSyncState."""
+    which is handled by AutomationGetConfigSyncState. Remote sites of older versions do not
+    report whether they accept compressed sync archives."""
     response = cmk.gui.watolib.automations.do_remote_automation(
         automation_config,
         "get-config-sync-state",
@@ -778,7 +780,11 @@ def _get_config_sync_state(
     )
 
     assert isinstance(response, tuple)
-    return {k: ConfigSyncFileInfo(*v) for k, v in response[0].items()}, response[1]
+    return (
+        {k: ConfigSyncFileInfo(*v) for k, v in response[0].items()},
+        response[1],
+        len(response) > 2 and response[2] is True,
+    )
 
 
 def _synchronize_files(
@@ -789,27 +795,29 @@ def _synchronize_files(
     remote_config_generation: int,
     site_config_dir: Path,
     *,
+    compress_archive: bool,
     debug: bool,
 ) -> None:
     """Pack the files in a simple tar archive and send it to the remote site
 
     We build a simple tar archive containing all files to be synchronized.  The list of file to
     be deleted and the current config generation is handed over using dedicated HTTP parameters.
+    The archive is buffered in a temporary file and streamed from there to the remote site.
     """
-
-    sync_archive = _get_sync_archive(files_to_sync, site_config_dir)
-
-    response = cmk.gui.watolib.automations.do_remote_automation(
-        automation_config,
-        "receive-config-sync",
-        [
-            ("site_id", site_id),
-            ("to_delete", repr(files_to_delete)),
-            ("config_generation", "%d" % remote_config_generation),
-        ],
-        files={"sync_archive": io.BytesIO(sync_archive)},
-        debug=debug,
-    )
+    with _create_sync_archive(
+        files_to_sync, site_config_dir, compress=compress_archive
+    ) as sync_archive:
+        response = cmk.gui.watolib.automations.do_remote_automation(
+            automation_config,
+            "receive-config-sync",
+            [
+                ("site_id", site_id),
+                ("to_delete", repr(files_to_delete)),
+                ("config_generation", "%d" % remote_config_generation),
+            ],
+            files={"sync_archive": sync_archive},
+            debug=debug,
+        )
 
     if response is not True:
         raise MKGeneralException(
@@ -822,6 +830,7 @@ class SyncState:
     central_file_infos: ConfigSyncFileInfos
     remote_file_infos: ConfigSyncFileInfos
     remote_config_generation: int
+    remote_accepts_compressed_archive: bool = False
 
 
 def fetch_sync_state(
@@ -848,10 +857,8 @@ def fetch_sync_state(
                 {"site_activation_state": site_activation_state},
             )
 
-            remote_file_infos, remote_config_generation = _get_config_sync_state(
-                automation_config,
-                replication_paths,
-                debug=debug,
+            remote_file_infos, remote_config_generation, remote_accepts_compressed_archive = (
+                _get_config_sync_state(automation_config, replication_paths, debug=debug)
             )
             site_logger.debug(
                 "Received %(count)d file infos from remote",
@@ -863,6 +870,7 @@ def fetch_sync_state(
                     central_file_infos=central_file_infos,
                     remote_file_infos=remote_file_infos,
                     remote_config_generation=remote_config_generation,
+                    remote_accepts_compressed_archive=remote_accepts_compressed_archive,
                 ),
                 site_activation_state,
                 sync_start,
@@ -928,6 +936,7 @@ def synchronize_files(
     origin_span: trace.Span,
     automation_config: RemoteAutomationConfig,
     debug: bool,
+    compress_archive: bool = False,
 ) -> SiteActivationState | None:
     site_id = site_activation_state["_site_id"]
     site_logger = logger.getChild(f"site[{site_id}]")
@@ -961,6 +970,7 @@ def synchronize_files(
                 sync_delta.to_delete,
                 remote_config_generation,
                 site_config_dir,
+                compress_archive=compress_archive,
                 debug=debug,
             )
             site_logger.debug("Finished config sync")
@@ -2504,9 +2514,9 @@ def _initialize_site_activation_state(
 
 
 def _get_config_sync_file_infos_per_inode(
-    replication_paths: Sequence[ReplicationPath],
+    replication_paths: Sequence[ReplicationPath], digest_cache: ConfigSyncDigestCache
 ) -> Mapping[int, ConfigSyncFileInfo]:
-    inode_sync_states = {}
+    inodes: dict[str, int] = {}
 
     for replication_path in replication_paths:
         replication_path_full = os.path.join(cmk.utils.paths.omd_root, replication_path.site_path)
@@ -2515,21 +2525,22 @@ def _get_config_sync_file_infos_per_inode(
             continue
 
         if replication_path.ty == ReplicationPathType.FILE:
-            inode_sync_states[os.stat(replication_path_full).st_ino] = _get_config_sync_file_info(
-                replication_path_full
-            )
+            inodes[replication_path_full] = os.stat(replication_path_full).st_ino
         elif replication_path.ty == ReplicationPathType.DIR:
-            _get_replication_dir_config_sync_file_infos_per_inode(
-                inode_sync_states, replication_path_full, replication_path.is_excluded
-            )
+            _get_replication_dir_inodes(inodes, replication_path_full, replication_path.is_excluded)
         else:
             raise NotImplementedError
 
-    return inode_sync_states
+    file_infos = digest_cache.file_infos(list(inodes))
+    return {
+        inode: file_infos[file_path]
+        for file_path, inode in inodes.items()
+        if file_path in file_infos
+    }
 
 
-def _get_replication_dir_config_sync_file_infos_per_inode(
-    inode_sync_states: MutableMapping[int, ConfigSyncFileInfo],
+def _get_replication_dir_inodes(
+    inodes: MutableMapping[str, int],
     replication_path: str,
     replication_path_excluder: Callable[[str], bool],
 ) -> None:
@@ -2544,17 +2555,16 @@ def _get_replication_dir_config_sync_file_infos_per_inode(
             with suppress(FileNotFoundError):
                 # Ignore directories vanishing during processing
                 if os.path.islink(dir_path) and dir_name != GENERAL_DIR_EXCLUDE:
-                    inode_sync_states[os.stat(dir_path).st_ino] = _get_config_sync_file_info(
-                        dir_path
-                    )
+                    inodes[dir_path] = os.stat(dir_path).st_ino
 
         for file_name in file_names:
             file_path = os.path.join(root, file_name)
             with suppress(FileNotFoundError):
                 # Ignore files vanishing during processing
-                inode_sync_states[os.stat(file_path).st_ino] = _get_config_sync_file_info(file_path)
+                inodes[file_path] = os.stat(file_path).st_ino
 
 
+@tracer.instrument("_prepare_for_activation_tasks")
 def _prepare_for_activation_tasks(
     activate_changes: ActivateChanges,
     activation_id: ActivationId,
@@ -2566,9 +2576,10 @@ def _prepare_for_activation_tasks(
 ) -> tuple[Mapping[SiteId, ConfigSyncFileInfos], Mapping[SiteId, SiteActivationState]]:
     # All activations need to fail if the initialization failed
     initialization_failure: Exception | None = None
+    digest_cache = ConfigSyncDigestCache.load()
     try:
         config_sync_file_infos_per_inode = _get_config_sync_file_infos_per_inode(
-            list(replication_path_registry.values())
+            list(replication_path_registry.values()), digest_cache
         )
     except Exception as e:
         initialization_failure = e
@@ -2603,13 +2614,17 @@ def _prepare_for_activation_tasks(
 
             if activate_changes.is_sync_needed(site_id, snapshot_settings.site_config):
                 central_file_infos_per_site[site_id] = _get_site_central_file_infos(
-                    site_id, snapshot_settings, config_sync_file_infos_per_inode
+                    site_id, snapshot_settings, config_sync_file_infos_per_inode, digest_cache
                 )
         except Exception as e:
             _handle_activation_changes_exception(
                 logger.getChild(f"site[{site_id}]"), e, site_activation_state
             )
             _finalize_activation(site_id, activation_id, source)
+
+    if not initialization_failure:
+        digest_cache.save()
+    digest_cache.add_span_attributes(trace.get_current_span())
     return central_file_infos_per_site, site_activation_states_per_site
 
 
@@ -2617,15 +2632,13 @@ def _get_site_central_file_infos(
     site_id: SiteId,
     snapshot_settings: SnapshotSettings,
     config_sync_file_infos_per_inode: Mapping[int, ConfigSyncFileInfo],
+    digest_cache: ConfigSyncDigestCache,
 ) -> ConfigSyncFileInfos:
-    # In case we experience performance issues here, we could postpone the hashing of the
-    # central files to only be done ad-hoc in get_file_names_to_sync when the other attributes
-    # are not enough to detect a differing file.
-
     site_config_dir = Path(snapshot_settings.work_dir)
     central_file_infos = _get_config_sync_file_infos(
         snapshot_settings.snapshot_components,
         site_config_dir,
+        digest_cache,
         config_sync_file_infos_per_inode,
     )
 
@@ -2762,7 +2775,7 @@ def _sync_and_activate(
                 )
                 active_tasks["activate_site_changes"][site_id] = async_result_activate_site_changes
 
-        remote_config_generation_per_site: dict[SiteId, int] = {}
+        sync_state_per_site: dict[SiteId, SyncState] = {}
         # we want to mostly parallelize the activation steps, but if one site takes longer,
         # it should not hold up the other sites
         # -> monitor active tasks to handle results as soon as one finishes and start a task for
@@ -2779,7 +2792,7 @@ def _sync_and_activate(
                 activate_changes,
                 file_filter_func,
                 prevent_activate,
-                remote_config_generation_per_site,
+                sync_state_per_site,
                 site_snapshot_settings,
                 task_pool,
                 automation_configs,
@@ -2904,7 +2917,7 @@ def _handle_active_tasks(
     activate_changes: ActivateChanges,
     file_filter_func: FileFilterFunc,
     prevent_activate: bool,
-    remote_config_generation_per_site: MutableMapping[SiteId, int],
+    sync_state_per_site: MutableMapping[SiteId, SyncState],
     site_snapshot_settings: Mapping[SiteId, SnapshotSettings],
     task_pool: ThreadPool,
     automation_configs: Mapping[SiteId, LocalAutomationConfig | RemoteAutomationConfig],
@@ -2920,7 +2933,7 @@ def _handle_active_tasks(
             return  # exception handling happens in thread
 
         sync_state, activation_state, sync_start_time = fetch_sync_state_results
-        remote_config_generation_per_site[site_id] = sync_state.remote_config_generation
+        sync_state_per_site[site_id] = sync_state
 
         active_tasks["calc_sync_delta"][site_id] = task_pool.apply_async(
             func=copy_request_context(calc_sync_delta),
@@ -2947,17 +2960,19 @@ def _handle_active_tasks(
         assert isinstance(automation_config, RemoteAutomationConfig)
 
         sync_delta, activation_state, sync_start_time = calc_sync_delta_result
+        sync_state = sync_state_per_site[site_id]
         active_tasks["synchronize_files"][site_id] = task_pool.apply_async(
             func=copy_request_context(synchronize_files),
             args=(
                 sync_delta,
-                remote_config_generation_per_site[site_id],
+                sync_state.remote_config_generation,
                 Path(site_snapshot_settings[site_id].work_dir),
                 activation_state,
                 sync_start_time,
                 trace.get_current_span(),
                 automation_config,
                 debug,
+                sync_state.remote_accepts_compressed_archive,
             ),
             error_callback=_error_callback,
         )
@@ -3533,41 +3548,49 @@ def _filter_remote_files(remote_files: set[str]) -> set[str]:
     return remote_files_to_keep
 
 
-def _get_sync_archive(to_sync: list[str], base_dir: Path) -> bytes:
-    # Use native tar instead of python tarfile for performance reasons
-    completed_process = subprocess.run(
-        [
-            "tar",
-            "-c",
-            "-C",
-            str(base_dir),
-            "-f",
-            "-",
-            "--null",
-            "-T",
-            "-",
-            "--preserve-permissions",
-        ],
-        input=b"\0".join(f.encode() for f in to_sync),
-        capture_output=True,
-        close_fds=True,
-        shell=False,
-        check=False,
-    )
-
-    # Since we don't stream the archive to the remote site (we could probably do this) it should be
-    # no problem to buffer it in memory for the moment
+@contextmanager
+def _create_sync_archive(
+    to_sync: list[str], base_dir: Path, *, compress: bool
+) -> Iterator[IO[bytes]]:
+    """Create the archive in a temporary file, which is removed afterwards
 
-    if completed_process.returncode:
-        raise MKGeneralException(
-            _("Failed to create sync archive [%(returncode)d]: %(error)s")
-            % {
-                "returncode": completed_process.returncode,
-                "error": completed_process.stderr.decode(),
-            }
+    This way the archive does not need to be held in memory while it is sent to the remote site.
+    """
+    with tempfile.TemporaryFile() as sync_archive:
+        # Use native tar instead of python tarfile for performance reasons
+        completed_process = subprocess.run(
+            [
+                "tar",
+                "-c",
+                *(["--gzip"] if compress else []),
+                "-C",
+                str(base_dir),
+                "-f",
+                "-",
+                "--null",
+                "-T",
+                "-",
+                "--preserve-permissions",
+            ],
+            input=b"\0".join(f.encode() for f in to_sync),
+            stdout=sync_archive,
+            stderr=subprocess.PIPE,
+            close_fds=True,
+            shell=False,
+            check=False,
         )
 
-    return completed_process.stdout
+        if completed_process.returncode:
+            raise MKGeneralException(
+                _("Failed to create sync archive [%(returncode)d]: %(error)s")
+                % {
+                    "returncode": completed_process.returncode,
+                    "error": completed_process.stderr.decode(),
+                }
+            )
+
+        sync_archive.seek(0)
+        yield sync_archive
 
 
 def _unpack_sync_archive(sync_archive: bytes, base_dir: Path) -> None:
@@ -3575,6 +3598,8 @@ def _unpack_sync_archive(sync_archive: bytes, base_dir: Path) -> None:
         [
             "tar",
             "-x",
+            # tar does not detect the compression of archives read from stdin
+            *(["--gzip"] if sync_archive.startswith(_GZIP_MAGIC) else []),
             "-C",
             str(base_dir),
             "-f",
@@ -3600,6 +3625,9 @@ def _unpack_sync_archive(sync_archive: bytes, base_dir: Path) -> None:
         )
 
 
+_GZIP_MAGIC: Final = b"\x1f\x8b"
+
+
 class ConfigSyncFileInfo(NamedTuple):
     st_mode: int
     st_size: int
@@ -3613,7 +3641,8 @@ class ConfigSyncFileInfo(NamedTuple):
 #    ("file_infos", dict[str, ConfigSyncFileInfo]),
 #    ("config_generation", int),
 # ])
-GetConfigSyncStateResponse = tuple[dict[str, tuple[int, int, str | None, str | None]], int]
+# The last element tells the central site that gzip compressed sync archives are accepted
+GetConfigSyncStateResponse = tuple[dict[str, tuple[int, int, str | None, str | None]], int, bool]
 
 ConfigSyncFileInfos = dict[str, ConfigSyncFileInfo]
 
@@ -3647,12 +3676,20 @@ class AutomationGetConfigSyncState(AutomationCommand[list[ReplicationPath]]):
 
     @override
     def execute(self, api_request: list[ReplicationPath]) -> GetConfigSyncStateResponse:
-        with store.lock_checkmk_configuration(configuration_lockfile):
-            file_infos = _get_config_sync_file_infos(api_request, base_dir=cmk.utils.paths.omd_root)
+        with (
+            store.lock_checkmk_configuration(configuration_lockfile),
+            tracer.span("get_config_sync_state") as span,
+        ):
+            digest_cache = ConfigSyncDigestCache.load()
+            file_infos = _get_config_sync_file_infos(
+                api_request, base_dir=cmk.utils.paths.omd_root, digest_cache=digest_cache
+            )
+            digest_cache.save()
+            digest_cache.add_span_attributes(span)
             transport_file_infos = {
                 k: (v.st_mode, v.st_size, v.link_target, v.file_hash) for k, v in file_infos.items()
             }
-            return (transport_file_infos, _get_current_config_generation())
+            return (transport_file_infos, _get_current_config_generation(), True)
 
 
 def _get_config_sync_paths(
@@ -3687,6 +3724,7 @@ def _get_config_sync_paths(
 def _get_config_sync_file_infos(
     replication_paths: list[ReplicationPath],
     base_dir: Path,
+    digest_cache: ConfigSyncDigestCache,
     config_sync_file_infos_per_inode: Mapping[int, ConfigSyncFileInfo] | None = None,
 ) -> ConfigSyncFileInfos:
     """Scans the given replication paths for the information needed for the config sync
@@ -3700,6 +3738,8 @@ def _get_config_sync_file_infos(
         config_sync_file_infos_per_inode = {}
 
     infos = {}
+    # Maps the site paths of the files without precomputed info to their full paths
+    to_compute: dict[str, str] = {}
     for replication_path in replication_paths:
         replication_path_full = str(base_dir.joinpath(replication_path.site_path))
 
@@ -3708,13 +3748,12 @@ def _get_config_sync_file_infos(
 
         match replication_path.ty:
             case ReplicationPathType.FILE:
-                infos[replication_path.site_path] = _get_config_sync_file_info(
-                    replication_path_full
-                )
+                to_compute[replication_path.site_path] = replication_path_full
 
             case ReplicationPathType.DIR:
                 _get_replication_dir_config_sync_file_infos(
                     infos,
+                    to_compute,
                     config_sync_file_infos_per_inode,
                     base_dir,
                     replication_path_full,
@@ -3722,11 +3761,17 @@ def _get_config_sync_file_infos(
                 )
             case _:
                 assert_never(replication_path.ty)
+
+    computed_infos = digest_cache.file_infos(list(to_compute.values()))
+    for site_path, file_path in to_compute.items():
+        if file_path in computed_infos:
+            infos[site_path] = computed_infos[file_path]
     return infos
 
 
 def _get_replication_dir_config_sync_file_infos(
     infos: MutableMapping[str, ConfigSyncFileInfo],
+    to_compute: MutableMapping[str, str],
     config_sync_file_infos_per_inode: Mapping[int, ConfigSyncFileInfo],
     base_dir: Path,
     replication_path: str,
@@ -3750,30 +3795,122 @@ def _get_replication_dir_config_sync_file_infos(
                 ):
                     infos[valid_site_path] = sync_file_info
                 else:
-                    infos[valid_site_path] = _get_config_sync_file_info(config_sync_path)
+                    to_compute[valid_site_path] = config_sync_path
             except FileNotFoundError:  # e.g. broken symlinks
-                infos[valid_site_path] = _get_config_sync_file_info(config_sync_path)
+                to_compute[valid_site_path] = config_sync_path
 
 
-def _get_config_sync_file_info(file_path: str) -> ConfigSyncFileInfo:
-    stat = os.lstat(file_path)
-    is_symlink = os.path.islink(file_path)
-    return ConfigSyncFileInfo(
-        stat.st_mode,
-        stat.st_size,
-        os.readlink(str(file_path)) if is_symlink else None,
-        _create_config_sync_file_hash(file_path) if not is_symlink else None,
-    )
+type _ConfigSyncDigestKey = tuple[int, int, int, int]
+
+
+class ConfigSyncDigestCache:
+    """Persistent cache of the SHA-256 digests of the files to synchronize
+
+    The central site hashes the files of all site snapshots on every activation and the remote
+    sites hash all their replicated files to report their sync state. Most of these files did not
+    change since the last activation, so a digest is reused as long as the device, inode, size and
+    modification time of the file are unchanged.
+
+    The change time is deliberately not part of the key: Creating and removing the hard links of
+    the site snapshots changes it on every activation.
+    """
+
+    # Files modified this recently may be modified again without changing their modification
+    # time, so their digests are not cached
+    _RACY_INTERVAL_NS: Final = 2_000_000_000
+    _HASHING_THREADS: Final = 4
+
+    def __init__(self, path: Path, digests: Mapping[_ConfigSyncDigestKey, str]) -> None:
+        self._path = path
+        self._digests = digests
+        self._used_digests: dict[_ConfigSyncDigestKey, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> ConfigSyncDigestCache:
+        path = path or wato_var_dir() / "config_sync_digests.pkl"
+        try:
+            digests = store.load_object_from_pickle_file(path, default={})
+        except Exception as e:
+            logger.warning("Ignoring the cached config sync digests: %s", e)
+            digests = {}
+        return cls(path, digests)
+
+    def save(self) -> None:
+        """Persists the digests which have been used since loading the cache
+
+        Each user of the cache scans all files to synchronize, so the other digests belong to
+        files which have been modified or removed in the meantime.
+        """
+        store.save_object_to_pickle_file(self._path, self._used_digests)
+
+    def add_span_attributes(self, span: trace.Span) -> None:
+        total = self.hits + self.misses
+        span.set_attribute("cmk.activate.config_sync_digests.hits", self.hits)
+        span.set_attribute("cmk.activate.config_sync_digests.misses", self.misses)
+        span.set_attribute(
+            "cmk.activate.config_sync_digests.hit_ratio", self.hits / total if total else 1.0
+        )
+
+    def file_infos(self, file_paths: Sequence[str]) -> dict[str, ConfigSyncFileInfo]:
+        """Computes the sync file infos of the given files
+
+        The files with unknown digests are hashed in parallel. Files vanishing during processing
+        are left out.
+        """
+        infos: dict[str, ConfigSyncFileInfo] = {}
+        to_hash: list[tuple[str, os.stat_result]] = []
+        for file_path in file_paths:
+            with suppress(FileNotFoundError):
+                file_stat = os.lstat(file_path)
+                if stat.S_ISLNK(file_stat.st_mode):
+                    infos[file_path] = ConfigSyncFileInfo(
+                        file_stat.st_mode, file_stat.st_size, os.readlink(file_path), None
+                    )
+                elif (digest := self._digests.get(key := _digest_key(file_stat))) is not None:
+                    self.hits += 1
+                    self._used_digests[key] = digest
+                    infos[file_path] = ConfigSyncFileInfo(
+                        file_stat.st_mode, file_stat.st_size, None, digest
+                    )
+                else:
+                    to_hash.append((file_path, file_stat))
+
+        if to_hash:
+            self.misses += len(to_hash)
+            with ThreadPool(min(len(to_hash), self._HASHING_THREADS)) as pool:
+                digests = pool.map(
+                    _create_config_sync_file_hash, [file_path for file_path, _stat in to_hash]
+                )
+            racy_since = time.time_ns() - self._RACY_INTERVAL_NS
+            for (file_path, file_stat), digest in zip(to_hash, digests, strict=True):
+                if digest is None:
+                    continue
+                if file_stat.st_mtime_ns < racy_since:
+                    self._used_digests[_digest_key(file_stat)] = digest
+                infos[file_path] = ConfigSyncFileInfo(
+                    file_stat.st_mode, file_stat.st_size, None, digest
+                )
 
+        return {file_path: infos[file_path] for file_path in file_paths if file_path in infos}
 
-def _create_config_sync_file_hash(file_path: str) -> str:
+
+def _digest_key(file_stat: os.stat_result) -> _ConfigSyncDigestKey:
+    return file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns
+
+
+def _create_config_sync_file_hash(file_path: str) -> str | None:
     sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        while True:
-            chunk = f.read(65536)
-            if not chunk:
-                break
-            sha256.update(chunk)
+    try:
+        with open(file_path, "rb") as f:
+            while True:
+                chunk = f.read(65536)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+    except FileNotFoundError:
+        return None
     return sha256.hexdigest()
 
 
@@ -17,11 +17,11 @@ import os
 import re
 import subprocess
 import time
+import uuid
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from contextlib import contextmanager
 from dataclasses import asdict, replace
-from io import BytesIO
-from typing import Annotated, Final, NamedTuple
+from typing import Annotated, Final, IO, NamedTuple
 
 import requests
 import urllib3
@@ -326,7 +326,7 @@ def _do_remote_automation_serialized(
     automation_config: RemoteAutomationConfig,
     command: str,
     vars_: Sequence[tuple[str, str]],
-    files: Mapping[str, BytesIO] | None,
+    files: Mapping[str, IO[bytes]] | None,
     timeout: float | None,
     debug: bool,
 ) -> str:
@@ -404,7 +404,7 @@ def do_remote_automation(
     command: str,
     vars_: Sequence[tuple[str, str]],
     debug: bool,
-    files: Mapping[str, BytesIO] | None = None,
+    files: Mapping[str, IO[bytes]] | None = None,
     timeout: float | None = None,
 ) -> object:
     serialized_response = _do_remote_automation_serialized(
@@ -433,7 +433,7 @@ def get_url_raw(
     insecure: bool,
     auth: tuple[str, str] | None = None,
     data: Mapping[str, str] | None = None,
-    files: Mapping[str, BytesIO] | None = None,
+    files: Mapping[str, IO[bytes]] | None = None,
     timeout: float | None = None,
     add_headers: dict[str, str] | None = None,
 ) -> requests.Response:
@@ -444,13 +444,17 @@ def get_url_raw(
     }
     headers_.update(add_headers or {})
 
+    body: Mapping[str, str] | _StreamedMultipartFormData | None = data
+    if files:
+        body = _StreamedMultipartFormData(data or {}, files)
+        headers_["Content-Type"] = body.content_type
+
     try:
         response = requests.post(
             url,
-            data=data,
+            data=body,
             verify=not insecure,
             auth=auth,
-            files=files,
             timeout=timeout,
             headers=headers_,
         )
@@ -477,6 +481,50 @@ def get_url_raw(
     return response
 
 
+class _StreamedMultipartFormData:
+    """A multipart/form-data request body which reads the files only while it is sent
+
+    requests would read all files into memory to encode the body, which is a problem for big
+    uploads like the config sync archives. The length of the body is known in advance, so it is
+    sent with a Content-Length instead of a chunked transfer encoding.
+    """
+
+    _CHUNK_SIZE: Final = 65536
+
+    def __init__(self, fields: Mapping[str, str], files: Mapping[str, IO[bytes]]) -> None:
+        self._boundary = uuid.uuid4().hex
+        self._parts: list[bytes | IO[bytes]] = []
+        for name, value in fields.items():
+            self._parts += [self._part_header(f'name="{name}"'), value.encode("utf-8"), b"\r\n"]
+        for name, file in files.items():
+            self._parts += [self._part_header(f'name="{name}"; filename="{name}"'), file, b"\r\n"]
+        self._parts.append(f"--{self._boundary}--\r\n".encode())
+        self._length = sum(
+            len(part) if isinstance(part, bytes) else requests.utils.super_len(part)
+            for part in self._parts
+        )
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self._boundary}"
+
+    def _part_header(self, disposition: str) -> bytes:
+        return (
+            f"--{self._boundary}\r\nContent-Disposition: form-data; {disposition}\r\n\r\n".encode()
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            while chunk := part.read(self._CHUNK_SIZE):
+                yield chunk
+
+
 def _verify_compatibility(response: requests.Response) -> None:
     """Ensure we are compatible with the remote site
 
@@ -583,7 +631,7 @@ def get_url(
     insecure: bool,
     auth: tuple[str, str] | None = None,
     data: Mapping[str, str] | None = None,
-    files: Mapping[str, BytesIO] | None = None,
+    files: Mapping[str, IO[bytes]] | None = None,
     timeout: float | None = None,
 ) -> str:
     return get_url_raw(url, insecure, auth, data, files, timeout).text
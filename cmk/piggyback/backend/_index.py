@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Persistent index of the stored piggyback payloads
+
+Without the index, finding out which piggybacked hosts have data from which source requires a
+listing of all piggybacked host folders. Payload files may still be removed without passing the
+index, e.g. by hand or by older versions of the writers, so the readers only take the index as
+the list of candidates and check the payload files themselves.
+
+The writers of the payloads append a line "<last update> <source> <piggybacked host>" to the log
+of the index, removed payloads are recorded as "- <source> <piggybacked host>". Later lines win.
+Once the log has grown larger than the snapshot, both are compacted into a new snapshot. All of
+this happens under a lock of the log, which is shared by all processes of the site.
+
+Without a snapshot the index is not known to be complete, e.g. after a reboot, an update or the
+renaming of a host. It is then built from the payload files with the next query.
+"""
+
+import os
+import tempfile
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+
+from cmk.ccc import store
+from cmk.ccc.hostaddress import HostAddress, HostName
+
+from ._paths import index_dir
+
+type PiggybackIndex = Mapping[HostName, Mapping[HostAddress, int]]
+"""The last update of the payloads by source and piggybacked host"""
+
+# Compacting small logs does not pay off
+_MIN_COMPACTION_SIZE = 1024 * 1024
+
+
+def record_payloads(
+    omd_root: Path, source: HostName, piggybacked_hosts: Iterable[HostAddress], last_update: int
+) -> None:
+    _append(
+        omd_root,
+        "".join(f"{last_update} {source} {piggybacked}\n" for piggybacked in piggybacked_hosts),
+    )
+
+
+def record_removals(
+    omd_root: Path, source: HostName, piggybacked_hosts: Iterable[HostAddress]
+) -> None:
+    _append(omd_root, "".join(f"- {source} {piggybacked}\n" for piggybacked in piggybacked_hosts))
+
+
+def invalidate(omd_root: Path) -> None:
+    """Make the next query build the index from the payload files"""
+    with store.locked(log_path := _log_path(omd_root)):
+        _snapshot_path(omd_root).unlink(missing_ok=True)
+        os.truncate(log_path, 0)
+
+
+def load(omd_root: Path, scan: Callable[[], PiggybackIndex]) -> PiggybackIndex:
+    """Read the index, or build it with the scan of the payload files if it is not complete"""
+    with store.locked(log_path := _log_path(omd_root)):
+        try:
+            snapshot = _snapshot_path(omd_root).read_text()
+        except FileNotFoundError:
+            index = scan()
+            _write_snapshot(omd_root, index)
+            os.truncate(log_path, 0)
+            return index
+        return _apply(_apply({}, snapshot), log_path.read_text())
+
+
+def _append(omd_root: Path, lines: str) -> None:
+    if not lines:
+        return
+    with store.locked(log_path := _log_path(omd_root)):
+        with log_path.open("ab+") as log:
+            if (end := log.seek(0, os.SEEK_END)) and os.pread(log.fileno(), 1, end - 1) != b"\n":
+                # Do not continue the line left behind by an interrupted writer
+                lines = f"\n{lines}"
+            log.write(lines.encode())
+            log_size = log.tell()
+        try:
+            snapshot_size = _snapshot_path(omd_root).stat().st_size
+        except FileNotFoundError:
+            # The next query builds the index from the payload files anyway
+            os.truncate(log_path, 0)
+            return
+        if log_size > max(snapshot_size, _MIN_COMPACTION_SIZE):
+            _write_snapshot(
+                omd_root,
+                _apply(_apply({}, _snapshot_path(omd_root).read_text()), log_path.read_text()),
+            )
+            os.truncate(log_path, 0)
+
+
+def _apply(
+    index: dict[HostName, dict[HostAddress, int]], lines: str
+) -> dict[HostName, dict[HostAddress, int]]:
+    # The last line is incomplete if a writer was interrupted, so it is dropped as well
+    for line in lines.split("\n")[:-1]:
+        if (entry := _parse(line)) is None:
+            continue
+        last_update, source, piggybacked = entry
+        if last_update is None:
+            if (piggybacked_hosts := index.get(source)) is not None:
+                piggybacked_hosts.pop(piggybacked, None)
+                if not piggybacked_hosts:
+                    del index[source]
+        else:
+            index.setdefault(source, {})[piggybacked] = last_update
+    return index
+
+
+def _parse(line: str) -> tuple[int | None, HostName, HostAddress] | None:
+    """Parse a line of the log or the snapshot, the last update of removals is None"""
+    try:
+        last_update, source, piggybacked = line.split(" ")
+        return (
+            None if last_update == "-" else int(last_update),
+            HostName(source),
+            HostAddress(piggybacked),
+        )
+    except ValueError:
+        # Garbled, e.g. by an interrupted writer. The payload files are checked on reading anyway.
+        return None
+
+
+def _write_snapshot(omd_root: Path, index: PiggybackIndex) -> None:
+    snapshot_path = _snapshot_path(omd_root)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=str(snapshot_path.parent), prefix=f".{snapshot_path.name}.new", delete=False
+    ) as tmp:
+        tmp.write(
+            "".join(
+                f"{last_update} {source} {piggybacked}\n"
+                for source, piggybacked_hosts in index.items()
+                for piggybacked, last_update in piggybacked_hosts.items()
+            )
+        )
+    os.rename(tmp.name, str(snapshot_path))
+
+
+def _snapshot_path(omd_root: Path) -> Path:
+    return index_dir(omd_root) / "index"
+
+
+def _log_path(omd_root: Path) -> Path:
+    return index_dir(omd_root) / "index.log"
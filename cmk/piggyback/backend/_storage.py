@@ -22,6 +22,7 @@ from typing import Self
 from cmk.ccc.hostaddress import HostAddress, HostName
 from cmk.ccc.inotify import Event, INotify, Masks
 
+from . import _index
 from ._paths import payload_dir, source_status_dir
 
 logger = logging.getLogger(__name__)
@@ -78,7 +79,8 @@ class PiggybackMessage:
 def watch_new_messages(omd_root: Path) -> Iterator[PiggybackMessage]:
     """Yields piggyback messages as they come in."""
 
-    host_folder_mask = Masks.MOVED_TO | Masks.DELETE_SELF
+    # Unchanged payloads are not written again, only their mtime is updated (ATTRIB)
+    host_folder_mask = Masks.MOVED_TO | Masks.ATTRIB | Masks.DELETE_SELF
 
     with INotify() as inotify:
         watch_for_new_piggybacked_hosts = inotify.add_watch(payload_dir(omd_root), Masks.CREATE)
@@ -145,6 +147,12 @@ def watch_new_messages(omd_root: Path) -> Iterator[PiggybackMessage]:
 
 
 def _make_message_from_event(event: Event, omd_root: Path) -> PiggybackMessage | None:
+    if not event.name:
+        # Event of the watched folder itself, e.g. when it is removed
+        return None
+    if event.name.startswith("."):
+        # Temporary file of _write_file_with_mtime()
+        return None
     # Note: we deliberately ignore potential host name validation errors here.
     # The are handled further up the callstack, depending on the callsite.
     source = HostAddress(event.name)
@@ -218,22 +226,38 @@ def get_piggybacked_host_with_sources(
     omd_root: Path, piggybacked_hostname: HostName | None = None
 ) -> Mapping[HostAddress, Sequence[PiggybackMetaData]]:
     """Generates all piggyback pig/piggybacked host pairs"""
-    return {
-        piggybacked_host: _get_payload_meta_data(piggybacked_host, omd_root)
-        for piggybacked_host_folder in (
-            [d for d in [payload_dir(omd_root) / piggybacked_hostname] if d.exists()]
-            if piggybacked_hostname
-            else _get_piggybacked_host_folders(omd_root)
-        )
-        if (piggybacked_host := HostAddress(piggybacked_host_folder.name))
+    if piggybacked_hostname:
+        if not (payload_dir(omd_root) / piggybacked_hostname).exists():
+            return {}
+        return {piggybacked_hostname: _get_payload_meta_data(piggybacked_hostname, omd_root)}
+
+    # Looking into every piggybacked host folder is too expensive with many piggybacked hosts
+    index = _load_index(omd_root)
+    last_contacts = {
+        source: _get_mtime(_get_source_status_file_path(source, omd_root)) for source in index
     }
+    meta_data: dict[HostAddress, list[PiggybackMetaData]] = {}
+    for source in sorted(index):
+        for piggybacked in index[source]:
+            # The payload may have been removed without passing the index
+            last_update = _get_mtime(_get_piggybacked_file_path(source, piggybacked, omd_root))
+            if last_update is None:
+                continue
+            meta_data.setdefault(piggybacked, []).append(
+                PiggybackMetaData(
+                    source=source,
+                    piggybacked=piggybacked,
+                    last_update=last_update,
+                    last_contact=last_contacts[source],
+                )
+            )
+    return {piggybacked: meta_data[piggybacked] for piggybacked in sorted(meta_data)}
 
 
 def _get_piggybacked_hosts_for_source(omd_root: Path, source: HostName) -> Sequence[Path]:
     return [
-        piggybacked_host
-        for piggybacked_host in _get_piggybacked_host_folders(omd_root)
-        if (piggybacked_host / source).exists()
+        payload_dir(omd_root) / piggybacked
+        for piggybacked in sorted(_load_index(omd_root).get(source, {}))
     ]
 
 
@@ -290,6 +314,9 @@ def store_piggyback_raw_data(
             content=b"%s\n" % b"\n".join(lines),
             mtime=message_timestamp,
         )
+    _index.record_payloads(
+        omd_root, source_hostname, piggybacked_raw_data, last_update=int(message_timestamp)
+    )
 
 
 def _write_file_with_mtime(
@@ -297,7 +324,14 @@ def _write_file_with_mtime(
     content: bytes,
     mtime: float,
 ) -> None:
-    """Create a file with the given mtime in a race-condition free manner"""
+    """Create a file with the given mtime in a race-condition free manner
+
+    Most payloads do not change between two check cycles. If the file already has the content,
+    only its mtime is set, which saves creating and renaming a new file.
+    """
+    if _set_mtime_if_unchanged(file_path, content, mtime):
+        return
+
     file_path.parent.mkdir(mode=0o770, exist_ok=True, parents=True)
 
     with tempfile.NamedTemporaryFile(
@@ -311,6 +345,19 @@ def _write_file_with_mtime(
     os.rename(tmp_path, str(file_path))
 
 
+def _set_mtime_if_unchanged(file_path: Path, content: bytes, mtime: float) -> bool:
+    try:
+        with file_path.open("rb") as f:
+            stats = os.fstat(f.fileno())
+            if stats.st_size != len(content) or f.read() != content:
+                return False
+            # Through the file descriptor, in case the file has been replaced in the meantime
+            os.utime(f.fileno(), (stats.st_atime, mtime))
+    except FileNotFoundError:
+        return False
+    return True
+
+
 #   .--folders/files-------------------------------------------------------.
 #   |         __       _     _                  ____ _ _                   |
 #   |        / _| ___ | | __| | ___ _ __ ___   / / _(_) | ___  ___         |
@@ -350,6 +397,21 @@ def _get_payload_meta_data(
     return meta_data
 
 
+def _load_index(omd_root: Path) -> _index.PiggybackIndex:
+    return _index.load(omd_root, lambda: _scan_payload_files(omd_root))
+
+
+def _scan_payload_files(omd_root: Path) -> _index.PiggybackIndex:
+    index: dict[HostName, dict[HostAddress, int]] = {}
+    for piggybacked_host_folder in _get_piggybacked_host_folders(omd_root):
+        for payload_file in _files_in(piggybacked_host_folder):
+            if (mtime := _get_mtime(payload_file)) is not None:
+                index.setdefault(HostName(payload_file.name), {})[
+                    HostAddress(piggybacked_host_folder.name)
+                ] = mtime
+    return index
+
+
 def _get_piggybacked_host_folders(omd_root: Path) -> Sequence[Path]:
     return _files_in(payload_dir(omd_root))
 
@@ -444,13 +506,8 @@ def cleanup_piggyback_files(
         },
     )
 
-    piggybacked_hosts_settings = [
-        (piggybacked_host_folder, _files_in(piggybacked_host_folder))
-        for piggybacked_host_folder in _get_piggybacked_host_folders(omd_root)
-    ]
-
     _cleanup_old_source_status_files(_get_source_state_files(omd_root), cut_off_timestamp)
-    _cleanup_old_piggybacked_files(piggybacked_hosts_settings, cut_off_timestamp)
+    _cleanup_old_piggybacked_files(omd_root, cut_off_timestamp)
 
 
 def _cleanup_old_source_status_files(
@@ -474,17 +531,20 @@ def _cleanup_old_source_status_files(
             _remove_piggyback_file(source_state_file)
 
 
-def _cleanup_old_piggybacked_files(
-    piggybacked_hosts_settings: Iterable[tuple[Path, Iterable[Path]]], cut_off_timestamp: float
-) -> None:
+def _cleanup_old_piggybacked_files(omd_root: Path, cut_off_timestamp: float) -> None:
     """Remove piggybacked data files which exceed provided maximum age."""
 
-    for piggybacked_host_folder, source_hosts in piggybacked_hosts_settings:
-        for piggybacked_host_source in source_hosts:
-            if (mtime := _get_mtime(piggybacked_host_source)) is None:
+    for source, piggybacked_hosts in _load_index(omd_root).items():
+        removed = []
+        for piggybacked, last_update in piggybacked_hosts.items():
+            if last_update >= cut_off_timestamp:
                 continue
 
-            if mtime < cut_off_timestamp:
+            piggybacked_host_source = _get_piggybacked_file_path(source, piggybacked, omd_root)
+            # The payload may have been updated after the index has been read
+            if (mtime := _get_mtime(piggybacked_host_source)) is not None:
+                if mtime >= cut_off_timestamp:
+                    continue
                 logger.debug(
                     "Piggyback file '%(piggybacked_host_source)s' too old (%(mtime)s). Remove it.",
                     {
@@ -493,18 +553,25 @@ def _cleanup_old_piggybacked_files(
                     },
                 )
                 _remove_piggyback_file(piggybacked_host_source)
+            removed.append(piggybacked)
+            _remove_empty_piggybacked_host_folder(piggybacked_host_source.parent)
 
-        # Remove empty backed host directory
-        try:
-            piggybacked_host_folder.rmdir()
-        except OSError as e:
-            if e.errno == errno.ENOTEMPTY:
-                continue
-            raise
-        logger.debug(
-            "Piggyback folder '%(piggybacked_host_folder)s' was empty. Removed it.",
-            {"piggybacked_host_folder": piggybacked_host_folder},
-        )
+        _index.record_removals(omd_root, source, removed)
+
+
+def _remove_empty_piggybacked_host_folder(piggybacked_host_folder: Path) -> None:
+    try:
+        piggybacked_host_folder.rmdir()
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        if e.errno == errno.ENOTEMPTY:
+            return
+        raise
+    logger.debug(
+        "Piggyback folder '%(piggybacked_host_folder)s' was empty. Removed it.",
+        {"piggybacked_host_folder": piggybacked_host_folder},
+    )
 
 
 def _get_mtime(path: Path) -> int | None:
@@ -547,7 +614,10 @@ def move_for_host_rename(omd_root: Path, old_host: str, new_host: str) -> tuple[
         old_path.rename(new_path)
         yield "piggyback-pig"
 
-    return tuple(
+    actions = tuple(
         *_rename_piggybacked_dir(old_host, new_host),
         *_rename_payload_file(piggyback_dir, old_host, new_host),
     )
+    if actions:
+        _index.invalidate(omd_root)
+    return actions
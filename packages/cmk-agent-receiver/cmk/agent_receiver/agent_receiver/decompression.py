@@ -3,19 +3,36 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from collections.abc import Iterable, Iterator
 from enum import Enum
-from zlib import decompress
+from zlib import decompress, decompressobj
 from zlib import error as zlibError
 
+from lz4.frame import LZ4FrameDecompressor
+
+# Highly compressed data can expand a thousandfold, so the output is limited per step
+_MAX_STEP_OUTPUT = 1024 * 1024
+
 
 class DecompressionError(Exception): ...
 
 
 class Decompressor(Enum):
     ZLIB = "zlib"
+    LZ4 = "lz4"
 
     def __call__(self, data: bytes) -> bytes:
-        return {Decompressor.ZLIB: Decompressor._zlib_decompress}[self](data)
+        return {
+            Decompressor.ZLIB: Decompressor._zlib_decompress,
+            Decompressor.LZ4: Decompressor._lz4_decompress,
+        }[self](data)
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Decompress the chunks step by step, without holding the whole data in memory"""
+        return {
+            Decompressor.ZLIB: Decompressor._zlib_stream,
+            Decompressor.LZ4: Decompressor._lz4_stream,
+        }[self](chunks)
 
     @staticmethod
     def _zlib_decompress(data: bytes) -> bytes:
@@ -23,3 +40,33 @@ class Decompressor(Enum):
             return decompress(data)
         except zlibError as e:
             raise DecompressionError(f"Decompression with zlib failed: {e}") from e
+
+    @staticmethod
+    def _zlib_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        decompressor = decompressobj()
+        try:
+            for chunk in chunks:
+                while chunk:
+                    yield decompressor.decompress(chunk, _MAX_STEP_OUTPUT)
+                    chunk = decompressor.unconsumed_tail
+        except zlibError as e:
+            raise DecompressionError(f"Decompression with zlib failed: {e}") from e
+        if not decompressor.eof:
+            raise DecompressionError("Decompression with zlib failed: incomplete data")
+
+    @staticmethod
+    def _lz4_decompress(data: bytes) -> bytes:
+        return b"".join(Decompressor._lz4_stream([data]))
+
+    @staticmethod
+    def _lz4_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        decompressor = LZ4FrameDecompressor()
+        try:
+            for chunk in chunks:
+                yield decompressor.decompress(chunk, _MAX_STEP_OUTPUT)
+                while not (decompressor.needs_input or decompressor.eof):
+                    yield decompressor.decompress(b"", _MAX_STEP_OUTPUT)
+        except RuntimeError as e:
+            raise DecompressionError(f"Decompression with lz4 failed: {e}") from e
+        if not decompressor.eof:
+            raise DecompressionError("Decompression with lz4 failed: incomplete data")
@@ -3,10 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-import os
-import tempfile
 from functools import cache
-from pathlib import Path
 from typing import Annotated, assert_never
 
 from fastapi import (
@@ -29,6 +26,7 @@ from starlette.status import (
     HTTP_404_NOT_FOUND,
     HTTP_500_INTERNAL_SERVER_ERROR,
     HTTP_501_NOT_IMPLEMENTED,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 
 from cmk.agent_receiver.agent_receiver.checkmk_rest_api import (
@@ -43,6 +41,7 @@ from cmk.agent_receiver.agent_receiver.checkmk_rest_api import (
     register_token,
 )
 from cmk.agent_receiver.agent_receiver.decompression import DecompressionError, Decompressor
+from cmk.agent_receiver.agent_receiver.ingestion import AgentDataIngestion, TooManyUploadsError
 from cmk.agent_receiver.agent_receiver.models import (
     CertificateRenewalBody,
     ConnectionMode,
@@ -420,20 +419,19 @@ def _validate_is_allowed(credentials: HTTPBasicCredentials, uuid: UUID4) -> None
         )
 
 
-def _store_agent_data(
-    target_dir: Path,
-    decompressed_data: bytes,
-) -> None:
-    target_dir.resolve().mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(
-        dir=target_dir,
-        delete=False,
-    ) as temp_file:
-        try:
-            temp_file.write(decompressed_data)
-            os.rename(temp_file.name, target_dir / "agent_output")
-        finally:
-            Path(temp_file.name).unlink(missing_ok=True)
+@cache
+def _agent_data_ingestion() -> AgentDataIngestion:
+    config = get_config()
+    return AgentDataIngestion(
+        max_concurrent_writes=config.max_concurrent_agent_data_writes,
+        max_queued_uploads=config.max_queued_agent_data_uploads,
+    )
+
+
+def shutdown_agent_data_ingestion() -> None:
+    if _agent_data_ingestion.cache_info().currsize:
+        _agent_data_ingestion().shutdown()
+        _agent_data_ingestion.cache_clear()
 
 
 @UUID_VALIDATION_ROUTER.post(
@@ -480,7 +478,16 @@ async def agent_data(
         ) from e
 
     try:
-        decompressed_agent_data = decompressor(monitoring_data.file.read())
+        await _agent_data_ingestion().store(host.source_path, decompressor, monitoring_data.file)
+    except TooManyUploadsError as e:
+        logger.warning(
+            "uuid=%(uuid)s Agent data rejected: %(error)s",
+            {"uuid": uuid, "error": e},
+        )
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many agent data uploads in progress",
+        ) from e
     except DecompressionError as e:
         logger.error(
             "uuid=%(uuid)s Decompression of agent data failed: %(error)s",
@@ -491,11 +498,6 @@ async def agent_data(
             detail="Decompression of agent data failed",
         ) from e
 
-    _store_agent_data(
-        host.source_path,
-        decompressed_agent_data,
-    )
-
     logger.info(
         "uuid=%(uuid)s Agent data saved",
         {"uuid": uuid},
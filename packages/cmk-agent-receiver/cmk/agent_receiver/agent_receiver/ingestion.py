@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Storage of the monitoring data pushed by the agents
+
+Decompressing and writing the agent output blocks, so it happens in a bounded pool of threads
+instead of the event loop, which keeps serving the other requests in the meantime. The data is
+decompressed and written chunk by chunk, so large uploads do not need to fit into memory.
+
+The number of uploads waiting for a free thread is limited as well. Beyond that, uploads are
+rejected right away, so that an overloaded agent receiver does not pile up requests which the
+agents may already have given up on.
+"""
+
+import asyncio
+import os
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO
+
+from cmk.agent_receiver.agent_receiver.decompression import Decompressor
+
+_CHUNK_SIZE = 256 * 1024
+
+
+class TooManyUploadsError(Exception):
+    def __init__(self, max_uploads: int) -> None:
+        super().__init__(f"Too many agent data uploads in progress (maximum: {max_uploads})")
+
+
+class AgentDataIngestion:
+    def __init__(self, *, max_concurrent_writes: int, max_queued_uploads: int) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_writes, thread_name_prefix="agent-data"
+        )
+        self._max_uploads = max_concurrent_writes + max_queued_uploads
+        # Only changed in the event loop, so no lock is needed
+        self._uploads = 0
+
+    async def store(self, target_dir: Path, decompressor: Decompressor, data: BinaryIO) -> None:
+        """Decompress the data and store it as the agent output in target_dir
+
+        Raises TooManyUploadsError if the limit of concurrent uploads is reached and
+        DecompressionError if the data can not be decompressed.
+        """
+        if self._uploads >= self._max_uploads:
+            raise TooManyUploadsError(self._max_uploads)
+        self._uploads += 1
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, _store_agent_data, target_dir, decompressor, data
+            )
+        finally:
+            self._uploads -= 1
+
+    def shutdown(self) -> None:
+        """Wait for the running writes and stop the threads"""
+        self._executor.shutdown()
+
+
+def _store_agent_data(target_dir: Path, decompressor: Decompressor, data: BinaryIO) -> None:
+    target_dir.resolve().mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=target_dir,
+        delete=False,
+    ) as temp_file:
+        try:
+            for chunk in decompressor.stream(_read_chunks(data)):
+                temp_file.write(chunk)
+            temp_file.flush()
+            os.rename(temp_file.name, target_dir / "agent_output")
+        finally:
+            Path(temp_file.name).unlink(missing_ok=True)
+
+
+def _read_chunks(data: BinaryIO) -> Iterator[bytes]:
+    while chunk := data.read(_CHUNK_SIZE):
+        yield chunk
@@ -20,6 +20,8 @@ class Config(BaseModel):
     task_ttl: float = 120.0
     max_pending_tasks_per_relay: int = 10
     socket_timeout: float = 5.0
+    max_concurrent_agent_data_writes: int = 8
+    max_queued_agent_data_uploads: int = 1000
 
     @classmethod
     def load(cls, path: Path | None = None) -> Config:
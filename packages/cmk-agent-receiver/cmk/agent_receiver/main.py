@@ -3,9 +3,12 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, AsyncExitStack
 
 from fastapi import FastAPI
 
+from cmk.agent_receiver.agent_receiver.endpoints import shutdown_agent_data_ingestion
 from cmk.agent_receiver.lib.config import get_config
 from cmk.agent_receiver.lib.log import configure_logger
 from cmk.agent_receiver.lib.middleware import B3RequestIDMiddleware
@@ -17,18 +20,32 @@ from .relay.app import create_app as create_relay_app
 from .relay.app import lifespan as relay_lifespan
 
 
+def _make_lifespan(
+    relay_enabled: bool,
+) -> Callable[[FastAPI], AbstractAsyncContextManager[None]]:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        async with AsyncExitStack() as stack:
+            stack.callback(shutdown_agent_data_ingestion)
+            # The relay lifespan only schedules the initial relay config task
+            if relay_enabled:
+                await stack.enter_async_context(relay_lifespan(app))
+            yield
+
+    return lifespan
+
+
 def main_app() -> FastAPI:
     config = get_config()
     relay_enabled = get_license_options(config.omd_root, edition(config.omd_root)).relay.enabled
 
     # Note: Defining the lifespan on a sub-app does not work as expected. So, it is defined on the
-    # main app instead. It is only attached when the relay feature is enabled, since its sole
-    # purpose is to schedule the initial relay config task.
+    # main app instead.
     main_app_ = FastAPI(
         openapi_url=None,
         docs_url=None,
         redoc_url=None,
-        lifespan=relay_lifespan if relay_enabled else None,
+        lifespan=_make_lifespan(relay_enabled),
     )
 
     # Configure logger on the main app level so it works with middleware
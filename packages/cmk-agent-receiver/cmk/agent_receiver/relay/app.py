@@ -105,7 +105,7 @@ def _schedule_initial_relay_config() -> None:
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     """App lifespan: schedule the (non-blocking) initial relay config task.
 
-    This is only attached to the app when the relay feature is enabled (see
+    This is only entered when the relay feature is enabled (see
     cmk.agent_receiver.main.main_app), so it always schedules the task.
     """
     _schedule_initial_relay_config()
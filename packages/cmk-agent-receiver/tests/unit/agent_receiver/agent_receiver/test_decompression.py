@@ -5,6 +5,7 @@
 
 from zlib import compress
 
+import lz4.frame
 import pytest
 
 from cmk.agent_receiver.agent_receiver.decompression import (
@@ -24,3 +25,47 @@ def test_zlib_decompress_round_trip() -> None:
 def test_zlib_decompress_invalid_data() -> None:
     with pytest.raises(DecompressionError):
         Decompressor._zlib_decompress(b"blablub")  # noqa: SLF001
+
+
+def test_decompressor_lz4_round_trip() -> None:
+    assert Decompressor("lz4")(lz4.frame.compress(b"blablub")) == b"blablub"
+
+
+def test_lz4_decompress_invalid_data() -> None:
+    with pytest.raises(DecompressionError):
+        Decompressor.LZ4(b"blablub")
+
+
+@pytest.mark.parametrize(
+    "decompressor, compressed",
+    [
+        (Decompressor.ZLIB, compress(b"blablub" * 100_000)),
+        (Decompressor.LZ4, lz4.frame.compress(b"blablub" * 100_000)),
+    ],
+)
+def test_stream_round_trip(decompressor: Decompressor, compressed: bytes) -> None:
+    chunks = [compressed[i : i + 1000] for i in range(0, len(compressed), 1000)]
+    assert b"".join(decompressor.stream(chunks)) == b"blablub" * 100_000
+
+
+@pytest.mark.parametrize(
+    "decompressor, compressed",
+    [
+        (Decompressor.ZLIB, compress(b"blablub" * 1000)),
+        (Decompressor.LZ4, lz4.frame.compress(b"blablub" * 1000)),
+    ],
+)
+def test_stream_truncated_data(decompressor: Decompressor, compressed: bytes) -> None:
+    with pytest.raises(DecompressionError):
+        b"".join(decompressor.stream([compressed[:-5]]))
+
+
+@pytest.mark.parametrize(
+    "decompressor, compressed",
+    [
+        (Decompressor.ZLIB, compress(b"a" * 50_000_000)),
+        (Decompressor.LZ4, lz4.frame.compress(b"a" * 50_000_000)),
+    ],
+)
+def test_stream_limits_output_per_step(decompressor: Decompressor, compressed: bytes) -> None:
+    assert max(len(step) for step in decompressor.stream([compressed])) <= 1024 * 1024
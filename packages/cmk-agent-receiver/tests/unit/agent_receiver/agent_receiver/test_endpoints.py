@@ -2,25 +2,29 @@
 # Copyright (C) 2019 Checkmk GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
+import asyncio
 import io
 import stat
 from collections.abc import MutableMapping
 from pathlib import Path
-from uuid import uuid4
+from uuid import UUID, uuid4
 from zlib import compress
 
 import httpx
+import lz4.frame
 import pytest
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from pydantic import UUID4
 from pytest_mock import MockerFixture
+from starlette.routing import Mount
 
 from cmk.agent_receiver.agent_receiver.checkmk_rest_api import (
     CMKEdition,
     HostConfiguration,
     RegisterResponse,
 )
+from cmk.agent_receiver.agent_receiver.ingestion import AgentDataIngestion, TooManyUploadsError
 from cmk.agent_receiver.agent_receiver.models import (
     ConnectionMode,
     R4RStatus,
@@ -30,6 +34,7 @@ from cmk.agent_receiver.agent_receiver.utils import R4R
 from cmk.agent_receiver.lib.certs import serialize_to_pem
 from cmk.agent_receiver.lib.config import get_config
 from cmk.agent_receiver.lib.mtls_auth_validator import INJECTED_ISSUER_HEADER, INJECTED_UUID_HEADER
+from cmk.agent_receiver.main import main_app
 from cmk.testlib.agent_receiver.certs import agent_ca_common_name, generate_csr_pair
 
 
@@ -699,6 +704,104 @@ def test_agent_data_success(
     assert response.status_code == 204
 
 
+@pytest.mark.usefixtures("symlink_push_host")
+def test_agent_data_lz4(
+    tmp_path: Path,
+    client: TestClient,
+    uuid: UUID4,
+    agent_data_headers: MutableMapping[str, str],
+) -> None:
+    response = client.post(
+        f"/agent_data/{uuid}",
+        headers={**agent_data_headers, "compression": "lz4"},
+        files={"monitoring_data": ("filename", io.BytesIO(lz4.frame.compress(b"mock file")))},
+    )
+
+    file_path = tmp_path / "push-agent" / "hostname" / "agent_output"
+    assert file_path.read_text() == "mock file"
+
+    assert response.status_code == 204
+
+
+@pytest.mark.usefixtures("symlink_push_host")
+def test_agent_data_too_many_uploads(
+    mocker: MockerFixture,
+    client: TestClient,
+    uuid: UUID4,
+    agent_data_headers: MutableMapping[str, str],
+    compressed_agent_data: io.BytesIO,
+) -> None:
+    mocker.patch(
+        "cmk.agent_receiver.agent_receiver.ingestion.AgentDataIngestion.store",
+        side_effect=TooManyUploadsError(10),
+    )
+    response = client.post(
+        f"/agent_data/{uuid}",
+        headers=agent_data_headers,
+        files={"monitoring_data": ("filename", compressed_agent_data)},
+    )
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Too many agent data uploads in progress"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_agent_data_uploads(tmp_path: Path) -> None:
+    uuids = [UUID(str(uuid4())) for _nr in range(20)]
+    for uuid in uuids:
+        _symlink_push_host(tmp_path / str(uuid), uuid)
+    agent_output = b"<<<check_mk>>>\nVersion: 2.5.0\n"
+    large_agent_output = b"<<<logwatch>>>\n" + b"W Something happened\n" * 100_000
+    assert isinstance(mount := main_app().routes[1], Mount)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=mount.app), base_url="http://testserver"
+    ) as client:
+
+        async def push(nr: int, uuid: UUID4) -> int:
+            response = await client.post(
+                f"/agent_data/{uuid}",
+                headers={
+                    "compression": "zlib",
+                    INJECTED_UUID_HEADER: str(uuid),
+                    INJECTED_ISSUER_HEADER: _agent_ca_common_name(),
+                },
+                files={
+                    "monitoring_data": (
+                        "filename",
+                        compress(large_agent_output if nr == 0 else agent_output),
+                    )
+                },
+            )
+            return response.status_code
+
+        status_codes = await asyncio.gather(*(push(nr, uuid) for nr, uuid in enumerate(uuids)))
+
+    assert status_codes == [204] * len(uuids)
+    for nr, uuid in enumerate(uuids):
+        assert (tmp_path / str(uuid) / "push-agent/hostname/agent_output").read_bytes() == (
+            large_agent_output if nr == 0 else agent_output
+        )
+
+
+@pytest.mark.usefixtures("symlink_push_host")
+def test_main_app_shuts_down_agent_data_ingestion(
+    mocker: MockerFixture,
+    uuid: UUID4,
+    agent_data_headers: MutableMapping[str, str],
+    compressed_agent_data: io.BytesIO,
+) -> None:
+    shutdown = mocker.spy(AgentDataIngestion, "shutdown")
+    with TestClient(main_app()) as client:
+        response = client.post(
+            f"/NO_SITE/agent-receiver/agent_data/{uuid}",
+            headers=agent_data_headers,
+            files={"monitoring_data": ("filename", compressed_agent_data)},
+        )
+        assert response.status_code == 204
+        shutdown.assert_not_called()
+    shutdown.assert_called_once()
+
+
 @pytest.fixture(name="registration_status_headers")
 def fixture_registration_status_headers(uuid: UUID4) -> dict[str, str]:
     return {
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import asyncio
+import io
+import threading
+from pathlib import Path
+from zlib import compress
+
+import pytest
+
+from cmk.agent_receiver.agent_receiver.decompression import DecompressionError, Decompressor
+from cmk.agent_receiver.agent_receiver.ingestion import AgentDataIngestion, TooManyUploadsError
+
+
+class _BlockingData(io.BytesIO):
+    def __init__(self, data: bytes, release: threading.Event) -> None:
+        super().__init__(data)
+        self._release = release
+
+    def read(self, size: int | None = -1, /) -> bytes:
+        self._release.wait()
+        return super().read(size)
+
+
+@pytest.mark.asyncio
+async def test_store_large_agent_data(tmp_path: Path) -> None:
+    agent_output = b"<<<check_mk>>>\nVersion: 2.5.0\n" * 100_000
+    ingestion = AgentDataIngestion(max_concurrent_writes=2, max_queued_uploads=2)
+
+    await ingestion.store(tmp_path / "host", Decompressor.ZLIB, io.BytesIO(compress(agent_output)))
+
+    assert (tmp_path / "host" / "agent_output").read_bytes() == agent_output
+
+
+@pytest.mark.asyncio
+async def test_failed_decompression_keeps_agent_output(tmp_path: Path) -> None:
+    ingestion = AgentDataIngestion(max_concurrent_writes=2, max_queued_uploads=2)
+    target_dir = tmp_path / "host"
+    await ingestion.store(target_dir, Decompressor.ZLIB, io.BytesIO(compress(b"old output")))
+
+    with pytest.raises(DecompressionError):
+        await ingestion.store(target_dir, Decompressor.ZLIB, io.BytesIO(compress(b"new")[:-3]))
+
+    assert [p.name for p in target_dir.iterdir()] == ["agent_output"]
+    assert (target_dir / "agent_output").read_bytes() == b"old output"
+
+
+@pytest.mark.asyncio
+async def test_uploads_beyond_the_limit_are_rejected(tmp_path: Path) -> None:
+    ingestion = AgentDataIngestion(max_concurrent_writes=1, max_queued_uploads=1)
+    release = threading.Event()
+    uploads = [
+        asyncio.create_task(
+            ingestion.store(
+                tmp_path / "hosts" / f"host{nr}",
+                Decompressor.ZLIB,
+                _BlockingData(compress(b"output"), release),
+            )
+        )
+        for nr in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(TooManyUploadsError):
+        await ingestion.store(
+            tmp_path / "hosts" / "host2", Decompressor.ZLIB, io.BytesIO(compress(b""))
+        )
+
+    release.set()
+    await asyncio.gather(*uploads)
+    await ingestion.store(
+        tmp_path / "hosts" / "host2", Decompressor.ZLIB, io.BytesIO(compress(b"output"))
+    )
+    assert sorted(p.name for p in (tmp_path / "hosts").iterdir()) == ["host0", "host1", "host2"]
@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import errno
+import io
 import logging
 import os
 import socket
@@ -59,18 +60,27 @@ class TCPFetcherParams(TypedDict):
     tls_config: _TLSConfigParams
 
 
-def recvall(sock: socket.socket, flags: int = 0) -> bytes:
-    buffer = bytearray()
+# Agents may send tens of megabytes, e.g. logwatch or piggyback data
+_RECV_CHUNK_SIZE = 256 * 1024
+
+
+def recvall(sock: socket.socket, flags: int = 0, *, prefix: bytes = b"") -> bytes:
+    """Receive until the peer closes the connection, the data is prepended by the prefix
+
+    The chunks are received into one reused buffer and collected in a BytesIO, which hands out
+    its buffer without copying it. So the data is only copied once and no bytes object is
+    created per chunk.
+    """
+    chunk = memoryview(bytearray(_RECV_CHUNK_SIZE))
+    received = io.BytesIO()
+    received.write(prefix)
     try:
-        while True:
-            data = sock.recv(4096, flags)
-            if not data:
-                break
-            buffer += data
+        while size := sock.recv_into(chunk, 0, flags):
+            received.write(chunk[:size])
     except OSError as e:
         raise FetcherError("Communication failed: %s" % e)
 
-    return bytes(buffer)
+    return received.getvalue()
 
 
 def wrap_tls(sock: socket.socket, server_hostname: str, *, tls_config: TLSConfig) -> ssl.SSLSocket:
@@ -264,6 +274,7 @@ class TCPFetcher(Fetcher[AgentRawData, TCPFetcherParams]):
     def _from_tls(
         self, sock: socket.socket, server_hostname: str
     ) -> tuple[TransportProtocol, Buffer]:
+        """Returns the transported protocol and the data including its two protocol bytes"""
         logger.debug("Reading data from agent via TLS socket")
         with wrap_tls(sock, server_hostname, tls_config=self.tls_config) as ssock:
             logger.debug("Reading data from agent")
@@ -283,7 +294,7 @@ class TCPFetcher(Fetcher[AgentRawData, TCPFetcherParams]):
             raise FetcherError(f"Unknown transport protocol: {bytes(memoryview(agent_data)[:2])!r}")
 
         logger.debug("Detected transport protocol: %(protocol)s", {"protocol": protocol})
-        return protocol, memoryview(agent_data)[2:]
+        return protocol, agent_data
 
     def _get_agent_data(self, sock: socket.socket, server_hostname: str | None) -> AgentRawData:
         try:
@@ -311,20 +322,26 @@ class TCPFetcher(Fetcher[AgentRawData, TCPFetcherParams]):
             protocol, output = self._from_tls(sock, server_hostname)
         else:
             logger.debug("Reading data from agent")
-            output = recvall(sock, socket.MSG_WAITALL)
+            # bring back stolen bytes
+            output = recvall(sock, socket.MSG_WAITALL, prefix=raw_protocol)
 
-        if not memoryview(output):
+        if len(memoryview(output)) <= len(protocol.value):
             return AgentRawData(b"")  # nothing to to, validation will fail
 
         if protocol is TransportProtocol.PLAIN:
-            return AgentRawData(protocol.value + output)  # bring back stolen bytes
+            # No copy for the usual bytes objects
+            return AgentRawData(bytes(output))
 
         if (secret := self.pre_shared_secret) is None:
             raise FetcherError("Data is encrypted but no secret is known")
 
         logger.debug("Try to decrypt output")
         try:
-            return AgentRawData(decrypt_by_agent_protocol(secret, protocol, output))
+            return AgentRawData(
+                decrypt_by_agent_protocol(
+                    secret, protocol, memoryview(output)[len(protocol.value) :]
+                )
+            )
         except MKTimeout:
             raise
         except Exception as e:
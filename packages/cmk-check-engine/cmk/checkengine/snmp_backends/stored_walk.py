@@ -6,7 +6,9 @@
 """Abstract classes and types."""
 
 import logging
+from bisect import bisect_left
 from collections.abc import Sequence
+from functools import lru_cache
 from pathlib import Path
 from typing import Final, override
 
@@ -22,10 +24,87 @@ from cmk.checkengine.snmplib import (
 
 from ._utils import BackendError, strip_snmp_value
 
-__all__ = ["StoredWalkSNMPBackend"]
+__all__ = ["StoredWalkSNMPBackend", "WalkIndex", "load_walk_index", "read_walk_from_path"]
 logger = logging.getLogger(__name__)
 
 
+class WalkIndex:
+    """Sorted OID index over the lines of a stored walk
+
+    The walk file is parsed exactly once.  Lookups are binary searches on
+    integer OID tuples, the values are only stripped for the rows returned.
+    """
+
+    def __init__(self, lines: Sequence[str]) -> None:
+        entries: list[tuple[tuple[int, ...], OID, str]] = []
+        for line in lines:
+            parts = line.split(None, 1)
+            if not parts:
+                continue
+            oid = parts[0] if parts[0].startswith(".") else f".{parts[0]}"
+            try:
+                key = oid_to_tuple(oid)
+            except ValueError:
+                logger.debug("Skipping invalid OID %(oid)s", {"oid": oid})
+                continue
+            entries.append((key, oid, parts[1] if len(parts) > 1 else ""))
+        # Walks are usually sorted already, but we must not rely on it.
+        entries.sort(key=lambda e: e[0])
+        self._keys: Final = [e[0] for e in entries]
+        self._oids: Final = [e[1] for e in entries]
+        self._values: Final = [e[2] for e in entries]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(
+        self, prefix: tuple[int, ...], *, strict: bool = False, limit: int | None = None
+    ) -> SNMPRowInfo:
+        """Return the rows below (or at, unless `strict`) the given OID prefix"""
+        depth = len(prefix)
+        index = bisect_left(self._keys, prefix)
+        rows: SNMPRowInfo = []
+        while index < len(self._keys) and (limit is None or len(rows) < limit):
+            key = self._keys[index]
+            if key[:depth] != prefix:
+                break
+            if not strict or len(key) > depth:
+                rows.append((self._oids[index], strip_snmp_value(self._values[index])))
+            index += 1
+        return rows
+
+
+def load_walk_index(path: Path) -> WalkIndex:
+    stat = path.stat()
+    return _load_walk_index(path, stat.st_mtime_ns, stat.st_size)
+
+
+# The index is shared by all backend instances (and therefore all sections)
+# of a host within one process.  It is rebuilt whenever the walk file changes.
+# Only the indexes of the most recently used walks are kept.
+@lru_cache(maxsize=16)
+def _load_walk_index(path: Path, _mtime_ns: int, _size: int) -> WalkIndex:
+    return WalkIndex(read_walk_from_path(path))
+
+
+def read_walk_from_path(path: Path) -> Sequence[str]:
+    logger.debug("Opening %(path)s", {"path": path})
+    lines: list[str] = []
+    with path.open() as f:
+        # Sometimes there are newlines in the data of snmpwalks.
+        # Append the data to the last OID rather than throwing it away/skipping it.
+        for line in f:
+            if line.startswith("."):
+                lines.append(line)
+            elif lines:
+                lines[-1] += line
+    return lines
+
+
+def oid_to_tuple(oid: OID) -> tuple[int, ...]:
+    return tuple(map(int, oid.strip(".").split(".")))
+
+
 class StoredWalkSNMPBackend(SNMPBackend):
     def __init__(self, snmp_config: SNMPHostConfig) -> None:
         super().__init__(snmp_config)
@@ -70,89 +149,27 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         logger.debug("Loading %(oid)s", {"oid": oid})
-        lines = self.read_walk_data()
-
-        begin = 0
-        end = len(lines)
-        current = (begin + end) // 2
-        hit = None
-        while end - begin > 0:
-            parts = lines[current].split(None, 1)
-            comp = parts[0]
-            hit = StoredWalkSNMPBackend._compare_oids(oid_prefix, comp)
-            if hit == 0:
-                break
-            if hit == 1:  # we are too low
-                begin = current + 1
-            else:
-                end = current
-            current = (begin + end) // 2
-
-        if hit != 0:
-            return []  # not found
-
-        rowinfo = StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current, -1)
-        rowinfo.reverse()
-        rowinfo += StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current + 1, 1)
+        try:
+            prefix = oid_to_tuple(oid_prefix)
+        except ValueError:
+            return []
 
         if dot_star:
-            return [rowinfo[0]]
+            return self.load_walk_index().lookup(prefix, strict=True, limit=1)
+        return self.load_walk_index().lookup(prefix)
 
-        return rowinfo
+    def load_walk_index(self) -> WalkIndex:
+        try:
+            return load_walk_index(self.path)
+        except OSError:
+            raise BackendError(f"No snmpwalk file {self.path}")
 
     @staticmethod
     def read_walk_from_path(path: Path) -> Sequence[str]:
-        logger.debug("Opening %(path)s", {"path": path})
-        lines = []
-        with path.open() as f:
-            # Sometimes there are newlines in the data of snmpwalks.
-            # Append the data to the last OID rather than throwing it away/skipping it.
-            for line in f.readlines():
-                if line.startswith("."):
-                    lines.append(line)
-                elif lines:
-                    lines[-1] += line
-        return lines
+        return read_walk_from_path(path)
 
     def read_walk_data(self) -> Sequence[str]:
         try:
             return self.read_walk_from_path(self.path)
         except OSError:
             raise BackendError(f"No snmpwalk file {self.path}")
-
-    @staticmethod
-    def _compare_oids(a: OID, b: OID) -> int:
-        aa = StoredWalkSNMPBackend._to_bin_string(a)
-        bb = StoredWalkSNMPBackend._to_bin_string(b)
-        return 0 if len(aa) <= len(bb) and bb[: len(aa)] == aa else (aa > bb) - (aa < bb)
-
-    @staticmethod
-    def _to_bin_string(oid: OID) -> tuple[int, ...]:
-        return tuple(map(int, oid.strip(".").split(".")))
-
-    @staticmethod
-    def _collect_until(
-        oid: OID, oid_prefix: OID, lines: Sequence[str], index: int, direction: int
-    ) -> SNMPRowInfo:
-        rows = []
-        # Handle case, where we run after the end of the lines list
-        if index >= len(lines):
-            if direction > 0:
-                return []
-            index -= 1
-        while True:
-            line = lines[index]
-            parts = line.split(None, 1)
-            o = parts[0]
-            if o.startswith("."):
-                o = o[1:]
-            if o == oid or o.startswith(oid_prefix + "."):
-                value = parts[1] if len(parts) > 1 else ""
-                # Fix for missing starting oids
-                rows.append(("." + o, strip_snmp_value(value)))
-                index += direction
-                if index < 0 or index >= len(lines):
-                    break
-            else:
-                break
-        return rows
@@ -7,6 +7,7 @@
 
 import json
 import logging
+import os
 from ast import literal_eval
 from collections.abc import (
     Callable,
@@ -116,6 +117,171 @@ class AllValueStoresStore:
             self._last_known_state = _LastState(timestamp=self.path.stat().st_mtime, data=new_data)
 
 
+@dataclass(frozen=True)
+class _JournalState:
+    snapshot_mtime_ns: int | None
+    journal_size: int
+    journal_entries: int
+    data: Mapping[ValueStoreKey, _SerializedValueStore]
+
+
+class JournaledValueStoresStore(AllValueStoresStore):
+    """Read and write values stored on disk, writing only what changed
+
+    The file at `path` holds a snapshot in the same format as the one used
+    by :class:`AllValueStoresStore`.  Updates only append the value stores
+    that actually changed to a journal next to it (one JSON line per
+    value store).  Once the journal outgrows the snapshot, both are
+    compacted into a new snapshot.
+
+    Reading does not lock, so read only users never create any files.  A
+    compaction first appends its changes to the journal, so the new snapshot
+    equals the old one with the journal replayed.  Replaying the old journal
+    on the new snapshot is harmless, and a read that saw the old snapshot is
+    repeated if the snapshot was replaced meanwhile.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        log_debug: Callable[[str], object] | None = None,
+        compaction_min_entries: int = 100,
+    ) -> None:
+        super().__init__(path, log_debug=log_debug)
+        self.journal_path: Final = path.with_name(f"{path.name}.journal")
+        self._compaction_min_entries: Final = compaction_min_entries
+        self._journal_state: None | _JournalState = None
+
+    @staticmethod
+    def _serialize_entry(key: ValueStoreKey, value: _SerializedValueStore) -> str:
+        return json.dumps([key, value]) + "\n"
+
+    def _stat_signature(self) -> tuple[int | None, int]:
+        try:
+            snapshot_mtime_ns: int | None = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            snapshot_mtime_ns = None
+        try:
+            journal_size = self.journal_path.stat().st_size
+        except FileNotFoundError:
+            journal_size = 0
+        return snapshot_mtime_ns, journal_size
+
+    def _snapshot_identity(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _replay_journal(self, data: dict[ValueStoreKey, _SerializedValueStore]) -> tuple[int, int]:
+        try:
+            with self.journal_path.open("rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return 0, 0
+
+        # An incomplete last line is either being appended right now or is terminated by the
+        # next append. Either way it is no entry (yet).
+        raw = raw[: raw.rfind(b"\n") + 1]
+        entries = 0
+        for line in raw.splitlines():
+            try:
+                (hn, cn, i), v = json.loads(line)
+            except (json.JSONDecodeError, ValueError, TypeError):
+                # Most likely an incomplete last line of an interrupted write.
+                logger.warning(
+                    "value store: ignoring corrupt journal entry in %(path)s",
+                    {"path": self.journal_path},
+                )
+                continue
+            data[(HostName(hn), str(cn), None if i is None else str(i))] = v
+            entries += 1
+        return len(raw), entries
+
+    @override
+    def load(self) -> Mapping[ValueStoreKey, _SerializedValueStore]:
+        while True:
+            snapshot_identity = self._snapshot_identity()
+            data = {**super().load()}
+            journal_size, journal_entries = self._replay_journal(data)
+            # The journal we replayed may already belong to a newer snapshot.
+            if self._snapshot_identity() == snapshot_identity:
+                break
+            self._log_debug("snapshot replaced while loading, loading again")
+
+        self._journal_state = _JournalState(
+            None if snapshot_identity is None else snapshot_identity[1],
+            journal_size,
+            journal_entries,
+            data,
+        )
+        return data
+
+    @override
+    def update(self, updated: Mapping[ValueStoreKey, _SerializedValueStore]) -> None:
+        """Re-load and append the changes of the stored values
+
+        Only value stores that differ from what is on disk are written.
+        """
+        self._log_debug("updating")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with store.locked(self.path):
+            if self._journal_state is not None and self._stat_signature() == (
+                self._journal_state.snapshot_mtime_ns,
+                self._journal_state.journal_size,
+            ):
+                self._log_debug("already loaded")
+                state = self._journal_state
+            else:
+                self._log_debug("loading from disk")
+                self.load()
+                assert self._journal_state is not None
+                state = self._journal_state
+
+            changed = {k: v for k, v in updated.items() if state.data.get(k) != v}
+            if not changed:
+                self._log_debug("nothing changed")
+                return
+
+            new_data = {**state.data, **changed}
+            journal_entries = state.journal_entries + len(changed)
+
+            self._log_debug(f"appending {len(changed)} entries to journal")
+            self._append_to_journal(
+                "".join(self._serialize_entry(k, v) for k, v in changed.items())
+            )
+
+            if journal_entries > max(self._compaction_min_entries, len(new_data)):
+                self._compact(new_data)
+                return
+
+            snapshot_mtime_ns, journal_size = self._stat_signature()
+            self._journal_state = _JournalState(
+                snapshot_mtime_ns, journal_size, journal_entries, new_data
+            )
+
+    def _append_to_journal(self, entries: str) -> None:
+        with self.journal_path.open("a+b") as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate the incomplete last line of an interrupted write, so that it
+                    # does not swallow the first of our entries.
+                    entries = "\n" + entries
+            f.write(entries.encode("utf-8"))
+
+    def _compact(self, data: Mapping[ValueStoreKey, _SerializedValueStore]) -> None:
+        self._log_debug("compacting journal")
+        store.save_text_to_file(self.path, self._serialize(data))
+        self.journal_path.unlink(missing_ok=True)
+        snapshot_mtime_ns, journal_size = self._stat_signature()
+        self._journal_state = _JournalState(snapshot_mtime_ns, journal_size, 0, data)
+
+
 class _ValueStore(MutableMapping[str, object]):
     """Implements the mutable mapping that is exposed to the plugins
 
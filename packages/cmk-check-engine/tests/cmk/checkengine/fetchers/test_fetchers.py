@@ -9,8 +9,10 @@ from __future__ import annotations
 
 import os
 import socket
+import threading
 import time
-from collections.abc import Mapping, Sequence, Sized
+from collections.abc import Iterator, Mapping, Sequence, Sized
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, cast, NamedTuple, NoReturn, override, Self
 
@@ -30,7 +32,7 @@ from cmk.checkengine.fetchers.ipmi import IPMIFetcher, IPMISensor
 from cmk.checkengine.fetchers.piggyback import PiggybackFetcher
 from cmk.checkengine.fetchers.program import ProgramFetcher
 from cmk.checkengine.fetchers.snmp import SNMPFetcher, SNMPScanConfig, SNMPSectionMeta
-from cmk.checkengine.fetchers.tcp import TCPFetcher, TLSConfig
+from cmk.checkengine.fetchers.tcp import recvall, TCPFetcher, TLSConfig
 from cmk.checkengine.filecache import (
     AgentFileCache,
     FileCache,
@@ -943,6 +945,23 @@ class _MockSock:
         pass
 
 
+@contextmanager
+def _sending_socket(data: bytes) -> Iterator[socket.socket]:
+    receiving, sending = socket.socketpair()
+
+    def send() -> None:
+        with sending:
+            sending.sendall(data)
+
+    sender = threading.Thread(target=send)
+    sender.start()
+    try:
+        with receiving:
+            yield receiving
+    finally:
+        sender.join()
+
+
 class TestTCPFetcher:
     @pytest.fixture
     def fetcher(self, tmp_path: Path) -> TCPFetcher:
@@ -964,6 +983,30 @@ class TestTCPFetcher:
     def test_repr(self, fetcher: TCPFetcher) -> None:
         assert isinstance(repr(fetcher), str)
 
+    def test_get_agent_data_plain(self, fetcher: TCPFetcher) -> None:
+        with _sending_socket(b"<<<check_mk>>>\nVersion: 2.5.0\n") as sock:
+            assert fetcher._get_agent_data(sock, None) == b"<<<check_mk>>>\nVersion: 2.5.0\n"  # noqa: SLF001
+
+    def test_get_agent_data_empty_payload(self, fetcher: TCPFetcher) -> None:
+        with _sending_socket(b"<<") as sock:
+            assert fetcher._get_agent_data(sock, None) == b""  # noqa: SLF001
+
+    def test_recvall_many_chunks(self) -> None:
+        # Roughly what agents with a lot of logwatch data send
+        agent_output = b"<<<logwatch>>>\n[[[/var/log/messages]]]\n" + b"".join(
+            b"W Oct 17 12:00:%02d host kernel: something happened %d\n" % (n % 60, n)
+            for n in range(50_000)
+        )
+        with _sending_socket(agent_output) as sock:
+            assert recvall(sock, socket.MSG_WAITALL, prefix=b"<<") == b"<<" + agent_output
+
+    def test_recvall_communication_failure(self) -> None:
+        receiving, sending = socket.socketpair()
+        with receiving, sending:
+            receiving.settimeout(0.01)
+            with pytest.raises(FetcherError, match="Communication failed"):
+                recvall(receiving)
+
     def test_with_cached_does_not_open(self, tmp_path: Path) -> None:
         file_cache = StubFileCache[AgentRawData](
             base_path=Path("/"),
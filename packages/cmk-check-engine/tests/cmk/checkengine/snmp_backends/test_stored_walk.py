@@ -9,7 +9,11 @@ from pathlib import Path
 import pytest
 
 import cmk.checkengine.snmp_backends._utils as utils
-from cmk.checkengine.snmp_backends.stored_walk import StoredWalkSNMPBackend
+from cmk.checkengine.snmp_backends.stored_walk import (
+    load_walk_index,
+    StoredWalkSNMPBackend,
+    WalkIndex,
+)
 
 
 @pytest.mark.parametrize(
@@ -27,21 +31,6 @@ def test_strip_snmp_value(value: str, expected: bytes) -> None:
 
 @pytest.mark.usefixtures("create_files")
 class TestStoredWalkSNMPBackend:
-    @pytest.mark.parametrize(
-        "a, b, result",
-        [
-            ("1.2.3", "1.2.3", 0),
-            ("1.2.3", ".1.2.3", 0),
-            (".1.2.3", "1.2.3", 0),
-            (".1.2.3", ".1.2.3", 0),
-            ("1.2.3", "1.2.3.4", 0),
-            ("1.2.3.4", "1.2.3", 1),
-            ("1.2.3", "4.5.6", -1),
-        ],
-    )
-    def test_compare_oids(self, a: str, b: str, result: int) -> None:
-        assert StoredWalkSNMPBackend._compare_oids(a, b) == result  # noqa: SLF001
-
     def test_read_walk_data(self, tmpdir: Path) -> None:
         assert StoredWalkSNMPBackend.read_walk_from_path(tmpdir / "walkdata" / "1.txt") == [
             ".1.2.3 foo\n",
@@ -53,6 +42,65 @@ class TestStoredWalkSNMPBackend:
         ]
 
 
+class TestWalkIndex:
+    @pytest.fixture
+    def index(self) -> WalkIndex:
+        return WalkIndex(
+            [
+                ".1.2.10 ten\n",
+                ".1.2.3 three\n",
+                ".1.2.3.1 three-one\n",
+                ".1.2.4 four\n",
+                ".1.20 twenty\n",
+                "invalid line\n",
+            ]
+        )
+
+    def test_skips_invalid_lines(self, index: WalkIndex) -> None:
+        assert len(index) == 5
+
+    def test_lookup_prefix(self, index: WalkIndex) -> None:
+        assert index.lookup((1, 2)) == [
+            (".1.2.3", b"three"),
+            (".1.2.3.1", b"three-one"),
+            (".1.2.4", b"four"),
+            (".1.2.10", b"ten"),
+        ]
+
+    def test_lookup_exact(self, index: WalkIndex) -> None:
+        assert index.lookup((1, 2, 4)) == [(".1.2.4", b"four")]
+
+    def test_lookup_strict(self, index: WalkIndex) -> None:
+        assert index.lookup((1, 2, 3), strict=True) == [(".1.2.3.1", b"three-one")]
+
+    def test_lookup_limit(self, index: WalkIndex) -> None:
+        assert index.lookup((1,), limit=1) == [(".1.2.3", b"three")]
+
+    def test_lookup_missing(self, index: WalkIndex) -> None:
+        assert not index.lookup((1, 3))
+
+
+def test_load_walk_index_is_cached_until_file_changes(tmp_path: Path) -> None:
+    walk = tmp_path / "host"
+    walk.write_text(".1.2.3 foo\n")
+    index = load_walk_index(walk)
+    assert load_walk_index(walk) is index
+
+    walk.write_text(".1.2.3 foo\n.1.2.4 bar\n")
+    assert load_walk_index(walk).lookup((1, 2)) == [(".1.2.3", b"foo"), (".1.2.4", b"bar")]
+
+
+def test_load_walk_index_keeps_only_recent_walks(tmp_path: Path) -> None:
+    walks = [tmp_path / f"host{nr}" for nr in range(20)]
+    for walk in walks:
+        walk.write_text(".1.2.3 foo\n")
+    first_index = load_walk_index(walks[0])
+    for walk in walks[1:]:
+        load_walk_index(walk)
+
+    assert load_walk_index(walks[0]) is not first_index
+
+
 @pytest.fixture
 def create_files(tmp_path: Path) -> None:
     (tmp_path / "walkdata").mkdir()
@@ -82,6 +82,141 @@ class TestAllValueStoresStore:
         }
 
 
+class TestJournaledValueStoresStore:
+    _KEY1 = (HostName("host1"), "service1", "item")
+    _KEY2 = (HostName("host1"), "service2", None)
+
+    def _get_jvss(
+        self, file: Path, compaction_min_entries: int = 100
+    ) -> value_store.JournaledValueStoresStore:
+        return value_store.JournaledValueStoresStore(
+            file,
+            log_debug=lambda x: None,  # noqa: ARG005
+            compaction_min_entries=compaction_min_entries,
+        )
+
+    def test_reads_snapshot_of_all_value_stores_store(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        value_store.AllValueStoresStore(file).update({self._KEY1: {"key": "value1"}})
+        assert self._get_jvss(file).load() == {self._KEY1: {"key": "value1"}}
+
+    def test_load_creates_no_files(self, tmp_path: Path) -> None:
+        file = tmp_path / "counters" / "file"
+        assert not self._get_jvss(file).load()
+        assert not file.parent.exists()
+
+    def test_load_during_compaction(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        file = tmp_path / "file"
+        writer = self._get_jvss(file, compaction_min_entries=2)
+        writer.update({self._KEY1: {"key": "value1"}})
+        writer.update({self._KEY2: {"key": "value2"}})
+
+        reader = self._get_jvss(file)
+        replay_journal = reader._replay_journal  # noqa: SLF001
+        replays = 0
+
+        def compact_before_first_replay(
+            data: dict[value_store.ValueStoreKey, Mapping[str, str]],
+        ) -> tuple[int, int]:
+            nonlocal replays
+            if not replays:
+                writer.update({self._KEY1: {"key": "new_value1"}})
+                assert not writer.journal_path.exists()
+            replays += 1
+            return replay_journal(data)
+
+        monkeypatch.setattr(reader, "_replay_journal", compact_before_first_replay)
+
+        assert reader.load() == {
+            self._KEY1: {"key": "new_value1"},
+            self._KEY2: {"key": "value2"},
+        }
+
+    def test_load_between_compaction_steps(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        file = tmp_path / "file"
+        writer = self._get_jvss(file, compaction_min_entries=2)
+        writer.update({self._KEY1: {"key": "value1"}})
+        writer.update({self._KEY2: {"key": "value2"}})
+
+        # The new snapshot is written, but the journal is not deleted yet
+        with monkeypatch.context() as m:
+            m.setattr(Path, "unlink", lambda *_args, **_kwargs: None)
+            writer.update({self._KEY1: {"key": "new_value1"}})
+
+        assert self._get_jvss(file).load() == {
+            self._KEY1: {"key": "new_value1"},
+            self._KEY2: {"key": "value2"},
+        }
+
+    def test_update_appends_changed_only(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        jvss = self._get_jvss(file)
+        jvss.load()
+
+        jvss.update({self._KEY1: {"key": "value1"}, self._KEY2: {"key": "value2"}})
+        assert not file.read_text()
+        assert len(jvss.journal_path.read_text().splitlines()) == 2
+
+        jvss.update({self._KEY1: {"key": "value1"}, self._KEY2: {"key": "new_value2"}})
+        assert len(jvss.journal_path.read_text().splitlines()) == 3
+
+        assert self._get_jvss(file).load() == {
+            self._KEY1: {"key": "value1"},
+            self._KEY2: {"key": "new_value2"},
+        }
+
+    def test_concurrent_updates(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        jvss1 = self._get_jvss(file)
+        jvss2 = self._get_jvss(file)
+        jvss1.load()
+        jvss2.load()
+
+        jvss1.update({self._KEY1: {"key": "value1"}})
+        jvss2.update({self._KEY2: {"key": "value2"}})
+        jvss1.update({self._KEY1: {"key": "new_value1"}})
+
+        assert self._get_jvss(file).load() == {
+            self._KEY1: {"key": "new_value1"},
+            self._KEY2: {"key": "value2"},
+        }
+
+    def test_compaction(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        jvss = self._get_jvss(file, compaction_min_entries=2)
+
+        for n in range(3):
+            jvss.update({self._KEY1: {"key": f"value{n}"}})
+
+        assert not jvss.journal_path.exists()
+        assert value_store.AllValueStoresStore(file).load() == {self._KEY1: {"key": "value2"}}
+
+    def test_ignores_incomplete_journal_entry(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        jvss = self._get_jvss(file)
+        jvss.update({self._KEY1: {"key": "value1"}})
+        with jvss.journal_path.open("a") as f:
+            f.write('[["host1", "serv')
+
+        assert self._get_jvss(file).load() == {self._KEY1: {"key": "value1"}}
+
+    def test_update_after_interrupted_write(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        jvss = self._get_jvss(file)
+        jvss.update({self._KEY1: {"key": "value1"}})
+        with jvss.journal_path.open("a") as f:
+            f.write('[["host1", "serv')
+
+        self._get_jvss(file).update({self._KEY2: {"key": "value2"}})
+
+        assert self._get_jvss(file).load() == {
+            self._KEY1: {"key": "value1"},
+            self._KEY2: {"key": "value2"},
+        }
+
+
 class _BrokenRepr(str):
     @override
     def __repr__(self) -> str:
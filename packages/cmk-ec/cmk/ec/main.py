@@ -25,6 +25,7 @@ import logging
 import os
 import pprint
 import select
+import selectors
 import signal
 import socket
 import sys
@@ -82,6 +83,7 @@ from .query import (
 )
 from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
 from .rule_packs import load_active_config
+from .rule_prefilter import RuleCandidates, RulePrefilter
 from .settings import create_settings, FileDescriptor, PortNumber, Settings
 from .snmp import SNMPTrapParser
 from .syslog import SyslogFacility, SyslogPriority
@@ -280,6 +282,17 @@ def parse_address(what: str, address: object) -> tuple[str, int]:
     return unmap_ipv4_address(address[0]), address[1]
 
 
+def _drain_datagrams(
+    sock: socket.socket, bufsize: int, limit: int
+) -> Iterator[tuple[bytes, object]]:
+    """Receive the datagrams already queued on a non-blocking socket, at most limit of them"""
+    for _ in range(limit):
+        try:
+            yield sock.recvfrom(bufsize)
+        except (BlockingIOError, InterruptedError):
+            return
+
+
 def terminate(
     terminate_main_event: threading.Event,
     event_server: EventServer,
@@ -369,6 +382,14 @@ class MKSignalException(MKException):
 class EventServer(ECServerThread):
     """Processing and classification of incoming events."""
 
+    # Stop accepting new connections on the stream sockets when this many clients are connected
+    _max_client_connections = 900
+    # Buffer size used for reading the stream sockets and the event pipe
+    _stream_recv_size = 65536
+    # Upper bounds per loop iteration, so no single source can starve the others
+    _max_datagrams_per_batch = 256
+    _max_spool_files_per_batch = 100
+
     def __init__(
         self,
         logger: Logger,
@@ -394,6 +415,7 @@ class EventServer(ECServerThread):
             profiling_enabled=settings.options.profile_event,
             profile_file=settings.paths.event_server_profile.value,
         )
+        self._eventsocket: socket.socket | None = None
         self._syslog_udp: socket.socket | None = None
         self._syslog_tcp: socket.socket | None = None
         self._snmp_trap_socket: socket.socket | None = None
@@ -404,6 +426,8 @@ class EventServer(ECServerThread):
         self._hash_stats: list[list[int]] = []  # facility/priority
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
+        self._rule_prefilter = RulePrefilter([])
+        self._prefilter_stats = {"skipped": 0, "tried": 0, "hits": 0}
 
         self._connection = connection
         self._omd_site = omd_site
@@ -681,60 +705,68 @@ class EventServer(ECServerThread):
     @override
     def serve(self) -> None:
         pipe = self.open_pipe()
-        # We just read()/recvfrom() these, so we create no new FDs via them.
-        pipe_and_datagram_sockets = [
-            f for f in (pipe, self._syslog_udp, self._snmp_trap_socket) if f is not None
-        ]
-        # We use accept() on these FDs, so we must be careful to avoid creating too many additional
-        # FDs. We use an arbitrary limit below (less than the usual 1024 FD_SETSIZE limit), so we
-        # don't accept() any more connections when there are already many of them. Connections get
-        # queued in the OS queue then, and when that is full, a client will get an error, which is
-        # the right thing here.
+        # We use accept() on the stream sockets, so we must be careful to avoid creating too many
+        # additional FDs. We stop listening on them when there are already many client
+        # connections. Connections get queued in the OS queue then, and when that is full, a client
+        # will get an error, which is the right thing here.
         stream_sockets = [f for f in (self._syslog_tcp, self._eventsocket) if f is not None]
         client_sockets: dict[FileDescr, tuple[socket.socket, tuple[str, int] | None, bytes]] = {}
-        select_timeout = 1
         unprocessed_pipe_data = b""
-        while not self._terminate_event.is_set():
-            try:
-                readable: list[FileDescr | socket.socket] = select.select(
-                    pipe_and_datagram_sockets
-                    + (stream_sockets if len(client_sockets) < 900 else [])
-                    + list(client_sockets.keys()),
-                    [],
-                    [],
-                    select_timeout,
-                )[0]
-            except OSError as e:
-                if e.args[0] != errno.EINTR:
-                    raise
-                continue
-            address: tuple[str, int] | None  # host/port
-
-            # Accept new connection on event unix socket
-            if self._eventsocket in readable:
-                client_socket, remote_address = self._eventsocket.accept()
-                # We have a AF_UNIX socket, so the remote address is a str, which is always ''.
-                if not (isinstance(remote_address, str) and remote_address == ""):
-                    raise ValueError(
-                        f"Invalid remote address '{remote_address!r}' for event socket"
+        accepting = True
+        select_timeout = 1.0
+
+        with selectors.DefaultSelector() as selector:
+            # We just read()/recvfrom() these, so we create no new FDs via them.
+            selector.register(pipe, selectors.EVENT_READ)
+            for datagram_socket in (self._syslog_udp, self._snmp_trap_socket):
+                if datagram_socket is not None:
+                    datagram_socket.setblocking(False)
+                    selector.register(datagram_socket, selectors.EVENT_READ)
+            for stream_socket in stream_sockets:
+                selector.register(stream_socket, selectors.EVENT_READ)
+
+            while not self._terminate_event.is_set():
+                if accepting != (len(client_sockets) < self._max_client_connections):
+                    accepting = not accepting
+                    for stream_socket in stream_sockets:
+                        if accepting:
+                            selector.register(stream_socket, selectors.EVENT_READ)
+                        else:
+                            selector.unregister(stream_socket)
+
+                try:
+                    ready = selector.select(select_timeout)
+                except InterruptedError:
+                    continue
+                readable = {key.fd for key, _mask in ready}
+                address: tuple[str, int] | None  # host/port
+
+                # Accept new connection on event unix socket
+                if self._eventsocket is not None and self._eventsocket.fileno() in readable:
+                    client_socket, remote_address = self._eventsocket.accept()
+                    # We have a AF_UNIX socket, so the remote address is a str, which is always ''.
+                    if not (isinstance(remote_address, str) and remote_address == ""):
+                        raise ValueError(
+                            f"Invalid remote address '{remote_address!r}' for event socket"
+                        )
+                    client_sockets[client_socket.fileno()] = (client_socket, None, b"")
+                    selector.register(client_socket, selectors.EVENT_READ)
+
+                # Same for the TCP syslog socket
+                if self._syslog_tcp is not None and self._syslog_tcp.fileno() in readable:
+                    client_socket, address = self._syslog_tcp.accept()
+                    client_sockets[client_socket.fileno()] = (
+                        client_socket,
+                        parse_address("syslog socket (TCP)", address),
+                        b"",
                     )
-                client_sockets[client_socket.fileno()] = (client_socket, None, b"")
-
-            # Same for the TCP syslog socket
-            if self._syslog_tcp is not None and self._syslog_tcp in readable:
-                client_socket, address = self._syslog_tcp.accept()
-                client_sockets[client_socket.fileno()] = (
-                    client_socket,
-                    parse_address("syslog socket (TCP)", address),
-                    b"",
-                )
+                    selector.register(client_socket, selectors.EVENT_READ)
 
-            # Read data from existing event unix socket connections
-            # NOTE: We modify client_socket in the loop, so we need to copy below!
-            for fd, (cs, address, previous_data) in list(client_sockets.items()):
-                if fd in readable:
+                # Read data from existing event unix socket connections
+                for fd in readable & client_sockets.keys():
+                    cs, address, previous_data = client_sockets[fd]
                     try:
-                        new_data = cs.recv(4096)
+                        new_data = cs.recv(self._stream_recv_size)
                     except Exception:
                         new_data = b""
                         self._logger.exception("Exception during syslog socket_tcp recv")
@@ -747,42 +779,71 @@ class EventServer(ECServerThread):
                         client_sockets[fd] = (cs, address, unprocessed)
                     else:  # the other side is gone, no more data will ever come
                         del client_sockets[fd]  # discarding previous_data is OK, it's incomplete
+                        selector.unregister(cs)
                         cs.close()  # do this *after* the bookkeeping above, close() can throw
 
-            # Read data from pipe
-            if pipe in readable:
-                try:
-                    unprocessed_pipe_data += os.read(pipe, 4096)
-                except Exception:
-                    self._logger.exception("General exception during pipe os.read")
+                # Read data from pipe
+                if pipe in readable:
+                    try:
+                        unprocessed_pipe_data += os.read(pipe, self._stream_recv_size)
+                    except Exception:
+                        self._logger.exception("General exception during pipe os.read")
 
-                messages, unprocessed_pipe_data = parse_bytes_into_syslog_messages(
-                    unprocessed_pipe_data
-                )
-                self.process_syslog_messages(messages, None)
+                    messages, unprocessed_pipe_data = parse_bytes_into_syslog_messages(
+                        unprocessed_pipe_data
+                    )
+                    self.process_syslog_messages(messages, None)
+
+                # Read events from builtin syslog server
+                if self._syslog_udp is not None and self._syslog_udp.fileno() in readable:
+                    # Consecutive datagrams of a sender are processed as one batch, which keeps
+                    # the messages of all senders in the order they arrived in.
+                    for address, datagrams in itertools.groupby(
+                        [
+                            (message, parse_address("syslog socket (UDP)", address))
+                            for message, address in _drain_datagrams(
+                                self._syslog_udp, 4096, self._max_datagrams_per_batch
+                            )
+                        ],
+                        key=lambda datagram: datagram[1],
+                    ):
+                        self.process_syslog_messages(
+                            [message for message, _address in datagrams], address
+                        )
 
-            # Read events from builtin syslog server
-            if self._syslog_udp is not None and self._syslog_udp in readable:
-                message, address = self._syslog_udp.recvfrom(4096)
-                self.process_syslog_messages(
-                    [message], parse_address("syslog socket (UDP)", address)
-                )
+                # Read events from builtin snmptrap server
+                if (
+                    self._snmp_trap_socket is not None
+                    and self._snmp_trap_socket.fileno() in readable
+                ):
+                    for message, address in _drain_datagrams(
+                        self._snmp_trap_socket, 65535, self._max_datagrams_per_batch
+                    ):
+                        self.process_potential_event_instrumented(
+                            self.create_events_from_trap(
+                                message, parse_address("SNMP trap", address)
+                            )
+                        )
 
-            # Read events from builtin snmptrap server
-            if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
-                message, address = self._snmp_trap_socket.recvfrom(65535)
-                self.process_potential_event_instrumented(
-                    self.create_events_from_trap(message, parse_address("SNMP trap", address))
-                )
+                # enable fast processing to process further files, otherwise restore the default
+                select_timeout = 0.0 if self._process_spool_files() else 1.0
 
-            if spool_files := sorted(
-                self.settings.paths.spool_dir.value.glob("[!.]*"), key=lambda x: x.stat().st_mtime
-            ):
-                self.process_syslog_messages(spool_files[0].read_bytes().splitlines(), None)
-                spool_files[0].unlink()
-                select_timeout = 0  # enable fast processing to process further files
-            else:
-                select_timeout = 1  # restore default select timeout
+    def _process_spool_files(self) -> bool:
+        """Process the oldest spool files, returns whether there may be more of them"""
+        try:
+            with os.scandir(self.settings.paths.spool_dir.value) as entries:
+                spool_files = sorted(
+                    (entry.stat().st_mtime, entry.path)
+                    for entry in entries
+                    if not entry.name.startswith(".")
+                )
+        except FileNotFoundError:
+            return False
+        for _mtime, path in spool_files[: self._max_spool_files_per_batch]:
+            spool_file = Path(path)
+            self.process_syslog_messages(spool_file.read_bytes().splitlines(), None)
+            spool_file.unlink()
+        return bool(spool_files)
 
     def create_events_from_trap(self, data: bytes, address: tuple[str, int]) -> Iterator[Event]:
         try:
@@ -1025,9 +1086,8 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
-                for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                for event in self._event_status.events_of_rule(rule["id"]):
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expect["count"]:  # no -> trigger alarm
@@ -1084,10 +1144,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge  # type: ignore[unreachable]
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1105,7 +1163,9 @@ class EventServer(ECServerThread):
             merge_event["text"] = text
             # Better rewrite (again). Rule might have changed. Also we have changed
             # the text and the user might have his own text added via set_text.
+            previous_host = merge_event["host"]
             self.rewrite_event(rule, merge_event, MatchGroups(), set_first=False)
+            self._event_status.reindex_host(merge_event, previous_host, merge_event["core_host"])
             self._history.add(merge_event, "COUNTFAILED")
         else:
             # Create artificial event from scratch. Make sure that all important
@@ -1213,6 +1273,8 @@ class EventServer(ECServerThread):
                         ):
                             count_unspecific += 1
 
+        self._rule_prefilter = RulePrefilter(self._rules)
+
         self._logger.info(
             "Compiled %(count_rules)d active rules (ignoring %(count_disabled)d disabled rules)",
             {"count_rules": count_rules, "count_disabled": count_disabled},
@@ -1294,6 +1356,18 @@ class EventServer(ECServerThread):
                 },
             )
 
+        considered = self._prefilter_stats["skipped"] + self._prefilter_stats["tried"]
+        if considered:
+            self._logger.info(
+                "Rule prefilter: skipped %(skipped)d of %(considered)d rule candidates "
+                "(%(percentage).2f%%), %(hits)d of %(tried)d tried rules matched",
+                {
+                    "considered": considered,
+                    "percentage": 100.0 * self._prefilter_stats["skipped"] / considered,
+                    **self._prefilter_stats,
+                },
+            )
+
     def process_potential_event(self, event: Event) -> None:
         self.do_translate_hostname(event)
 
@@ -1302,9 +1376,13 @@ class EventServer(ECServerThread):
             self.log_message(event)
 
         # Rule optimizer
+        prefiltered: RuleCandidates | None = None
         if self._config["rule_optimizer"]:
             self._hash_stats[event["facility"]][event["priority"]] += 1
             rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+            # When debugging rules we want to see why each single rule did not match
+            if not self._config["debug_rules"]:
+                prefiltered = self._rule_prefilter.candidates(event)
         else:
             rule_candidates = self._rules
 
@@ -1314,6 +1392,12 @@ class EventServer(ECServerThread):
                 continue  # still in the rule pack that we want to skip
             skip_pack = None  # new pack, reset skipping
 
+            if prefiltered is not None:
+                if rule not in prefiltered:
+                    self._prefilter_stats["skipped"] += 1
+                    continue
+                self._prefilter_stats["tried"] += 1
+
             try:
                 result = self.event_rule_matches(rule, event)
             except Exception as e:
@@ -1323,6 +1407,8 @@ class EventServer(ECServerThread):
                 self._logger.exception(result.reason)
 
             if isinstance(result, MatchSuccess):
+                if prefiltered is not None:
+                    self._prefilter_stats["hits"] += 1
                 self._perfcounters.count("rule_hits")
                 if self._config["debug_rules"]:
                     self._logger.info(
@@ -2675,8 +2761,7 @@ class EventStatus:
         self._history = history
 
     def flush(self) -> None:
-        # TODO: Improve types!
-        self._events: list[Event] = []
+        self._set_events([])
         self._next_event_id = 1
         self._rule_stats: dict[str, int] = {}
         # needed for expecting rules
@@ -2688,15 +2773,67 @@ class EventStatus:
         # - number of rule hits
         # - number of rule misses
 
+    def _set_events(self, events: Iterable[Event]) -> None:
+        """(Re-)build the event store and its indexes
+
+        All dicts are keyed by event ID and keep the insertion order, so the
+        first entry is always the oldest event.
+        """
+        self._events: dict[int, Event] = {}
+        self._events_by_rule: dict[str | None, dict[int, Event]] = {}
+        self._events_by_rule_and_host: dict[tuple[str | None, HostName], dict[int, Event]] = {}
+        self._events_by_host: dict[HostName, dict[int, Event]] = {}
+        for event in events:
+            self._index_event(event)
+
+    def _index_event(self, event: Event) -> None:
+        eid = event["id"]
+        self._events[eid] = event
+        self._events_by_rule.setdefault(event["rule_id"], {})[eid] = event
+        self._events_by_rule_and_host.setdefault((event["rule_id"], event["host"]), {})[eid] = event
+        self._events_by_host.setdefault(event["host"], {})[eid] = event
+
+    def _unindex_event(self, event: Event) -> bool:
+        eid = event["id"]
+        if self._events.get(eid) is not event:
+            return False
+        del self._events[eid]
+        _remove_from_index(self._events_by_rule, event["rule_id"], eid)
+        _remove_from_index(self._events_by_rule_and_host, (event["rule_id"], event["host"]), eid)
+        _remove_from_index(self._events_by_host, event["host"], eid)
+        return True
+
+    def reindex_host(
+        self, event: Event, previous_host: HostName, previous_core_host: HostName | None
+    ) -> None:
+        """Move an event in the indexes and the event limit counters after its host has changed"""
+        if (host_key := (event["host"], event["core_host"])) != (
+            previous_key := (previous_host, previous_core_host)
+        ):
+            self.num_existing_events_by_host[previous_key] -= 1
+            self.num_existing_events_by_host[host_key] = (
+                self.num_existing_events_by_host.get(host_key, 0) + 1
+            )
+        if event["host"] == previous_host:
+            return
+        eid = event["id"]
+        _remove_from_index(self._events_by_rule_and_host, (event["rule_id"], previous_host), eid)
+        _remove_from_index(self._events_by_host, previous_host, eid)
+        self._events_by_rule_and_host.setdefault((event["rule_id"], event["host"]), {})[eid] = event
+        self._events_by_host.setdefault(event["host"], {})[eid] = event
+
     def events(self) -> list[Event]:
-        # TODO: Improve type!
-        return self._events
+        """All current events, oldest first
+
+        This is a copy, so the caller may remove events while iterating over it.
+        """
+        return list(self._events.values())
+
+    def events_of_rule(self, rule_id: str | None) -> list[Event]:
+        return list(self._events_by_rule.get(rule_id, {}).values())
 
     def event(self, eid: int) -> Event | None:
-        for event in self._events:
-            if event["id"] == eid:
-                return event
-        return None
+        return self._events.get(eid)
 
     def interval_start(self, rule_id: str, interval: ExpectInterval) -> int:
         """
@@ -2754,16 +2891,17 @@ class EventStatus:
     def pack_status(self) -> PackedEventStatus:
         return PackedEventStatus(
             next_event_id=self._next_event_id,
-            events=self._events,
+            events=self.events(),
             rule_stats=self._rule_stats,
             interval_starts=self._interval_starts,
         )
 
     def unpack_status(self, status: PackedEventStatus) -> None:
         self._next_event_id = status["next_event_id"]
-        self._events = status["events"]
+        self._set_events(status["events"])
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
+        self._initialize_event_limit_status()
 
     def save_status(self) -> None:
         now = time.time()
@@ -2793,11 +2931,12 @@ class EventStatus:
 
     def load_status(self, event_server: EventServer) -> None:
         path = self.settings.paths.status_file.value
+        events = self.events()
         if path.exists():
             try:
                 status = ast.literal_eval(path.read_text(encoding="utf-8"))
                 self._next_event_id = status["next_event_id"]
-                self._events = status["events"]
+                events: list[Event] = status["events"]
                 self._rule_stats = status["rule_stats"]
                 self._interval_starts = status.get("interval_starts", {})
                 self._logger.info("Loaded event state from %(path)s.", {"path": path})
@@ -2806,7 +2945,7 @@ class EventStatus:
                 raise
 
         # Add new columns and fix broken events
-        for event in self._events:
+        for event in events:
             event.setdefault("ipaddress", "")
             event.setdefault("host", HostName(""))
             event.setdefault("application", "")
@@ -2815,6 +2954,7 @@ class EventStatus:
             if "core_host" not in event:
                 event_server.add_core_host_to_event(event)
                 event["host_in_downtime"] = False
+        self._set_events(events)
 
         # core_host is needed to initialize the status
         self._initialize_event_limit_status()
@@ -2829,7 +2969,7 @@ class EventStatus:
 
         self.num_existing_events_by_host: dict[tuple[str, HostName | None], int] = {}
         self.num_existing_events_by_rule: dict[Any, int] = {}
-        for event in self._events:
+        for event in self._events.values():
             self._count_event_add(event)
 
     def _count_event_add(self, event: Event) -> None:
@@ -2855,7 +2995,7 @@ class EventStatus:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
         self._next_event_id += 1
-        self._events.append(event)
+        self._index_event(event)
         self.num_existing_events += 1
         self._count_event_add(event)
         self._history.add(event, "NEW")
@@ -2868,21 +3008,20 @@ class EventStatus:
         self._history.add(event, "ARCHIVED")
 
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
-        try:
-            self._events.remove(event)
-            self._history.add(event, delete_reason, user)
-            self._count_event_remove(event)
-        except ValueError:
-            self._logger.exception(
+        if not self._unindex_event(event):
+            self._logger.error(
                 "Cannot remove event %(event_id)d: not present", {"event_id": event["id"]}
             )
+            return
+        self._history.add(event, delete_reason, user)
+        self._count_event_remove(event)
 
     # protected by self.lock
     def remove_oldest_event(self, ty: LimitKind, event: Event) -> None:
         match ty:
             case "overall":
                 self._logger.log(VERBOSE, "  Removing oldest event")
-                oldest_event = self._events[0]
+                oldest_event = next(iter(self._events.values()))
                 self.remove_event(oldest_event, "AUTODELETE")
             case "by_rule":
                 if event["rule_id"] is not None:
@@ -2902,17 +3041,13 @@ class EventStatus:
 
     # protected by self.lock
     def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+        if events_of_rule := self._events_by_rule.get(rule_id):
+            self.remove_event(next(iter(events_of_rule.values())), "AUTODELETE")
 
     # protected by self.lock
-    def _remove_oldest_event_of_host(self, hostname: str) -> None:
-        for event in self._events:
-            if event["host"] == hostname:
-                self.remove_event(event, "AUTODELETE")
-                return
+    def _remove_oldest_event_of_host(self, hostname: HostName) -> None:
+        if events_of_host := self._events_by_host.get(hostname):
+            self.remove_event(next(iter(events_of_host.values())), "AUTODELETE")
 
     # protected by self.lock
     def get_num_existing_events_by(self, ty: LimitKind, event: Event) -> int:
@@ -2940,10 +3075,19 @@ class EventStatus:
         """
         with self.lock:
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            # Only events of the same host can be cancelled. When debugging rules we want to see
+            # why each single event of the rule was not cancelled.
+            candidates = (
+                self.events_of_rule(rule["id"])
+                if self._config["debug_rules"]
+                else list(
+                    self._events_by_rule_and_host.get(
+                        (rule["id"], self._cancelling_host(match_groups, new_event, rule)), {}
+                    ).values()
+                )
+            )
+            for event in candidates:
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -2990,11 +3134,8 @@ class EventStatus:
             for e in to_delete:
                 self.remove_event(e, "CANCELLED")
 
-    def cancelling_match(
-        self, match_groups: MatchGroups, new_event: Event, event: Event, rule: Rule
-    ) -> bool:
-        debug = self._config["debug_rules"]
-
+    @staticmethod
+    def _cancelling_host(match_groups: MatchGroups, new_event: Event, rule: Rule) -> HostName:
         # The match_groups of the canceling match only contain the *_ok match groups
         # Since the rewrite definitions are based on the positive match, we need to
         # create some missing keys. O.o
@@ -3009,7 +3150,14 @@ class EventStatus:
         host = new_event["host"]
         if "set_host" in rule:
             host = HostName(replace_groups(rule["set_host"], host, match_groups))
+        return host
 
+    def cancelling_match(
+        self, match_groups: MatchGroups, new_event: Event, event: Event, rule: Rule
+    ) -> bool:
+        debug = self._config["debug_rules"]
+
+        host = self._cancelling_host(match_groups, new_event, rule)
         if event["host"] != host:
             if debug:
                 self._logger.info(
@@ -3123,9 +3271,11 @@ class EventStatus:
         found.update(preserve)
 
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
+        for ev in self._events_by_rule.get(event["rule_id"], {}).values():
+            if ev["phase"] == "counting":
+                previous_host, previous_core_host = ev["host"], ev["core_host"]
                 self.count_event_up(ev, event)
+                self.reindex_host(ev, previous_host, previous_core_host)
                 return
 
         # None found, create one
@@ -3141,31 +3291,34 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
-                if ev["phase"] == "ack" and not count["count_ack"]:
-                    continue  # skip acknowledged events
-
-                if count["separate_host"] and ev["host"] != event["host"]:
-                    continue  # treat events with separated hosts separately
+        candidates = (
+            self._events_by_rule_and_host.get((event["rule_id"], event["host"]), {})
+            if count["separate_host"]
+            else self._events_by_rule.get(event["rule_id"], {})
+        )
+        for ev in candidates.values():
+            if ev["phase"] == "ack" and not count["count_ack"]:
+                continue  # skip acknowledged events
 
-                if count["separate_application"] and ev["application"] != event["application"]:
-                    continue  # same for application
+            if count["separate_application"] and ev["application"] != event["application"]:
+                continue  # same for application
 
-                if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
-                    continue
+            if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
+                continue
 
-                count_duration = count.get("count_duration")
-                if count_duration is not None and ev["first"] + count_duration < event["time"]:
-                    # Counting has been discontinued on this event after a certain time
-                    continue
+            count_duration = count.get("count_duration")
+            if count_duration is not None and ev["first"] + count_duration < event["time"]:
+                # Counting has been discontinued on this event after a certain time
+                continue
 
-                if ev["host_in_downtime"] != event["host_in_downtime"]:
-                    continue  # treat events with different downtime states separately
+            if ev["host_in_downtime"] != event["host_in_downtime"]:
+                continue  # treat events with different downtime states separately
 
-                found = ev
-                self.count_event_up(found, event)
-                break
+            found = ev
+            previous_host, previous_core_host = found["host"], found["core_host"]
+            self.count_event_up(found, event)
+            self.reindex_host(found, previous_host, previous_core_host)
+            break
         else:
             event["count"] = 1
             event["phase"] = "counting"
@@ -3181,7 +3334,7 @@ class EventStatus:
     def delete_events_by(
         self, predicate: Callable[[Event], bool], user: str, get_rule: Callable[[str], Rule | None]
     ) -> None:
-        for event in self._events[:]:
+        for event in self.events():
             if predicate(event):
                 event["phase"] = "closed"
                 if user:
@@ -3195,12 +3348,20 @@ class EventStatus:
                         self.interval_start(rule_id, event_rule["expect"]["interval"])
 
     def get_events(self) -> Iterable[Event]:
-        return self._events
+        return self.events()
 
     def get_rule_stats(self) -> Iterable[tuple[str, int]]:
         return sorted(self._rule_stats.items(), key=lambda x: x[0])
 
 
+def _remove_from_index[K](index: dict[K, dict[int, Event]], key: K, eid: int) -> None:
+    if (events := index.get(key)) is None:
+        return
+    events.pop(eid, None)
+    if not events:
+        del index[key]
+
+
 # .
 #   .--Replication---------------------------------------------------------.
 #   |           ____            _ _           _   _                        |
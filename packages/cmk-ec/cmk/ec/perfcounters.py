@@ -5,6 +5,7 @@
 from __future__ import annotations
 
 import time
+from collections import deque
 from collections.abc import Mapping, Sequence
 from logging import Logger
 
@@ -37,6 +38,9 @@ class Perfcounters:
         "request": 0.95,  # Client requests
     }
 
+    # Number of most recent times the percentiles are computed from
+    _time_samples = 1000
+
     # TODO: Why aren't self._times / self._rates / ... not initialized with their defaults?
     def __init__(self, logger: Logger) -> None:
         self._lock = ECLock(logger)
@@ -47,6 +51,9 @@ class Perfcounters:
         self._rates: dict[str, float] = {}
         self._average_rates: dict[str, float] = {}
         self._times: dict[str, float] = {}
+        self._recent_times = {
+            name: deque[float](maxlen=self._time_samples) for name in self._weights
+        }
         self._last_statistics: float | None = None
 
         self._logger = logger.getChild("Perfcounters")
@@ -61,6 +68,7 @@ class Perfcounters:
                 self._times[counter] = lerp(ptime, self._times[counter], self._weights[counter])
             else:
                 self._times[counter] = ptime
+            self._recent_times[counter].append(ptime)
 
     def do_statistics(self) -> None:
         with self._lock:
@@ -96,6 +104,9 @@ class Perfcounters:
         for name in cls._weights:
             columns.append((f"status_average_{name}_time", 0.0))
 
+        for name in cls._weights:
+            columns.append((f"status_p99_{name}_time", 0.0))
+
         return columns
 
     def get_status(self) -> Sequence[float]:
@@ -114,4 +125,15 @@ class Perfcounters:
             for name in self._weights:
                 row.append(self._times.get(name, 0.0))
 
+            for name in self._weights:
+                row.append(_percentile(self._recent_times[name], 0.99))
+
             return row
+
+
+def _percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile, 0.0 for no samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Cheap preselection of the rules an event may match
+
+Most rules can only match if some literal substring is contained in the message text, the syslog
+application or the host name. These literals are extracted from the rule patterns once and
+searched for all rules at the same time with an Aho-Corasick automaton, so only the rules whose
+literals have been found need to run their regular expressions.
+
+The prefilter only ever skips rules that cannot match, it never decides that a rule matches.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Sequence
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parser  # type: ignore[attr-defined]
+from typing import Final, Literal
+
+from .config import Rule, TextPattern
+from .event import Event
+
+type PrefilterField = Literal["text", "application", "host"]
+
+_FIELDS: Final[Sequence[PrefilterField]] = ("text", "application", "host")
+
+# Literals shorter than this are contained in too many texts to be worth it
+_MIN_LITERAL_LENGTH: Final = 2
+
+_REPEATS: Final = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT} | (
+    {sre_constants.POSSESSIVE_REPEAT} if hasattr(sre_constants, "POSSESSIVE_REPEAT") else set()
+)
+
+
+def required_literals(pattern: TextPattern) -> frozenset[str] | None:
+    """Lower case strings of which at least one is contained in every text the pattern matches
+
+    Returns None if no such strings can be determined. The texts are expected in lower case and
+    to be ASCII only: Case insensitive regex matching folds some non-ASCII characters to ASCII ones.
+    """
+    if isinstance(pattern, str):
+        # Plain strings are compared lower case anyway, see rule_matcher.match()
+        return frozenset({pattern}) if len(pattern) >= _MIN_LITERAL_LENGTH else None
+    try:
+        parsed = sre_parser.parse(pattern.pattern, pattern.flags)
+    except re.error:
+        return None
+    return _required_literals_of_sequence(parsed)
+
+
+def _required_literals_of_sequence(items: Iterable[tuple[object, object]]) -> frozenset[str] | None:
+    candidates: list[frozenset[str]] = []
+    run: list[str] = []
+
+    def flush() -> None:
+        if len(run) >= _MIN_LITERAL_LENGTH:
+            candidates.append(frozenset({"".join(run)}))
+        run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL and isinstance(av, int) and chr(av).isascii():
+            run.append(chr(av).lower())
+            continue
+
+        flush()
+        nested: frozenset[str] | None = None
+        if op is sre_constants.SUBPATTERN and isinstance(av, tuple):
+            nested = _required_literals_of_sequence(av[-1])
+        elif op is sre_constants.ATOMIC_GROUP and isinstance(av, sre_parser.SubPattern):
+            nested = _required_literals_of_sequence(av)
+        elif op in _REPEATS and isinstance(av, tuple) and av[0] >= 1:
+            nested = _required_literals_of_sequence(av[2])
+        elif op is sre_constants.BRANCH and isinstance(av, tuple):
+            branches = [_required_literals_of_sequence(branch) for branch in av[1]]
+            if all(branch is not None for branch in branches):
+                nested = frozenset().union(*(b for b in branches if b is not None))
+        if nested is not None:
+            candidates.append(nested)
+    flush()
+
+    # The most selective requirement is the one whose shortest alternative is the longest
+    return max(candidates, key=lambda c: (min(map(len, c)), -len(c)), default=None)
+
+
+class _AhoCorasick:
+    """Finds all occurrences of a set of words in a text in a single pass"""
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._output: list[frozenset[str]] = [frozenset()]
+        for word in words:
+            state = 0
+            for char in word:
+                if (next_state := self._goto[state].get(char)) is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._output.append(frozenset())
+                state = next_state
+            self._output[state] |= {word}
+
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = (
+                    self._goto[fail][char]
+                    if char in self._goto[fail] and self._goto[fail][char] != next_state
+                    else 0
+                )
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def search(self, text: str) -> set[str]:
+        goto, fail, output = self._goto, self._fail, self._output
+        found: set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class RulePrefilter:
+    """Determines the rules which may match an event by the literals required by their patterns
+
+    Rules without any required literal are candidates for all events.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        # per field: literal -> rules requiring one of their literals in that field
+        rules_by_literal: dict[PrefilterField, dict[str, set[int]]] = {f: {} for f in _FIELDS}
+        self._num_requirements: dict[int, int] = {}
+        for rule in rules:
+            requirements = _rule_requirements(rule)
+            if not requirements:
+                continue
+            self._num_requirements[id(rule)] = len(requirements)
+            for field, literals in requirements.items():
+                for literal in literals:
+                    rules_by_literal[field].setdefault(literal, set()).add(id(rule))
+        self._rules_by_literal = rules_by_literal
+        self._automatons = {field: _AhoCorasick(rules_by_literal[field]) for field in _FIELDS}
+
+    def candidates(self, event: Event) -> RuleCandidates:
+        texts = {
+            "text": event["text"],
+            "application": event["application"],
+            "host": event["host"],
+        }
+        if not self._num_requirements or not all(text.isascii() for text in texts.values()):
+            return RuleCandidates(None, frozenset())
+
+        fulfilled: dict[int, int] = {}
+        for field in _FIELDS:
+            if not (automaton := self._automatons[field]):
+                continue
+            rules_of_field: set[int] = set()
+            for literal in automaton.search(texts[field].lower()):
+                rules_of_field |= self._rules_by_literal[field][literal]
+            for rule_id in rules_of_field:
+                fulfilled[rule_id] = fulfilled.get(rule_id, 0) + 1
+
+        return RuleCandidates(
+            self._num_requirements.keys(),
+            frozenset(
+                rule_id
+                for rule_id, count in fulfilled.items()
+                if count == self._num_requirements[rule_id]
+            ),
+        )
+
+
+class RuleCandidates:
+    """The result of the prefilter for one event: Does a rule need to be evaluated?"""
+
+    def __init__(self, constrained: Iterable[int] | None, passed: frozenset[int]) -> None:
+        self._constrained = constrained
+        self._passed = passed
+
+    def __contains__(self, rule: Rule) -> bool:
+        if self._constrained is None:
+            return True
+        rule_id = id(rule)
+        return rule_id in self._passed or rule_id not in self._constrained
+
+
+def _rule_requirements(rule: Rule) -> dict[PrefilterField, frozenset[str]]:
+    """The literals of which at least one must be found per field for the rule to match
+
+    A rule matches either positively or cancelling, so the literals of both are alternatives.
+    Inverted rules match exactly when the patterns don't, so nothing is required for them.
+    Disabled rules may not even have compiled patterns.
+    """
+    if rule.get("invert_matching") or rule.get("disabled"):
+        return {}
+    requirements: dict[PrefilterField, frozenset[str]] = {}
+    for field, keys in (
+        ("text", ("match", "match_ok")),
+        ("application", ("match_application", "cancel_application")),
+        ("host", ("match_host",)),
+    ):
+        present = [rule[key] for key in keys if key in rule]  # type: ignore[literal-required]
+        if field == "text" and "match" not in rule:
+            continue  # an absent message pattern matches everything
+        if not present:
+            continue
+        literals = [required_literals(pattern) for pattern in present]
+        if all(lit is not None for lit in literals):
+            requirements[field] = frozenset().union(*(lit for lit in literals if lit is not None))
+    return requirements
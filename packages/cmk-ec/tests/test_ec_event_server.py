@@ -4,13 +4,23 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import logging
+import os
+import socket
+import threading
+import time
 
 import pytest
 
 import cmk.ec.export as ec
 from cmk.ccc.hostaddress import HostName
 from cmk.ec.config import Config, MatchGroups
-from cmk.ec.main import create_history, EventServer, StatusTableEvents, StatusTableHistory
+from cmk.ec.main import (
+    create_history,
+    EventServer,
+    EventStatus,
+    StatusTableEvents,
+    StatusTableHistory,
+)
 
 from .helpers import new_event
 
@@ -111,3 +121,95 @@ def test_rewrite_event_state(
     event_server.rewrite_event(rule=rule, event=event, match_groups=MatchGroups())
 
     assert event["state"] == expected
+
+
+def test_serve_reads_all_sources_in_batches(
+    monkeypatch: pytest.MonkeyPatch, settings: ec.Settings, event_server: EventServer
+) -> None:
+    received: list[tuple[list[bytes], tuple[str, int] | None]] = []
+    monkeypatch.setattr(
+        event_server,
+        "process_syslog_messages",
+        lambda messages, address: received.append((list(messages), address)),
+    )
+    settings.paths.event_pipe.value.parent.mkdir(parents=True, exist_ok=True)
+    event_server.create_pipe()
+    spool_dir = settings.paths.spool_dir.value
+    spool_dir.mkdir(parents=True)
+    for num in range(3):
+        (spool_dir / f"spool-{num}").write_bytes(b"spooled %d\nspooled again %d\n" % (num, num))
+        os.utime(spool_dir / f"spool-{num}", (num, num))
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as syslog_udp:
+        syslog_udp.bind(("127.0.0.1", 0))
+        event_server._syslog_udp = syslog_udp  # noqa: SLF001
+        thread = threading.Thread(target=event_server.serve)
+        thread.start()
+        try:
+            with (
+                socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender_1,
+                socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender_2,
+            ):
+                senders = [sender_1, sender_2]
+                for sender in senders:
+                    sender.bind(("127.0.0.1", 0))
+                sender_addresses = {sender.getsockname() for sender in senders}
+                for num in range(20):
+                    senders[num // 3 % 2].sendto(b"datagram %d" % num, syslog_udp.getsockname())
+            pipe = os.open(settings.paths.event_pipe.value, os.O_WRONLY)
+            os.write(pipe, b"piped 1\npiped 2\n")
+            os.close(pipe)
+
+            deadline = time.time() + 10
+            while time.time() < deadline and sum(len(m) for m, _a in received) < 28:
+                time.sleep(0.01)
+        finally:
+            event_server.terminate()
+            thread.join()
+
+    messages = [message for batch, _address in received for message in batch]
+    assert [message for message in messages if message.startswith(b"spooled")] == [
+        b"spooled 0",
+        b"spooled again 0",
+        b"spooled 1",
+        b"spooled again 1",
+        b"spooled 2",
+        b"spooled again 2",
+    ]
+    assert len(messages) == 28
+    assert [message for message in messages if message.startswith(b"piped")] == [
+        b"piped 1",
+        b"piped 2",
+    ]
+    assert [message for message in messages if message.startswith(b"datagram")] == [
+        b"datagram %d" % num for num in range(20)
+    ]
+    assert {address for _batch, address in received if address} == sender_addresses
+    assert not list(spool_dir.iterdir())
+
+
+def test_merged_absent_event_is_cancelled_with_its_rewritten_host(
+    event_server: EventServer, event_status: EventStatus
+) -> None:
+    rule = _make_rule(2) | ec.Rule(
+        id="expected",
+        expect=ec.Expect(interval=60, count=1, merge="open"),
+        # Every rewrite prepends to the host again, so the merge changes the host of the event
+        set_host="absent-\\0",
+    )
+    event_server._handle_absent_event(rule, rule["expect"], 0, time.time())  # noqa: SLF001
+    event_server._handle_absent_event(rule, rule["expect"], 0, time.time())  # noqa: SLF001
+    assert [(event["host"], event["count"]) for event in event_status.events()] == [
+        ("absent-absent-", 2)
+    ]
+    assert event_status.get_num_existing_events_by("by_host", event_status.events()[0]) == 1
+
+    event_status.cancel_events(
+        event_server,
+        StatusTableEvents.columns,
+        new_event(ec.Event(host=HostName("absent-"), application="")),
+        MatchGroups(),
+        rule,
+    )
+
+    assert event_status.events() == []
@@ -9,7 +9,8 @@ import pytest
 
 import cmk.ec.export as ec
 from cmk.ccc.hostaddress import HostName
-from cmk.ec.main import EventStatus, StatusServer
+from cmk.ec.config import Config, MatchGroups
+from cmk.ec.main import EventServer, EventStatus, StatusServer, StatusTableEvents
 
 from .helpers import FakeStatusSocket, new_event
 
@@ -128,3 +129,61 @@ def test_mkevent_query_filters(
     status_server.handle_client(status_socket, True, "127.0.0.1")
     response = status_socket.get_response()
     assert (len(response) == 2) is is_match
+
+
+def test_event_status_indexes_follow_event_lifecycle(event_status: EventStatus) -> None:
+    for num in range(30):
+        event_status.new_event(
+            new_event(
+                {
+                    "rule_id": f"rule-{num % 3}",
+                    "host": HostName(f"host-{num % 5}"),
+                    "core_host": HostName(f"host-{num % 5}"),
+                }
+            )
+        )
+
+    assert [ev["id"] for ev in event_status.events_of_rule("rule-1")] == list(range(2, 31, 3))
+    assert event_status.event(17) is not None
+
+    event_status.remove_oldest_event("by_rule", new_event({"rule_id": "rule-1"}))
+    event_status.remove_oldest_event("by_host", new_event({"host": HostName("host-3")}))
+    event_status.remove_oldest_event("overall", new_event({}))
+
+    assert [ev["id"] for ev in event_status.events()][:3] == [3, 5, 6]
+    assert event_status.event(2) is None
+    assert event_status.event(4) is None
+    assert len(event_status.events_of_rule("rule-1")) == 9
+
+    event_status.delete_events_by(lambda ev: ev["rule_id"] == "rule-2", "", lambda _rule_id: None)
+
+    assert not event_status.events_of_rule("rule-2")
+    assert len(event_status.events()) == 17
+
+
+@pytest.mark.parametrize("debug_rules", [False, True])
+def test_cancel_events_of_the_same_host(
+    config: Config, event_status: EventStatus, event_server: EventServer, debug_rules: bool
+) -> None:
+    config["debug_rules"] = debug_rules
+    for host_name in ("host-1", "host-2", "host-1"):
+        event_status.new_event(
+            new_event(
+                {
+                    "rule_id": "rule",
+                    "host": HostName(host_name),
+                    "core_host": HostName(host_name),
+                    "match_groups": ("1",),
+                }
+            )
+        )
+
+    event_status.cancel_events(
+        event_server,
+        StatusTableEvents.columns,
+        new_event({"rule_id": "rule", "host": HostName("host-1"), "text": "recovered"}),
+        MatchGroups(match_groups_message_ok=("1",)),
+        ec.Rule(id="rule"),
+    )
+
+    assert [(ev["id"], ev["host"]) for ev in event_status.events()] == [(2, "host-2")]
@@ -82,6 +82,8 @@ def test_perfcounters_column_default_values() -> None:
         if (
             column_name.startswith("status_average_")
             and column_name.endswith("_time")
+            or column_name.startswith("status_p99_")
+            and column_name.endswith("_time")
             or column_name.startswith("status_average_")
             and column_name.endswith("_rate")
             or column_name.startswith("status_")
@@ -120,6 +122,9 @@ def test_perfcounters_correct_status_values() -> None:
             counter_name = column_name.split("_")[-2]
             assert column_value == c._times.get(counter_name, 0.0)
 
+        elif column_name.startswith("status_p99_") and column_name.endswith("_time"):
+            assert column_value == 0.0
+
         elif column_name.startswith("status_average_") and column_name.endswith("_rate"):
             counter_name = column_name.split("_")[-2]
             assert column_value == c._average_rates.get(counter_name, 0.0)
@@ -136,3 +141,24 @@ def test_perfcounters_correct_status_values() -> None:
 
         else:
             raise NotImplementedError
+
+
+def test_perfcounters_p99_time() -> None:
+    c = Perfcounters(logger)
+    for ptime in range(1, 201):
+        c.count_time("processing", ptime / 1000)
+
+    status = dict(zip([n for n, _d in c.status_columns()], c.get_status()))
+    assert status["status_p99_processing_time"] == 0.199
+    assert status["status_p99_request_time"] == 0.0
+
+
+def test_perfcounters_p99_time_uses_recent_samples() -> None:
+    c = Perfcounters(logger)
+    for _x in range(c._time_samples):
+        c.count_time("processing", 10.0)
+    for _x in range(c._time_samples):
+        c.count_time("processing", 0.5)
+
+    status = dict(zip([n for n, _d in c.status_columns()], c.get_status()))
+    assert status["status_p99_processing_time"] == 0.5
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import random
+import re
+from collections.abc import Sequence
+
+import pytest
+
+import cmk.ec.export as ec
+from cmk.ccc.hostaddress import HostName
+from cmk.ccc.site import SiteId
+from cmk.ec.config import TextPattern
+from cmk.ec.rule_matcher import compile_rule
+from cmk.ec.rule_prefilter import _AhoCorasick, required_literals, RulePrefilter
+
+from .helpers import new_event
+
+_WORDS = ["disk", "full", "error", "ok", "backup", "link", "down", "up", "eth0", "sshd", "cron"]
+_PATTERNS = [
+    "{0}",
+    "{0} {1}",
+    "^{0}.*{1}$",
+    "{0}|{1}",
+    "({0}|{1}) failed",
+    "{0}(ed)? (\\d+)",
+    "(?:{0})+",
+    "{0}?{1}",
+    "[a-z]+ {0}",
+    ".*",
+    "{0}\\b",
+    "(?i:{0})",
+]
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        pytest.param("Disk Full", {"disk full"}, id="plain string"),
+        pytest.param(re.compile("^Disk (\\d+) full$", re.I), {"disk "}, id="longest run"),
+        pytest.param(re.compile("(sshd|cron)\\[\\d+\\]", re.I), {"sshd", "cron"}, id="branch"),
+        pytest.param(re.compile("sshd|.*", re.I), None, id="branch without literal"),
+        pytest.param(re.compile("(backup)?ok", re.I), {"ok"}, id="optional group"),
+        pytest.param(re.compile("(?:backup)+", re.I), {"backup"}, id="repeated group"),
+        pytest.param(re.compile("[a-z]+\\d*", re.I), None, id="no literal"),
+        pytest.param(re.compile("x.y", re.I), None, id="too short"),
+        pytest.param(re.compile("Größe", re.I), {"gr"}, id="non ascii"),
+    ],
+)
+def test_required_literals(pattern: TextPattern, expected: set[str] | None) -> None:
+    if isinstance(pattern, str):
+        pattern = pattern.lower()
+    assert required_literals(pattern) == (None if expected is None else frozenset(expected))
+
+
+def test_aho_corasick_finds_all_words() -> None:
+    rng = random.Random(42)
+    for _ in range(1000):
+        words = {
+            "".join(rng.choice("abc") for _ in range(rng.randint(1, 5)))
+            for _ in range(rng.randint(0, 15))
+        }
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 30)))
+        assert _AhoCorasick(words).search(text) == {w for w in words if w in text}, (words, text)
+
+
+def _random_pattern(rng: random.Random) -> str:
+    return rng.choice(_PATTERNS).format(*rng.sample(_WORDS, 2))
+
+
+def _random_rules(rng: random.Random, count: int) -> Sequence[ec.Rule]:
+    rules = []
+    for num in range(count):
+        rule = ec.Rule(id=f"rule-{num}", pack="pack", match=_random_pattern(rng))
+        if rng.random() < 0.2:
+            rule["match_ok"] = _random_pattern(rng)
+        if rng.random() < 0.2:
+            rule["match_application"] = rng.choice(_WORDS)
+        if rng.random() < 0.1:
+            rule["cancel_application"] = _random_pattern(rng)
+        if rng.random() < 0.2:
+            rule["match_host"] = rng.choice(["host-1", "host-\\d+", "(web|db)-.*"])
+        if rng.random() < 0.05:
+            rule["invert_matching"] = True
+        compile_rule(rule)
+        rules.append(rule)
+    return rules
+
+
+def _random_event(rng: random.Random) -> ec.Event:
+    return new_event(
+        {
+            "text": " ".join(
+                rng.choice([*_WORDS, "failed", "Failed", "123", "ERROR", "Kelvin"])
+                for _ in range(rng.randint(0, 6))
+            ),
+            "application": rng.choice(["", *_WORDS]),
+            "host": HostName(rng.choice(["host-1", "host-22", "web-1", "db-2", "other"])),
+        }
+    )
+
+
+def test_prefilter_never_skips_matching_rules() -> None:
+    rng = random.Random(4711)
+    rules = _random_rules(rng, 300)
+    prefilter = RulePrefilter(rules)
+    matcher = ec.RuleMatcher(None, SiteId("test_site"), lambda _time_period_name: True)
+
+    skipped = 0
+    for _ in range(300):
+        event = _random_event(rng)
+        candidates = prefilter.candidates(event)
+        for rule in rules:
+            if rule not in candidates:
+                skipped += 1
+                assert isinstance(matcher.event_rule_matches(rule, event), ec.MatchFailure), (
+                    rule,
+                    event,
+                )
+
+    assert skipped > 0
+
+
+def test_prefilter_passes_everything_for_non_ascii_texts() -> None:
+    rule = ec.Rule(id="1", pack="pack", match="size")
+    compile_rule(rule)
+
+    assert rule in RulePrefilter([rule]).candidates(new_event({"text": "ſize"}))
+    assert rule not in RulePrefilter([rule]).candidates(new_event({"text": "length"}))
+
+
+def test_prefilter_narrows_down_many_rules() -> None:
+    rules = []
+    for num in range(3000):
+        rule = ec.Rule(
+            id=f"rule-{num}",
+            pack="pack",
+            match=f"(app{num}|service{num}).*(error|failed) (\\d+)",
+        )
+        compile_rule(rule)
+        rules.append(rule)
+
+    candidates = RulePrefilter(rules).candidates(new_event({"text": "service17 reported error 4"}))
+
+    # The first ten rules require "error" or "failed", which is longer than "app0" to "app9"
+    assert [rule["id"] for rule in rules if rule in candidates] == [
+        *(f"rule-{num}" for num in range(10)),
+        "rule-17",
+    ]
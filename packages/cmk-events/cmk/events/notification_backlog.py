@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""The most recent raw notification contexts, kept for the analysis and replay of notifications
+
+The backlog is a ring buffer: Every context is stored in its own file named after its sequence
+number and the file "head" holds the sequence number of the newest context. Adding a context and
+reading a context by its number only touch a constant number of small files, no matter how large
+the backlog is.
+"""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+from cmk.ccc import store
+
+from .event_context import EventContext
+
+_HEAD = "head"
+
+
+class NotificationBacklog:
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+        self._head = directory / _HEAD
+        # Earlier versions rewrote the whole backlog in this file for every notification
+        self._legacy_path = directory.with_name("backlog.mk")
+
+    def append(self, context: EventContext, *, size: int) -> None:
+        """Add the context as number 0 and forget the contexts beyond the size"""
+        if not size:
+            self.clear()
+            return
+
+        with store.locked(self._head):
+            if (newest := self._newest()) is None:
+                newest = self._take_over_legacy_backlog()
+            newest += 1
+            store.save_object_to_file(self._directory / str(newest), context)
+            # Also removes the surplus contexts after the size has been reduced
+            oldest_surplus = newest - size
+            while self._remove(oldest_surplus):
+                oldest_surplus -= 1
+            store.save_text_to_file(self._head, str(newest))
+
+    def get(self, nr: int) -> EventContext | None:
+        """The context number nr, counted from the newest one, which is number 0"""
+        if nr < 0:
+            return None
+        if (newest := self._newest()) is None:
+            legacy_backlog = self._legacy_backlog()
+            return legacy_backlog[nr] if nr < len(legacy_backlog) else None
+        return store.load_object_from_file(self._directory / str(newest - nr), default=None)
+
+    def __iter__(self) -> Iterator[EventContext]:
+        """The contexts, newest first"""
+        if (newest := self._newest()) is None:
+            yield from self._legacy_backlog()
+            return
+        for sequence_number in range(newest, -1, -1):
+            if (
+                context := store.load_object_from_file(
+                    self._directory / str(sequence_number), default=None
+                )
+            ) is None:
+                return
+            yield context
+
+    def clear(self) -> None:
+        self._legacy_path.unlink(missing_ok=True)
+        if not self._directory.exists():
+            return
+        with store.locked(self._head):
+            for path in self._directory.iterdir():
+                if path.name != _HEAD:
+                    path.unlink(missing_ok=True)
+            self._head.unlink(missing_ok=True)
+
+    def _newest(self) -> int | None:
+        head = store.load_text_from_file(self._head)
+        return int(head) if head else None
+
+    def _remove(self, sequence_number: int) -> bool:
+        try:
+            (self._directory / str(sequence_number)).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _legacy_backlog(self) -> list[EventContext]:
+        return store.load_object_from_file(self._legacy_path, default=[])
+
+    def _take_over_legacy_backlog(self) -> int:
+        """Store the contexts of the legacy backlog file and return the newest sequence number"""
+        legacy_backlog = self._legacy_backlog()
+        for sequence_number, context in enumerate(reversed(legacy_backlog)):
+            store.save_object_to_file(self._directory / str(sequence_number), context)
+        self._legacy_path.unlink(missing_ok=True)
+        return len(legacy_backlog) - 1
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from pathlib import Path
+
+import pytest
+
+from cmk.ccc import store
+from cmk.events.event_context import EventContext
+from cmk.events.notification_backlog import NotificationBacklog
+
+
+def _context(nr: int) -> EventContext:
+    return EventContext({"HOSTNAME": f"host{nr}", "MICROTIME": str(nr)})
+
+
+def test_backlog_keeps_the_newest_contexts(tmp_path: Path) -> None:
+    backlog = NotificationBacklog(tmp_path / "backlog")
+    for nr in range(5):
+        backlog.append(_context(nr), size=3)
+
+    assert list(backlog) == [_context(4), _context(3), _context(2)]
+    assert backlog.get(0) == _context(4)
+    assert backlog.get(2) == _context(2)
+    assert backlog.get(3) is None
+    assert backlog.get(-1) is None
+    assert len(list((tmp_path / "backlog").iterdir())) == 4  # including the head
+
+
+def test_backlog_shrinks(tmp_path: Path) -> None:
+    backlog = NotificationBacklog(tmp_path / "backlog")
+    for nr in range(5):
+        backlog.append(_context(nr), size=5)
+    backlog.append(_context(5), size=2)
+
+    assert list(backlog) == [_context(5), _context(4)]
+
+
+def test_backlog_is_cleared_without_size(tmp_path: Path) -> None:
+    backlog = NotificationBacklog(tmp_path / "backlog")
+    backlog.append(_context(0), size=3)
+    backlog.append(_context(1), size=0)
+
+    assert not list(backlog)
+    assert backlog.get(0) is None
+    backlog.append(_context(2), size=3)
+    assert list(backlog) == [_context(2)]
+
+
+def test_backlog_takes_over_legacy_backlog(tmp_path: Path) -> None:
+    legacy_path = tmp_path / "backlog.mk"
+    store.save_object_to_file(legacy_path, [_context(1), _context(0)])
+    backlog = NotificationBacklog(tmp_path / "backlog")
+
+    assert backlog.get(1) == _context(0)
+    assert list(backlog) == [_context(1), _context(0)]
+
+    backlog.append(_context(2), size=10)
+    assert list(backlog) == [_context(2), _context(1), _context(0)]
+    assert not legacy_path.exists()
+
+
+def test_append_only_writes_the_new_context(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backlog = NotificationBacklog(tmp_path / "backlog")
+    for nr in range(100):
+        backlog.append(_context(nr), size=100)
+    written: list[Path] = []
+    save_object_to_file = store.save_object_to_file
+    monkeypatch.setattr(
+        store,
+        "save_object_to_file",
+        lambda path, data: (written.append(path), save_object_to_file(path, data)),
+    )
+
+    backlog.append(_context(100), size=100)
+
+    assert written == [tmp_path / "backlog" / "100"]
+    assert len(list((tmp_path / "backlog").iterdir())) == 101  # including the head
+    assert backlog.get(99) == _context(1)
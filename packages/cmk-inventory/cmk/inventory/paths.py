@@ -57,6 +57,7 @@ class Paths:
         self.archive_dir = omd_root / "var/check_mk/inventory_archive"
         self.delta_cache_dir = omd_root / "var/check_mk/inventory_delta_cache"
         self.auto_dir = omd_root / "var/check_mk/autoinventory"
+        self.indexed_tree_dir = omd_root / "var/check_mk/inventory_indexed"
 
     @property
     def inventory_marker_file(self) -> Path:
@@ -74,6 +75,9 @@ class Paths:
             legacy=self.inventory_dir / f"{host_name}.gz",
         )
 
+    def inventory_tree_indexed(self, host_name: HostName) -> Path:
+        return self.indexed_tree_dir / f"{host_name}.sdi"
+
     @property
     def status_data_marker_file(self) -> Path:
         return self.status_data_dir / ".last"
@@ -17,9 +17,11 @@ import contextlib
 import gzip
 import io
 import json
+import mmap
 import os
 import pprint
 import shutil
+import struct
 from collections import Counter
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
@@ -672,6 +674,10 @@ class ImmutableTree:
             + [len(node) for node in self.nodes_by_name.values()]
         )
 
+    def __bool__(self) -> bool:
+        # Stops at the first node with data instead of counting (and loading) all of them
+        return bool(self.attributes or self.table or any(self.nodes_by_name.values()))
+
     @override
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, MutableTree | ImmutableTree):
@@ -1146,29 +1152,65 @@ def _merge_tables(left: ImmutableTable, right: ImmutableTable) -> ImmutableTable
     )
 
 
-def merge_trees(left: ImmutableTree, right: ImmutableTree) -> ImmutableTree:
-    compared_node_names = _DictKeys.compare(
-        left=set(left.nodes_by_name),
-        right=set(right.nodes_by_name),
-    )
+class _MergedNodes(Mapping[SDNodeName, ImmutableTree]):
+    """The child nodes of two merged trees, each one is merged on first access
 
-    nodes_by_name: dict[SDNodeName, ImmutableTree] = {}
-    for name in compared_node_names.only_left:
-        nodes_by_name[name] = left.nodes_by_name[name]
+    The lazily loaded nodes of an indexed tree thus stay unloaded until they are accessed.
+    """
 
-    for name in compared_node_names.both:
-        nodes_by_name[name] = merge_trees(
-            left=left.nodes_by_name[name], right=right.nodes_by_name[name]
-        )
+    def __init__(
+        self, left: Mapping[SDNodeName, ImmutableTree], right: Mapping[SDNodeName, ImmutableTree]
+    ) -> None:
+        self._left = left
+        self._right = right
+        self._names = {**dict.fromkeys(left), **dict.fromkeys(right)}
+        self._merged: dict[SDNodeName, ImmutableTree] = {}
 
-    for name in compared_node_names.only_right:
-        nodes_by_name[name] = right.nodes_by_name[name]
+    @override
+    def __getitem__(self, name: SDNodeName) -> ImmutableTree:
+        if (node := self._merged.get(name)) is None:
+            if name not in self._names:
+                raise KeyError(name)
+            if name not in self._right:
+                node = self._left[name]
+            elif name not in self._left:
+                node = self._right[name]
+            else:
+                node = merge_trees(self._left[name], self._right[name])
+            self._merged[name] = node
+        return node
+
+    @override
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    @override
+    def __iter__(self) -> Iterator[SDNodeName]:
+        return iter(self._names)
 
+    @override
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @override
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    @override
+    def __reduce__(self) -> tuple[type[dict], tuple[dict[SDNodeName, ImmutableTree]]]:
+        return dict, (dict(self),)
+
+
+def merge_trees(left: ImmutableTree, right: ImmutableTree) -> ImmutableTree:
     return ImmutableTree(
         path=left.path,
         attributes=_merge_attributes(left.attributes, right.attributes),
         table=_merge_tables(left.table, right.table),
-        nodes_by_name=nodes_by_name,
+        nodes_by_name=(
+            _MergedNodes(left.nodes_by_name, right.nodes_by_name)
+            if left.nodes_by_name and right.nodes_by_name
+            else left.nodes_by_name or right.nodes_by_name
+        ),
     )
 
 
@@ -1598,6 +1640,166 @@ def deserialize_delta_tree(raw_tree: SDRawDeltaTree) -> ImmutableDeltaTree:
     return _deserialize_delta_tree(path=(), raw_tree=raw_tree)
 
 
+# .
+#   .--indexed trees-------------------------------------------------------.
+
+# An indexed tree file holds the nodes of a tree as separately serialized records together with
+# an index of their positions, so single nodes can be read without parsing the whole tree:
+#   <magic> <length of the index: 4 bytes, big endian> <index> <record> <record> ...
+# The index is a JSON object:
+#   {"source": [<mtime_ns>, <size>], "nodes": [[<path>, <offset>, <length>], ...]}
+# The offsets are relative to the first record. "source" identifies the JSON tree file the
+# indexed tree file has been created from, it is only used as long as this file is unchanged.
+
+_INDEXED_TREE_MAGIC = b"CMKSDI1\n"
+# Smaller JSON tree files are parsed as a whole quickly enough, indexing them would only cost a
+# third file write per inventory update
+_INDEXED_TREE_MIN_SIZE = 64 * 1024
+_INDEXED_TREE_INDEX_LENGTH = struct.Struct(">I")
+
+
+def _serialize_indexed_tree(raw_tree: SDRawTree, *, source: os.stat_result) -> bytes:
+    records = io.BytesIO()
+    nodes: list[tuple[SDPath, int, int]] = []
+
+    def _add(path: SDPath, raw_node: SDRawTree) -> None:
+        record = json.dumps(
+            {"Attributes": raw_node.get("Attributes", {}), "Table": raw_node.get("Table", {})}
+        ).encode("utf-8")
+        nodes.append((path, records.tell(), len(record)))
+        records.write(record)
+        for name, raw_child in raw_node.get("Nodes", {}).items():
+            _add(path + (name,), raw_child)
+
+    _add((), raw_tree)
+    index = json.dumps({"source": [source.st_mtime_ns, source.st_size], "nodes": nodes}).encode(
+        "utf-8"
+    )
+    return b"".join(
+        [
+            _INDEXED_TREE_MAGIC,
+            _INDEXED_TREE_INDEX_LENGTH.pack(len(index)),
+            index,
+            records.getvalue(),
+        ]
+    )
+
+
+class _IndexedTreeFile:
+    def __init__(
+        self,
+        data: mmap.mmap | bytes,
+        records_start: int,
+        records_by_path: Mapping[SDPath, tuple[int, int]],
+    ) -> None:
+        self._data = data
+        self._records_start = records_start
+        self._records_by_path = records_by_path
+        self._children: dict[SDPath, dict[SDNodeName, None]] = {}
+        for path in records_by_path:
+            if path:
+                self._children.setdefault(path[:-1], {})[path[-1]] = None
+
+    @classmethod
+    def parse(cls, data: mmap.mmap | bytes, source: os.stat_result) -> _IndexedTreeFile | None:
+        index_start = len(_INDEXED_TREE_MAGIC) + _INDEXED_TREE_INDEX_LENGTH.size
+        if data[: len(_INDEXED_TREE_MAGIC)] != _INDEXED_TREE_MAGIC:
+            return None
+        (index_length,) = _INDEXED_TREE_INDEX_LENGTH.unpack_from(data, len(_INDEXED_TREE_MAGIC))
+        index = json.loads(data[index_start : index_start + index_length])
+        if index["source"] != [source.st_mtime_ns, source.st_size]:
+            return None
+        return cls(
+            data,
+            index_start + index_length,
+            {
+                tuple(SDNodeName(n) for n in raw_path): (offset, length)
+                for raw_path, offset, length in index["nodes"]
+            },
+        )
+
+    def children(self, path: SDPath) -> dict[SDNodeName, None]:
+        return self._children.get(path, {})
+
+    def load_node(self, path: SDPath) -> ImmutableTree:
+        offset, length = self._records_by_path[path]
+        start = self._records_start + offset
+        raw_node = json.loads(self._data[start : start + length])
+        return ImmutableTree(
+            path=path,
+            attributes=_deserialize_attributes(raw_node["Attributes"]),
+            table=_deserialize_table(raw_node["Table"]),
+            nodes_by_name=_LazyNodes(self, path),
+        )
+
+
+class _LazyNodes(Mapping[SDNodeName, ImmutableTree]):
+    """The child nodes of a node from an indexed tree file, each one is loaded on first access"""
+
+    def __init__(self, tree_file: _IndexedTreeFile, path: SDPath) -> None:
+        self._tree_file = tree_file
+        self._path = path
+        self._names = tree_file.children(path)
+        self._loaded: dict[SDNodeName, ImmutableTree] = {}
+
+    @override
+    def __getitem__(self, name: SDNodeName) -> ImmutableTree:
+        if (node := self._loaded.get(name)) is None:
+            if name not in self._names:
+                raise KeyError(name)
+            node = self._loaded[name] = self._tree_file.load_node(self._path + (name,))
+        return node
+
+    @override
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    @override
+    def __iter__(self) -> Iterator[SDNodeName]:
+        return iter(self._names)
+
+    @override
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @override
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    @override
+    def __reduce__(self) -> tuple[type[dict], tuple[dict[SDNodeName, ImmutableTree]]]:
+        # The memory map can not be pickled or copied, the nodes can
+        return dict, (dict(self),)
+
+
+def _load_indexed_tree(tree_path: TreePath, indexed_tree_path: Path) -> ImmutableTree | None:
+    """Returns None if there is no indexed tree file matching the current JSON tree file"""
+    try:
+        source = tree_path.path.stat()
+        with indexed_tree_path.open("rb") as f:
+            # The lazily loaded nodes keep the mapping alive, but it stays valid without the
+            # file descriptor, so none is kept open per tree
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ, trackfd=False)
+    except (FileNotFoundError, ValueError):  # ValueError: empty file
+        return None
+    try:
+        tree_file = _IndexedTreeFile.parse(data, source)
+    except (KeyError, TypeError, ValueError, struct.error):
+        return None
+    return None if tree_file is None else tree_file.load_node(())
+
+
+def _save_indexed_tree(tree_path: TreePath, indexed_tree_path: Path, raw_tree: SDRawTree) -> bool:
+    """Returns False if the JSON tree file is too small to be worth an indexed tree file"""
+    # Has to be called after the JSON tree file has been written including its mtime
+    if (source := tree_path.path.stat()).st_size < _INDEXED_TREE_MIN_SIZE:
+        indexed_tree_path.unlink(missing_ok=True)
+        return False
+    indexed_tree_path.parent.mkdir(parents=True, exist_ok=True)
+    store.save_bytes_to_file(indexed_tree_path, _serialize_indexed_tree(raw_tree, source=source))
+    return True
+
+
 # .
 #   .--IO------------------------------------------------------------------.
 
@@ -1644,6 +1846,10 @@ def rename(
         (old_inv_tree_path_gz.legacy, new_inv_tree_path_gz.legacy),
         (old_stat_tree_path.path, new_stat_tree_path.path),
         (old_stat_tree_path.legacy, new_stat_tree_path.legacy),
+        (
+            inv_paths.inventory_tree_indexed(HostName(old_host_name)),
+            inv_paths.inventory_tree_indexed(HostName(new_host_name)),
+        ),
     ]:
         try:
             old_file_path.rename(new_file_path)
@@ -1720,6 +1926,7 @@ def _archive_inventory_tree(inv_paths: InventoryPaths, host_name: HostName) -> N
 
     tree_path_gz = inv_paths.inventory_tree_gz(host_name)
     archive_tree = inv_paths.archive_tree(host_name, int(tree_path_mtime.mtime))
+    inv_paths.inventory_tree_indexed(host_name).unlink(missing_ok=True)
 
     if tree_path_mtime.is_json:
         inv_paths.archive_host(host_name).mkdir(parents=True, exist_ok=True)
@@ -1821,6 +2028,11 @@ class RawInventoryStore:
         _save_raw_tree(tree_path, meta_and_raw_tree["raw_tree"])
         tree_path.legacy.unlink(missing_ok=True)
         os.utime(tree_path.path, (timestamp, timestamp))
+        _save_indexed_tree(
+            tree_path,
+            self.inv_paths.inventory_tree_indexed(host_name),
+            meta_and_raw_tree["raw_tree"],
+        )
 
         tree_path_gz = self.inv_paths.inventory_tree_gz(host_name)
         _save_raw_tree_gz(tree_path_gz, meta_and_raw_tree)
@@ -1836,7 +2048,26 @@ class InventoryStore:
         self.inv_paths = InventoryPaths(omd_root)
 
     def load_inventory_tree(self, *, host_name: HostName) -> ImmutableTree:
-        return _load_tree_from_tree_path(self.inv_paths.inventory_tree(host_name))
+        """The nodes are loaded lazily if the tree has been indexed, see index_inventory_tree"""
+        tree_path = self.inv_paths.inventory_tree(host_name)
+        if (
+            tree := _load_indexed_tree(tree_path, self.inv_paths.inventory_tree_indexed(host_name))
+        ) is not None:
+            return tree
+        return _load_tree_from_tree_path(tree_path)
+
+    def index_inventory_tree(self, *, host_name: HostName) -> bool:
+        """Create the indexed tree file of an inventory tree unless it is up to date"""
+        tree_path = self.inv_paths.inventory_tree(host_name)
+        indexed_tree_path = self.inv_paths.inventory_tree_indexed(host_name)
+        if _load_indexed_tree(tree_path, indexed_tree_path) is not None:
+            return False
+        if not (raw_tree := store.load_text_from_file(tree_path.path)):
+            return False
+        # The JSON tree file may still be in the legacy format, see transform()
+        return _save_indexed_tree(
+            tree_path, indexed_tree_path, serialize_tree(deserialize_tree(json.loads(raw_tree)))
+        )
 
     def save_inventory_tree(
         self, *, host_name: HostName, tree: MutableTree | ImmutableTree, meta: SDMeta
@@ -1846,6 +2077,7 @@ class InventoryStore:
         tree_path = self.inv_paths.inventory_tree(host_name)
         _save_raw_tree(tree_path, raw_tree)
         tree_path.legacy.unlink(missing_ok=True)
+        _save_indexed_tree(tree_path, self.inv_paths.inventory_tree_indexed(host_name), raw_tree)
 
         tree_path_gz = self.inv_paths.inventory_tree_gz(host_name)
         _save_raw_tree_gz(tree_path_gz, SDMetaAndRawTree(meta=meta, raw_tree=raw_tree))
@@ -1863,6 +2095,8 @@ class InventoryStore:
         tree_path_gz.path.unlink(missing_ok=True)
         tree_path_gz.legacy.unlink(missing_ok=True)
 
+        self.inv_paths.inventory_tree_indexed(host_name).unlink(missing_ok=True)
+
     def load_status_data_tree(self, *, host_name: HostName) -> ImmutableTree:
         return _load_tree_from_tree_path(self.inv_paths.status_data_tree(host_name))
 
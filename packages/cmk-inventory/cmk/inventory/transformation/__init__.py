@@ -3,6 +3,6 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-from cmk.inventory.transformation.main import transform_inventory_trees
+from cmk.inventory.transformation.main import index_inventory_trees, transform_inventory_trees
 
-__all__ = ["transform_inventory_trees"]
+__all__ = ["index_inventory_trees", "transform_inventory_trees"]
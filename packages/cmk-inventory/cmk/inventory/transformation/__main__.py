@@ -12,6 +12,7 @@ from collections.abc import Sequence
 from pathlib import Path
 
 from cmk.inventory.transformation.main import (
+    index_inventory_trees,
     transform_inventory_trees,
 )
 
@@ -38,6 +39,15 @@ def _parse_arguments(argv: Sequence[str]) -> Namespace:
         default=0,
         help="Specify the bundle length. Only applies if no host names are given.",
     )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        default=False,
+        help=(
+            "Create the indexed inventory tree files which allow to load single nodes of a tree."
+            " Only applies to inventory trees which have already been transformed."
+        ),
+    )
     parser.add_argument(
         "--host-name",
         nargs="*",
@@ -66,6 +76,12 @@ def main() -> int:
     omd_root = Path(os.environ.get("OMD_ROOT", ""))
     args = _parse_arguments(sys.argv)
     try:
+        if args.index:
+            return index_inventory_trees(
+                logger=logger,
+                omd_root=omd_root,
+                host_names=args.host_name or _collect_hosts(),
+            )
         return transform_inventory_trees(
             logger=logger,
             omd_root=omd_root,
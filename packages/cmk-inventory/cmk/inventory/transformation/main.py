@@ -16,7 +16,7 @@ from typing import TypedDict
 import cmk.ccc.store
 from cmk.ccc.hostaddress import HostName
 from cmk.inventory.paths import Paths, TreePath, TreePathGz
-from cmk.inventory.structured_data import transform
+from cmk.inventory.structured_data import InventoryStore, transform
 
 
 @dataclass(frozen=True)
@@ -250,3 +250,21 @@ def transform_inventory_trees(
     transformation_results_store.save(list(transformation_results) + new_transformation_results)
 
     return 0
+
+
+def index_inventory_trees(
+    *,
+    logger: logging.Logger,
+    omd_root: Path,
+    host_names: Sequence[str],
+) -> int:
+    inv_store = InventoryStore(omd_root)
+    indexed = 0
+    for raw_host_name in host_names:
+        try:
+            indexed += inv_store.index_inventory_tree(host_name=HostName(raw_host_name))
+        except (OSError, ValueError, TypeError):
+            logger.exception("Failed to index inventory tree of %s", raw_host_name)
+    if indexed:
+        logger.info("Indexed %(tree_count)s inventory trees", {"tree_count": indexed})
+    return 0
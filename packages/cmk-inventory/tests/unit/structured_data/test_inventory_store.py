@@ -6,23 +6,31 @@
 import gzip
 import io
 import json
+import os
+import pickle
 from pathlib import Path
 
+import pytest
+
 import cmk.ccc.store
 from cmk.ccc.hostaddress import HostName
 from cmk.inventory.structured_data import (
+    _IndexedTreeFile,
     deserialize_delta_tree,
     deserialize_tree,
     HistoryStore,
+    ImmutableTree,
     InventoryStore,
     load_history,
     make_meta,
+    merge_trees,
     rename,
     SDKey,
     SDMetaAndRawTree,
     SDNodeName,
     SDRawDeltaTree,
     SDRawTree,
+    serialize_tree,
 )
 
 
@@ -413,3 +421,227 @@ def test_load_history_only_from_archive_files(tmp_path: Path) -> None:
     )
     assert len(history.entries) == 3
     assert not history.corrupted
+
+
+@pytest.fixture(name="index_small_trees")
+def fixture_index_small_trees(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("cmk.inventory.structured_data._INDEXED_TREE_MIN_SIZE", 0)
+
+
+@pytest.mark.usefixtures("index_small_trees")
+def test_save_inventory_tree_creates_indexed_tree(tmp_path: Path) -> None:
+    host_name = HostName("hostname")
+    tree = deserialize_tree(_raw_tree("val"))
+
+    inv_store = InventoryStore(tmp_path)
+    inv_store.save_inventory_tree(host_name=host_name, tree=tree, meta=make_meta(do_archive=True))
+    assert (tmp_path / "var/check_mk/inventory_indexed/hostname.sdi").exists()
+
+    loaded = inv_store.load_inventory_tree(host_name=host_name)
+    assert not isinstance(loaded.nodes_by_name, dict)  # loaded from the indexed tree file
+    assert loaded.get_attribute((SDNodeName("node"),), SDKey("nkey")) == "nval"
+    assert loaded.get_tree((SDNodeName("node"),)).path == (SDNodeName("node"),)
+    assert loaded.get_tree((SDNodeName("missing"),)) == ImmutableTree()
+    assert loaded == tree
+    assert serialize_tree(loaded) == serialize_tree(tree)
+    assert pickle.loads(pickle.dumps(loaded)) == tree
+
+
+@pytest.mark.usefixtures("index_small_trees")
+def test_load_inventory_tree_ignores_outdated_indexed_tree(tmp_path: Path) -> None:
+    host_name = HostName("hostname")
+    inv_store = InventoryStore(tmp_path)
+    inv_store.save_inventory_tree(
+        host_name=host_name,
+        tree=deserialize_tree(_raw_tree("val")),
+        meta=make_meta(do_archive=True),
+    )
+    cmk.ccc.store.save_text_to_file(
+        tmp_path / "var/check_mk/inventory/hostname.json", json.dumps(_raw_tree("new value"))
+    )
+
+    assert inv_store.load_inventory_tree(host_name=host_name) == deserialize_tree(
+        _raw_tree("new value")
+    )
+
+
+@pytest.mark.usefixtures("index_small_trees")
+def test_index_inventory_tree(tmp_path: Path) -> None:
+    host_name = HostName("hostname")
+    raw_tree = _raw_tree("val")
+    cmk.ccc.store.save_text_to_file(
+        tmp_path / "var/check_mk/inventory/hostname.json", json.dumps(raw_tree)
+    )
+
+    inv_store = InventoryStore(tmp_path)
+    assert inv_store.index_inventory_tree(host_name=host_name)
+    assert not inv_store.index_inventory_tree(host_name=host_name)
+    assert not inv_store.index_inventory_tree(host_name=HostName("unknown"))
+
+    loaded = inv_store.load_inventory_tree(host_name=host_name)
+    assert not isinstance(loaded.nodes_by_name, dict)
+    assert loaded == deserialize_tree(raw_tree)
+
+
+@pytest.mark.usefixtures("index_small_trees")
+def test_remove_and_rename_indexed_tree(tmp_path: Path) -> None:
+    inv_store = InventoryStore(tmp_path)
+    for raw_host_name in ("old_host_name", "removed"):
+        inv_store.save_inventory_tree(
+            host_name=HostName(raw_host_name),
+            tree=deserialize_tree(_raw_tree("val")),
+            meta=make_meta(do_archive=True),
+        )
+
+    inv_store.remove_inventory_tree(host_name=HostName("removed"))
+    rename(tmp_path, old_host_name=HostName("old_host_name"), new_host_name=HostName("new"))
+
+    assert sorted(p.name for p in (tmp_path / "var/check_mk/inventory_indexed").iterdir()) == [
+        "new.sdi"
+    ]
+    loaded = inv_store.load_inventory_tree(host_name=HostName("new"))
+    assert not isinstance(loaded.nodes_by_name, dict)
+    assert loaded == deserialize_tree(_raw_tree("val"))
+
+
+def test_small_tree_is_not_indexed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    host_name = HostName("hostname")
+    inv_store = InventoryStore(tmp_path)
+    with monkeypatch.context() as m:
+        m.setattr("cmk.inventory.structured_data._INDEXED_TREE_MIN_SIZE", 0)
+        inv_store.save_inventory_tree(
+            host_name=host_name,
+            tree=deserialize_tree(_raw_tree("val")),
+            meta=make_meta(do_archive=True),
+        )
+
+    inv_store.save_inventory_tree(
+        host_name=host_name,
+        tree=deserialize_tree(_raw_tree("new value")),
+        meta=make_meta(do_archive=True),
+    )
+
+    assert not (tmp_path / "var/check_mk/inventory_indexed/hostname.sdi").exists()
+    assert not inv_store.index_inventory_tree(host_name=host_name)
+    loaded = inv_store.load_inventory_tree(host_name=host_name)
+    assert isinstance(loaded.nodes_by_name, dict)
+    assert loaded == deserialize_tree(_raw_tree("new value"))
+
+
+def _large_raw_tree(num: int) -> SDRawTree:
+    def _node(
+        pairs: dict[SDKey, str | int], rows: list[dict[SDKey, str | int]] | None = None
+    ) -> SDRawTree:
+        return SDRawTree(
+            Attributes={"Pairs": pairs},
+            Table={"KeyColumns": [SDKey("name")], "Rows": rows} if rows else {},
+            Nodes={},
+        )
+
+    return SDRawTree(
+        Attributes={},
+        Table={},
+        Nodes={
+            SDNodeName("hardware"): SDRawTree(
+                Attributes={},
+                Table={},
+                Nodes={
+                    SDNodeName("cpu"): _node({SDKey("model"): f"CPU {num}", SDKey("cores"): 8}),
+                    SDNodeName("memory"): _node({SDKey("total_ram_usable"): 2**34}),
+                },
+            ),
+            SDNodeName("software"): SDRawTree(
+                Attributes={},
+                Table={},
+                Nodes={
+                    SDNodeName("packages"): _node(
+                        {},
+                        [
+                            {SDKey("name"): f"package-{n}", SDKey("version"): f"1.{n}.{num}"}
+                            for n in range(2000)
+                        ],
+                    ),
+                },
+            ),
+            SDNodeName("networking"): SDRawTree(
+                Attributes={},
+                Table={},
+                Nodes={
+                    SDNodeName("interfaces"): _node(
+                        {},
+                        [
+                            {SDKey("name"): f"eth{n}", SDKey("speed"): 10**9, SDKey("alias"): "x"}
+                            for n in range(64)
+                        ],
+                    ),
+                },
+            ),
+        },
+    )
+
+
+def test_load_indexed_trees_keeps_no_files_open(tmp_path: Path) -> None:
+    host_names = [HostName(f"host-{n}") for n in range(100)]
+    inv_store = InventoryStore(tmp_path)
+    for num, host_name in enumerate(host_names):
+        inv_store.save_inventory_tree(
+            host_name=host_name,
+            tree=deserialize_tree(_large_raw_tree(num)),
+            meta=make_meta(do_archive=True),
+        )
+    path = (SDNodeName("hardware"), SDNodeName("cpu"))
+    open_files = len(os.listdir("/proc/self/fd"))
+
+    trees = [inv_store.load_inventory_tree(host_name=host_name) for host_name in host_names]
+
+    assert len(os.listdir("/proc/self/fd")) == open_files
+    assert [tree.get_attribute(path, SDKey("model")) for tree in trees] == [
+        deserialize_tree(
+            json.loads(inv_store.inv_paths.inventory_tree(host_name).path.read_text())
+        ).get_attribute(path, SDKey("model"))
+        for host_name in host_names
+    ]
+
+
+def test_merged_indexed_tree_loads_accessed_nodes_only(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    host_name = HostName("hostname")
+    inv_store = InventoryStore(tmp_path)
+    inv_store.save_inventory_tree(
+        host_name=host_name,
+        tree=deserialize_tree(_large_raw_tree(0)),
+        meta=make_meta(do_archive=True),
+    )
+    status_data_tree = deserialize_tree(
+        SDRawTree(
+            Attributes={},
+            Table={},
+            Nodes={
+                SDNodeName("software"): SDRawTree(
+                    Attributes={"Pairs": {SDKey("running"): 42}}, Table={}, Nodes={}
+                )
+            },
+        )
+    )
+    loaded_paths: list[tuple[str, ...]] = []
+    load_node = _IndexedTreeFile.load_node
+
+    def _load_node(self: _IndexedTreeFile, path: tuple[SDNodeName, ...]) -> ImmutableTree:
+        loaded_paths.append(path)
+        return load_node(self, path)
+
+    monkeypatch.setattr(_IndexedTreeFile, "load_node", _load_node)
+
+    # Like the tree of a host in the GUI
+    tree = merge_trees(inv_store.load_inventory_tree(host_name=host_name), status_data_tree)
+
+    assert tree
+    assert tree.get_attribute((SDNodeName("hardware"), SDNodeName("cpu")), SDKey("model")) == (
+        "CPU 0"
+    )
+    assert tree.get_attribute((SDNodeName("software"),), SDKey("running")) == 42
+    assert (SDNodeName("software"), SDNodeName("packages")) not in loaded_paths
+    assert (SDNodeName("networking"),) not in loaded_paths
+
+    assert tree == merge_trees(deserialize_tree(_large_raw_tree(0)), status_data_tree)
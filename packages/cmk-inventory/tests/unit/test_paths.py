@@ -26,6 +26,10 @@ def test_tree_paths(tmp_path: Path, raw_host_name: str) -> None:
         path=tmp_path / f"var/check_mk/inventory/{raw_host_name}.json.gz",
         legacy=tmp_path / f"var/check_mk/inventory/{raw_host_name}.gz",
     )
+    assert (
+        inv_paths.inventory_tree_indexed(host_name)
+        == tmp_path / f"var/check_mk/inventory_indexed/{raw_host_name}.sdi"
+    )
     assert inv_paths.status_data_tree(host_name) == TreePath(
         path=tmp_path / f"tmp/check_mk/status_data/{raw_host_name}.json",
         legacy=tmp_path / f"tmp/check_mk/status_data/{raw_host_name}",
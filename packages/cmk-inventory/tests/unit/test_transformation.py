@@ -8,15 +8,20 @@ import io
 import logging
 from pathlib import Path
 
+import pytest
+
 import cmk.ccc.store
+from cmk.ccc.hostaddress import HostName
 from cmk.inventory.structured_data import (
+    deserialize_tree,
+    InventoryStore,
     make_meta,
     SDKey,
     SDMetaAndRawTree,
     SDNodeName,
     SDRawTree,
 )
-from cmk.inventory.transformation import transform_inventory_trees
+from cmk.inventory.transformation import index_inventory_trees, transform_inventory_trees
 
 
 def _logger() -> logging.Logger:
@@ -94,6 +99,28 @@ def test_transform_inventory_tree(tmp_path: Path) -> None:
     assert (tmp_path / "var/check_mk/inventory/hostname.json.gz").exists()
 
 
+def test_index_inventory_tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("cmk.inventory.structured_data._INDEXED_TREE_MIN_SIZE", 0)
+    raw_tree = _raw_tree()
+    cmk.ccc.store.save_object_to_file(tmp_path / "var/check_mk/inventory/hostname", raw_tree)
+    transform_inventory_trees(
+        logger=_logger(),
+        omd_root=tmp_path,
+        show_results=False,
+        bundle_length=0,
+        filter_host_names=["hostname"],
+        all_host_names=["hostname"],
+    )
+
+    index_inventory_trees(logger=_logger(), omd_root=tmp_path, host_names=["hostname", "unknown"])
+
+    assert (tmp_path / "var/check_mk/inventory_indexed/hostname.sdi").exists()
+    assert not (tmp_path / "var/check_mk/inventory_indexed/unknown.sdi").exists()
+    assert InventoryStore(tmp_path).load_inventory_tree(
+        host_name=HostName("hostname")
+    ) == deserialize_tree(raw_tree)
+
+
 def test_transform_status_data_tree(tmp_path: Path) -> None:
     raw_tree = _raw_tree()
     cmk.ccc.store.save_object_to_file(tmp_path / "tmp/check_mk/status_data/hostname", raw_tree)
@@ -15,6 +15,7 @@ import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
@@ -24,7 +25,17 @@ from dataclasses import dataclass, field
 from enum import Enum
 from functools import cache
 from io import BytesIO
-from typing import Any, Literal, NamedTuple, NewType, NotRequired, override, Protocol, TypedDict
+from typing import (
+    Any,
+    Literal,
+    NamedTuple,
+    NewType,
+    NoReturn,
+    NotRequired,
+    override,
+    Protocol,
+    TypedDict,
+)
 
 from cmk import trace
 from cmk.ccc.site import SiteId
@@ -591,6 +602,10 @@ class SingleSiteConnection(Helpers):
     # So we only collect in a specific thread, and not in all of them. We also use
     # a class-variable for this case, so we activate this across all sites at once.
     collect_queries = threading.local()
+    # Timeout for receiving the content of a response once its header has arrived
+    content_timeout = 30.0
+    # Amount of data read from the socket at once by stream_query()
+    _stream_chunk_size = 1024 * 1024
 
     def __init__(
         self,
@@ -618,6 +633,8 @@ class SingleSiteConnection(Helpers):
         self.timeout: int | None = None
         self.successful_persistence = False
         self._output_format = LivestatusOutputFormat.PYTHON
+        # Data already received from the socket, but not consumed yet, see prefetch()
+        self._prefetched = b""
 
         # Whether to establish an encrypted connection
         self.tls = tls
@@ -731,6 +748,7 @@ class SingleSiteConnection(Helpers):
                 self.socket.close()
 
             self.socket = None
+        self._prefetched = b""
 
         if self.persist:
             self.successful_persistence = False
@@ -742,6 +760,11 @@ class SingleSiteConnection(Helpers):
             raise MKLivestatusSocketError("Socket to '%s' is not connected" % self.socketurl)
 
         data = BytesIO()
+        if self._prefetched:
+            chunk, self._prefetched = self._prefetched[:size], self._prefetched[size:]
+            data.write(chunk)
+            size -= len(chunk)
+
         self.socket.settimeout(timeout)
         receive_start = time.time()
         while size > 0:
@@ -761,6 +784,13 @@ class SingleSiteConnection(Helpers):
 
         return data.getvalue()
 
+    def prefetch(self, data: bytes) -> None:
+        """Hand over data received from the socket outside of this connection
+
+        It is consumed by the next reads before anything is read from the socket.
+        """
+        self._prefetched += data
+
     def do_query(self, query: Query, add_headers: str = "") -> LivestatusResponse:
         with (
             tracer.span(
@@ -836,41 +866,18 @@ class SingleSiteConnection(Helpers):
         timeout_at: float | None = None,
     ) -> bytes:
         try:
-            # Headers are always ASCII encoded
-            resp = self.receive_data(16)
-            code = resp[0:3].decode("ascii")
-            try:
-                length = int(resp[4:15].lstrip())
-            except Exception:
-                self.disconnect()
-                raise MKLivestatusSocketError(
-                    f"Malformed response header {resp!r}. Livestatus TCP socket might be "
-                    "unreachable or wrong encryption settings are used."
-                )
+            code, length = self._receive_response_header()
 
             # Apply a lower timeout for the content because the data is already available
             # in the socket. The liveproxyd (same system) has the complete data available
             # while the data from a standard connection can still take some time.
             # 30 seconds should be more than enough for the maximum telegram size of 100MB
-            data = self.receive_data(length, 30)
+            data = self.receive_data(length, self.content_timeout)
 
             if code == "200":
                 return data
 
-            error_info = data.decode("utf-8")
-            if code == "404":
-                raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
-
-            if code == "413":
-                raise MKLivestatusPayloadTooLargeError(error_info)
-
-            if code == "495":
-                raise MKLivestatusCertificateError(error_info)
-
-            if code == "502":
-                raise MKLivestatusBadGatewayError(error_info)
-
-            raise MKLivestatusQueryError(f"{code}: {error_info}")
+            self._raise_response_error(code, data)
 
         except (MKLivestatusSocketClosed, OSError) as e:
             # In case of an IO error or the other side having
@@ -917,6 +924,105 @@ class SingleSiteConnection(Helpers):
             # FIXME: ? self.disconnect()
             raise MKLivestatusSocketError("Unhandled exception: %s" % e)
 
+    def _receive_response_header(self) -> tuple[str, int]:
+        # Headers are always ASCII encoded
+        resp = self.receive_data(16)
+        code = resp[0:3].decode("ascii")
+        try:
+            length = int(resp[4:15].lstrip())
+        except Exception:
+            self.disconnect()
+            raise MKLivestatusSocketError(
+                f"Malformed response header {resp!r}. Livestatus TCP socket might be "
+                "unreachable or wrong encryption settings are used."
+            )
+        return code, length
+
+    def _raise_response_error(self, code: str, data: bytes) -> NoReturn:
+        error_info = data.decode("utf-8")
+        if code == "404":
+            raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+
+        if code == "413":
+            raise MKLivestatusPayloadTooLargeError(error_info)
+
+        if code == "495":
+            raise MKLivestatusCertificateError(error_info)
+
+        if code == "502":
+            raise MKLivestatusBadGatewayError(error_info)
+
+        raise MKLivestatusQueryError(f"{code}: {error_info}")
+
+    def stream_query(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query(), but yields the rows while the response is being received
+
+        Only a chunk of the response is held in memory at a time instead of the whole response
+        and all of its rows. The connection can only be used for the next query once all rows
+        have been consumed, it is closed when the iteration is abandoned earlier.
+
+        In contrast to query() a closed connection is only re-established before the response
+        started to arrive, rows that have already been yielded can not be taken back.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        if self.limit is not None:
+            normalized_query = Query(
+                "%sLimit: %d\n" % (normalized_query, self.limit),
+                normalized_query.suppress_exceptions,
+            )
+
+        with _livestatus_output_format_switcher(normalized_query, self):
+            str_query = self.build_query(normalized_query, add_headers)
+
+        # The span must not become the current one: The caller runs between the rows
+        span = tracer.start_span(
+            "stream_query",
+            kind=trace.SpanKind.CLIENT,
+            attributes={
+                "cmk.livestatus.target_site_id": str(self.site_name),
+                "cmk.livestatus.query": str_query,
+            },
+        )
+        complete = False
+        try:
+            self.send_query(str_query)
+            for row in self._receive_rows(str_query, normalized_query):
+                if self.prepend_site:
+                    row.insert(0, b"")
+                yield row
+            complete = True
+        finally:
+            if not complete:
+                self.disconnect()
+            span.end()
+
+    def _receive_rows(self, query_str: str, query: Query) -> Iterator[LivestatusRow]:
+        try:
+            try:
+                code, length = self._receive_response_header()
+            except (MKLivestatusSocketClosed, OSError):
+                # Most likely a persisted connection closed by the other side, try once again
+                self.disconnect()
+                self.connect()
+                self.send_query(query_str, do_reconnect=False)
+                code, length = self._receive_response_header()
+
+            if code != "200":
+                self._raise_response_error(code, self.receive_data(length, self.content_timeout))
+
+            splitter = _RowSplitter(query.supports_json_format())
+            while length > 0:
+                chunk = self.receive_data(
+                    min(length, self._stream_chunk_size), self.content_timeout
+                )
+                length -= len(chunk)
+                yield from splitter.feed(chunk)
+            yield from splitter.finish()
+
+        except (MKLivestatusSocketClosed, OSError) as e:
+            self.disconnect()
+            raise MKLivestatusSocketError(str(e))
+
     def parse_raw_response(self, raw_response: bytes, query: Query) -> LivestatusResponse:
         data = raw_response.decode("utf-8")
         try:
@@ -1267,6 +1373,40 @@ class MultiSiteConnection(Helpers):
                 return self.query_parallel(normalized_query, normalized_add_headers)
             return self.query_non_parallel(normalized_query, normalized_add_headers)
 
+    def stream_query(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query(), but yields the rows of one site after the other while receiving them
+
+        See SingleSiteConnection.stream_query(). A site failing in the middle of its response
+        is marked as dead, the rows it has delivered until then have already been yielded.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        stillalive = []
+        limit = self.limit
+        for connected_site in self.connections:
+            if self.only_sites is not None and connected_site.id not in self.only_sites:
+                stillalive.append(connected_site)  # state unknown, assume still alive
+                continue
+            try:
+                limit_header = "Limit: %d\n" % limit if limit is not None else ""
+                for row in connected_site.connection.stream_query(
+                    normalized_query, add_headers + limit_header
+                ):
+                    if self.prepend_site:
+                        row.insert(0, connected_site.id)
+                    if limit is not None:
+                        limit -= 1  # Account for portion of limit used by this site
+                    yield row
+                stillalive.append(connected_site)
+            except LivestatusTestingError:
+                raise
+            except Exception as e:
+                connected_site.connection.disconnect()
+                self.deadsites[connected_site.id] = {
+                    "exception": e,
+                    "site": connected_site.config,
+                }
+        self.connections = stillalive
+
     def query_non_parallel(self, query: Query, add_headers: str = "") -> LivestatusResponse:
         result = LivestatusResponse([])
         stillalive = []
@@ -1320,11 +1460,9 @@ class MultiSiteConnection(Helpers):
                 limit_header="Limit: %d\n" % self.limit if self.limit is not None else "",
             )
 
-            # Then retrieve all raw responses. We will be as slow as the slowest of all connections.
-            site_responses = self._retrieve_responses(query, retrieve_responses, stillalive)
-
-            # Convert responses to python format
-            result = self._parse_responses(query, site_responses, stillalive)
+            # Then retrieve all responses at the same time and convert them to python format.
+            # We will be as slow as the slowest of all connections.
+            result = self._retrieve_responses(query, retrieve_responses, stillalive)
 
         self.connections = stillalive
         return LivestatusResponse(result)
@@ -1362,59 +1500,89 @@ class MultiSiteConnection(Helpers):
         query: Query,
         retrieve_responses: list[tuple[str, trace.Span, ConnectedSite]],
         stillalive: ConnectedSites,
-    ) -> list[tuple[ConnectedSite, bytes]]:
-        site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, request_span, connected_site in retrieve_responses:
-            with tracer.span(
-                f"receive_from_site[{connected_site.id}]",
-                kind=trace.SpanKind.CONSUMER,
-                links=[trace.Link(request_span.get_span_context())],
-                attributes={
-                    "cmk.livestatus.query": str_query,
-                    "cmk.livestatus.target_site_id": str(connected_site.id),
-                },
-            ):
-                try:
-                    site_responses.append(
-                        (
-                            connected_site,
-                            connected_site.connection.receive_raw_response(
-                                str_query, query.suppress_exceptions
-                            ),
-                        )
+    ) -> list[LivestatusRow]:
+        """Receive the responses of all sites at the same time and parse each one when complete
+
+        The sockets are only read in a non-blocking way here. As soon as the response of a site
+        is complete - or anything unexpected happens - the regular, blocking receive path of the
+        site connection takes over, which is then fed from the already received data. This way
+        the error handling, e.g. reconnecting, is the same as for a single site.
+        """
+        # None for the sites found dead
+        site_rows: list[list[LivestatusRow] | None] = [None] * len(retrieve_responses)
+        receiving: dict[int, tuple[_ResponseReceiver, trace.Span]] = {}
+        try:
+            with selectors.DefaultSelector() as selector:
+                for index, (str_query, request_span, connected_site) in enumerate(
+                    retrieve_responses
+                ):
+                    span = tracer.start_span(
+                        f"receive_from_site[{connected_site.id}]",
+                        kind=trace.SpanKind.CONSUMER,
+                        links=[trace.Link(request_span.get_span_context())],
+                        attributes={
+                            "cmk.livestatus.query": str_query,
+                            "cmk.livestatus.target_site_id": str(connected_site.id),
+                        },
                     )
-                except query.suppress_exceptions:
-                    # Mostly handles exception types MKLivestatusTableNotFoundError
-                    stillalive.append(connected_site)
-                    continue
-                except LivestatusTestingError:
-                    raise
-                except Exception as e:
-                    connected_site.connection.disconnect()
-                    self.deadsites[connected_site.id] = {
-                        "exception": e,
-                        "site": connected_site.config,
-                    }
-        return site_responses
+                    receiver = _ResponseReceiver(connected_site.connection)
+                    receiving[index] = receiver, span
+                    if not receiver.register(selector, index):
+                        self._finish_response(
+                            query, retrieve_responses, index, receiving, site_rows
+                        )
 
-    def _parse_responses(
+                while selector.get_map():
+                    for key, _events in selector.select(timeout=1.0):
+                        if receiving[key.data][0].receive():
+                            selector.unregister(key.fileobj)
+                            self._finish_response(
+                                query, retrieve_responses, key.data, receiving, site_rows
+                            )
+
+                    for key in list(selector.get_map().values()):
+                        if receiving[key.data][0].timed_out():
+                            selector.unregister(key.fileobj)
+                            self._finish_response(
+                                query, retrieve_responses, key.data, receiving, site_rows
+                            )
+        finally:
+            for _receiver, span in receiving.values():
+                span.end()
+
+        result: list[LivestatusRow] = []
+        for (_str_query, _request_span, connected_site), rows in zip(retrieve_responses, site_rows):
+            if rows is not None:
+                stillalive.append(connected_site)
+                result.extend(rows)
+        return result
+
+    def _finish_response(
         self,
         query: Query,
-        site_responses: list[tuple[ConnectedSite, bytes]],
-        stillalive: ConnectedSites,
-    ) -> list[LivestatusRow]:
-        result: list[LivestatusRow] = []
-        for connected_site, raw_response in site_responses:
+        retrieve_responses: list[tuple[str, trace.Span, ConnectedSite]],
+        index: int,
+        receiving: dict[int, tuple[_ResponseReceiver, trace.Span]],
+        site_rows: list[list[LivestatusRow] | None],
+    ) -> None:
+        str_query, _request_span, connected_site = retrieve_responses[index]
+        receiver, span = receiving.pop(index)
+        with trace.use_span(span, end_on_exit=True):
+            span.set_attribute("cmk.livestatus.prefetched_bytes", receiver.hand_over())
             try:
-                rows = connected_site.connection.parse_raw_response(raw_response, query)
-                stillalive.append(connected_site)
+                rows = connected_site.connection.parse_raw_response(
+                    connected_site.connection.receive_raw_response(
+                        str_query, query.suppress_exceptions
+                    ),
+                    query,
+                )
                 if self.prepend_site:
                     for row in rows:
                         row.insert(0, connected_site.id)
-                result.extend(rows)
+                site_rows[index] = rows
             except query.suppress_exceptions:
-                stillalive.append(connected_site)
-                continue
+                # Mostly handles exception types MKLivestatusTableNotFoundError
+                site_rows[index] = []
             except LivestatusTestingError:
                 raise
             except Exception as e:
@@ -1423,7 +1591,6 @@ class MultiSiteConnection(Helpers):
                     "exception": e,
                     "site": connected_site.config,
                 }
-        return result
 
     def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
         if sitename in self.deadsites:
@@ -1557,6 +1724,131 @@ def _combine_query(query: str, headers: str | list[str]) -> str:
     return query + "\n" + headers
 
 
+class _RowSplitter:
+    """Parses the rows of a livestatus response while it arrives chunk by chunk
+
+    The python3 and the JSON renderer of livestatus put every row on a line of its own:
+    "[[row 1],\n[row 2]]\n". Control characters within strings are escaped, so line breaks
+    only ever separate rows. Should a row nevertheless span multiple lines, its lines are
+    joined until they can be parsed.
+    """
+
+    def __init__(self, json_format: bool) -> None:
+        self._json_format = json_format
+        self._pending = b""
+        self._line = b""
+        self._started = False
+        self._finished = False
+
+    def feed(self, data: bytes) -> list[LivestatusRow]:
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        rows = []
+        for line in lines:
+            if (row := self._add_line(line)) is not None:
+                rows.append(row)
+        return rows
+
+    def finish(self) -> list[LivestatusRow]:
+        rows = self.feed(b"\n") if self._pending else []
+        if not self._finished or self._line:
+            raise MKLivestatusQueryError("Malformed raw response output")
+        return rows
+
+    def _add_line(self, line: bytes) -> LivestatusRow | None:
+        if self._finished:
+            if line.strip():
+                raise MKLivestatusQueryError("Malformed raw response output")
+            return None
+        if not self._started:
+            if not line.startswith(b"["):
+                raise MKLivestatusQueryError("Malformed raw response output")
+            line = line[1:]
+            self._started = True
+        self._line = self._line + b"\n" + line if self._line else line
+
+        if self._line.endswith(b","):
+            text = self._line[:-1]
+        elif self._line.endswith(b"]"):
+            text = self._line[:-1]
+            if not text:  # empty response
+                self._line = b""
+                self._finished = True
+                return None
+        else:
+            return None  # incomplete row
+
+        try:
+            row: LivestatusRow = (
+                json.loads(text) if self._json_format else ast.literal_eval(text.decode("utf-8"))
+            )
+        except (ValueError, SyntaxError):
+            return None  # incomplete row, or the end of the response not reached yet
+        self._finished = not self._line.endswith(b",")
+        self._line = b""
+        return row
+
+
+class _ResponseReceiver:
+    """Receives a complete livestatus response of a connection without blocking
+
+    The received data has to be handed over to the connection afterwards, from where it is read
+    by the regular receive path, see SingleSiteConnection.prefetch().
+    """
+
+    def __init__(self, connection: SingleSiteConnection) -> None:
+        self._connection = connection
+        self._data = bytearray()
+        self._size: int | None = None
+        self._content_deadline: float | None = None
+
+    def register(self, selector: selectors.BaseSelector, data: object) -> bool:
+        """Returns False if the response can not be received here"""
+        if self._connection.socket is None:
+            return False
+        try:
+            selector.register(self._connection.socket, selectors.EVENT_READ, data)
+        except (KeyError, OSError, ValueError):
+            return False
+        return True
+
+    def timed_out(self) -> bool:
+        return self._content_deadline is not None and time.time() > self._content_deadline
+
+    def receive(self) -> bool:
+        """Read what is available, returns True when we are done with this response
+
+        This is the case when the response is complete, but also if something unexpected
+        happened. The regular receive path will run into the same problem then and handle it.
+        """
+        sock = self._connection.socket
+        assert sock is not None
+        try:
+            sock.settimeout(0)
+            while (missing := (16 if self._size is None else self._size) - len(self._data)) > 0:
+                if not (packet := sock.recv(min(missing, 65536))):
+                    return True  # closed by the peer
+                self._data += packet
+                if self._size is None and len(self._data) >= 16:
+                    try:
+                        self._size = 16 + int(self._data[4:15].lstrip())
+                    except ValueError:
+                        return True  # malformed header
+                    self._content_deadline = time.time() + self._connection.content_timeout
+            return True
+        except (ssl.SSLWantReadError, BlockingIOError, InterruptedError):
+            return False
+        except OSError:
+            return True
+
+    def hand_over(self) -> int:
+        """Pass the received data to the connection, returns the number of bytes"""
+        self._connection.prefetch(bytes(self._data))
+        size = len(self._data)
+        self._data.clear()
+        return size
+
+
 def is_socket_readable(sock: socket.socket, select_timeout: float = 1.0) -> bool:
     # SSL sockets may not return any fileno in the select, since the data lingers around in pending
     # https://stackoverflow.com/questions/3187565/select-and-ssl-in-python
@@ -206,6 +206,27 @@ class Eventconsolestatus(Table):
     )
     """The number of message overflows, i.e. messages simply dropped due to an overflow of the Event Console"""
 
+    status_p99_processing_time = Column(
+        'status_p99_processing_time',
+        col_type='float',
+        description='The 99th percentile of the recent incoming message processing times',
+    )
+    """The 99th percentile of the recent incoming message processing times"""
+
+    status_p99_request_time = Column(
+        'status_p99_request_time',
+        col_type='float',
+        description='The 99th percentile of the recent status client request times',
+    )
+    """The 99th percentile of the recent status client request times"""
+
+    status_p99_sync_time = Column(
+        'status_p99_sync_time',
+        col_type='float',
+        description='The 99th percentile of the recent sync times',
+    )
+    """The 99th percentile of the recent sync times"""
+
     status_replication_last_sync = Column(
         'status_replication_last_sync',
         col_type='time',
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import json
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from cmk.ccc.site import SiteId
+from cmk.livestatus_client import (
+    MKLivestatusTableNotFoundError,
+    MultiSiteConnection,
+    Query,
+    SingleSiteConnection,
+    SiteConfiguration,
+    SiteConfigurations,
+)
+from cmk.livestatus_client._connection import _RowSplitter
+
+
+class _FakeLivestatusServer:
+    """Answers every query on a UNIX socket with a fixed response
+
+    The payload is sent in chunks with a pause in between to simulate a slow network. With a
+    barrier, the payload from barrier_offset (default: the middle) on is only sent once all
+    parties of the barrier got there.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        code: int,
+        payload: bytes,
+        *,
+        chunk_size: int = 65536,
+        chunk_pause: float = 0.0,
+        close_instead: bool = False,
+        barrier: threading.Barrier | None = None,
+        barrier_offset: int | None = None,
+    ) -> None:
+        self.path = path
+        self._code = code
+        self._payload = payload
+        self._chunk_size = chunk_size
+        self._chunk_pause = chunk_pause
+        self._close_instead = close_instead
+        self._barrier = barrier
+        self._barrier_offset = len(payload) // 2 if barrier_offset is None else barrier_offset
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(str(path))
+        self._listener.listen(5)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                connection, _address = self._listener.accept()
+            except OSError:
+                return  # closed
+            threading.Thread(target=self._answer, args=(connection,), daemon=True).start()
+
+    def _answer(self, connection: socket.socket) -> None:
+        with connection:
+            query = b""
+            while not query.endswith(b"\n\n"):
+                if not (data := connection.recv(4096)):
+                    return
+                query += data
+            if self._close_instead:
+                return
+            connection.sendall(b"%03d %11d\n" % (self._code, len(self._payload)))
+            barrier = self._barrier
+            for offset in range(0, len(self._payload), self._chunk_size):
+                if barrier is not None and offset >= self._barrier_offset:
+                    try:
+                        barrier.wait(timeout=5)
+                    except threading.BrokenBarrierError:
+                        return
+                    barrier = None
+                connection.sendall(self._payload[offset : offset + self._chunk_size])
+                time.sleep(self._chunk_pause)
+            # Keep the connection open like a livestatus server with KeepAlive: on
+            connection.recv(1)
+
+    def close(self) -> None:
+        self._listener.close()
+
+
+def _site_config(site_id: SiteId, path: Path) -> SiteConfiguration:
+    return SiteConfiguration(
+        id=site_id,
+        alias=str(site_id),
+        socket=f"unix:{path}",
+        disable_wato=True,
+        disabled=False,
+        insecure=False,
+        is_trusted=False,
+        message_broker_port=5672,
+        multisiteurl="",
+        persist=False,
+        proxy=None,
+        replicate_ec=False,
+        replicate_mkps=False,
+        replication=None,
+        status_host=None,
+        timeout=5,
+        url_prefix="",
+        user_login=True,
+    )
+
+
+@contextmanager
+def _sites(
+    tmp_path: Path, servers: Sequence[Callable[[Path], _FakeLivestatusServer]]
+) -> Iterator[MultiSiteConnection]:
+    started = [make_server(tmp_path / f"site{num}") for num, make_server in enumerate(servers)]
+    connection = MultiSiteConnection(
+        SiteConfigurations(
+            {
+                SiteId(f"site{num}"): _site_config(SiteId(f"site{num}"), server.path)
+                for num, server in enumerate(started)
+            }
+        )
+    )
+    try:
+        yield connection
+    finally:
+        connection.disconnect()
+        for server in started:
+            server.close()
+
+
+def _render(rows: Sequence[Sequence[object]]) -> bytes:
+    """Render the rows like the JSON renderer of livestatus does"""
+    return b"[" + b",\n".join(json.dumps(row).encode() for row in rows) + b"]\n"
+
+
+def _rows(site_no: int, count: int, padding: int = 0) -> bytes:
+    return _render([[f"host-{site_no}-{n}" + "x" * padding, n] for n in range(count)])
+
+
+def test_query_parallel_collects_rows_in_site_order(tmp_path: Path) -> None:
+    with _sites(
+        tmp_path,
+        [
+            # The first site is the slowest one, its rows still have to come first
+            lambda path: _FakeLivestatusServer(
+                path, 200, _rows(0, 3000), chunk_size=4096, chunk_pause=0.001
+            ),
+            lambda path: _FakeLivestatusServer(path, 200, _rows(1, 2)),
+            lambda path: _FakeLivestatusServer(path, 404, b"Table not found"),
+            lambda path: _FakeLivestatusServer(path, 200, b"", close_instead=True),
+            lambda path: _FakeLivestatusServer(path, 200, _rows(4, 1)),
+        ],
+    ) as live:
+        live.set_prepend_site(True)
+        rows = live.query(
+            Query(
+                "GET hosts\nColumns: name\n", suppress_exceptions=(MKLivestatusTableNotFoundError,)
+            )
+        )
+
+        assert rows == [
+            *(["site0", f"host-0-{n}", n] for n in range(3000)),
+            ["site1", "host-1-0", 0],
+            ["site1", "host-1-1", 1],
+            ["site4", "host-4-0", 0],
+        ]
+        assert sorted(live.alive_sites()) == ["site0", "site1", "site2", "site4"]
+        assert list(live.dead_sites()) == ["site3"]
+
+
+def test_query_parallel_receives_concurrently(tmp_path: Path) -> None:
+    num_sites = 4
+    # More than the socket buffers take: Receiving one site after the other would leave the
+    # servers of the other sites stuck in their first half, and the first one at the barrier.
+    payload = _rows(0, 2000, padding=500)
+    chunk_size = len(payload) // 16
+    halfway = threading.Barrier(num_sites)
+
+    with _sites(
+        tmp_path,
+        [
+            lambda path: _FakeLivestatusServer(
+                path, 200, payload, chunk_size=chunk_size, barrier=halfway
+            )
+        ]
+        * num_sites,
+    ) as live:
+        rows = live.query("GET hosts\nColumns: name\n")
+
+        assert not live.dead_sites()
+    assert len(rows) == num_sites * 2000
+    assert not halfway.broken
+
+
+_ODD_ROWS: Sequence[Sequence[object]] = [
+    ["multi\nline", "brackets ],\n[", "quotes \"'", 1.5, None, True],
+    [["nested", ["list"]], {"dict": "value"}, "Größe", "\u2603", -1],
+    [],
+]
+
+
+@pytest.mark.parametrize(
+    "json_format, response",
+    [
+        pytest.param(True, _render(_ODD_ROWS), id="json"),
+        pytest.param(
+            False,
+            b"[" + b",\n".join(repr(row).encode() for row in _ODD_ROWS) + b"]\n",
+            id="python",
+        ),
+        pytest.param(
+            True,
+            b"[" + b",\n".join(json.dumps(row, indent=1).encode() for row in _ODD_ROWS) + b"]\n",
+            id="rows spanning lines",
+        ),
+    ],
+)
+def test_row_splitter_handles_any_chunking(json_format: bool, response: bytes) -> None:
+    for chunk_size in (1, 2, 7, len(response)):
+        splitter = _RowSplitter(json_format)
+        rows = []
+        for offset in range(0, len(response), chunk_size):
+            rows.extend(splitter.feed(response[offset : offset + chunk_size]))
+        rows.extend(splitter.finish())
+        assert rows == list(_ODD_ROWS)
+
+
+def test_row_splitter_empty_response() -> None:
+    splitter = _RowSplitter(True)
+    assert splitter.feed(b"[]\n") == []
+    assert splitter.finish() == []
+
+
+def test_multisite_stream_query(tmp_path: Path) -> None:
+    with _sites(
+        tmp_path,
+        [
+            lambda path: _FakeLivestatusServer(path, 200, _rows(0, 300), chunk_size=1000),
+            lambda path: _FakeLivestatusServer(path, 200, b"", close_instead=True),
+            lambda path: _FakeLivestatusServer(path, 200, _rows(2, 2)),
+        ],
+    ) as live:
+        live.set_prepend_site(True)
+        rows = list(live.stream_query("GET hosts\nColumns: name\n"))
+
+        assert rows == [
+            *(["site0", f"host-0-{n}", n] for n in range(300)),
+            ["site2", "host-2-0", 0],
+            ["site2", "host-2-1", 1],
+        ]
+        assert live.alive_sites() == ["site0", "site2"]
+        assert list(live.dead_sites()) == ["site1"]
+
+
+def test_stream_query_closes_abandoned_connection(tmp_path: Path) -> None:
+    server = _FakeLivestatusServer(tmp_path / "site", 200, _rows(0, 10))
+    try:
+        connection = SingleSiteConnection(f"unix:{server.path}", SiteId("site"))
+        rows = connection.stream_query("GET hosts\nColumns: name\n")
+        assert next(rows) == ["host-0-0", 0]
+        rows.close()
+        assert connection.socket is None
+
+        # The next query starts on a fresh connection
+        assert len(connection.query("GET hosts\nColumns: name\n")) == 10
+    finally:
+        server.close()
+
+
+def test_stream_query_yields_rows_before_the_response_is_complete(tmp_path: Path) -> None:
+    # The rest of the response is only sent once we got the first row. Until then the server
+    # sends a bit more than one chunk of the connection, so it is not stuck before the barrier.
+    first_row = threading.Barrier(2)
+    server = _FakeLivestatusServer(
+        tmp_path / "site",
+        200,
+        _rows(0, 30000, padding=100),
+        chunk_size=4096,
+        barrier=first_row,
+        barrier_offset=SingleSiteConnection._stream_chunk_size + 65536,  # noqa: SLF001
+    )
+    try:
+        connection = SingleSiteConnection(f"unix:{server.path}", SiteId("site"))
+        rows = connection.stream_query("GET log\nColumns: message\n")
+
+        assert next(rows) == ["host-0-0" + "x" * 100, 0]
+        first_row.wait(timeout=5)
+        assert sum(1 for _row in rows) == 29999
+    finally:
+        server.close()
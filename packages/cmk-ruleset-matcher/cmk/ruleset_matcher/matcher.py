@@ -11,7 +11,7 @@ import contextlib
 from collections.abc import Callable, Iterable, Iterator, Mapping, Reversible, Sequence
 from dataclasses import dataclass
 from re import Pattern
-from typing import Any, cast, NotRequired, TypedDict, TypeGuard
+from typing import Any, cast, Final, NotRequired, Self, TypedDict, TypeGuard
 
 import cmk.trace
 from cmk.ccc.hostaddress import HostAddress, HostName
@@ -76,11 +76,66 @@ LabelGroupsCacheId = tuple[tuple[AndOrNotLiteral, tuple[tuple[AndOrNotLiteral, s
 
 type PreprocessedPattern = tuple[bool, Pattern[str]]
 
+type _CompiledLabelGroup = tuple[AndOrNotLiteral, tuple[tuple[AndOrNotLiteral, str, str], ...]]
+
+
+@dataclass(frozen=True)
+class CompiledLabelGroups:
+    """Label group conditions with the labels already split into name and value
+
+    Build it once per rule with `compile()` and match it against many objects.
+    """
+
+    groups: tuple[_CompiledLabelGroup, ...]
+    # Precomputed outcome for objects without any labels
+    matches_unlabeled: bool
+
+    @classmethod
+    def compile(cls, label_groups: LabelGroups) -> Self:
+        groups: list[_CompiledLabelGroup] = []
+        matches_unlabeled = True
+        for group_operator, label_group in label_groups:
+            compiled_group: list[tuple[AndOrNotLiteral, str, str]] = []
+            for label_operator, label in label_group:
+                if not label:
+                    continue
+                try:
+                    parsed = BaseLabel.from_str(label)
+                except ValueError:
+                    raise NotImplementedError(f"Invalid label condition: {label!r}")
+                compiled_group.append((label_operator, parsed.name, parsed.value))
+            groups.append((group_operator, tuple(compiled_group)))
+            # The first label operator in a group is always "and" or "not", it cannot be "or"
+            # -> a label group matches an object without labels only if it has no "and" operators
+            matches_unlabeled = _and_or_not_group_match(
+                matches_unlabeled,
+                all(label_operator != "and" for label_operator, _n, _v in compiled_group),
+                group_operator,
+            )
+        return cls(tuple(groups), matches_unlabeled)
+
+    def __bool__(self) -> bool:
+        return bool(self.groups)
+
+    def matches(self, object_labels: Labels) -> bool:
+        if not object_labels:
+            return self.matches_unlabeled
+
+        overall_match = True
+        for group_operator, label_group in self.groups:
+            group_match = True
+            for label_operator, name, value in label_group:
+                group_match = _and_or_not_group_match(
+                    group_match, value == object_labels.get(name), label_operator
+                )
+            overall_match = _and_or_not_group_match(overall_match, group_match, group_operator)
+        return overall_match
+
+
 type _PreprocessedServiceRule[TRuleValue] = tuple[
     TRuleValue,
     set[HostName],
-    LabelGroups,
-    LabelGroupsCacheId,
+    CompiledLabelGroups,
     PreprocessedPattern,
 ]
 
@@ -161,9 +216,7 @@ class RulesetMatcher:
         )
 
         self._service_match_cache: dict[
-            tuple[
-                tuple[ServiceName | None, int], PreprocessedPattern, tuple[tuple[str, object], ...]
-            ],
+            tuple[tuple[ServiceName | None, int], PreprocessedPattern, CompiledLabelGroups],
             object,
         ] = {}
 
@@ -317,7 +370,6 @@ class RulesetMatcher:
             value,
             hosts,
             service_label_groups,
-            service_label_groups_cache_id,
             service_description_condition,
         ) in optimized_ruleset:
             if match_text is None:
@@ -332,7 +384,7 @@ class RulesetMatcher:
                     hash(None if service_labels is None else frozenset(service_labels.items())),  # type: ignore[redundant-expr]
                 ),
                 service_description_condition,
-                service_label_groups_cache_id,
+                service_label_groups,
             )
 
             if service_cache_id in self._service_match_cache:
@@ -401,6 +453,9 @@ class RulesetOptimizer:
 
         # Reference dirname -> hosts in this dir including subfolders
         self._folder_host_lookup: dict[tuple[bool, str], set[HostName]] = {}
+        self._folder_host_bits_lookup: dict[tuple[bool, str], int] = {}
+
+        self._host_index = HostConditionIndex(self._all_configured_hosts, self._host_tags)
 
         # Provides a list of hosts with the same hosttags, excluding the folder
         self._hosts_grouped_by_tags: dict[tuple[tuple[TagGroupID, TagID], ...], set[HostName]] = {}
@@ -417,6 +472,7 @@ class RulesetOptimizer:
     def clear_caches(self) -> None:
         self.__host_ruleset_cache.clear()
         self._all_matching_hosts_match_cache.clear()
+        self._host_index.clear_labels()
 
     def set_all_processed_hosts(self, all_processed_hosts: set[HostName]) -> None:
         involved_clusters: set[HostName] = set()
@@ -440,6 +496,7 @@ class RulesetOptimizer:
         # the scope of relevant hosts has changed. This is -good-, since the values in this
         # lookup are iterated one by one later on in all_matching_hosts
         self._folder_host_lookup = {}
+        self._folder_host_bits_lookup = {}
 
         used_groups = {
             self._host_grouped_ref.get(hostname, ()) for hostname in self._all_processed_hosts
@@ -507,22 +564,14 @@ class RulesetOptimizer:
                     rule["condition"], with_foreign_hosts, labels_of_host
                 )
 
-                # Prepare cache id
-                service_label_groups: LabelGroups = rule["condition"].get(
-                    "service_label_groups", []
-                )
-                # cast lists in label groups to tuples
-                service_label_groups_cache_id = tuple(
-                    (operator, tuple(label_group)) for operator, label_group in service_label_groups
-                )
-
-                # And now preprocess the configured patterns in the servlist
+                # And now preprocess the configured labels and patterns in the servlist
                 new_rules.append(
                     (
                         rule["value"],
                         hosts,
-                        service_label_groups,
-                        service_label_groups_cache_id,
+                        CompiledLabelGroups.compile(
+                            rule["condition"].get("service_label_groups", [])
+                        ),
                         RulesetOptimizer._convert_pattern_list(
                             rule["condition"].get("service_description")
                         ),
@@ -590,9 +639,8 @@ class RulesetOptimizer:
         return self._all_matching_hosts_match_cache.setdefault(
             cache_id,
             self._all_matching_hosts_computation(
-                # Determine match candidates.
-                # If the rule is located in a folder we only need the hosts in that folder.
-                self._get_hosts_within_folder(rule_path, with_foreign_hosts),
+                rule_path,
+                with_foreign_hosts,
                 host_conditions,
                 tag_conditions,
                 label_conditions,
@@ -602,23 +650,18 @@ class RulesetOptimizer:
 
     def _all_matching_hosts_computation(
         self,
-        hosts_in_rule_scope: set[HostName],
+        rule_path: str,
+        with_foreign_hosts: bool,
         host_conditions: HostOrServiceConditions | None,
         tag_conditions: Mapping[TagGroupID, TagCondition],
-        label_conditions: LabelGroups,
+        label_groups: LabelGroups,
         labels_of_host: Callable[[HostName], Labels],
     ) -> set[HostName]:
-        if tag_conditions and host_conditions is None and not label_conditions:
-            # TODO: Labels could also be optimized like the tags
-            matched_by_tags = self._match_hosts_by_tags(hosts_in_rule_scope, tag_conditions)
-            if matched_by_tags is not None:
-                return matched_by_tags
+        label_conditions = CompiledLabelGroups.compile(label_groups)
 
-        only_specific_hosts = (
-            host_conditions is not None
-            and not isinstance(host_conditions, dict)
-            and all(not isinstance(x, dict) for x in host_conditions)
-        )
+        # Determine match candidates.
+        # If the rule is located in a folder we only need the hosts in that folder.
+        hosts_in_rule_scope = self._get_hosts_within_folder(rule_path, with_foreign_hosts)
 
         if host_conditions == []:
             return set()  # Empty host list -> Nothing matches
@@ -627,21 +670,49 @@ class RulesetOptimizer:
             # If no tags are specified and the hostlist only include @all (all hosts)
             return hosts_in_rule_scope
 
-        if (
-            not tag_conditions
-            and not label_conditions
-            and only_specific_hosts
-            and host_conditions is not None
-        ):
-            # If no tags are specified and there are only specific hosts we already have the matches
-            return hosts_in_rule_scope.intersection(host_conditions)
+        only_specific_hosts = (
+            host_conditions is not None
+            and not isinstance(host_conditions, dict)
+            and all(not isinstance(x, dict) for x in host_conditions)
+        )
 
-        # If the rule has only exact host restrictions, we can thin out the list of hosts to check
         if only_specific_hosts and host_conditions is not None:
             hosts_to_check = hosts_in_rule_scope.intersection(host_conditions)
-        else:
-            hosts_to_check = hosts_in_rule_scope
+            if not tag_conditions and not label_conditions:
+                # If no tags are specified and there are only specific hosts we already have the matches
+                return hosts_to_check
+            # Only a few candidates left, checking them one by one is cheaper than the index.
+            return self._match_hosts_one_by_one(
+                hosts_to_check, host_conditions, tag_conditions, label_conditions, labels_of_host
+            )
 
+        matching = self._host_index.matching_hosts(
+            self._get_host_bits_within_folder(rule_path, with_foreign_hosts),
+            host_conditions,
+            tag_conditions,
+            label_conditions,
+            labels_of_host,
+        )
+        if matching is not None:
+            return matching
+
+        if tag_conditions and host_conditions is None and not label_conditions:
+            matched_by_tags = self._match_hosts_by_tags(hosts_in_rule_scope, tag_conditions)
+            if matched_by_tags is not None:
+                return matched_by_tags
+
+        return self._match_hosts_one_by_one(
+            hosts_in_rule_scope, host_conditions, tag_conditions, label_conditions, labels_of_host
+        )
+
+    def _match_hosts_one_by_one(
+        self,
+        hosts_to_check: set[HostName],
+        host_conditions: HostOrServiceConditions | None,
+        tag_conditions: Mapping[TagGroupID, TagCondition],
+        label_conditions: CompiledLabelGroups,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> set[HostName]:
         matching: set[HostName] = set()
         for hostname in hosts_to_check:
             # When no tag matching is requested, do not filter by tags. Accept all hosts
@@ -654,7 +725,7 @@ class RulesetOptimizer:
 
             if label_conditions:
                 host_labels = labels_of_host(hostname)
-                if not matches_labels(host_labels, label_conditions):
+                if not label_conditions.matches(host_labels):
                     continue
 
             if not matches_host_name(host_conditions, hostname):
@@ -782,6 +853,17 @@ class RulesetOptimizer:
 
         return self._folder_host_lookup[cache_id]
 
+    def _get_host_bits_within_folder(self, folder_path: str, with_foreign_hosts: bool) -> int:
+        cache_id = with_foreign_hosts, folder_path
+        try:
+            return self._folder_host_bits_lookup[cache_id]
+        except KeyError:
+            pass
+        return self._folder_host_bits_lookup.setdefault(
+            cache_id,
+            self._host_index.bits(self._get_hosts_within_folder(folder_path, with_foreign_hosts)),
+        )
+
     def _initialize_host_lookup(self) -> None:
         for hostname in self._all_configured_hosts:
             group_ref = tuple(sorted(self._host_tags[hostname]))
@@ -789,6 +871,200 @@ class RulesetOptimizer:
             self._host_grouped_ref[hostname] = group_ref
 
 
+# Positions of the set bits for every possible byte value
+_BYTE_BITS: Final = tuple(tuple(b for b in range(8) if n >> b & 1) for n in range(256))
+
+
+class HostConditionIndex:
+    """Evaluate host conditions of rules on bitsets of host indices
+
+    Every configured host gets a fixed position.  For every (tag group, tag),
+    (label name, label value), explicit host name and host name regex we keep
+    an integer whose set bits are the hosts having that property.  Tag, label
+    and host name conditions (including "$ne", "$or" and "$nor") can then be
+    evaluated with a handful of bitwise operations instead of one test per host.
+
+    Host labels are only computed for hosts that still are match candidates,
+    and only once per host.  Call `clear_labels()` when they may have changed.
+    """
+
+    def __init__(
+        self,
+        all_hosts: Iterable[HostName],
+        host_tags: Mapping[HostName, Iterable[tuple[TagGroupID, TagID]]],
+    ) -> None:
+        self._hosts: Final = sorted(all_hosts)
+        self._position: Final = {host_name: pos for pos, host_name in enumerate(self._hosts)}
+        self._nbytes: Final = (len(self._hosts) + 7) // 8
+        self.all: Final = (1 << len(self._hosts)) - 1
+        # The generic agent host ("") never matches host name conditions
+        self._named: Final = self.all & ~self.bits(h for h in self._hosts if h == "")
+
+        tag_builders: dict[tuple[TagGroupID, TagID], bytearray] = {}
+        for host_name, pos in self._position.items():
+            for tag in host_tags[host_name]:
+                self._set_bit(tag_builders.setdefault(tag, bytearray(self._nbytes)), pos)
+        self._tags: Final = {
+            tag: int.from_bytes(builder, "little") for tag, builder in tag_builders.items()
+        }
+
+        self._host_name_regexes: dict[str, int] = {}
+
+        self._labels_known = bytearray(self._nbytes)
+        self._labeled = bytearray(self._nbytes)
+        self._label_builders: dict[tuple[str, str], bytearray] = {}
+        self._label_bits: dict[tuple[str, str] | None, int] = {}
+
+    def clear_labels(self) -> None:
+        self._labels_known = bytearray(self._nbytes)
+        self._labeled = bytearray(self._nbytes)
+        self._label_builders.clear()
+        self._label_bits.clear()
+
+    @staticmethod
+    def _set_bit(builder: bytearray, pos: int) -> None:
+        builder[pos >> 3] |= 1 << (pos & 7)
+
+    def bits(self, host_names: Iterable[HostName]) -> int:
+        """Return the bitset of the given hosts (unknown hosts are ignored)"""
+        builder = bytearray(self._nbytes)
+        for host_name in host_names:
+            if (pos := self._position.get(host_name)) is not None:
+                self._set_bit(builder, pos)
+        return int.from_bytes(builder, "little")
+
+    def host_names(self, bits: int) -> set[HostName]:
+        hosts = self._hosts
+        result: set[HostName] = set()
+        for byte_pos, byte in enumerate(bits.to_bytes(self._nbytes, "little")):
+            if byte:
+                base = byte_pos << 3
+                result.update(hosts[base + b] for b in _BYTE_BITS[byte])
+        return result
+
+    def matching_hosts(
+        self,
+        candidates: int,
+        host_conditions: HostOrServiceConditions | None,
+        tag_conditions: Mapping[TagGroupID, TagCondition],
+        label_conditions: CompiledLabelGroups,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> set[HostName] | None:
+        """Return the candidates matching all conditions
+
+        Returns None if the conditions can not be evaluated on the index.
+        """
+        bits = candidates
+        for taggroup_id, tag_condition in tag_conditions.items():
+            try:
+                bits &= self._tag_condition_bits(taggroup_id, tag_condition)
+            except NotImplementedError:
+                return None  # Unknown operator, left to the per host matching
+
+        if host_conditions is not None:
+            bits &= self._host_name_bits(host_conditions)
+
+        if label_conditions and bits:
+            self._index_labels(bits, labels_of_host)
+            bits &= self._label_groups_bits(label_conditions)
+
+        return self.host_names(bits)
+
+    def _tag_condition_bits(self, taggroup_id: TagGroupID, tag_condition: TagCondition) -> int:
+        if isinstance(tag_condition, dict):
+            if "$ne" in tag_condition:
+                return self.all & ~self._tags.get(
+                    (taggroup_id, cast(TagConditionNE, tag_condition)["$ne"]), 0
+                )
+
+            if "$or" in tag_condition:
+                return self._any_tag_bits(taggroup_id, cast(TagConditionOR, tag_condition)["$or"])
+
+            if "$nor" in tag_condition:
+                return self.all & ~self._any_tag_bits(
+                    taggroup_id, cast(TagConditionNOR, tag_condition)["$nor"]
+                )
+
+            raise NotImplementedError
+
+        return self._tags.get((taggroup_id, tag_condition), 0)
+
+    def _any_tag_bits(self, taggroup_id: TagGroupID, tag_ids: Iterable[TagID | None]) -> int:
+        bits = 0
+        for tag_id in tag_ids:
+            bits |= self._tags.get((taggroup_id, tag_id), 0)
+        return bits
+
+    def _host_name_bits(self, host_conditions: HostOrServiceConditions) -> int:
+        negate, entries = parse_negated_condition_list(host_conditions)
+        bits = 0
+        for entry in entries:
+            if isinstance(entry, dict):
+                bits |= self._host_name_regex_bits(entry["$regex"])
+            elif (pos := self._position.get(entry)) is not None:
+                bits |= 1 << pos
+        bits &= self._named
+        return self.all & ~bits if negate else bits
+
+    def _host_name_regex_bits(self, pattern: str) -> int:
+        try:
+            return self._host_name_regexes[pattern]
+        except KeyError:
+            pass
+        compiled = regex(pattern)
+        return self._host_name_regexes.setdefault(
+            pattern, self.bits(h for h in self._hosts if compiled.match(h) is not None)
+        )
+
+    def _index_labels(self, candidates: int, labels_of_host: Callable[[HostName], Labels]) -> None:
+        missing = candidates & ~int.from_bytes(self._labels_known, "little")
+        if not missing:
+            return
+
+        for host_name in self.host_names(missing):
+            pos = self._position[host_name]
+            self._set_bit(self._labels_known, pos)
+            if not (labels := labels_of_host(host_name)):
+                continue
+            self._set_bit(self._labeled, pos)
+            for label in labels.items():
+                self._set_bit(self._label_builders.setdefault(label, bytearray(self._nbytes)), pos)
+        self._label_bits.clear()
+
+    def _get_label_bits(self, label: tuple[str, str] | None) -> int:
+        try:
+            return self._label_bits[label]
+        except KeyError:
+            pass
+        builder = self._labeled if label is None else self._label_builders.get(label)
+        return self._label_bits.setdefault(
+            label, 0 if builder is None else int.from_bytes(builder, "little")
+        )
+
+    def _label_groups_bits(self, label_groups: CompiledLabelGroups) -> int:
+        """Bitset version of `CompiledLabelGroups.matches()`"""
+        labeled = self._get_label_bits(None)
+        overall = self.all
+        for group_operator, label_group in label_groups.groups:
+            group_bits = self.all
+            for label_operator, name, value in label_group:
+                group_bits = _and_or_not_bits(
+                    group_bits, self._get_label_bits((name, value)), label_operator
+                )
+            overall = _and_or_not_bits(overall, group_bits, group_operator)
+        return (overall & labeled) | (self.all & ~labeled if label_groups.matches_unlabeled else 0)
+
+
+def _and_or_not_bits(given: int, new: int, operator: AndOrNotLiteral) -> int:
+    match operator:
+        case "and":
+            return given & new
+        case "or":
+            return given | new
+        case "not":
+            return given & ~new
+
+
 def merge_parameters[T](
     parameters: Reversible[Mapping[str, T]], default: Mapping[str, T]
 ) -> Mapping[str, T]:
@@ -880,32 +1156,12 @@ def matches_host_name(host_entries: HostOrServiceConditions | None, hostname: Ho
 
 
 def matches_labels(object_labels: Labels, required_label_groups: LabelGroups) -> bool:
-    overall_match: bool = True
+    """Match the labels of an object against label group conditions
 
-    for group_operator, label_group in required_label_groups:
-        group_match: bool = True
-        for label_operator, label in label_group:
-            if not label:
-                continue
-
-            if not object_labels:
-                # The first label operator in a group is always "and" or "not", it cannot be "or"
-                # -> a label group matches a host without labels only if it has no "and" operators
-                if label_operator == "and":
-                    group_match = False
-                    break
-                continue
-
-            try:
-                l = BaseLabel.from_str(label)
-            except Exception:
-                raise NotImplementedError(f"HALLO DORT: wird hier zu wenig entpackt?  --  {label}")
-            label_match: bool = l.value == object_labels.get(l.name)
-            group_match = _and_or_not_group_match(group_match, label_match, label_operator)
-
-        overall_match = _and_or_not_group_match(overall_match, group_match, group_operator)
-
-    return overall_match
+    Compile the conditions with `CompiledLabelGroups.compile()` instead if
+    they are matched against more than one object.
+    """
+    return CompiledLabelGroups.compile(required_label_groups).matches(object_labels)
 
 
 def _and_or_not_group_match(
@@ -922,12 +1178,12 @@ def _and_or_not_group_match(
 
 def _matches_service_conditions(
     service_description_condition: tuple[bool, Pattern[str]],
-    service_labels_condition: LabelGroups,
+    service_labels_condition: CompiledLabelGroups,
     match_text: ServiceName | Item,
     service_labels: Labels,
 ) -> bool:
     return _matches_service_description_condition(service_description_condition, match_text) and (
-        not service_labels_condition or matches_labels(service_labels, service_labels_condition)
+        not service_labels_condition or service_labels_condition.matches(service_labels)
     )
 
 
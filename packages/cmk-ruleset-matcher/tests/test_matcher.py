@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# Copyright (C) 2019 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import random
+from collections.abc import Mapping, Sequence
+from typing import cast
+
+import pytest
+
+from cmk.ccc.hostaddress import HostName
+from cmk.ruleset_matcher.conditions import HostOrServiceConditions
+from cmk.ruleset_matcher.labels import AndOrNotLiteral, BaseLabel, LabelGroups, Labels
+from cmk.ruleset_matcher.matcher import (
+    CompiledLabelGroups,
+    HostConditionIndex,
+    matches_host_name,
+    matches_host_tags,
+    RulesetMatcher,
+    RuleSpec,
+    TagCondition,
+)
+from cmk.ruleset_matcher.tags import TagGroupID, TagID
+
+_TAG_GROUPS = {
+    TagGroupID("agent"): [TagID("cmk-agent"), TagID("no-agent"), TagID("special-agents")],
+    TagGroupID("criticality"): [TagID("prod"), TagID("test"), TagID("critical")],
+    TagGroupID("networking"): [TagID("lan"), TagID("wan"), TagID("dmz")],
+}
+_LABELS = {"os": ["linux", "windows"], "env": ["prod", "dev"], "rack": ["1", "2", "3"]}
+
+
+def _matches_labels_uncompiled(object_labels: Labels, required_label_groups: LabelGroups) -> bool:
+    """Reference: the label matching as it was before conditions were compiled"""
+
+    def _and_or_not(given: bool, new: bool, operator: AndOrNotLiteral) -> bool:
+        match operator:
+            case "and":
+                return given and new
+            case "or":
+                return given or new
+            case "not":
+                return given and not new
+
+    overall_match = True
+    for group_operator, label_group in required_label_groups:
+        group_match = True
+        for label_operator, label in label_group:
+            if not label:
+                continue
+            if not object_labels:
+                if label_operator == "and":
+                    group_match = False
+                    break
+                continue
+            parsed = BaseLabel.from_str(label)
+            group_match = _and_or_not(
+                group_match, parsed.value == object_labels.get(parsed.name), label_operator
+            )
+        overall_match = _and_or_not(overall_match, group_match, group_operator)
+    return overall_match
+
+
+def _random_host_tags(rng: random.Random) -> set[tuple[TagGroupID, TagID]]:
+    return {(group, rng.choice(tags)) for group, tags in _TAG_GROUPS.items() if rng.random() < 0.9}
+
+
+def _random_labels(rng: random.Random) -> Labels:
+    if rng.random() < 0.2:
+        return {}
+    return {name: rng.choice(values) for name, values in _LABELS.items() if rng.random() < 0.7}
+
+
+def _random_tag_conditions(rng: random.Random) -> Mapping[TagGroupID, TagCondition]:
+    conditions: dict[TagGroupID, TagCondition] = {}
+    for group, tags in rng.sample(sorted(_TAG_GROUPS.items()), rng.randint(0, 2)):
+        match rng.randint(0, 3):
+            case 0:
+                conditions[group] = rng.choice(tags)
+            case 1:
+                conditions[group] = {"$ne": rng.choice(tags)}
+            case 2:
+                conditions[group] = {"$or": rng.sample(tags, 2)}
+            case _:
+                conditions[group] = {"$nor": rng.sample(tags, 2)}
+    return conditions
+
+
+def _random_label_groups(rng: random.Random) -> LabelGroups:
+    operators: Sequence[AndOrNotLiteral] = ("and", "or", "not")
+    groups = []
+    for group_no in range(rng.randint(0, 2)):
+        group = []
+        for label_no in range(rng.randint(1, 3)):
+            name = rng.choice(sorted(_LABELS))
+            group.append(
+                (
+                    rng.choice(("and", "not")) if label_no == 0 else rng.choice(operators),
+                    f"{name}:{rng.choice(_LABELS[name])}",
+                )
+            )
+        groups.append(
+            (rng.choice(("and", "not")) if group_no == 0 else rng.choice(operators), group)
+        )
+    return groups
+
+
+def _random_host_conditions(
+    rng: random.Random, host_names: Sequence[HostName]
+) -> HostOrServiceConditions | None:
+    if rng.random() < 0.4:
+        return None
+    entries: list = [rng.choice(host_names) for _ in range(rng.randint(0, 3))]
+    if rng.random() < 0.5:
+        entries.append({"$regex": rng.choice(("host-1", "host-.*2$", ".*3", "nohost"))})
+    return {"$nor": entries} if rng.random() < 0.3 else entries
+
+
+def test_host_condition_index_equals_one_by_one_matching() -> None:
+    rng = random.Random(4711)
+    host_names = [HostName(f"host-{n}") for n in range(300)]
+    host_tags = {host_name: _random_host_tags(rng) for host_name in host_names}
+    host_labels = {host_name: _random_labels(rng) for host_name in host_names}
+
+    index = HostConditionIndex(host_names, host_tags)
+
+    for _ in range(500):
+        scope = set(rng.sample(host_names, rng.randint(0, len(host_names))))
+        tag_conditions = _random_tag_conditions(rng)
+        label_groups = _random_label_groups(rng)
+        host_conditions = _random_host_conditions(rng, host_names)
+
+        assert index.matching_hosts(
+            index.bits(scope),
+            host_conditions,
+            tag_conditions,
+            CompiledLabelGroups.compile(label_groups),
+            host_labels.__getitem__,
+        ) == {
+            host_name
+            for host_name in scope
+            if matches_host_tags(host_tags[host_name], tag_conditions)
+            and _matches_labels_uncompiled(host_labels[host_name], label_groups)
+            and matches_host_name(host_conditions, host_name)
+        }, (tag_conditions, label_groups, host_conditions)
+
+
+def test_compiled_label_groups_equal_uncompiled_matching() -> None:
+    rng = random.Random(815)
+    for _ in range(2000):
+        label_groups = _random_label_groups(rng)
+        labels = _random_labels(rng)
+        assert CompiledLabelGroups.compile(label_groups).matches(
+            labels
+        ) is _matches_labels_uncompiled(labels, label_groups), (label_groups, labels)
+
+
+def test_host_condition_index_computes_labels_once() -> None:
+    host_names = [HostName("host-1"), HostName("host-2")]
+    index = HostConditionIndex(host_names, {host_name: set() for host_name in host_names})
+    computed: list[HostName] = []
+
+    def labels_of_host(host_name: HostName) -> Labels:
+        computed.append(host_name)
+        return {"os": "linux"}
+
+    for _ in range(2):
+        assert index.matching_hosts(
+            index.all,
+            None,
+            {},
+            CompiledLabelGroups.compile([("and", [("and", "os:linux")])]),
+            labels_of_host,
+        ) == set(host_names)
+    assert sorted(computed) == host_names
+
+
+def test_host_condition_index_leaves_unknown_tag_operators_to_fallback() -> None:
+    host_names = [HostName("host-1"), HostName("host-2")]
+    index = HostConditionIndex(host_names, {host_name: set() for host_name in host_names})
+    assert (
+        index.matching_hosts(
+            index.all,
+            None,
+            {TagGroupID("criticality"): cast(TagCondition, {"$unknown": TagID("prod")})},
+            CompiledLabelGroups.compile([]),
+            lambda _host_name: {},
+        )
+        is None
+    )
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "fallback"])
+@pytest.mark.parametrize(
+    "tag_condition, expected",
+    [
+        pytest.param({"$or": [TagID("prod"), TagID("test")]}, ["prod", "test"], id="or"),
+        pytest.param({"$nor": [TagID("prod"), TagID("test")]}, ["critical"], id="nor"),
+        pytest.param({"$ne": TagID("prod")}, ["test", "critical"], id="ne"),
+    ],
+)
+def test_ruleset_matcher_tag_condition_operators(
+    monkeypatch: pytest.MonkeyPatch,
+    use_index: bool,
+    tag_condition: TagCondition,
+    expected: Sequence[str],
+) -> None:
+    if not use_index:
+        monkeypatch.setattr(HostConditionIndex, "matching_hosts", lambda *_args: None)
+    host_tags = {
+        HostName(tag_id): {(TagGroupID("criticality"), TagID(tag_id))}
+        for tag_id in ("prod", "test", "critical")
+    }
+    matcher = RulesetMatcher(
+        host_tags={host_name: dict(tags) for host_name, tags in host_tags.items()},
+        host_paths={},
+        all_configured_hosts=frozenset(host_tags),
+        clusters_of={},
+        nodes_of={},
+    )
+    ruleset: Sequence[RuleSpec[str]] = [
+        {
+            "id": "1",
+            "value": "matched",
+            "condition": {"host_tags": {TagGroupID("criticality"): tag_condition}},
+        }
+    ]
+    assert sorted(
+        host_name
+        for host_name in host_tags
+        if matcher.get_host_values_all(host_name, ruleset, lambda _h: {})
+    ) == sorted(expected)
@@ -45,6 +45,7 @@ INVALID_SPAN = trace.INVALID_SPAN
 ReadableSpan = sdk_trace.ReadableSpan
 TracerProvider = sdk_trace.TracerProvider
 get_current_span = trace.get_current_span
+use_span = trace.use_span
 
 
 def init_tracing(
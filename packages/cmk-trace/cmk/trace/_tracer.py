@@ -28,6 +28,19 @@ class Tracer:
             name, context=context, links=links, attributes=attributes, kind=kind
         )
 
+    def start_span(
+        self,
+        name: str,
+        context: Context | None = None,
+        links: Sequence[trace.Link] | None = None,
+        kind: trace.SpanKind = trace.SpanKind.INTERNAL,
+        attributes: types.Attributes = None,
+    ) -> Span:
+        """Start a span without making it the current one, it has to be ended explicitly"""
+        return self._tracer.start_span(
+            name, context=context, links=links, attributes=attributes, kind=kind
+        )
+
     def instrument[**P, T](
         self, name: str | None = None
     ) -> Callable[[Callable[P, T]], Callable[P, T]]:
@@ -89,6 +89,17 @@ TableEventConsoleStatus::TableEventConsoleStatus() {
                                       offsets));
     addColumn(ECRow::makeDoubleColumn("status_average_sync_time",
                                       "The average sync time", offsets));
+    addColumn(ECRow::makeDoubleColumn(
+        "status_p99_processing_time",
+        "The 99th percentile of the recent incoming message processing times",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn(
+        "status_p99_request_time",
+        "The 99th percentile of the recent status client request times",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn(
+        "status_p99_sync_time", "The 99th percentile of the recent sync times",
+        offsets));
     addColumn(ECRow::makeStringColumn(
         "status_replication_slavemode",
         "The replication slavemode (empty or one of sync/takeover)", offsets));
@@ -398,6 +398,9 @@ ColumnDefinitions event_console_status_columns() {
         {"status_num_open_events", ColumnType::int_},
         {"status_overflow_rate", ColumnType::double_},
         {"status_overflows", ColumnType::int_},
+        {"status_p99_processing_time", ColumnType::double_},
+        {"status_p99_request_time", ColumnType::double_},
+        {"status_p99_sync_time", ColumnType::double_},
         {"status_replication_last_sync", ColumnType::time},
         {"status_replication_slavemode", ColumnType::string},
         {"status_replication_success", ColumnType::int_},
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Agent receiver load benchmark
+
+Pushes the agent data of many agents concurrently to an in-process agent receiver. Some agents
+push large payloads, which must not stall the event loop serving the other agents. The longest
+stall is recorded in the extra info of the benchmark.
+
+The scenario does not need a site:
+
+  pytest tests/performance/test_agent_receiver_performance.py --rounds=8 --benchmark-verbose
+"""
+
+import asyncio
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from uuid import UUID, uuid4
+from zlib import compress
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.agent_receiver.agent_receiver.app import create_app
+from cmk.agent_receiver.agent_receiver.endpoints import shutdown_agent_data_ingestion
+from cmk.agent_receiver.lib.config import get_config
+from cmk.agent_receiver.lib.mtls_auth_validator import INJECTED_ISSUER_HEADER, INJECTED_UUID_HEADER
+from cmk.testlib.agent_receiver.certs import agent_ca_common_name, set_up_site_certs
+
+# Raise to 10_000 for a local load test
+_AGENTS = 1_000
+_CONCURRENCY = 20
+# Some agents push large payloads, e.g. with many log messages
+_LARGE_PAYLOAD_EVERY = 250
+
+_AGENT_OUTPUT = b"<<<check_mk>>>\nVersion: 2.5.0\n<<<df>>>\n" + b"/dev/sda1 ext4 1 2 3 4% /\n" * 500
+_LARGE_AGENT_OUTPUT = b"<<<logwatch>>>\n" + b"W Something happened\n" * 5_000_000
+
+
+@pytest.fixture(name="agents")
+def fixture_agents(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[list[UUID]]:
+    (site_dir := tmp_path / "perf").mkdir()
+    monkeypatch.setenv("OMD_ROOT", str(site_dir))
+    monkeypatch.setenv("OMD_SITE", "perf")
+    get_config.cache_clear()
+    config = get_config()
+    config.agent_output_dir.mkdir(parents=True)
+    set_up_site_certs(config=config)
+    uuids = [uuid4() for _nr in range(_AGENTS)]
+    for uuid in uuids:
+        (target_dir := tmp_path / "push-agent" / str(uuid)).mkdir(parents=True)
+        (config.agent_output_dir / str(uuid)).symlink_to(target_dir)
+    yield uuids
+    shutdown_agent_data_ingestion()
+    get_config.cache_clear()
+
+
+async def _push_all(app: FastAPI, uuids: list[UUID]) -> float:
+    """Push the agent data of all agents and return the longest stall of the event loop"""
+    payload = compress(_AGENT_OUTPUT)
+    large_payload = compress(_LARGE_AGENT_OUTPUT)
+    issuer = agent_ca_common_name(get_config().site_name)
+    concurrency = asyncio.Semaphore(_CONCURRENCY)
+    max_stall = 0.0
+
+    async def watch_event_loop() -> None:
+        nonlocal max_stall
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_stall = max(max_stall, time.perf_counter() - before)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+    ) as client:
+
+        async def push(nr: int, uuid: UUID) -> None:
+            async with concurrency:
+                response = await client.post(
+                    f"/agent_data/{uuid}",
+                    headers={
+                        "compression": "zlib",
+                        INJECTED_UUID_HEADER: str(uuid),
+                        INJECTED_ISSUER_HEADER: issuer,
+                    },
+                    files={
+                        "monitoring_data": (
+                            "filename",
+                            large_payload if nr % _LARGE_PAYLOAD_EVERY == 0 else payload,
+                        )
+                    },
+                )
+                assert response.status_code == 204
+
+        watcher = asyncio.create_task(watch_event_loop())
+        await asyncio.gather(*(push(nr, uuid) for nr, uuid in enumerate(uuids)))
+        watcher.cancel()
+    return max_stall
+
+
+def test_performance_agent_data_uploads(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, agents: list[UUID]
+) -> None:
+    """Push the agent data of many agents concurrently"""
+    app = create_app()
+    max_stall = benchmark.pedantic(  # type: ignore[no-untyped-call]
+        lambda: asyncio.run(_push_all(app, agents)),
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+    benchmark.extra_info["max_event_loop_stall_seconds"] = max_stall
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Automation upload benchmark
+
+Uploads a big file like a config sync archive to a local HTTP server, once with the streamed
+request body of the automation calls and once with the body encoded in memory by requests. The
+peak memory of an upload is recorded in the extra info of the benchmark.
+
+The scenarios do not need a site:
+
+  pytest tests/performance/test_automation_upload_performance.py --rounds=8 --benchmark-verbose
+"""
+
+import threading
+import tracemalloc
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import override
+
+import pytest
+import requests
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.gui.watolib.automations import _StreamedMultipartFormData
+
+_UPLOAD_SIZE = 50 * 1024 * 1024
+
+
+class _DiscardingHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        remaining = int(self.headers["Content-Length"])
+        while remaining > 0 and (chunk := self.rfile.read(min(remaining, 65536))):
+            remaining -= len(chunk)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    @override
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture(name="url", scope="module")
+def fixture_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DiscardingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+@pytest.fixture(name="upload_path", scope="module")
+def fixture_upload_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    upload_path = tmp_path_factory.mktemp("upload") / "sync_archive"
+    upload_path.write_bytes(b"x" * _UPLOAD_SIZE)
+    return upload_path
+
+
+def _peak_memory(upload: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        upload()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def test_performance_streamed_upload(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, url: str, upload_path: Path
+) -> None:
+    """Upload the file with the streamed request body of the automation calls"""
+
+    def upload() -> None:
+        with upload_path.open("rb") as f:
+            body = _StreamedMultipartFormData({"site_id": "remote"}, {"sync_archive": f})
+            requests.post(
+                url, data=body, headers={"Content-Type": body.content_type}, timeout=60
+            ).raise_for_status()
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        upload,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+    benchmark.extra_info["peak_memory_bytes"] = _peak_memory(upload)
+
+
+def test_performance_in_memory_upload(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, url: str, upload_path: Path
+) -> None:
+    """Upload the file with the request body encoded in memory by requests"""
+
+    def upload() -> None:
+        with upload_path.open("rb") as f:
+            requests.post(
+                url, data={"site_id": "remote"}, files={"sync_archive": f}, timeout=60
+            ).raise_for_status()
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        upload,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+    benchmark.extra_info["peak_memory_bytes"] = _peak_memory(upload)
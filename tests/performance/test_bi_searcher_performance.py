@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""BI searcher benchmark
+
+Runs the host and service searches of a BI compilation over many synthetic hosts. Every search
+happens again and again for different rule nodes, once with the indexes of the searcher and
+once by checking the conditions against every host.
+
+The scenarios do not need a site:
+
+  pytest tests/performance/test_bi_searcher_performance.py --rounds=8 --benchmark-verbose
+"""
+
+import random
+import re
+from collections.abc import Mapping, Sequence
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.bi.lib import BIHostData, BIServiceData
+from cmk.bi.searcher import BISearcher
+from cmk.bi.type_defs import HostConditions, HostServiceConditions
+from cmk.ccc.hostaddress import HostName
+from cmk.ruleset_matcher.labels import LabelGroups
+from cmk.ruleset_matcher.matcher import matches_labels, matches_tag_condition, TagCondition
+from cmk.ruleset_matcher.tags import TagGroupID, TagID
+
+# Raise to 100_000 for a local load test
+_HOSTS = 20_000
+_SEARCHES = 5
+_REPETITIONS = 4
+
+_TAG_GROUPS = {
+    TagGroupID("criticality"): [TagID("prod"), TagID("test"), TagID("critical")],
+    TagGroupID("networking"): [TagID("lan"), TagID("wan"), TagID("dmz")],
+}
+_LABELS = {"os": ["linux", "windows"], "env": ["prod", "dev"]}
+_FOLDERS = ["", "dc1/", "dc1/rack1/", "dc1/rack2/", "dc2/", "dc2/rack1/", "dc10/"]
+_SERVICES = [
+    *(f"Interface {n}" for n in range(20)),
+    *(f"Filesystem /data{n}" for n in range(10)),
+    "CPU load",
+    "CPU utilization",
+    "Memory",
+    "Uptime",
+    "Check_MK",
+    "Check_MK Discovery",
+]
+_SERVICE_PATTERNS = [
+    "Interface",
+    "Interface 1(.*)",
+    "CPU|Memory",
+    "Filesystem /data(\\d)",
+    "Check_MK$",
+    ".*load",
+]
+
+
+def _random_hosts(rng: random.Random) -> dict[str, BIHostData]:
+    return {
+        f"host-{n}": BIHostData(
+            site_id="site",
+            tags={
+                (group, rng.choice(tags))
+                for group, tags in _TAG_GROUPS.items()
+                if rng.random() < 0.9
+            },
+            labels={
+                name: rng.choice(values) for name, values in _LABELS.items() if rng.random() < 0.7
+            },
+            folder=rng.choice(_FOLDERS),
+            services={
+                service_description: BIServiceData(
+                    tags=set(),
+                    labels={"svc": rng.choice(["a", "b"])} if rng.random() < 0.5 else {},
+                )
+                for service_description in rng.sample(_SERVICES, rng.randint(0, 12))
+            },
+            children=(HostName("switch-child"),),
+            parents=(HostName("switch"),),
+            alias=f"host-{n}_alias",
+            name=HostName(f"host-{n}"),
+        )
+        for n in range(_HOSTS)
+    }
+
+
+def _random_conditions(rng: random.Random) -> HostServiceConditions:
+    tag_conditions: dict[TagGroupID, TagCondition] = {}
+    for group, tags in rng.sample(sorted(_TAG_GROUPS.items()), rng.randint(0, 2)):
+        choices: list[TagCondition] = [
+            rng.choice(tags),
+            {"$ne": rng.choice(tags)},
+            {"$or": rng.sample(tags, 2)},
+        ]
+        tag_conditions[group] = rng.choice(choices)
+    name = rng.choice(sorted(_LABELS))
+    label_groups: LabelGroups = (
+        [(rng.choice(("and", "not")), [("and", f"{name}:{rng.choice(_LABELS[name])}")])]
+        if rng.random() < 0.5
+        else []
+    )
+    return {
+        "host_choice": {"type": "all_hosts"},
+        "host_folder": rng.choice(["", "dc1", "dc1/rack1", "dc2"]),
+        "host_tags": tag_conditions,
+        "host_label_groups": label_groups,
+        "service_regex": rng.choice(_SERVICE_PATTERNS),
+        "service_label_groups": rng.choice([[], [("and", [("and", "svc:a")])]]),
+    }
+
+
+def _unindexed_search_hosts(
+    hosts: Mapping[str, BIHostData], conditions: HostConditions
+) -> list[BIHostData]:
+    folder_path = f"{conditions['host_folder']}/"
+    return [
+        host
+        for host in hosts.values()
+        if (not conditions["host_folder"] or host.folder.startswith(folder_path))
+        and all(
+            matches_tag_condition(taggroup_id, tag_condition, host.tags)
+            for taggroup_id, tag_condition in conditions["host_tags"].items()
+        )
+        and matches_labels(host.labels, conditions["host_label_groups"])
+    ]
+
+
+def _unindexed_search_services(
+    hosts: Mapping[str, BIHostData], conditions: HostServiceConditions
+) -> list[tuple[str, str, tuple[str | None, ...]]]:
+    regex_pattern = re.compile(conditions["service_regex"])
+    return [
+        (host.name, service_description, match.groups())
+        for host in _unindexed_search_hosts(hosts, conditions)
+        for service_description, service_data in host.services.items()
+        if (match := regex_pattern.match(service_description))
+        and matches_labels(service_data.labels, conditions["service_label_groups"])
+    ]
+
+
+@pytest.fixture(name="hosts", scope="module")
+def fixture_hosts() -> dict[str, BIHostData]:
+    return _random_hosts(random.Random(42))
+
+
+@pytest.fixture(name="searches", scope="module")
+def fixture_searches() -> Sequence[HostServiceConditions]:
+    rng = random.Random(4711)
+    return [_random_conditions(rng) for _ in range(_SEARCHES)]
+
+
+def test_performance_bi_searcher_indexed(
+    benchmark: BenchmarkFixture,
+    pytestconfig: pytest.Config,
+    hosts: dict[str, BIHostData],
+    searches: Sequence[HostServiceConditions],
+) -> None:
+    """Search with the indexes of the searcher, including building them"""
+
+    def search() -> None:
+        searcher = BISearcher()
+        searcher.set_hosts(hosts)
+        for _ in range(_REPETITIONS):
+            for conditions in searches:
+                searcher.search_hosts(conditions)
+                searcher.search_services(conditions)
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        search,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+    benchmark.extra_info["hosts"] = len(hosts)
+
+
+def test_performance_bi_searcher_unindexed(
+    benchmark: BenchmarkFixture,
+    pytestconfig: pytest.Config,
+    hosts: dict[str, BIHostData],
+    searches: Sequence[HostServiceConditions],
+) -> None:
+    """Search by checking the conditions against every host"""
+
+    def search() -> None:
+        for _ in range(_REPETITIONS):
+            for conditions in searches:
+                _unindexed_search_hosts(hosts, conditions)
+                _unindexed_search_services(hosts, conditions)
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        search,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+    benchmark.extra_info["hosts"] = len(hosts)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# mypy: disable-error-code="explicit-any"
+
+"""Event Console load benchmark
+
+Replays synthetic syslog traffic against the event processing of an in-process event server
+which already has many open events. Counting, cancelling and the event limits have to look
+up the open events of the rule and host of every message, so this is where the lookups show.
+
+The scenario does not need a site:
+
+  pytest tests/performance/test_ec_performance.py --rounds=8 --benchmark-verbose
+"""
+
+import logging
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+import cmk.ec.export as ec
+from cmk.ccc.site import SiteId
+from cmk.ec.config import Config, Count, EventLimit
+from cmk.ec.helpers import ECLock
+from cmk.ec.main import (
+    create_history,
+    default_slave_status_master,
+    EventServer,
+    EventStatus,
+    make_config,
+    StatusTableEvents,
+    StatusTableHistory,
+)
+from cmk.ec.perfcounters import Perfcounters
+from cmk.ec.settings import create_settings
+
+_OPEN_EVENTS = 50_000
+_MESSAGES_PER_ROUND = 2_000
+_HOSTS = 1_000
+
+logger = logging.getLogger(__name__)
+
+
+class _CoreWithoutHosts:
+    """Answers the queries of the event server as a core without any hosts would"""
+
+    def query(self, query: str) -> Sequence[Sequence[Any]]:
+        return [[0]] if query.startswith("GET status") else []
+
+
+def _rules() -> list[ec.Rule]:
+    rule = ec.Rule(
+        actions=[],
+        actions_in_downtime=True,
+        autodelete=False,
+        cancel_action_phases="always",
+        cancel_actions=[],
+        comment="",
+        description="",
+        disabled=False,
+        docu_url="",
+        invert_matching=False,
+        sl=ec.ServiceLevel(precedence="message", value=0),
+        state=2,
+    )
+    return [
+        # Every error opens an event, which is cancelled by the recovery with the same number
+        rule | ec.Rule(id="errors", match=r"ERROR (\d+)", match_ok=r"RECOVERED (\d+)"),
+        # Warnings are counted per host and only open an event at the 1000th one
+        rule
+        | ec.Rule(
+            id="warnings",
+            match="WARNING",
+            count=Count(
+                count=1000,
+                period=3600,
+                algorithm="interval",
+                count_duration=None,
+                count_ack=False,
+                separate_host=True,
+                separate_application=False,
+                separate_match_groups=False,
+            ),
+        ),
+    ]
+
+
+def _syslog_message(nr: int, text: str) -> bytes:
+    return f"<11>Oct 17 10:00:00 host-{nr % _HOSTS} app: {text} {nr}".encode()
+
+
+def _traffic() -> list[bytes]:
+    """Mostly counted warnings, some new errors and some recoveries of open ones"""
+    messages = []
+    for nr in range(_MESSAGES_PER_ROUND):
+        match nr % 10:
+            case 0:
+                messages.append(_syslog_message(_OPEN_EVENTS + nr, "ERROR"))
+            case 1:
+                messages.append(_syslog_message(nr * 7, "RECOVERED"))
+            case _:
+                messages.append(_syslog_message(nr, "WARNING"))
+    return messages
+
+
+def _event_server_with_open_events(tmp_path: Path) -> EventServer:
+    settings = create_settings("1.2.3i45", tmp_path, ["mkeventd"])
+    limit = EventLimit(action="stop", limit=2 * _OPEN_EVENTS)
+    config: Config = make_config(
+        ec.default_config()
+        | {
+            "rule_packs": [ec.default_rule_pack(_rules())],
+            "event_limit": {"by_host": limit, "by_rule": limit, "overall": limit},
+            "archive_mode": "file",
+        }
+    )
+    perfcounters = Perfcounters(logger)
+    history = create_history(
+        settings, config, logger, StatusTableEvents.columns, StatusTableHistory.columns
+    )
+    event_server = EventServer(
+        logger,
+        settings,
+        config,
+        default_slave_status_master(),
+        perfcounters,
+        ECLock(logger),
+        history,
+        EventStatus(settings, config, perfcounters, history, logger, _CoreWithoutHosts()),
+        StatusTableEvents.columns,
+        _CoreWithoutHosts(),
+        SiteId("perf"),
+        create_pipes_and_sockets=False,
+    )
+    event_server.reload_configuration(config, history=history)
+    event_server.process_syslog_messages(
+        (_syslog_message(nr, "ERROR") for nr in range(_OPEN_EVENTS)), None
+    )
+    return event_server
+
+
+def test_performance_ec_syslog_replay(
+    benchmark: BenchmarkFixture,
+    pytestconfig: pytest.Config,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> None:
+    """Process syslog messages with many open events"""
+    messages = _traffic()
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        lambda event_server: event_server.process_syslog_messages(messages, None),
+        setup=lambda: ((_event_server_with_open_events(tmp_path_factory.mktemp("ec")),), {}),
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+        # pytest-benchmark forbids iterations > 1 together with a `setup` function
+        iterations=1,
+    )
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""TCP fetcher benchmark
+
+Receives a recorded agent output, repeated up to the size sent by agents with a lot of logwatch
+data, over a local socket. The growth of the peak RSS while receiving is recorded in the extra
+info of the benchmark.
+
+The scenario does not need a site:
+
+  pytest tests/performance/test_fetcher_performance.py --rounds=8 --benchmark-verbose
+"""
+
+import re
+import socket
+import threading
+from collections.abc import Callable
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.checkengine.fetchers.tcp import recvall
+from tests.testlib.common.repo import repo_path
+
+_AGENT_OUTPUT_SIZE = 50 * 1024 * 1024
+
+
+def _agent_output() -> bytes:
+    recorded = (
+        repo_path() / "tests/system/singlesite/cmk/base/test-files/linux-agent-output"
+    ).read_bytes()
+    return recorded * (_AGENT_OUTPUT_SIZE // len(recorded) + 1)
+
+
+def _sending_socket(data: bytes) -> tuple[socket.socket, threading.Thread]:
+    receiving, sending = socket.socketpair()
+
+    def send() -> None:
+        with sending:
+            sending.sendall(data)
+
+    sender = threading.Thread(target=send)
+    sender.start()
+    return receiving, sender
+
+
+def _receive(sock: socket.socket, sender: threading.Thread) -> bytes:
+    try:
+        return recvall(sock, socket.MSG_WAITALL, prefix=b"<<")
+    finally:
+        sock.close()
+        sender.join()
+
+
+def _rss_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        if match := re.search(rf"^{field}:\s+(\d+) kB$", status.read(), re.MULTILINE):
+            return int(match.group(1))
+    raise LookupError(field)
+
+
+def _peak_rss_growth(receive: Callable[[], object]) -> int:
+    # Resets the peak RSS (VmHWM) to the current RSS
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+    before = _rss_kb("VmRSS")
+    receive()
+    return (_rss_kb("VmHWM") - before) * 1024
+
+
+def test_performance_recvall(benchmark: BenchmarkFixture, pytestconfig: pytest.Config) -> None:
+    """Receive a big agent output"""
+    agent_output = _agent_output()
+
+    def setup() -> tuple[tuple[socket.socket, threading.Thread], dict[str, object]]:
+        return _sending_socket(agent_output), {}
+
+    received = benchmark.pedantic(  # type: ignore[no-untyped-call]
+        _receive,
+        setup=setup,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+        # pytest-benchmark forbids iterations > 1 together with a `setup` function
+        iterations=1,
+    )
+    assert received == b"<<" + agent_output
+    del received
+
+    benchmark.extra_info["agent_output_bytes"] = len(agent_output)
+    benchmark.extra_info["peak_rss_growth_bytes"] = _peak_rss_growth(
+        lambda: _receive(*_sending_socket(agent_output))
+    )
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Inventory tree benchmark
+
+Reads a single attribute from the inventory trees of many hosts, once by parsing the JSON tree
+files and once from the indexed tree files merged with a status data tree like in the GUI. The
+migration that indexes the existing inventory trees of a site is measured, too.
+
+The scenarios do not need a site:
+
+  pytest tests/performance/test_inventory_performance.py --rounds=8 --benchmark-verbose
+"""
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.ccc.hostaddress import HostName
+from cmk.inventory.structured_data import (
+    deserialize_tree,
+    InventoryStore,
+    make_meta,
+    merge_trees,
+    SDKey,
+    SDNodeName,
+    SDRawTree,
+)
+from cmk.inventory.transformation import index_inventory_trees
+
+# Raise to 10_000 for a local load test
+_HOSTS = 1_000
+_PACKAGES = 2_000
+_CPU = (SDNodeName("hardware"), SDNodeName("cpu"))
+
+
+def _raw_tree(num: int) -> SDRawTree:
+    def _node(pairs: dict[SDKey, str | int], rows: list[dict[SDKey, str | int]]) -> SDRawTree:
+        return SDRawTree(
+            Attributes={"Pairs": pairs},
+            Table={"KeyColumns": [SDKey("name")], "Rows": rows} if rows else {},
+            Nodes={},
+        )
+
+    return SDRawTree(
+        Attributes={},
+        Table={},
+        Nodes={
+            SDNodeName("hardware"): SDRawTree(
+                Attributes={},
+                Table={},
+                Nodes={SDNodeName("cpu"): _node({SDKey("model"): f"CPU {num}"}, [])},
+            ),
+            SDNodeName("software"): SDRawTree(
+                Attributes={},
+                Table={},
+                Nodes={
+                    SDNodeName("packages"): _node(
+                        {},
+                        [
+                            {SDKey("name"): f"package-{n}", SDKey("version"): f"1.{n}.{num}"}
+                            for n in range(_PACKAGES)
+                        ],
+                    )
+                },
+            ),
+        },
+    )
+
+
+_STATUS_DATA_TREE = deserialize_tree(
+    SDRawTree(
+        Attributes={},
+        Table={},
+        Nodes={
+            SDNodeName("software"): SDRawTree(
+                Attributes={"Pairs": {SDKey("uptime"): 4711}}, Table={}, Nodes={}
+            )
+        },
+    )
+)
+
+
+@pytest.fixture(name="omd_root", scope="module")
+def fixture_omd_root(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    omd_root = tmp_path_factory.mktemp("inventory")
+    inv_store = InventoryStore(omd_root)
+    for num in range(_HOSTS):
+        inv_store.save_inventory_tree(
+            host_name=HostName(f"host-{num}"),
+            tree=deserialize_tree(_raw_tree(num)),
+            meta=make_meta(do_archive=True),
+        )
+    return omd_root
+
+
+def _host_names() -> list[HostName]:
+    return [HostName(f"host-{num}") for num in range(_HOSTS)]
+
+
+def test_performance_inventory_attribute_from_json(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, omd_root: Path
+) -> None:
+    """Read one attribute per host from the JSON tree files"""
+    inv_store = InventoryStore(omd_root)
+
+    def read() -> None:
+        for host_name in _host_names():
+            tree_path = inv_store.inv_paths.inventory_tree(host_name).path
+            tree = deserialize_tree(json.loads(tree_path.read_text()))
+            assert tree.get_attribute(_CPU, SDKey("model")) is not None
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        read,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+
+
+def test_performance_inventory_attribute_from_indexed_trees(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, omd_root: Path
+) -> None:
+    """Read one attribute per host from the merged trees like the GUI"""
+    inv_store = InventoryStore(omd_root)
+
+    def read() -> None:
+        for host_name in _host_names():
+            tree = merge_trees(
+                inv_store.load_inventory_tree(host_name=host_name), _STATUS_DATA_TREE
+            )
+            assert tree.get_attribute(_CPU, SDKey("model")) is not None
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        read,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+
+
+def test_performance_index_inventory_trees(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, omd_root: Path
+) -> None:
+    """Index the inventory trees of all hosts like after an update"""
+    inv_store = InventoryStore(omd_root)
+
+    def drop_indexed_trees() -> tuple[tuple[()], dict[str, object]]:
+        for host_name in _host_names():
+            inv_store.inv_paths.inventory_tree_indexed(host_name).unlink(missing_ok=True)
+        return (), {}
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        lambda: index_inventory_trees(
+            logger=logging.getLogger(__name__),
+            omd_root=omd_root,
+            host_names=_host_names(),
+        ),
+        setup=drop_indexed_trees,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+        # pytest-benchmark forbids iterations > 1 together with a `setup` function
+        iterations=1,
+    )
+    assert all(
+        inv_store.inv_paths.inventory_tree_indexed(host_name).exists()
+        for host_name in _host_names()
+    )
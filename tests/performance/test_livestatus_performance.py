@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Livestatus multisite query benchmark
+
+Queries several local fake livestatus servers, each of which sends its response in chunks with
+a pause in between like a site behind a slow network. Receiving one site after the other would
+take at least the sum of the transfer times of the sites, which is recorded in the extra info of
+the benchmark.
+
+The scenario does not need a site:
+
+  pytest tests/performance/test_livestatus_performance.py --rounds=8 --benchmark-verbose
+"""
+
+import json
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.ccc.site import SiteId
+from cmk.livestatus_client import MultiSiteConnection, SiteConfiguration, SiteConfigurations
+
+_SITES = 8
+_ROWS = 2_000
+_CHUNK_SIZE = 65536
+_CHUNK_PAUSE = 0.01
+
+
+class _SlowLivestatusServer:
+    """Answers every query on a UNIX socket with the same payload, sent in chunks"""
+
+    def __init__(self, path: Path, payload: bytes) -> None:
+        self.path = path
+        self._payload = payload
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(str(path))
+        self._listener.listen(5)
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                connection, _address = self._listener.accept()
+            except OSError:
+                return  # closed
+            threading.Thread(target=self._answer, args=(connection,), daemon=True).start()
+
+    def _answer(self, connection: socket.socket) -> None:
+        with connection:
+            while True:
+                query = b""
+                while not query.endswith(b"\n\n"):
+                    if not (data := connection.recv(4096)):
+                        return
+                    query += data
+                connection.sendall(b"%03d %11d\n" % (200, len(self._payload)))
+                for offset in range(0, len(self._payload), _CHUNK_SIZE):
+                    connection.sendall(self._payload[offset : offset + _CHUNK_SIZE])
+                    time.sleep(_CHUNK_PAUSE)
+
+    def close(self) -> None:
+        self._listener.close()
+
+
+def _payload() -> bytes:
+    # About 1 MB in few rows: more than the socket buffers take, but cheap to parse
+    return (
+        b"["
+        + b",\n".join(json.dumps([f"host-{n}" + "x" * 500, n]).encode() for n in range(_ROWS))
+        + b"]\n"
+    )
+
+
+def _site_config(site_id: SiteId, path: Path) -> SiteConfiguration:
+    return SiteConfiguration(
+        id=site_id,
+        alias=str(site_id),
+        socket=f"unix:{path}",
+        disable_wato=True,
+        disabled=False,
+        insecure=False,
+        is_trusted=False,
+        message_broker_port=5672,
+        multisiteurl="",
+        persist=False,
+        proxy=None,
+        replicate_ec=False,
+        replicate_mkps=False,
+        replication=None,
+        status_host=None,
+        timeout=5,
+        url_prefix="",
+        user_login=True,
+    )
+
+
+@pytest.fixture(name="live")
+def fixture_live(tmp_path: Path) -> Iterator[MultiSiteConnection]:
+    payload = _payload()
+    servers = [_SlowLivestatusServer(tmp_path / f"site{num}", payload) for num in range(_SITES)]
+    live = MultiSiteConnection(
+        SiteConfigurations(
+            {
+                SiteId(f"site{num}"): _site_config(SiteId(f"site{num}"), server.path)
+                for num, server in enumerate(servers)
+            }
+        )
+    )
+    try:
+        yield live
+    finally:
+        live.disconnect()
+        for server in servers:
+            server.close()
+
+
+def test_performance_multisite_query(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, live: MultiSiteConnection
+) -> None:
+    """Query all sites, receiving their responses concurrently"""
+    rows = benchmark.pedantic(  # type: ignore[no-untyped-call]
+        live.query,
+        args=("GET hosts\nColumns: name\n",),
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+    assert len(rows) == _SITES * _ROWS
+    assert not live.dead_sites()
+
+    benchmark.extra_info["sites"] = _SITES
+    benchmark.extra_info["transfer_seconds_per_site"] = (
+        len(_payload()) // _CHUNK_SIZE * _CHUNK_PAUSE
+    )
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Piggyback backend benchmark
+
+Queries the piggybacked hosts of many sources, once with the index of the stored payloads and
+once after the index has been dropped, so that it is built from the payload files again.
+
+The scenarios do not need a site:
+
+  pytest tests/performance/test_piggyback_performance.py --rounds=8 --benchmark-verbose
+"""
+
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.ccc.hostaddress import HostAddress, HostName
+from cmk.piggyback.backend import get_piggybacked_host_with_sources, store_piggyback_raw_data
+
+_SOURCES = 10
+_PIGGYBACKED_HOSTS_PER_SOURCE = 1_000
+_TIMESTAMP = 1640000000.0
+
+
+@pytest.fixture(name="omd_root", scope="module")
+def fixture_omd_root(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    omd_root = tmp_path_factory.mktemp("piggyback")
+    for source in range(_SOURCES):
+        store_piggyback_raw_data(
+            HostName(f"source{source}"),
+            {
+                HostAddress(f"vm-{source}-{nr}"): [b"<<<check_mk>>>", b"Version: 2.5.0"]
+                for nr in range(_PIGGYBACKED_HOSTS_PER_SOURCE)
+            },
+            message_timestamp=_TIMESTAMP,
+            contact_timestamp=_TIMESTAMP,
+            omd_root=omd_root,
+        )
+    return omd_root
+
+
+def test_performance_piggybacked_hosts_indexed(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, omd_root: Path
+) -> None:
+    """Query the piggybacked hosts with the index"""
+    # Builds the index
+    get_piggybacked_host_with_sources(omd_root)
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        get_piggybacked_host_with_sources,
+        args=(omd_root,),
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+
+
+def test_performance_piggybacked_hosts_scanned(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, omd_root: Path
+) -> None:
+    """Query the piggybacked hosts while the index has to be built from the payload files"""
+
+    def drop_index() -> tuple[tuple[Path], dict[str, object]]:
+        (omd_root / "tmp/check_mk/piggyback_index/index").unlink(missing_ok=True)
+        return (omd_root,), {}
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        get_piggybacked_host_with_sources,
+        setup=drop_index,
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+        # pytest-benchmark forbids iterations > 1 together with a `setup` function
+        iterations=1,
+    )
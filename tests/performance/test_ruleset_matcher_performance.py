@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Label condition matching benchmark
+
+Matches the label conditions of a rule against the labels of many hosts, once with conditions
+that are parsed for every match and once with conditions that are compiled once per rule.
+
+The scenarios do not need a site:
+
+  pytest tests/performance/test_ruleset_matcher_performance.py --rounds=8 --benchmark-verbose
+"""
+
+from collections.abc import Sequence
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.ruleset_matcher.labels import LabelGroups, Labels
+from cmk.ruleset_matcher.matcher import CompiledLabelGroups, matches_labels
+
+_LABEL_GROUPS: LabelGroups = [
+    ("and", [("and", "os:linux"), ("or", "os:aix"), ("not", "env:dev")]),
+    ("or", [("and", "rack:1"), ("and", "cmk/site:heute")]),
+]
+_HOST_LABELS: Sequence[Labels] = [
+    {"os": "linux", "env": f"{n % 3}", "rack": f"{n % 5}", "cmk/site": "heute"}
+    for n in range(10_000)
+]
+
+
+def test_performance_label_conditions_parsed_per_match(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config
+) -> None:
+    """Match the label conditions, parsing them for every host"""
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        lambda: [matches_labels(labels, _LABEL_GROUPS) for labels in _HOST_LABELS],
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
+
+
+def test_performance_label_conditions_compiled(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config
+) -> None:
+    """Match the label conditions, compiled once for all hosts"""
+    compiled = CompiledLabelGroups.compile(_LABEL_GROUPS)
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        lambda: [compiled.matches(labels) for labels in _HOST_LABELS],
+        rounds=val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16,
+    )
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Value store benchmark
+
+Runs check cycles of a host with many services, of which only one changes its value store per
+cycle. The stores are written once in full per cycle and once as a journal of the changed value
+stores. The bytes written per cycle are recorded in the extra info of the benchmark.
+
+The scenarios do not need a site:
+
+  pytest tests/performance/test_value_store_performance.py --rounds=8 --benchmark-verbose
+"""
+
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cmk.ccc.hostaddress import HostName
+from cmk.checkengine.value_store import (
+    AllValueStoresStore,
+    JournaledValueStoresStore,
+    ValueStoreKey,
+)
+
+_SERVICES = 1_000
+
+_STORES = {
+    (HostName("host"), "interfaces", f"{n}"): {"in": f"{n}.0", "out": f"{n}.0"}
+    for n in range(_SERVICES)
+}
+
+
+def _run_cycles(
+    benchmark: BenchmarkFixture,
+    pytestconfig: pytest.Config,
+    avss: AllValueStoresStore,
+    written: Path,
+) -> None:
+    rounds = val if isinstance((val := pytestconfig.getoption("rounds")), int) else 16
+    avss.update(_STORES)
+    cycle = 0
+    bytes_before = 0
+
+    def next_cycle() -> tuple[tuple[dict[ValueStoreKey, dict[str, str]]], dict[str, object]]:
+        nonlocal cycle, bytes_before
+        cycle += 1
+        # The full rewrite replaces the file, the journal grows
+        bytes_before = 0 if written == avss.path else written.stat().st_size
+        return ({**_STORES, (HostName("host"), "interfaces", "0"): {"in": f"{cycle}"}},), {}
+
+    bytes_written = 0
+
+    def update(stores: dict[ValueStoreKey, dict[str, str]]) -> None:
+        nonlocal bytes_written
+        avss.load()
+        avss.update(stores)
+        bytes_written += written.stat().st_size - bytes_before
+
+    benchmark.pedantic(  # type: ignore[no-untyped-call]
+        update,
+        setup=next_cycle,
+        rounds=rounds,
+        # pytest-benchmark forbids iterations > 1 together with a `setup` function
+        iterations=1,
+    )
+    benchmark.extra_info["bytes_written_per_cycle"] = bytes_written / rounds
+
+
+def test_performance_value_stores_full_rewrite(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, tmp_path: Path
+) -> None:
+    """Write all value stores in every check cycle"""
+    avss = AllValueStoresStore(tmp_path / "counters", log_debug=lambda _msg: None)
+    _run_cycles(benchmark, pytestconfig, avss, avss.path)
+
+
+def test_performance_value_stores_journaled(
+    benchmark: BenchmarkFixture, pytestconfig: pytest.Config, tmp_path: Path
+) -> None:
+    """Append the changed value stores to the journal in every check cycle"""
+    avss = JournaledValueStoresStore(
+        tmp_path / "counters",
+        log_debug=lambda _msg: None,
+        compaction_min_entries=10_000,
+    )
+    _run_cycles(benchmark, pytestconfig, avss, avss.journal_path)
@@ -181,6 +181,7 @@ EMPTY_CONFIG = BaseConfig(
     notification_fallback_email="",
     notification_fallback_format=("asciimail", {}),
     notification_plugin_timeout=60,
+    notification_plugin_limits={},
     notification_logging=15,
     notification_spooling=None,
     notification_spool_to=None,
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Buffer
+
+def compress(
+    data: Buffer,
+    compression_level: int = 0,
+    block_size: int = 0,
+    content_checksum: bool = False,
+    block_linked: bool = True,
+    store_size: bool = True,
+) -> bytes: ...
+def decompress(data: Buffer) -> bytes: ...
+
+class LZ4FrameDecompressor:
+    eof: bool
+    needs_input: bool
+    unused_data: bytes | None
+    def decompress(self, data: Buffer, max_length: int = -1) -> bytes: ...
+    def reset(self) -> None: ...
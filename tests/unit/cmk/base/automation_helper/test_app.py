@@ -8,14 +8,19 @@
 
 import asyncio
 import logging
+import multiprocessing
+import os
+import signal
 import sys
 import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import NoReturn, override
 
 import fakeredis
+import psutil
 import pytest
 from fastapi.testclient import TestClient
 from pytest_mock import MockerFixture
@@ -33,7 +38,13 @@ from cmk.base.automation_helper._app import (
     make_application,
 )
 from cmk.base.automation_helper._cache import Cache, CacheError
-from cmk.base.automation_helper._config import Config, ReloaderConfig, ServerConfig, WatcherConfig
+from cmk.base.automation_helper._config import (
+    Config,
+    ReloaderConfig,
+    ServerConfig,
+    WatcherConfig,
+    WorkerPoolConfig,
+)
 from cmk.base.automations.automations import AutomationError
 from cmk.base.base_app import CheckmkBaseApp
 from cmk.base.config import ConfigCache, LoadingResult, make_host_tags, make_hosts_config
@@ -97,6 +108,59 @@ class _DummyAutomationEngineSystemExit:
         raise SystemExit(1)
 
 
+class _DummyAutomationEngineWorker:
+    """Reports the worker process and the generation of its configuration"""
+
+    def execute(
+        self,
+        app: CheckmkBaseApp,
+        cmd: str,
+        args: list[str],
+        plugins: AgentBasedPlugins | None,
+        loading_result: LoadingResult | None,
+    ) -> _DummyAutomationResult:
+        if args == ["exit"]:
+            os._exit(1)
+        sys.stdout.write(f"{os.getpid()} {getattr(loading_result, 'generation', None)}")
+        return _DummyAutomationResult()
+
+
+class _DummyAutomationEngineProcessPool:
+    """Starts a process pool, like the creation of the core configuration does"""
+
+    def execute(
+        self,
+        app: CheckmkBaseApp,
+        cmd: str,
+        args: list[str],
+        plugins: AgentBasedPlugins | None,
+        loading_result: LoadingResult | None,
+    ) -> _DummyAutomationResult:
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            sys.stdout.write(" ".join(str(n) for n in pool.map(abs, [-1, -2])))
+        return _DummyAutomationResult()
+
+
+class _DummyAutomationEngineBarrier:
+    """Only succeeds if the given number of automations are executed at the same time"""
+
+    def __init__(self, parties: int) -> None:
+        # Created before the workers are forked, so all of them share it
+        self.barrier = multiprocessing.get_context("fork").Barrier(parties, timeout=10)
+
+    def execute(
+        self,
+        app: CheckmkBaseApp,
+        cmd: str,
+        args: list[str],
+        plugins: AgentBasedPlugins | None,
+        loading_result: LoadingResult | None,
+    ) -> _DummyAutomationResult:
+        self.barrier.wait()
+        sys.stdout.write(str(os.getpid()))
+        return _DummyAutomationResult()
+
+
 _EXAMPLE_AUTOMATION_PAYLOAD = AutomationPayload(
     name=AutomationID("dummy"), args=[], stdin="", log_level=logging.INFO
 ).model_dump()
@@ -112,6 +176,7 @@ def _make_test_client(
         poll_interval=1.0,
         cooldown_interval=5.0,
     ),
+    worker_pool_config: WorkerPoolConfig | None = None,
 ) -> TestClient:
     dev_null = Path("/dev/null")
     config = Config(
@@ -126,6 +191,7 @@ def _make_test_client(
         ),
         watcher_config=WatcherConfig(schedules=[]),
         reloader_config=reloader_config,
+        worker_pool_config=worker_pool_config,
     )
     return TestClient(
         make_application(
@@ -289,6 +355,149 @@ def test_health_check(cache: Cache) -> None:
     assert HealthCheckResponse.model_validate(resp.json()).last_reload_at < time.time()
 
 
+def test_worker_pool_automation_with_success(mocker: MockerFixture, cache: Cache) -> None:
+    mock_reload_config = mocker.MagicMock()
+    with _make_test_client(
+        _DummyAutomationEngineSuccess(),
+        cache,
+        mock_reload_config,
+        lambda config_cache, hosts_config: None,
+        worker_pool_config=WorkerPoolConfig(num_workers=2),
+    ) as client:
+        resp = client.post("/automation", json=_EXAMPLE_AUTOMATION_PAYLOAD)
+
+    assert resp.status_code == 200
+    assert AutomationResponse.model_validate(resp.json()) == AutomationResponse(
+        serialized_result_or_error_code="dummy_serialized",
+        stdout="stdout_success",
+        stderr="stderr_success",
+    )
+    mock_reload_config.assert_called_once()  # only at application startup
+
+
+def test_worker_pool_executes_automations_concurrently(mocker: MockerFixture, cache: Cache) -> None:
+    engine = _DummyAutomationEngineBarrier(2)
+    with (
+        _make_test_client(
+            engine,
+            cache,
+            mocker.MagicMock(),
+            lambda config_cache, hosts_config: None,
+            worker_pool_config=WorkerPoolConfig(num_workers=2),
+        ) as client,
+        ThreadPoolExecutor(max_workers=2) as executor,
+    ):
+        responses = [
+            AutomationResponse.model_validate(resp.json())
+            for resp in executor.map(
+                lambda _n: client.post("/automation", json=_EXAMPLE_AUTOMATION_PAYLOAD), range(2)
+            )
+        ]
+
+    assert [resp.serialized_result_or_error_code for resp in responses] == [
+        "dummy_serialized",
+        "dummy_serialized",
+    ]
+    worker_pids = {resp.stdout for resp in responses}
+    assert len(worker_pids) == 2
+    assert str(os.getpid()) not in worker_pids
+    assert not engine.barrier.broken
+
+
+def test_worker_pool_automation_starts_processes(mocker: MockerFixture, cache: Cache) -> None:
+    with _make_test_client(
+        _DummyAutomationEngineProcessPool(),
+        cache,
+        mocker.MagicMock(),
+        lambda config_cache, hosts_config: None,
+        worker_pool_config=WorkerPoolConfig(num_workers=1),
+    ) as client:
+        resp = client.post("/automation", json=_EXAMPLE_AUTOMATION_PAYLOAD)
+
+    assert AutomationResponse.model_validate(resp.json()) == AutomationResponse(
+        serialized_result_or_error_code="dummy_serialized",
+        stdout="1 2",
+        stderr="",
+    )
+
+
+def _worker_pid(client: TestClient) -> int:
+    response = AutomationResponse.model_validate(
+        client.post("/automation", json=_EXAMPLE_AUTOMATION_PAYLOAD).json()
+    )
+    return int(response.stdout.split()[0])
+
+
+def test_worker_pool_replaces_failed_worker(mocker: MockerFixture, cache: Cache) -> None:
+    with _make_test_client(
+        _DummyAutomationEngineWorker(),
+        cache,
+        mocker.MagicMock(),
+        lambda config_cache, hosts_config: None,
+        worker_pool_config=WorkerPoolConfig(num_workers=1),
+    ) as client:
+        first_pid = _worker_pid(client)
+        failed = AutomationResponse.model_validate(
+            client.post(
+                "/automation",
+                json=AutomationPayload(
+                    name=AutomationID("dummy"), args=["exit"], stdin="", log_level=logging.INFO
+                ).model_dump(),
+            ).json()
+        )
+        second_pid = _worker_pid(client)
+
+    assert failed.serialized_result_or_error_code == AutomationError.UNKNOWN_ERROR
+    assert first_pid != second_pid
+
+
+def test_worker_pool_replaces_worker_killed_while_idle(mocker: MockerFixture, cache: Cache) -> None:
+    with _make_test_client(
+        _DummyAutomationEngineWorker(),
+        cache,
+        mocker.MagicMock(),
+        lambda config_cache, hosts_config: None,
+        worker_pool_config=WorkerPoolConfig(num_workers=1),
+    ) as client:
+        first_pid = _worker_pid(client)
+        os.kill(first_pid, signal.SIGKILL)
+        wait_until(
+            lambda: psutil.Process(first_pid).status() == psutil.STATUS_ZOMBIE,
+            timeout=5,
+            interval=0.01,
+        )
+        second_pid = _worker_pid(client)
+
+    assert first_pid != second_pid
+
+
+def test_worker_pool_replaces_stale_generation(mocker: MockerFixture, cache: Cache) -> None:
+    mock_reload_config = mocker.MagicMock(
+        side_effect=[mocker.MagicMock(generation=0), mocker.MagicMock(generation=1)]
+    )
+    with _make_test_client(
+        _DummyAutomationEngineWorker(),
+        cache,
+        mock_reload_config,
+        lambda config_cache, hosts_config: None,
+        worker_pool_config=WorkerPoolConfig(num_workers=1),
+    ) as client:
+        first_pid, first_generation = AutomationResponse.model_validate(
+            client.post("/automation", json=_EXAMPLE_AUTOMATION_PAYLOAD).json()
+        ).stdout.split()
+        cache.store_last_detected_change(time.time())
+        second_pid, second_generation = AutomationResponse.model_validate(
+            client.post("/automation", json=_EXAMPLE_AUTOMATION_PAYLOAD).json()
+        ).stdout.split()
+
+        # The worker of the previous generation has been stopped and reaped
+        assert not psutil.pid_exists(int(first_pid))
+
+    assert (first_generation, second_generation) == ("0", "1")
+    assert first_pid != second_pid
+    assert mock_reload_config.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_reloader_single_change(mocker: MockerFixture, cache: Cache) -> None:
     mock_reload_callback = mocker.MagicMock()
@@ -7,6 +7,7 @@
 
 import dataclasses
 import itertools
+import os
 import re
 import shutil
 import socket
@@ -2638,6 +2639,29 @@ def test_get_config_file_paths_with_confd(
     ]
 
 
+def test_load_config_restores_snapshot(
+    monkeypatch: MonkeyPatch, folder_path_test_config: BaseConfig
+) -> None:
+    # Recently modified files are never snapshotted
+    an_hour_ago = time.time() - 3600
+    for path in config.get_config_file_paths(with_conf_d=True):
+        os.utime(path, (an_hour_ago, an_hour_ago))
+    stored = config.load(edition=make_app().edition).loaded_config
+
+    with monkeypatch.context() as m:
+        m.setattr(config._impl, "_load_config", lambda *a, **kw: pytest.fail("not restored"))
+        restored = config.load(edition=make_app().edition).loaded_config
+    assert restored.host_paths == stored.host_paths == folder_path_test_config.host_paths
+    assert restored.cmc_host_rrd_config == folder_path_test_config.cmc_host_rrd_config
+
+    # The last loaded file
+    (cmk.utils.paths.check_mk_config_dir / "wato" / "lvl1_aaa" / "rules.mk").write_text(
+        "cmc_host_rrd_config = []\n"
+    )
+    assert not config.load(edition=make_app().edition).loaded_config.cmc_host_rrd_config
+    config._impl._config_snapshot_path().unlink()
+
+
 def test_load_config_folder_paths(folder_path_test_config: BaseConfig) -> None:
     config_cache = config.ConfigCache(
         folder_path_test_config,
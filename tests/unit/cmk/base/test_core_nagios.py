@@ -7,6 +7,7 @@
 # mypy: disable-error-code="type-arg"
 
 import importlib
+import importlib.util
 import io
 import itertools
 import os
@@ -20,6 +21,7 @@ import pytest
 from pytest import MonkeyPatch
 
 import cmk.ccc.debug
+import cmk.ccc.version
 
 # We need an active check plugin that exists.
 # The ExecutableFinder demands a location that exits :-/
@@ -30,8 +32,10 @@ import cmk.utils.paths
 from cmk.base import config
 from cmk.base.community_app import make_app
 from cmk.base.configlib.servicename import make_final_service_name_config
+from cmk.base.core.nagios import _parallel
 from cmk.base.core.nagios._create_config import (
     _format_nagios_object,
+    create_config,
     create_nagios_config_commands,
     create_nagios_host_spec,
     create_nagios_servicedefs,
@@ -43,6 +47,7 @@ from cmk.base.core.nagios._precompile_host_checks import (
     PrecompileMode,
 )
 from cmk.ccc.config_path import VersionedConfigPath
+from cmk.ccc.exceptions import MKIPAddressLookupError
 from cmk.ccc.hostaddress import HostAddress, HostName
 from cmk.checkengine.plugins import AgentBasedPlugins, AutocheckEntry, CheckPlugin, CheckPluginName
 from cmk.discover_plugins import PluginLocation
@@ -52,6 +57,7 @@ from cmk.utils import ip_lookup
 from cmk.utils.servicename import ServiceName
 from tests.testlib.common.empty_config import EMPTY_CONFIG, EMPTY_NAGIOS_CORE_CONFIG
 from tests.testlib.unit.base_configuration_scenario import Scenario
+from tests.unit.mocks_and_helpers import DummyLicensingHandler
 
 
 def _make_core_objects_config(config_cache: config.ConfigCache) -> config.CoreObjectsConfig:
@@ -446,6 +452,49 @@ class TestHostCheckStore:
 
         assert os.access(store.host_check_file_path(config_path, hostname), os.X_OK)
 
+    def test_write_reuses_unchanged_host_check(self, tmp_path: Path, config_path: Path) -> None:
+        previous_config_path = Path(VersionedConfigPath(tmp_path, 41))
+        store = HostCheckStore()
+        for hostname in (HostName("aaa"), HostName("bbb")):
+            assert not store.write(
+                previous_config_path, hostname, "xyz", precompile_mode=PrecompileMode.INSTANT
+            )
+
+        assert store.write(
+            config_path,
+            HostName("aaa"),
+            "xyz",
+            precompile_mode=PrecompileMode.INSTANT,
+            previous_config_path=previous_config_path,
+        )
+        assert not store.write(
+            config_path,
+            HostName("bbb"),
+            "abc",
+            precompile_mode=PrecompileMode.INSTANT,
+            previous_config_path=previous_config_path,
+        )
+
+        assert (
+            store.host_check_file_path(config_path, HostName("aaa")).stat().st_ino
+            == store.host_check_file_path(previous_config_path, HostName("aaa")).stat().st_ino
+        )
+        assert store.host_check_source_file_path(config_path, HostName("bbb")).read_text() == "abc"
+
+    def test_fingerprint(self, monkeypatch: MonkeyPatch, config_path: Path) -> None:
+        store = HostCheckStore()
+        assert not store.has_current_fingerprint(config_path)
+
+        store.save_fingerprint(config_path)
+        assert store.has_current_fingerprint(config_path)
+
+        monkeypatch.setattr(importlib.util, "MAGIC_NUMBER", b"\x00\x00\r\n")
+        assert not store.has_current_fingerprint(config_path)
+        monkeypatch.undo()
+
+        monkeypatch.setattr(cmk.ccc.version, "__version__", "1.2.3")
+        assert not store.has_current_fingerprint(config_path)
+
 
 def _make_plugins_for_test() -> AgentBasedPlugins:
     """Don't load actual plugins, just create some dummy objects."""
@@ -1175,3 +1224,118 @@ def test_create_nagios_config_commands(
 
     assert license_counter["services"] == 1
     assert outfile.getvalue() == expected_result
+
+
+def test_create_config_in_worker_processes(monkeypatch: MonkeyPatch) -> None:
+    ts = Scenario(edition=make_app().edition)
+    hostnames = [HostName(f"host-{n:02}") for n in range(20)]
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.set_option("ipaddresses", dict.fromkeys(hostnames, "127.0.0.1"))
+    ts.set_ruleset(
+        "host_check_commands",
+        [
+            {
+                "id": "01",
+                "condition": {"host_name": ["host-03", "host-17"]},
+                "value": ("service", "Check_MK"),
+            },
+        ],
+    )
+    loading_result = ts.apply(monkeypatch)
+    config_cache = loading_result.config_cache
+    final_service_name_config = make_final_service_name_config(
+        config_cache._loaded_config, config_cache.ruleset_matcher
+    )
+
+    def _create_config() -> tuple[str, Mapping[HostName, bytes]]:
+        outfile = io.StringIO()
+        notify_host_files = create_config(
+            outfile=outfile,
+            hosts_config=loading_result.hosts_config,
+            host_tags=loading_result.host_tags,
+            config_cache=config_cache,
+            core_objects_config=_make_core_objects_config(config_cache),
+            nagios_core_config=EMPTY_NAGIOS_CORE_CONFIG,
+            final_service_name_config=final_service_name_config,
+            passive_service_name_config=config_cache.make_passive_service_name_config(
+                final_service_name_config
+            ),
+            enforced_services_table=lambda hn: {},
+            plugins={},
+            hostnames=hostnames,
+            licensing_handler=DummyLicensingHandler(),
+            passwords={},
+            get_ip_stack_config=lambda hn: ip_lookup.IPStackConfig.IPv4,
+            default_address_family=lambda hn: socket.AddressFamily.AF_INET,
+            ip_address_of=ip_address_of_return_local,
+            service_depends_on=lambda *a: (),
+            timeperiods={},
+            get_relay_id=lambda hn: None,
+        )
+        return outfile.getvalue(), notify_host_files
+
+    in_this_process = _create_config()
+    monkeypatch.setattr(_parallel, "number_of_processes", lambda num_hosts: 3)
+    in_worker_processes = _create_config()
+
+    assert in_worker_processes == in_this_process
+    assert "check-mk-host-custom-host-17" in in_worker_processes[0]
+    assert list(in_worker_processes[1]) == hostnames
+
+
+def test_create_config_in_worker_processes_reports_failed_ip_lookups(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    ts = Scenario(edition=make_app().edition)
+    hostnames = [HostName(f"host-{n:02}") for n in range(20)]
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    loading_result = ts.apply(monkeypatch)
+    config_cache = loading_result.config_cache
+    final_service_name_config = make_final_service_name_config(
+        config_cache._loaded_config, config_cache.ruleset_matcher
+    )
+
+    def _lookup(host_name: HostName, family: socket.AddressFamily) -> HostAddress:
+        if host_name in ("host-05", "host-17"):
+            raise MKIPAddressLookupError(f"Failed to lookup IPv4 address of {host_name}")
+        return HostAddress("127.0.0.1")
+
+    def _create_config() -> Mapping[HostName, Exception]:
+        ip_address_of = ip_lookup.ConfiguredIPLookup(
+            _lookup, allow_empty=(), error_handler=ip_lookup.CollectFailedHosts()
+        )
+        create_config(
+            outfile=io.StringIO(),
+            hosts_config=loading_result.hosts_config,
+            host_tags=loading_result.host_tags,
+            config_cache=config_cache,
+            core_objects_config=_make_core_objects_config(config_cache),
+            nagios_core_config=EMPTY_NAGIOS_CORE_CONFIG,
+            final_service_name_config=final_service_name_config,
+            passive_service_name_config=config_cache.make_passive_service_name_config(
+                final_service_name_config
+            ),
+            enforced_services_table=lambda hn: {},
+            plugins={},
+            hostnames=hostnames,
+            licensing_handler=DummyLicensingHandler(),
+            passwords={},
+            get_ip_stack_config=lambda hn: ip_lookup.IPStackConfig.IPv4,
+            default_address_family=lambda hn: socket.AddressFamily.AF_INET,
+            ip_address_of=ip_address_of,
+            service_depends_on=lambda *a: (),
+            timeperiods={},
+            get_relay_id=lambda hn: None,
+        )
+        return ip_address_of.error_handler.failed_ip_lookups
+
+    in_this_process = _create_config()
+    monkeypatch.setattr(_parallel, "number_of_processes", lambda num_hosts: 3)
+    in_worker_processes = _create_config()
+
+    assert list(in_this_process) == ["host-05", "host-17"]
+    assert {host_name: str(exc) for host_name, exc in in_worker_processes.items()} == {
+        host_name: str(exc) for host_name, exc in in_this_process.items()
+    }
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import threading
+import time
+from collections.abc import Callable
+
+from cmk.base.notification_delivery import NotificationDelivery, PluginLimits
+
+
+def _deliver_after(seconds: float, result: str) -> Callable[[], str]:
+    def deliver() -> str:
+        time.sleep(seconds)
+        return result
+
+    return deliver
+
+
+def test_slow_plugin_does_not_delay_other_plugins() -> None:
+    delivery = NotificationDelivery({})
+    webhook_done = threading.Event()
+    mails: list[str] = []
+
+    delivery.submit("webhook", "alice", "host", webhook_done.wait, lambda _result: None)
+    for n in range(5):
+        delivery.submit(
+            "mail", f"contact{n}", f"host{n}", _deliver_after(0, f"mail{n}"), mails.append
+        )
+
+    deadline = time.monotonic() + 5
+    while len(mails) < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(mails) == [f"mail{n}" for n in range(5)]
+
+    webhook_done.set()
+    delivery.shutdown()
+
+
+def test_results_are_reported_in_order_per_contact() -> None:
+    delivery = NotificationDelivery({})
+    reported: list[str] = []
+
+    delivery.submit("webhook", "alice", "host1", _deliver_after(0.2, "first"), reported.append)
+    delivery.submit("mail", "alice", "host2", _deliver_after(0, "second"), reported.append)
+    delivery.submit("mail", "alice", "host3", _deliver_after(0, "third"), reported.append)
+    delivery.shutdown()
+
+    assert reported == ["first", "second", "third"]
+
+
+def test_notifications_about_one_object_are_delivered_in_order() -> None:
+    delivery = NotificationDelivery({})
+    delivered: list[str] = []
+
+    def deliver_after(seconds: float, notification_type: str) -> Callable[[], None]:
+        def deliver() -> None:
+            time.sleep(seconds)
+            delivered.append(notification_type)
+
+        return deliver
+
+    service = ("heute", "CPU load")
+    delivery.submit("webhook", "alice", service, deliver_after(0.2, "PROBLEM"), lambda _r: None)
+    delivery.submit("webhook", "bob", service, deliver_after(0, "RECOVERY"), lambda _r: None)
+    delivery.submit("webhook", "alice", ("heute", ""), deliver_after(0, "DOWN"), lambda _r: None)
+    delivery.shutdown()
+
+    assert delivered == ["DOWN", "PROBLEM", "RECOVERY"]
+
+
+def test_concurrency_is_limited_per_plugin() -> None:
+    delivery = NotificationDelivery(
+        {"webhook": PluginLimits(max_concurrent=2, max_per_minute=None)}
+    )
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def deliver() -> None:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    for n in range(6):
+        delivery.submit("webhook", f"contact{n}", f"host{n}", deliver, lambda _result: None)
+    delivery.shutdown()
+
+    assert max_running == 2
+
+
+def test_starts_are_limited_per_minute() -> None:
+    delivery = NotificationDelivery({"sms": PluginLimits(max_concurrent=4, max_per_minute=600)})
+    starts: list[float] = []
+
+    for n in range(3):
+        delivery.submit(
+            "sms",
+            f"contact{n}",
+            f"host{n}",
+            lambda: starts.append(time.monotonic()),
+            lambda _result: None,
+        )
+    delivery.shutdown()
+
+    assert starts[2] - starts[0] >= 0.19
+
+
+def test_statistics() -> None:
+    delivery = NotificationDelivery({"mail": PluginLimits(max_concurrent=1, max_per_minute=None)})
+    release = threading.Event()
+    delivery.submit("mail", "alice", "host1", release.wait, lambda _result: None)
+    delivery.submit("mail", "bob", "host2", _deliver_after(0, "sent"), lambda _result: None)
+
+    deadline = time.monotonic() + 5
+    while delivery.statistics()["mail"].running < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    statistics = delivery.statistics()["mail"]
+    assert (statistics.queued, statistics.running, statistics.delivered) == (1, 1, 0)
+
+    release.set()
+    while delivery.statistics()["mail"].delivered < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    statistics = delivery.statistics()["mail"]
+    assert (statistics.queued, statistics.running, statistics.delivered) == (0, 0, 2)
+    assert statistics.max_latency >= statistics.average_latency > 0
+    delivery.shutdown()
@@ -5,12 +5,14 @@
 
 import os
 from collections.abc import Mapping
+from pathlib import Path
 from typing import cast, Final
 
 import pytest
 from pytest import MonkeyPatch
 
 from cmk.base import notify
+from cmk.base.notification_delivery import NotificationDelivery
 from cmk.events.event_context import EnrichedEventContext, EventContext, HostName
 from cmk.events.notification_result import NotificationContext
 from cmk.events.notify_types import (
@@ -1699,3 +1701,43 @@ def test__rbn_match_rule_escalation_blocked() -> None:
         )
         == "The notification number 10 does not lie in range 1 ... 5"
     )
+
+
+def test_deliver_notification_concurrently(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    script = tmp_path / "webhook"
+    script.write_text('#!/bin/sh\necho "sent to $NOTIFY_CONTACTNAME"\nexit 2\n')
+    script.chmod(0o755)
+    monkeypatch.setattr(notify, "path_to_notification_script", lambda _plugin: str(script))
+    history: list[str] = []
+    monkeypatch.setattr(notify, "log_to_history", history.append)
+
+    delivery = NotificationDelivery({})
+    notify._deliver_notification(
+        "webhook",
+        NotificationContext({"CONTACTNAME": "alice", "WHAT": "HOST", "HOSTNAME": "heute"}),
+        plugin_timeout=10,
+        delivery=delivery,
+    )
+    delivery.shutdown()
+
+    assert len(history) == 2
+    assert history[0].startswith("HOST NOTIFICATION: alice;heute;")
+    assert history[1].startswith("HOST NOTIFICATION RESULT: alice;heute;CRITICAL;webhook;")
+    assert "sent to alice" in history[1]
+
+
+def test_run_notification_script_with_timeout_and_background_process(tmp_path: Path) -> None:
+    script = tmp_path / "webhook"
+    # The background process keeps the output pipe open after the plug-in has been killed
+    script.write_text('#!/bin/sh\necho "sending"\nsleep 60 &\nsleep 60\n')
+    script.chmod(0o755)
+
+    exit_code, output_lines = notify._run_notification_script(
+        "webhook",
+        str(script),
+        NotificationContext({"CONTACTNAME": "alice", "WHAT": "HOST", "HOSTNAME": "heute"}),
+        plugin_timeout=1,
+    )
+
+    assert exit_code == 1
+    assert output_lines == ["sending"]
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import copy
+import gc
+from collections.abc import Sequence
+
+import pytest
+from fakeredis import FakeRedis
+
+from cmk.bi import compiler
+from cmk.bi.compiler import BICompiler, ConfigStatus
+from cmk.bi.data_fetcher import BIStructureFetcher, SiteProgramStart
+from cmk.bi.filesystem import BIFileSystem
+from cmk.bi.lib import BIHostData, BIServiceData
+from cmk.bi.storage import LookupStore
+from cmk.bi.type_defs import BIPackConfig
+from cmk.ccc.hostaddress import HostName
+from cmk.ccc.site import SiteId
+from tests.unit.cmk.bi.bi_mocks import MockBIAggregationPack
+
+from .bi_test_data import sample_config
+from .conftest import DUMMY_SITES_CALLBACK
+
+
+def _packs(num_aggregations: int) -> Sequence[BIPackConfig]:
+    pack = copy.deepcopy(sample_config.bi_sample_packs[0])
+    template = pack["aggregations"][0]
+    pack["aggregations"] = [
+        {**copy.deepcopy(template), "id": f"aggregation_{num}"} for num in range(num_aggregations)
+    ]
+    return [pack]
+
+
+def _compiler(fs: BIFileSystem, num_hosts: int) -> BICompiler:
+    bi_compiler = BICompiler(fs.etc.config, DUMMY_SITES_CALLBACK, fs, FakeRedis())
+    structure_fetcher = BIStructureFetcher(DUMMY_SITES_CALLBACK, fs)
+    template = sample_config.bi_structure_states[HostName("heute")]
+    structure_fetcher.add_site_data(
+        SiteId("heute"),
+        {
+            HostName(f"host-{num}"): (*template[:-2], f"host-{num}_alias", f"host-{num}")
+            for num in range(num_hosts)
+        },
+    )
+    bi_compiler.bi_searcher.set_hosts(structure_fetcher.hosts)
+    return bi_compiler
+
+
+def _force_processes(monkeypatch: pytest.MonkeyPatch, processes: int) -> None:
+    monkeypatch.setattr(compiler, "_MIN_AGGREGATIONS_FOR_MULTIPROCESSING", 1)
+    monkeypatch.setattr(
+        compiler, "_get_multiprocessing_pool_size", lambda count: min(processes, count)
+    )
+
+
+def test_parallel_compilation_equals_sequential(
+    fs: BIFileSystem, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bi_compiler = _compiler(fs, 20)
+    aggregations = MockBIAggregationPack(_packs(5)).get_all_aggregations()
+
+    sequential, _recorders = bi_compiler._compile_aggregations(aggregations)
+    assert bi_compiler.compilation_stats is not None
+    assert bi_compiler.compilation_stats.processes == 1
+
+    _force_processes(monkeypatch, 2)
+    parallel, recorders = bi_compiler._compile_aggregations(aggregations)
+    assert bi_compiler.compilation_stats is not None
+    assert bi_compiler.compilation_stats.processes == 2
+    assert set(bi_compiler.compilation_stats.durations) == {a.id for a in aggregations}
+
+    assert list(parallel) == list(sequential) == list(recorders) == [a.id for a in aggregations]
+    for aggregation_id, compiled in sequential.items():
+        assert len(compiled.branches) == 20
+        assert parallel[aggregation_id].serialize() == compiled.serialize()
+
+
+def test_few_aggregations_are_compiled_without_processes(
+    fs: BIFileSystem, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bi_compiler = _compiler(fs, 20)
+    monkeypatch.setattr(compiler, "_get_multiprocessing_pool_size", lambda count: 4)
+
+    bi_compiler._compile_aggregations(MockBIAggregationPack(_packs(5)).get_all_aggregations())
+
+    assert bi_compiler.compilation_stats is not None
+    assert bi_compiler.compilation_stats.processes == 1
+
+
+def test_parallel_compilation_unfreezes_the_garbage_collector(
+    fs: BIFileSystem, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bi_compiler = _compiler(fs, 20)
+    _force_processes(monkeypatch, 2)
+    frozen_objects = gc.get_freeze_count()
+
+    bi_compiler._compile_aggregations(MockBIAggregationPack(_packs(5)).get_all_aggregations())
+
+    assert bi_compiler.compilation_stats is not None
+    assert bi_compiler.compilation_stats.processes == 2
+    assert gc.get_freeze_count() == frozen_objects
+
+
+class _IncrementalSetup:
+    """Drives compile_if_needed() with packs and hosts given by the test instead of the site"""
+
+    def __init__(self, fs: BIFileSystem, redis: FakeRedis, num_aggregations: int) -> None:
+        self.packs = _grouped_packs(num_aggregations)
+        self.hosts = {
+            HostName(f"group{group}-{num}"): _host_data(f"group{group}-{num}")
+            for group in range(num_aggregations)
+            for num in range(5)
+        }
+        self.compiler = BICompiler(fs.etc.config, DUMMY_SITES_CALLBACK, fs, redis)
+        self._timestamp = 0.0
+
+        def prepare_for_compilation(online_sites: set[SiteProgramStart]) -> None:
+            self.compiler._bi_packs._cleanup_and_load_packs(self.packs)
+            self.compiler.bi_searcher.set_hosts(dict(self.hosts))
+
+        def compute_current_configstatus() -> ConfigStatus:
+            return {
+                "configfile_timestamp": self._timestamp,
+                "online_sites": set(),
+                "known_sites": set(),
+            }
+
+        self.compiler.prepare_for_compilation = prepare_for_compilation  # type: ignore[method-assign]
+        self.compiler.compute_current_configstatus = compute_current_configstatus  # type: ignore[method-assign]
+
+    def compile(self) -> set[str]:
+        """Returns the IDs of the aggregations that have been compiled"""
+        self._timestamp += 1
+        self.compiler.compile_if_needed()
+        assert self.compiler.compilation_stats is not None
+        return set(self.compiler.compilation_stats.durations)
+
+
+def _grouped_packs(num_aggregations: int) -> Sequence[BIPackConfig]:
+    """Aggregation number N aggregates the hosts named groupN-*"""
+    pack = copy.deepcopy(sample_config.bi_sample_packs[0])
+    template = pack["aggregations"][0]
+    pack["aggregations"] = []
+    for num in range(num_aggregations):
+        aggregation = copy.deepcopy(template)
+        aggregation["id"] = f"aggregation_{num}"
+        aggregation["node"]["search"]["conditions"]["host_choice"] = {  # type: ignore[typeddict-item]
+            "type": "host_name_regex",
+            "pattern": f"group{num}-.*",
+        }
+        pack["aggregations"].append(aggregation)
+    return [pack]
+
+
+def _host_data(host_name: str, alias: str | None = None) -> BIHostData:
+    site_id, tags, labels, folder, services, children, parents, _alias, _name = (
+        sample_config.bi_structure_states[HostName("heute")]
+    )
+    return BIHostData(
+        site_id=site_id,
+        tags=tags,
+        labels=labels,
+        folder=folder,
+        services={x: BIServiceData(*y) for x, y in services.items()},
+        children=children,
+        parents=parents,
+        alias=alias or f"{host_name}_alias",
+        name=HostName(host_name),
+    )
+
+
+def _lookups(redis: FakeRedis) -> dict[str, set[str]]:
+    return {
+        key: redis.smembers(key)
+        for key in redis.scan_iter("bi:aggregation_lookup:*")
+        if not key.startswith("bi:aggregation_lookup_index")
+    }
+
+
+def _assert_equals_full_compilation(fs: BIFileSystem, setup: _IncrementalSetup) -> None:
+    redis = FakeRedis(decode_responses=True)
+    full_compiler = BICompiler(fs.etc.config, DUMMY_SITES_CALLBACK, fs, redis)
+    full_compiler.bi_searcher.set_hosts(dict(setup.hosts))
+    full_compiler._bi_packs._cleanup_and_load_packs(setup.packs)
+    compiled, _recorders = full_compiler._compile_aggregations(
+        full_compiler._bi_packs.get_all_aggregations()
+    )
+    LookupStore(redis).generate_aggregation_lookups(compiled)
+
+    assert {
+        aggr_id: aggregation.serialize()
+        for aggr_id, aggregation in setup.compiler.compiled_aggregations.items()
+    } == {aggr_id: aggregation.serialize() for aggr_id, aggregation in compiled.items()}
+    assert _lookups(setup.compiler._lookup_store._redis_client) == _lookups(redis)  # type: ignore[arg-type]
+
+
+def test_incremental_compilation_only_recompiles_affected_aggregations(fs: BIFileSystem) -> None:
+    setup = _IncrementalSetup(fs, FakeRedis(decode_responses=True), 3)
+    assert setup.compile() == {"aggregation_0", "aggregation_1", "aggregation_2"}
+    _assert_equals_full_compilation(fs, setup)
+
+    # Nothing changed but the time stamp of the configuration
+    assert setup.compile() == set()
+
+    setup.hosts[HostName("group1-2")] = _host_data("group1-2", alias="changed alias")
+    assert setup.compile() == {"aggregation_1"}
+    _assert_equals_full_compilation(fs, setup)
+
+    setup.hosts[HostName("group2-9")] = _host_data("group2-9")
+    assert setup.compile() == {"aggregation_2"}
+    _assert_equals_full_compilation(fs, setup)
+
+    del setup.hosts[HostName("group0-0")]
+    assert setup.compile() == {"aggregation_0"}
+    _assert_equals_full_compilation(fs, setup)
+
+    # A host which none of the searches matches
+    setup.hosts[HostName("other")] = _host_data("other")
+    assert setup.compile() == set()
+
+    # The aggregation IDs are part of the lookup values, all of them change
+    setup.packs = [{**setup.packs[0], "aggregations": setup.packs[0]["aggregations"][1:]}]
+    assert setup.compile() == {"aggregation_1", "aggregation_2"}
+    _assert_equals_full_compilation(fs, setup)
+
+
+def test_incremental_compilation_recompiles_all_without_dependencies(fs: BIFileSystem) -> None:
+    setup = _IncrementalSetup(fs, FakeRedis(decode_responses=True), 2)
+    setup.compile()
+    fs.cache.clear_compilation_cache()
+
+    assert setup.compile() == {"aggregation_0", "aggregation_1"}
+    _assert_equals_full_compilation(fs, setup)
+
+
+def test_incremental_compilation_of_many_aggregations(fs: BIFileSystem) -> None:
+    setup = _IncrementalSetup(fs, FakeRedis(decode_responses=True), 50)
+    assert len(setup.compile()) == 50
+
+    setup.hosts[HostName("group7-1")] = _host_data("group7-1", alias="changed alias")
+    assert setup.compile() == {"aggregation_7"}
+    _assert_equals_full_compilation(fs, setup)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import random
+import re
+from collections.abc import Mapping, Sequence
+
+import pytest
+
+from cmk.bi.lib import BIHostData, BIServiceData
+from cmk.bi.searcher import _literal_prefix, BISearcher
+from cmk.bi.type_defs import HostConditions, HostServiceConditions
+from cmk.ccc.hostaddress import HostName
+from cmk.ruleset_matcher.labels import LabelGroups
+from cmk.ruleset_matcher.matcher import matches_labels, matches_tag_condition, TagCondition
+from cmk.ruleset_matcher.tags import TagGroupID, TagID
+
+_TAG_GROUPS = {
+    TagGroupID("criticality"): [TagID("prod"), TagID("test"), TagID("critical")],
+    TagGroupID("networking"): [TagID("lan"), TagID("wan"), TagID("dmz")],
+}
+_LABELS = {"os": ["linux", "windows"], "env": ["prod", "dev"]}
+_FOLDERS = ["", "dc1/", "dc1/rack1/", "dc1/rack2/", "dc2/", "dc2/rack1/", "dc10/"]
+_SERVICES = [
+    *(f"Interface {n}" for n in range(20)),
+    *(f"Filesystem /data{n}" for n in range(10)),
+    "CPU load",
+    "CPU utilization",
+    "Memory",
+    "Uptime",
+    "Check_MK",
+    "Check_MK Discovery",
+]
+_SERVICE_PATTERNS = [
+    "Interface",
+    "Interface 1(.*)",
+    "Interface (1|2)$",
+    "CPU|Memory",
+    "Filesystem /data(\\d)",
+    "Check_MK$",
+    "Check_MK?",
+    ".*load",
+    "(?i)uptime",
+    "Nothing",
+]
+
+
+def _random_host(rng: random.Random, name: str) -> BIHostData:
+    return BIHostData(
+        site_id="site",
+        tags={
+            (group, rng.choice(tags)) for group, tags in _TAG_GROUPS.items() if rng.random() < 0.9
+        },
+        labels={name: rng.choice(values) for name, values in _LABELS.items() if rng.random() < 0.7},
+        folder=rng.choice(_FOLDERS),
+        services={
+            service_description: BIServiceData(
+                tags=set(), labels={"svc": rng.choice(["a", "b"])} if rng.random() < 0.5 else {}
+            )
+            for service_description in rng.sample(_SERVICES, rng.randint(0, 12))
+        },
+        children=(HostName("switch-child"),),
+        parents=(HostName("switch"),),
+        alias=f"{name}_alias",
+        name=HostName(name),
+    )
+
+
+def _random_hosts(rng: random.Random, count: int) -> dict[str, BIHostData]:
+    return {f"host-{n}": _random_host(rng, f"host-{n}") for n in range(count)}
+
+
+def _random_conditions(rng: random.Random) -> HostServiceConditions:
+    tag_conditions: dict[TagGroupID, TagCondition] = {}
+    for group, tags in rng.sample(sorted(_TAG_GROUPS.items()), rng.randint(0, 2)):
+        choices: list[TagCondition] = [
+            rng.choice(tags),
+            {"$ne": rng.choice(tags)},
+            {"$or": rng.sample(tags, 2)},
+        ]
+        tag_conditions[group] = rng.choice(choices)
+    name = rng.choice(sorted(_LABELS))
+    label_groups: LabelGroups = (
+        [(rng.choice(("and", "not")), [("and", f"{name}:{rng.choice(_LABELS[name])}")])]
+        if rng.random() < 0.5
+        else []
+    )
+    return {
+        "host_choice": {"type": "all_hosts"},
+        "host_folder": rng.choice(["", "dc1", "dc1/rack1", "dc2", "dc", "nowhere"]),
+        "host_tags": tag_conditions,
+        "host_label_groups": label_groups,
+        "service_regex": rng.choice(_SERVICE_PATTERNS),
+        "service_label_groups": rng.choice([[], [("and", [("and", "svc:a")])]]),
+    }
+
+
+def _reference_search_hosts(
+    hosts: Mapping[str, BIHostData], conditions: HostConditions
+) -> list[str]:
+    """The host search as it was before the indexes"""
+    folder_path = f"{conditions['host_folder']}/"
+    return [
+        host.name
+        for host in hosts.values()
+        if (not conditions["host_folder"] or host.folder.startswith(folder_path))
+        and all(
+            matches_tag_condition(taggroup_id, tag_condition, host.tags)
+            for taggroup_id, tag_condition in conditions["host_tags"].items()
+        )
+        and matches_labels(host.labels, conditions["host_label_groups"])
+    ]
+
+
+def _reference_search_services(
+    hosts: Mapping[str, BIHostData], conditions: HostServiceConditions
+) -> list[tuple[str, str, tuple[str | None, ...]]]:
+    regex_pattern = re.compile(conditions["service_regex"])
+    return [
+        (host_name, service_description, match.groups())
+        for host_name in _reference_search_hosts(hosts, conditions)
+        for service_description, service_data in hosts[host_name].services.items()
+        if (match := regex_pattern.match(service_description))
+        and matches_labels(service_data.labels, conditions["service_label_groups"])
+    ]
+
+
+def _search_services(
+    searcher: BISearcher, conditions: HostServiceConditions
+) -> list[tuple[str, str, tuple[str | None, ...]]]:
+    return [
+        (match.host_match.host.name, match.service_description, match.match_groups)
+        for match in searcher.search_services(conditions)
+    ]
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        pytest.param("Interface 1(.*)", "Interface 1", id="group"),
+        pytest.param("Check_MK?", "Check_M", id="optional character"),
+        pytest.param("Filesystem /data\\d", "Filesystem /data", id="escape"),
+        pytest.param("CPU|Memory", "", id="alternative"),
+        pytest.param("(?i)uptime", "", id="flags"),
+        pytest.param("*", "", id="invalid"),
+    ],
+)
+def test_literal_prefix(pattern: str, expected: str) -> None:
+    assert _literal_prefix(pattern) == expected
+
+
+def test_indexed_searches_equal_unindexed_searches() -> None:
+    rng = random.Random(4711)
+    hosts = _random_hosts(rng, 300)
+    searcher = BISearcher()
+    searcher.set_hosts(hosts)
+
+    for _ in range(300):
+        conditions = _random_conditions(rng)
+        assert [match.host.name for match in searcher.search_hosts(conditions)] == (
+            _reference_search_hosts(hosts, conditions)
+        ), conditions
+        assert _search_services(searcher, conditions) == _reference_search_services(
+            hosts, conditions
+        ), conditions
+
+
+def test_searcher_checks_hosts_it_does_not_know() -> None:
+    rng = random.Random(815)
+    searcher = BISearcher()
+    searcher.set_hosts(_random_hosts(rng, 10))
+    searcher.build_index()
+    # E.g. hosts which have been replaced without a call to set_hosts()
+    other_hosts = _random_hosts(rng, 10)
+
+    for _ in range(50):
+        conditions = _random_conditions(rng)
+        host_data = list(other_hosts.values())
+        hosts = searcher.filter_host_folder(host_data, conditions["host_folder"])
+        hosts = searcher.filter_host_tags(hosts, conditions["host_tags"])
+        hosts = searcher.filter_host_labels(hosts, conditions["host_label_groups"])
+        assert [host.name for host in hosts] == _reference_search_hosts(other_hosts, conditions)
+
+
+def test_repeated_searches_follow_changed_hosts() -> None:
+    rng = random.Random(42)
+    searches: Sequence[HostServiceConditions] = [_random_conditions(rng) for _ in range(20)]
+    searcher = BISearcher()
+
+    for num_hosts in (50, 80):
+        hosts = _random_hosts(rng, num_hosts)
+        searcher.set_hosts(hosts)
+        # Every search happens again and again for different rule nodes
+        for _ in range(3):
+            for conditions in searches:
+                assert [match.host.name for match in searcher.search_hosts(conditions)] == (
+                    _reference_search_hosts(hosts, conditions)
+                ), conditions
+                assert _search_services(searcher, conditions) == _reference_search_services(
+                    hosts, conditions
+                ), conditions
@@ -169,6 +169,34 @@ class TestLookupStore:
 
         assert lookup_store.aggregation_lookup_exists("heute", None)
 
+    def test_update_aggregation_lookups_only_rewrites_given_aggregations(self) -> None:
+        redis = FakeRedis(decode_responses=True)
+        lookup_store = LookupStore(redis)
+        lookup_store.generate_aggregation_lookups(
+            {
+                "first": _build_aggregation("first", branches=[_build_branch("Host heute")]),
+                "second": _build_aggregation("second", branches=[_build_branch("Other heute")]),
+                "removed": _build_aggregation("removed", branches=[_build_branch("Gone")]),
+            }
+        )
+        redis.sadd("bi:aggregation_lookup:heute:None", "untouched\tmarker")
+
+        lookup_store.update_aggregation_lookups(
+            {
+                "first": _build_aggregation("first", branches=[_build_branch("New title")]),
+                # Only the other aggregations are rewritten, this one is ignored
+                "second": _build_aggregation("second"),
+            },
+            {"first", "removed"},
+        )
+
+        assert redis.smembers("bi:aggregation_lookup:heute:None") == {
+            "first\tNew title",
+            "second\tOther heute",
+            "untouched\tmarker",
+        }
+        assert not redis.exists("bi:aggregation_lookup_index:removed")
+
 
 def test_identifier_handles_long_aggregation_ids() -> None:
     aggregation_id = """rsentoanfukkexikcuduwfywktekresvkfu_seriieorf;rnetinrsdknerfuornserf?fentn\
@@ -1256,3 +1256,26 @@ def test_abandoned_file_age_remaining_files_not_too_old(tmp_path: Path) -> None:
     assert unknown_files_no_history.inventory_tree.path.exists()
     assert unknown_files_no_history.inventory_tree_gz.path.exists()
     assert unknown_files_no_history.status_data_tree.path.exists()
+
+
+def test_abandoned_indexed_tree_files(tmp_path: Path) -> None:
+    inv_paths = InventoryPaths(tmp_path)
+    inv_paths.indexed_tree_dir.mkdir(parents=True)
+    known = inv_paths.inventory_tree_indexed(HostName("known"))
+    unknown = inv_paths.inventory_tree_indexed(HostName("unknown"))
+    for file_path in (known, unknown):
+        file_path.touch()
+        os.utime(file_path, (100, 100))
+    InventoryCleanup(tmp_path)._run(
+        Config(
+            inventory_cleanup=InvCleanupParams(
+                for_hosts=[],
+                default=None,
+                abandoned_file_age=2,
+            )
+        ),
+        host_names=[HostName("known")],
+        now=103,
+    )
+    assert known.exists()
+    assert not unknown.exists()
@@ -159,10 +159,11 @@ def test_automation_get_config_sync_state(request_context: None) -> None:
             ),
         },
         0,
+        True,
     )
 
 
-def test_get_config_sync_file_infos() -> None:
+def test_get_config_sync_file_infos(tmp_path: Path) -> None:
     base_dir = cmk.utils.paths.omd_root / "replication"
     _create_get_config_sync_file_infos_test_config(base_dir)
 
@@ -203,7 +204,11 @@ def test_get_config_sync_file_infos() -> None:
             site_path="links",
         ),
     ]
-    sync_infos = activate_changes._get_config_sync_file_infos(replication_paths, base_dir)
+    sync_infos = activate_changes._get_config_sync_file_infos(
+        replication_paths,
+        base_dir,
+        activate_changes.ConfigSyncDigestCache.load(tmp_path / "digests.pkl"),
+    )
 
     assert sync_infos == {
         "bla/blub/f2": ConfigSyncFileInfo(
@@ -269,6 +274,36 @@ def test_get_config_sync_file_infos() -> None:
     }
 
 
+def test_config_sync_digest_cache_reuses_digests_of_unchanged_files(tmp_path: Path) -> None:
+    cache_path = tmp_path / "digests.pkl"
+    file_paths = [str(tmp_path / name) for name in ("unchanged", "modified", "recent")]
+    for file_path in file_paths:
+        Path(file_path).write_text("Däng1")
+        os.utime(file_path, ns=(1_000_000_000, 1_000_000_000))
+
+    digest_cache = activate_changes.ConfigSyncDigestCache.load(cache_path)
+    first_infos = digest_cache.file_infos(file_paths)
+    digest_cache.save()
+    assert (digest_cache.hits, digest_cache.misses) == (0, 3)
+
+    Path(file_paths[1]).write_text("Däng2")
+    os.utime(file_paths[1], ns=(2_000_000_000, 2_000_000_000))
+    # Modified too recently for the digest to be cached
+    Path(file_paths[2]).write_text("Däng3")
+
+    digest_cache = activate_changes.ConfigSyncDigestCache.load(cache_path)
+    second_infos = digest_cache.file_infos(file_paths)
+    digest_cache.save()
+    assert (digest_cache.hits, digest_cache.misses) == (1, 2)
+    assert second_infos[file_paths[0]] == first_infos[file_paths[0]]
+    assert second_infos[file_paths[1]].file_hash != first_infos[file_paths[1]].file_hash
+    assert second_infos[file_paths[2]].file_hash != first_infos[file_paths[2]].file_hash
+
+    digest_cache = activate_changes.ConfigSyncDigestCache.load(cache_path)
+    assert digest_cache.file_infos(file_paths) == second_infos
+    assert (digest_cache.hits, digest_cache.misses) == (2, 1)
+
+
 def _create_get_config_sync_file_infos_test_config(base_dir: Path) -> None:
     base_dir.joinpath("etc/d1").mkdir(parents=True, exist_ok=True)
 
@@ -516,9 +551,11 @@ def _get_test_file_infos() -> tuple[dict[str, ConfigSyncFileInfo], dict[str, Con
     return remote, central
 
 
-def test_get_sync_archive(tmp_path: Path) -> None:
-    sync_archive = _get_test_sync_archive(tmp_path)
-    with tarfile.TarFile(mode="r", fileobj=io.BytesIO(sync_archive)) as f:
+@pytest.mark.parametrize("compress", [False, True])
+def test_create_sync_archive(tmp_path: Path, compress: bool) -> None:
+    sync_archive = _get_test_sync_archive(tmp_path, compress=compress)
+    assert sync_archive.startswith(b"\x1f\x8b") is compress
+    with tarfile.open(mode="r:*", fileobj=io.BytesIO(sync_archive)) as f:
         assert sorted(f.getnames()) == sorted(
             [
                 "etc/abc",
@@ -531,7 +568,7 @@ def test_get_sync_archive(tmp_path: Path) -> None:
         )
 
 
-def _get_test_sync_archive(tmp_path: Path) -> bytes:
+def _get_test_sync_archive(tmp_path: Path, *, compress: bool = False) -> bytes:
     tmp_path.joinpath("etc").mkdir(parents=True, exist_ok=True)
     with tmp_path.joinpath("etc/abc").open("w", encoding="utf-8") as f:
         f.write("gä")
@@ -549,7 +586,7 @@ def _get_test_sync_archive(tmp_path: Path) -> bytes:
     tmp_path.joinpath("broken-symlink").symlink_to("eeg")
     tmp_path.joinpath("working-symlink").symlink_to("ding")
 
-    return activate_changes._get_sync_archive(
+    with activate_changes._create_sync_archive(
         [
             "etc/abc",
             "file-to-dir/aaa",
@@ -559,15 +596,19 @@ def _get_test_sync_archive(tmp_path: Path) -> bytes:
             "working-symlink",
         ],
         tmp_path,
-    )
+        compress=compress,
+    ) as sync_archive:
+        return sync_archive.read()
 
 
 class TestAutomationReceiveConfigSync:
+    @pytest.mark.parametrize("compress", [False, True])
     def test_automation_receive_config_sync(
         self,
         monkeypatch: pytest.MonkeyPatch,
         tmp_path: Path,
         request_context: None,
+        compress: bool,
     ) -> None:
         remote_path = tmp_path / "remote"
         monkeypatch.setattr(cmk.utils.paths, "omd_root", remote_path)
@@ -607,7 +648,9 @@ class TestAutomationReceiveConfigSync:
         automation.execute(
             activate_changes.ReceiveConfigSyncRequest(
                 site_id=SiteId("remote"),
-                sync_archive=_get_test_sync_archive(tmp_path.joinpath("central")),
+                sync_archive=_get_test_sync_archive(
+                    tmp_path.joinpath("central"), compress=compress
+                ),
                 to_delete=[
                     "to_delete",
                     "working-symlink/file",
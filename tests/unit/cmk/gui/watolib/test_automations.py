@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import io
+from pathlib import Path
+
+from werkzeug.formparser import parse_form_data
+from werkzeug.test import create_environ
+
+from cmk.gui.watolib.automations import _StreamedMultipartFormData
+
+
+def _parse(body: _StreamedMultipartFormData) -> tuple[dict[str, str], dict[str, bytes]]:
+    raw = b"".join(body)
+    assert len(raw) == len(body)
+    _stream, form, files = parse_form_data(
+        create_environ(
+            method="POST",
+            input_stream=io.BytesIO(raw),
+            content_type=body.content_type,
+            content_length=len(raw),
+        )
+    )
+    return dict(form), {name: file.read() for name, file in files.items()}
+
+
+def test_streamed_multipart_form_data_is_parsed_like_requests_encoding() -> None:
+    assert _parse(
+        _StreamedMultipartFormData(
+            {"to_delete": "['/ä/☃/☕']", "debug": ""},
+            {"sync_archive": io.BytesIO(b"\x00\r\n--archive--\r\n" * 1000)},
+        )
+    ) == (
+        {"to_delete": "['/ä/☃/☕']", "debug": ""},
+        {"sync_archive": b"\x00\r\n--archive--\r\n" * 1000},
+    )
+
+
+def test_streamed_multipart_form_data_reads_files_while_sending(tmp_path: Path) -> None:
+    upload_path = tmp_path / "sync_archive"
+    upload_path.write_bytes(b"x" * 1024 * 1024)
+
+    with upload_path.open("rb") as upload:
+        body = _StreamedMultipartFormData({"site_id": "remote"}, {"sync_archive": upload})
+        sent = 0
+        for chunk in body:
+            sent += len(chunk)
+            # Nothing of the file is read ahead of what has been sent
+            assert upload.tell() <= sent
+            assert len(chunk) <= _StreamedMultipartFormData._CHUNK_SIZE
+
+    assert sent == len(body)
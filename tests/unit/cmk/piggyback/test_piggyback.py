@@ -5,11 +5,15 @@
 
 
 import pprint
+import time
+from pathlib import Path
 
 import cmk.utils.log
 import cmk.utils.paths
 from cmk.ccc.hostaddress import HostAddress
+from cmk.ccc.inotify import Cookie, Event, Masks, Watchee
 from cmk.piggyback import backend
+from cmk.piggyback.backend._storage import _make_message_from_event
 
 _TEST_HOST_NAME = HostAddress("test-host")
 
@@ -222,6 +226,165 @@ def test_get_source_and_piggyback_hosts() -> None:
     }
 
 
+def _payload_inode(source: HostAddress, piggybacked: HostAddress) -> int:
+    return (
+        (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback" / piggybacked / source).stat().st_ino
+    )
+
+
+def _store_for_test_host(payload: tuple[bytes, ...], timestamp: float) -> None:
+    backend.store_piggyback_raw_data(
+        HostAddress("source1"),
+        {_TEST_HOST_NAME: payload},
+        message_timestamp=timestamp,
+        contact_timestamp=timestamp,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+
+
+def test_store_unchanged_payload_only_updates_mtime() -> None:
+    _store_for_test_host(_PAYLOAD, _REF_TIME)
+    inode = _payload_inode(HostAddress("source1"), _TEST_HOST_NAME)
+    _store_for_test_host(_PAYLOAD, _REF_TIME + 10)
+
+    assert _payload_inode(HostAddress("source1"), _TEST_HOST_NAME) == inode
+    stored = _get_only_raw_data_element(_TEST_HOST_NAME)
+    assert stored.meta.last_update == _REF_TIME + 10
+    assert stored.raw_data == b"pay\nload\n"
+
+    _store_for_test_host((b"new", b"load"), _REF_TIME + 20)
+
+    assert _payload_inode(HostAddress("source1"), _TEST_HOST_NAME) != inode
+    stored = _get_only_raw_data_element(_TEST_HOST_NAME)
+    assert stored.meta.last_update == _REF_TIME + 20
+    assert stored.raw_data == b"new\nload\n"
+
+
+def test_store_many_payloads_keeps_the_unchanged_ones() -> None:
+    payloads = {HostAddress(f"vm-{n}"): (b"<<<esx_vsphere_vm>>>", b"x" * 2000) for n in range(200)}
+
+    def store(timestamp: float) -> None:
+        backend.store_piggyback_raw_data(
+            HostAddress("vcenter"),
+            payloads,
+            message_timestamp=timestamp,
+            contact_timestamp=timestamp,
+            omd_root=cmk.utils.paths.omd_root,
+        )
+
+    store(_REF_TIME)
+    inodes = {host: _payload_inode(HostAddress("vcenter"), host) for host in payloads}
+    payloads.update(dict.fromkeys(list(payloads)[:50], (b"<<<esx_vsphere_vm>>>", b"y" * 2000)))
+    store(_REF_TIME + 60)
+
+    assert [
+        host for host in payloads if _payload_inode(HostAddress("vcenter"), host) != inodes[host]
+    ] == list(payloads)[:50]
+
+
+def test_make_message_ignores_events_of_the_watched_folder(tmp_path: Path) -> None:
+    (folder := tmp_path / "piggybacked-host").mkdir()
+    event = Event(
+        watchee=Watchee(wd=1, path=folder),
+        type=Masks.ATTRIB,
+        cookie=Cookie(0),
+        name="",
+    )
+    assert _make_message_from_event(event, cmk.utils.paths.omd_root) is None
+
+
+def _unlink_index_snapshot() -> None:
+    (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback_index/index").unlink()
+
+
+def test_index_follows_stores_and_cleanups() -> None:
+    now = time.time()
+    backend.store_piggyback_raw_data(
+        HostAddress("source1"),
+        {HostAddress("old-host"): _PAYLOAD},
+        message_timestamp=_REF_TIME,
+        contact_timestamp=_REF_TIME,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+    assert list(backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)) == [
+        HostAddress("old-host")
+    ]
+
+    backend.store_piggyback_raw_data(
+        HostAddress("source1"),
+        {HostAddress("new-host"): _PAYLOAD},
+        message_timestamp=now,
+        contact_timestamp=now,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+    backend.cleanup_piggyback_files(3600, [], cmk.utils.paths.omd_root)
+
+    piggybacked = backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)
+    assert list(piggybacked) == [HostAddress("new-host")]
+    assert not (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback/old-host").exists()
+
+    # Without the snapshot the index is built from the payload files
+    _unlink_index_snapshot()
+    assert backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root) == piggybacked
+
+
+def test_index_skips_payloads_removed_without_the_index() -> None:
+    backend.store_piggyback_raw_data(
+        HostAddress("source1"),
+        {HostAddress("host1"): _PAYLOAD, HostAddress("host2"): _PAYLOAD},
+        message_timestamp=_REF_TIME,
+        contact_timestamp=_REF_TIME,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+    # Builds the index
+    backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)
+
+    (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback/host1/source1").unlink()
+
+    assert list(backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)) == [
+        HostAddress("host2")
+    ]
+
+
+def test_index_survives_a_truncated_log() -> None:
+    backend.store_piggyback_raw_data(
+        HostAddress("source1"),
+        {HostAddress("host1"): _PAYLOAD},
+        message_timestamp=_REF_TIME,
+        contact_timestamp=_REF_TIME,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+    # Builds the index
+    backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)
+    backend.store_piggyback_raw_data(
+        HostAddress("source1"),
+        {HostAddress("host2"): _PAYLOAD},
+        message_timestamp=_REF_TIME,
+        contact_timestamp=_REF_TIME,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+
+    with (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback_index/index.log").open("a") as log:
+        log.write(f"{_REF_TIME} sour")
+
+    piggybacked = backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)
+    assert list(piggybacked) == [HostAddress("host1"), HostAddress("host2")]
+
+    # The next writer does not continue the truncated line
+    backend.store_piggyback_raw_data(
+        HostAddress("source1"),
+        {HostAddress("host3"): _PAYLOAD},
+        message_timestamp=_REF_TIME,
+        contact_timestamp=_REF_TIME,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+    assert list(backend.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)) == [
+        HostAddress("host1"),
+        HostAddress("host2"),
+        HostAddress("host3"),
+    ]
+
+
 class TestPiggybackMetaData:
     def test_serialization_roundtrip(self) -> None:
         pmd = backend.PiggybackMetaData(